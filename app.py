@@ -13,10 +13,14 @@ from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QFileDialog, QProgressBar,
-    QTextEdit, QGroupBox, QMessageBox
+    QTextEdit, QGroupBox, QMessageBox, QCheckBox
 )
 
 from main import VideoOverlayAutomator
+from utils.process_control import ProcessControl, ProcessingCancelled
+from utils.scheduler import DEFAULT_HISTORY_PATH
+from utils.segment_cache import project_cache_dir
+from utils.validation import ValidationError
 
 
 def get_version():
@@ -89,7 +93,8 @@ class VideoProcessThread(QThread):
     finished = pyqtSignal(bool, str)  # success, message
 
     def __init__(self, xml_path, excel_path, video_folder, output_path, team1_names="LÉO / YANNOUCK",
-                 team2_names="BILAL / PIERRE"):
+                 team2_names="BILAL / PIERRE", preview=False, contact_sheet=False, renditions=None,
+                 live=False, super_tiebreak=False):
         super().__init__()
         self.xml_path = xml_path
         self.excel_path = excel_path
@@ -97,6 +102,32 @@ class VideoProcessThread(QThread):
         self.output_path = output_path
         self.team1_names = team1_names
         self.team2_names = team2_names
+        self.preview = preview
+        # Versions supplémentaires (hauteurs), encodées depuis le même décodage
+        self.renditions = renditions
+        # Planche de vérification (vignettes des clips) au lieu de la vidéo
+        self.contact_sheet = contact_sheet
+        # Mode direct: points rendus au fil de la saisie, jusqu'à l'arrêt (bouton Annuler)
+        self.live = live
+        self.super_tiebreak = super_tiebreak
+        self.automator = None
+        self.cancel_requested = False
+
+    def cancel(self):
+        """Annule le traitement (appelé depuis l'interface, ne bloque pas)."""
+        self.cancel_requested = True
+        if self.automator:
+            self.automator.cancel()
+
+    def pause(self):
+        """Met le traitement en pause."""
+        if self.automator:
+            self.automator.pause()
+
+    def resume(self):
+        """Reprend le traitement."""
+        if self.automator:
+            self.automator.resume()
 
     def run(self):
         try:
@@ -108,66 +139,70 @@ class VideoProcessThread(QThread):
                 self.excel_path,
                 self.video_folder,
                 team1_names=self.team1_names,
-                team2_names=self.team2_names
+                team2_names=self.team2_names,
+                preview=self.preview,
+                renditions=self.renditions,
+                super_tiebreak=self.super_tiebreak,
+                history_path=DEFAULT_HISTORY_PATH,
+                cache_dir=project_cache_dir(self.xml_path)
             )
+            self.automator = automator
+            if self.cancel_requested:
+                automator.cancel()
+
+            if self.live:
+                # Feuille en cours de saisie: pas de validation globale avant le rendu
+                self.progress.emit("Mode direct: en attente des nouveaux points...")
+                self.progress_percent.emit(15)
+                published = automator.watch(self.output_path)
+                self.progress_percent.emit(100)
+                self.finished.emit(True, f"Mode direct terminé: {published} point(s) publié(s) "
+                                         f"dans {self.output_path}")
+                return
 
             self.progress.emit("Parsing des fichiers...")
             self.progress_percent.emit(10)
             automator.parse_xml()
             automator.parse_excel()
 
-            # Vérifier la correspondance
-            if len(automator.clips) != len(automator.scores):
-                min_len = min(len(automator.clips), len(automator.scores))
-                automator.clips = automator.clips[:min_len]
-                automator.scores = automator.scores[:min_len]
+            # Valider les entrées avant d'encoder
+            report = automator.validate()
+            self.progress.emit(report.format())
+            if not report.ok:
+                raise ValidationError(report)
+
+            if self.contact_sheet:
+                self.progress.emit("Extraction des vignettes...")
+                self.progress_percent.emit(30)
+                html_path = automator.contact_sheet(self.output_path)
+                self.progress_percent.emit(100)
+                self.finished.emit(True, f"Planche de vérification générée: {html_path}")
+                return
 
             total_clips = len(automator.clips)
             self.progress.emit(f"Traitement de {total_clips} segments...")
             self.progress_percent.emit(15)
 
-            # Hook into the automator to get progress
-            import time
-            start_time = time.time()
-            segment_times = []
-
-            # On va modifier temporairement la méthode pour capturer la progression
-            original_process = automator.process_single_segment
-            completed = [0]  # Utilisé comme compteur mutable
-
-            def wrapped_process(*args, **kwargs):
-                seg_start = time.time()
-                result = original_process(*args, **kwargs)
-                seg_time = time.time() - seg_start
-
-                if result:
-                    segment_times.append(seg_time)
-                    completed[0] += 1
-
-                    # Calculer le temps restant
-                    avg_time = sum(segment_times) / len(segment_times)
-                    remaining = total_clips - completed[0]
-                    est_remaining = avg_time * remaining
+            # Progression et temps restant fournis par l'ordonnanceur (modèle de coût)
+            def on_progress(completed, total, eta):
+                percent = 15 + int((completed / total) * 80)
+                self.progress_percent.emit(percent)
 
-                    # Mettre à jour la progression
-                    percent = 15 + int((completed[0] / total_clips) * 80)
-                    self.progress_percent.emit(percent)
+                # Formater le temps restant
+                mins = int(eta // 60)
+                secs = int(eta % 60)
+                time_str = f"{mins}m{secs:02d}s" if mins > 0 else f"{secs}s"
 
-                    # Formater le temps restant
-                    mins = int(est_remaining // 60)
-                    secs = int(est_remaining % 60)
-                    time_str = f"{mins}m{secs:02d}s" if mins > 0 else f"{secs}s"
+                self.progress_detail.emit(completed, total, time_str)
+                self.progress.emit(f"Segment {completed}/{total} - Temps restant: ~{time_str}")
 
-                    self.progress_detail.emit(completed[0], total_clips, time_str)
-                    self.progress.emit(f"Segment {completed[0]}/{total_clips} - Temps restant: ~{time_str}")
-
-                return result
-
-            automator.process_single_segment = wrapped_process
+            automator.progress_callback = on_progress
             automator.process_video(self.output_path)
 
             self.progress_percent.emit(100)
             self.finished.emit(True, f"Vidéo générée avec succès: {self.output_path}")
+        except ProcessingCancelled:
+            self.finished.emit(False, "Traitement annulé")
         except Exception as e:
             self.finished.emit(False, f"Erreur: {str(e)}")
 
@@ -181,6 +216,7 @@ class PadelOverlayApp(QMainWindow):
         self.excel_path = ""
         self.video_folder = ""
         self.output_path = ""
+        self.process_thread = None
 
         self.init_ui()
         self.check_for_updates()
@@ -283,6 +319,10 @@ class PadelOverlayApp(QMainWindow):
         info_label.setStyleSheet("color: #666; font-size: 11px; font-style: italic;")
         teams_layout.addWidget(info_label)
 
+        # Format du match (validation des points numériques au 3e set)
+        self.super_tiebreak_checkbox = QCheckBox("🎯 3e set en super tie-break")
+        teams_layout.addWidget(self.super_tiebreak_checkbox)
+
         teams_group.setLayout(teams_layout)
         main_layout.addWidget(teams_group)
 
@@ -290,6 +330,14 @@ class PadelOverlayApp(QMainWindow):
         process_group = QGroupBox("3. Génération")
         process_layout = QVBoxLayout()
 
+        # Aperçu rapide (540p) pour vérifier les scores avant le rendu final
+        self.preview_checkbox = QCheckBox("👁️ Aperçu rapide (540p, vérification des scores)")
+        process_layout.addWidget(self.preview_checkbox)
+
+        # Versions réduites pour la publication (un seul décodage de la source)
+        self.renditions_checkbox = QCheckBox("📐 Versions 1080p et 720p")
+        process_layout.addWidget(self.renditions_checkbox)
+
         # Bouton de génération
         self.generate_btn = QPushButton("🚀 Générer la vidéo avec overlays")
         self.generate_btn.setMinimumHeight(50)
@@ -308,9 +356,33 @@ class PadelOverlayApp(QMainWindow):
                 background-color: #cccccc;
             }
         """)
-        self.generate_btn.clicked.connect(self.start_processing)
+        self.generate_btn.clicked.connect(lambda: self.start_processing())
         process_layout.addWidget(self.generate_btn)
 
+        # Planche de vérification: une vignette par clip avec son score (sans encoder)
+        self.contact_sheet_btn = QPushButton("🖼️ Planche de vérification des scores")
+        self.contact_sheet_btn.clicked.connect(lambda: self.start_processing(contact_sheet=True))
+        process_layout.addWidget(self.contact_sheet_btn)
+
+        # Mode direct (tournoi): les points sont publiés en HLS au fil de la saisie
+        self.live_btn = QPushButton("📡 Mode direct (points publiés au fil de la saisie)")
+        self.live_btn.clicked.connect(lambda: self.start_processing(live=True))
+        process_layout.addWidget(self.live_btn)
+
+        # Pause / annulation du traitement en cours
+        control_layout = QHBoxLayout()
+        self.pause_btn = QPushButton("⏸️ Pause")
+        self.pause_btn.setCheckable(True)
+        self.pause_btn.setVisible(False)
+        self.pause_btn.toggled.connect(self.toggle_pause)
+        control_layout.addWidget(self.pause_btn)
+
+        self.cancel_btn = QPushButton("⏹️ Annuler")
+        self.cancel_btn.setVisible(False)
+        self.cancel_btn.clicked.connect(self.cancel_processing)
+        control_layout.addWidget(self.cancel_btn)
+        process_layout.addLayout(control_layout)
+
         # Barre de progression
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -436,15 +508,15 @@ class PadelOverlayApp(QMainWindow):
             self,
             "Enregistrer la vidéo sous",
             "output_final.mp4",
-            "Video Files (*.mp4)"
+            "Video Files (*.mp4);;Playlist HLS (*.m3u8)"
         )
         if file_path:
             self.output_path = file_path
             self.output_input.setText(file_path)
             self.log(f"Sortie: {Path(file_path).name}")
 
-    def start_processing(self):
-        """Démarre le traitement vidéo."""
+    def start_processing(self, contact_sheet=False, live=False):
+        """Démarre le traitement vidéo (ou la planche de vérification)."""
         # Validation
         if not self.xml_path or not self.excel_path or not self.video_folder:
             QMessageBox.warning(
@@ -455,6 +527,22 @@ class PadelOverlayApp(QMainWindow):
             return
 
         output = self.output_input.text() or "output_final.mp4"
+        preview = self.preview_checkbox.isChecked()
+        # Pas de versions multiples pour un aperçu ou une planche
+        renditions = None
+        if self.renditions_checkbox.isChecked() and not preview and not contact_sheet:
+            renditions = (2160, 1080, 720)
+        if preview:
+            # L'aperçu ne remplace pas la vidéo finale
+            output_file = Path(output)
+            output = str(output_file.with_name(f"{output_file.stem}_apercu{output_file.suffix}"))
+        if contact_sheet:
+            # Dossier des planches à côté de la vidéo
+            output = str(Path(output).with_name(f"{Path(output).stem}_planche"))
+        if live:
+            # Playlist HLS et ses segments dans un dossier à côté de la vidéo
+            stem = Path(output).stem
+            output = str(Path(output).with_name(f"{stem}_direct") / f"{stem}.m3u8")
 
         # Récupérer les noms des équipes
         team1_names = self.team1_input.text() or "LÉO / YANNOUCK"
@@ -462,16 +550,30 @@ class PadelOverlayApp(QMainWindow):
 
         # Désactiver le bouton
         self.generate_btn.setEnabled(False)
+        self.contact_sheet_btn.setEnabled(False)
+        self.live_btn.setEnabled(False)
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         self.time_label.setVisible(True)
         self.time_label.setText("Démarrage...")
+        self.pause_btn.setChecked(False)
+        self.pause_btn.setVisible(True)
+        self.cancel_btn.setEnabled(True)
+        self.cancel_btn.setVisible(True)
 
         self.log("\n" + "=" * 50)
         self.log("DÉMARRAGE DU TRAITEMENT")
         self.log("=" * 50)
         self.log(f"Équipe 1: {team1_names}")
         self.log(f"Équipe 2: {team2_names}")
+        if preview:
+            self.log(f"Mode aperçu: {Path(output).name}")
+        if renditions:
+            self.log("Versions: source, 1080p et 720p")
+        if contact_sheet:
+            self.log(f"Planche de vérification: {output}")
+        if live:
+            self.log(f"Mode direct: {output} (Annuler pour arrêter)")
 
         # Lancer le thread de traitement
         self.process_thread = VideoProcessThread(
@@ -480,7 +582,12 @@ class PadelOverlayApp(QMainWindow):
             self.video_folder,
             output,
             team1_names,
-            team2_names
+            team2_names,
+            preview=preview,
+            contact_sheet=contact_sheet,
+            renditions=renditions,
+            live=live,
+            super_tiebreak=self.super_tiebreak_checkbox.isChecked()
         )
         self.process_thread.progress.connect(self.log)
         self.process_thread.progress_percent.connect(self.update_progress)
@@ -496,17 +603,62 @@ class PadelOverlayApp(QMainWindow):
         """Met à jour le temps restant."""
         self.time_label.setText(f"📹 Segment {current}/{total} • ⏱️ Temps restant: ~{time_str}")
 
+    def toggle_pause(self, paused):
+        """Met en pause ou reprend le traitement en cours."""
+        if not self.process_thread:
+            return
+        if paused:
+            self.process_thread.pause()
+            self.pause_btn.setText("▶️ Reprendre")
+            if ProcessControl.can_suspend():
+                self.time_label.setText("⏸️ En pause")
+                self.log("⏸️ Traitement en pause")
+            else:
+                # Processus FFmpeg non suspendables ici: les segments en cours vont jusqu'au bout
+                self.time_label.setText("⏸️ Pause après les segments en cours...")
+                self.log("⏸️ Pause demandée: les segments en cours se terminent d'abord")
+        else:
+            self.process_thread.resume()
+            self.pause_btn.setText("⏸️ Pause")
+            self.log("▶️ Reprise du traitement")
+
+    def cancel_processing(self):
+        """Annule le traitement en cours (les processus FFmpeg sont arrêtés immédiatement)."""
+        if not self.process_thread:
+            return
+        self.cancel_btn.setEnabled(False)
+        self.pause_btn.setEnabled(False)
+        self.time_label.setText("⏹️ Annulation...")
+        self.log("⏹️ Annulation demandée...")
+        self.process_thread.cancel()
+
+    def closeEvent(self, event):
+        """Arrête le traitement en cours avant de fermer la fenêtre."""
+        if self.process_thread and self.process_thread.isRunning():
+            self.process_thread.cancel()
+            self.process_thread.wait()
+        event.accept()
+
     def processing_finished(self, success, message):
         """Traitement terminé."""
         self.generate_btn.setEnabled(True)
+        self.contact_sheet_btn.setEnabled(True)
+        self.live_btn.setEnabled(True)
         self.progress_bar.setVisible(False)
         self.time_label.setVisible(False)
+        self.pause_btn.setVisible(False)
+        self.pause_btn.setEnabled(True)
+        self.cancel_btn.setVisible(False)
 
         self.log("\n" + "=" * 50)
         self.log(message)
         self.log("=" * 50)
 
-        if success:
+        if message == "Traitement annulé":
+            return
+        if success and (self.process_thread.contact_sheet or self.process_thread.live):
+            QMessageBox.information(self, "Succès!", message)
+        elif success:
             QMessageBox.information(
                 self,
                 "Succès!",
@@ -4,37 +4,142 @@ Automatisation de l'ajout d'overlays de score sur des vidéos de padel.
 Lit un XML Premiere Pro et un fichier Excel avec les scores.
 """
 
+import asyncio
 import logging
-import platform
+import os
+import socket
 import subprocess
+import sys
 import tempfile
 import time
-import xml.etree.ElementTree as ET
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
 
 import openpyxl
 
+from utils.async_engine import AsyncFFmpegEngine, JobTimeout
+from utils.broker import DEFAULT_PORT, TOKEN_ENV, BrokerClient, BrokerServer, JobBroker
+from utils.chunking import parse_keyframes, plan_chunks
+from utils.contact_sheet import TILE_WIDTH, ContactSheet, match_thumbnails, tile_size
+from utils.encoders import get_encoder, hwaccel_profile, scale_bitrate, select_encoder
+from utils.ffmpeg_commands import (
+    AUDIO_MODES, PREVIEW_HEIGHT, SEGMENT_FORMATS, build_audio_command, build_audio_filter,
+    build_concat_command, build_remux_command, build_segment_command, build_thumbnail_command,
+    build_title_card_command,
+    compute_segment_offsets, join_segments_bytes, segment_extension
+)
+from utils.highlights import (
+    SITUATIONS, TITLE_SECONDS, render_title_card, select_highlights, title_card_color
+)
+from utils.hls_packager import HlsPackager, segment_frames
 from utils.overlay_generator import PadelOverlayGenerator
+from utils.overlay_track import OVERLAY_MODES, OverlayTrack
+from utils.process_control import ProcessControl, ProcessingCancelled
+from utils.scheduler import DEFAULT_HISTORY_PATH, CostModel, JobScheduler, ThroughputHistory
+from utils.segment_cache import SegmentCache, memoized_fingerprint, project_cache_dir
+from utils.score_animation import ANIMATION_STYLES, ScoreAnimator
+from utils.source_index import SourceIndex
+from utils.stream_assembler import StreamingAssembler
+from utils.timeline import Timeline
+from utils.validation import ValidationError, validate_inputs
 
 
 class VideoOverlayAutomator:
+    # Relances d'un job asyncio qui dépasse son délai (délai doublé à chaque fois)
+    JOB_TIMEOUT_RETRIES = 1
+
     def __init__(self, xml_path, excel_path, video_folder=".",
                  team1_names="LÉO / YANNOUCK", team2_names="BILAL / PIERRE",
-                 debug=False):
+                 debug=False, segment_format="mp4", audio_mode="copy", animation=None,
+                 overlay_mode="png", quality_target=0, max_chunk_seconds=90, work_dir=None,
+                 codec=None, stream_output=False, preview=False, cache_dir=None, renditions=None,
+                 super_tiebreak=False, history_path=None):
         self.xml_path = Path(xml_path)
         self.excel_path = Path(excel_path)
         self.video_folder = Path(video_folder)
-        self.fps = 59.94  # NTSC 60fps (drop-frame)
+        # Format du match: 3e set joué en super tie-break (points numériques)
+        self.super_tiebreak = super_tiebreak
+        # NTSC 60fps par défaut, remplacé par le timebase de la séquence (parse_xml)
+        self.fps = 59.94
+        self.timeline = None
+        self.source_index = None
         self.clips = []
         self.scores = []
-        self.encoder = self.detect_gpu_encoder()
+        self.quality_target = quality_target
+        # Format imposé aux encodeurs ('h264', 'hevc', 'av1'), ex: worker de rendu distribué
+        self.codec = codec
+        # Aperçu rapide: 540p, x264 ultrafast, décodage des seules images clés
+        self.preview = preview
+        if preview:
+            self.encoder = get_encoder('libx264').describe()
+            self.hwaccel = 'software'
+            print(f"👁️  Mode aperçu: {PREVIEW_HEIGHT}p, {self.encoder['label']} {self.encoder['preset']}")
+        else:
+            self.encoder = self.detect_gpu_encoder()
+            # Profil de décodage/composition (logiciel, cuda ou videotoolbox)
+            self.hwaccel = hwaccel_profile(get_encoder(self.encoder['video_codec']))
         self.overlay_generator = None  # Sera initialisé après détection de la résolution
         self.team1_names = team1_names
         self.team2_names = team2_names
         self.debug = debug
         self.video_width = None
         self.video_height = None
+        # Format des segments intermédiaires ('mp4' ou 'ts', voir utils/ffmpeg_commands.py)
+        if segment_format not in SEGMENT_FORMATS:
+            raise ValueError(f"Format de segment inconnu: {segment_format}")
+        self.segment_format = segment_format
+        # Traitement de l'audio ('copy' par segment ou 'separate' en une passe)
+        if audio_mode not in AUDIO_MODES:
+            raise ValueError(f"Mode audio inconnu: {audio_mode}")
+        self.audio_mode = audio_mode
+        # Animation des changements de score (None, 'fade' ou 'slide')
+        if animation is not None and animation not in ANIMATION_STYLES:
+            raise ValueError(f"Style d'animation inconnu: {animation}")
+        self.animation = animation
+        self.animator = None
+        # Source des overlays ('png' par segment ou 'track' unique, voir utils/overlay_track.py)
+        if overlay_mode not in OVERLAY_MODES:
+            raise ValueError(f"Mode d'overlay inconnu: {overlay_mode}")
+        self.overlay_mode = overlay_mode
+        self.overlay_track = None
+        self.overlay_track_path = None
+        self.overlay_images = (None, {})  # (générateur, clé d'état -> image): rendus conservés entre lots
+        # Clips plus longs découpés en morceaux encodés en parallèle (None = pas de découpe)
+        self.max_chunk_seconds = max_chunk_seconds
+        # Ordonnancement: débits mesurés, jobs en cours et suivi de l'avancement
+        # (history_path: fichier partagé entre traitements, None = en mémoire)
+        self.throughput_history = ThroughputHistory(history_path)
+        self.scheduler = None
+        # Appelé après chaque job: (jobs terminés, nombre de jobs, temps restant estimé en s)
+        self.progress_callback = None
+        # Appelé pendant l'encodage d'un job (moteur asyncio): (clip, morceau, images encodées, total)
+        self.segment_progress_callback = None
+        self.original_bitrate = None
+        # Annulation / pause des workers et des processus FFmpeg en cours
+        self.control = ProcessControl()
+        # Assemblage en continu: chaque segment est ajouté à la sortie dès que les précédents
+        # le sont, puis supprimé (segments 'ts' avec audio par segment uniquement)
+        if stream_output and (segment_format != 'ts' or audio_mode != 'copy'):
+            raise ValueError("L'assemblage en continu demande segment_format='ts' et audio_mode='copy'")
+        self.stream_output = stream_output
+        self.assembler = None
+        # Publication HLS (sortie .m3u8): segments découpés et publiés au fil de l'encodage
+        self.packager = None
+        self.hls_output = False
+        # Versions à plusieurs résolutions (hauteurs, ex: (2160, 1080, 720)): décodage et
+        # composition une seule fois, puis split + scale vers un encodeur par version
+        if renditions and (preview or stream_output):
+            raise ValueError("Les versions multiples ne sont pas compatibles avec l'aperçu "
+                             "ni avec l'assemblage en continu")
+        self.renditions = tuple(renditions) if renditions else None
+        # Dossier de travail persistant (None = dossier temporaire): les segments
+        # terminés y sont conservés et réutilisés à la relance après une annulation
+        self.work_dir = Path(work_dir) if work_dir else None
+        # Cache des segments encodés partagé entre projets (None = désactivé)
+        self.segment_cache = SegmentCache(cache_dir) if cache_dir else None
+        # Empreintes des sources (clé de rendu des segments, avec ou sans cache)
+        self.source_fingerprints = {}
 
         # Configurer le logging
         if self.debug:
@@ -59,103 +164,49 @@ class VideoOverlayAutomator:
         else:
             logging.basicConfig(level=logging.WARNING)
 
+    def cancel(self):
+        """Annule le traitement: plus de nouveaux jobs, processus FFmpeg tués immédiatement."""
+        self.control.cancel()
+
+    def pause(self):
+        """Met le traitement en pause (processus FFmpeg suspendus sous macOS/Linux)."""
+        self.control.pause()
+
+    def resume(self):
+        """Reprend un traitement en pause."""
+        self.control.resume()
+
     def detect_gpu_encoder(self):
-        """Détecte le meilleur encodeur GPU disponible selon la plateforme."""
-        system = platform.system()
+        """
+        Détecte le meilleur encodeur disponible (voir utils/encoders.py).
 
+        Retient l'encodeur le plus rapide qui atteint la qualité demandée
+        (quality_target); les encodeurs matériels sont testés avant d'être retenus.
+        """
         print("🔍 Détection de l'encodeur GPU...")
 
-        # macOS: VideoToolbox
-        if system == "Darwin":
-            try:
-                result = subprocess.run(
-                    ['ffmpeg', '-hide_banner', '-encoders'],
-                    capture_output=True, text=True, timeout=5
-                )
-                if 'hevc_videotoolbox' in result.stdout:
-                    print("✅ GPU détecté: VideoToolbox (macOS)")
-                    return {
-                        'video_codec': 'hevc_videotoolbox',
-                        'preset': None,
-                        'crf': None,
-                        'extra_params': [
-                            '-q:v', '70',  # Plus bas = plus rapide (60 = bon compromis vitesse/qualité)
-                            '-prio_speed', '1',  # Priorité à la vitesse d'encodage
-                            '-realtime', '0',  # Pas de limitation temps réel
-                            '-power_efficient', '-1'  # Max performance (0 = auto, 1 = économie d'énergie)
-                        ]
-                    }
-            except:
-                pass
-
-        # Windows/Linux: NVIDIA NVENC
-        elif system in ["Windows", "Linux"]:
-            try:
-                result = subprocess.run(
-                    ['ffmpeg', '-hide_banner', '-encoders'],
-                    capture_output=True, text=True, timeout=5
-                )
-                if 'hevc_nvenc' in result.stdout:
-                    print("✅ GPU détecté: NVIDIA NVENC")
-                    return {
-                        'video_codec': 'hevc_nvenc',
-                        'preset': 'p1',  # p1=fastest (max speed)
-                        'crf': None,
-                        'extra_params': [
-                            '-rc:v', 'vbr',           # Variable bitrate (plus rapide que CBR)
-                            '-b:v', '10M',            # Bitrate cible
-                            '-maxrate:v', '15M',      # Bitrate max
-                            '-bufsize:v', '20M',      # Buffer
-                            '-spatial_aq', '1',       # Spatial AQ pour meilleure qualité
-                            '-temporal_aq', '1',      # Temporal AQ
-                            '-rc-lookahead', '20',    # Lookahead frames (compromis vitesse/qualité)
-                            '-surfaces', '64',        # Max surfaces pour RTX (défaut 32)
-                            '-2pass', '0'             # Désactive 2-pass (plus rapide)
-                        ]
-                    }
-            except:
-                pass
-
-        # Fallback: CPU avec preset ultrafast
-        print("⚠️  Pas de GPU détecté, utilisation CPU (ultrafast)")
-        return {
-            'video_codec': 'libx264',
-            'preset': 'ultrafast',
-            'crf': '23',
-            'extra_params': []
-        }
+        encoder = select_encoder(quality_target=self.quality_target, codec=self.codec)
+        if encoder.hardware:
+            print(f"✅ GPU détecté: {encoder.label}")
+        else:
+            print(f"⚠️  Pas de GPU détecté, utilisation CPU ({encoder.label}, {encoder.preset})")
+        return encoder.describe()
 
     def parse_xml(self):
-        """Parse le XML Premiere Pro pour extraire les clips vidéo."""
+        """
+        Parse le XML Premiere Pro pour extraire les clips vidéo.
+
+        Toutes les pistes vidéo et les séquences imbriquées (multicam) sont prises
+        en compte: la liste retournée est le montage aplati, dans l'ordre.
+        """
         print(f"📄 Parsing XML: {self.xml_path}")
-        tree = ET.parse(self.xml_path)
-        root = tree.getroot()
-
-        # Extraire tous les clips vidéo de la première track
-        for track in root.findall('.//video/track'):
-            for clipitem in track.findall('clipitem'):
-                name = clipitem.find('name').text if clipitem.find('name') is not None else 'Unknown'
-                start = int(clipitem.find('start').text) if clipitem.find('start') is not None else 0
-                end = int(clipitem.find('end').text) if clipitem.find('end') is not None else 0
-                in_point = int(clipitem.find('in').text) if clipitem.find('in') is not None else 0
-                out_point = int(clipitem.find('out').text) if clipitem.find('out') is not None else 0
-
-                # Trouver le chemin du fichier source
-                file_elem = clipitem.find('.//file')
-                pathurl = file_elem.find('pathurl').text if file_elem is not None and file_elem.find('pathurl') is not None else ''
-
-                self.clips.append({
-                    'name': name,
-                    'start_frame': start,
-                    'end_frame': end,
-                    'in_frame': in_point,
-                    'out_frame': out_point,
-                    'duration_frames': end - start,
-                    'pathurl': pathurl
-                })
-            break  # On prend seulement la première track
+        self.timeline = Timeline.from_file(self.xml_path)
+        self.clips.extend(self.timeline.edit_list())
+        # Frames du XML exprimées dans le timebase de la séquence
+        self.fps = self.timeline.fps() or self.fps
 
-        print(f"✅ Found {len(self.clips)} video clips")
+        print(f"✅ Found {len(self.clips)} video clips "
+              f"({len(self.timeline.clipitems)} clipitems, {len(self.timeline.sequences)} sequences)")
         return self.clips
 
     def parse_excel(self):
@@ -193,18 +244,43 @@ class VideoOverlayAutomator:
         """Convertit des frames en secondes (NTSC)."""
         return frames / self.fps
 
-    def find_video_file(self, clip_name):
-        """Trouve le fichier vidéo source."""
-        video_path = self.video_folder / clip_name
-        if video_path.exists():
-            return str(video_path)
+    def build_source_index(self):
+        """Indexe une seule fois les fichiers sources (dossier vidéo, puis dossier courant)."""
+        self.source_index = SourceIndex([self.video_folder, Path('.')])
+        return self.source_index
+
+    def resolve_sources(self):
+        """
+        Résout le fichier source de chaque clip avant tout encodage.
+
+        Le chemin trouvé est mémorisé dans clip['source_path'].
+
+        Returns:
+            Liste des noms de fichiers introuvables
+        """
+        index = self.source_index or self.build_source_index()
+        paths, unresolved = index.resolve_all(self.clips)
+        for clip, path in zip(self.clips, paths):
+            clip['source_path'] = path
+        return unresolved
+
+    def find_video_file(self, clip):
+        """
+        Trouve le fichier vidéo source.
+
+        Args:
+            clip: Dict de clip (voir parse_xml) ou nom de fichier
+        """
+        if isinstance(clip, dict) and clip.get('source_path'):
+            return clip['source_path']
 
-        # Si pas trouvé, chercher dans le dossier courant
-        current_path = Path('.') / clip_name
-        if current_path.exists():
-            return str(current_path)
+        index = self.source_index or self.build_source_index()
+        path = index.lookup(clip)
+        if path:
+            return path
 
-        raise FileNotFoundError(f"Video file not found: {clip_name}")
+        name = clip.get('file_name') or clip.get('name') if isinstance(clip, dict) else clip
+        raise FileNotFoundError(f"Video file not found: {name}")
 
     def get_video_resolution(self, video_file):
         """Détecte la résolution de la vidéo source (largeur x hauteur)."""
@@ -222,6 +298,55 @@ class VideoOverlayAutomator:
             pass
         return None, None
 
+    def get_video_duration(self, video_file):
+        """Détecte la durée de la vidéo source (secondes)."""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                 '-of', 'default=noprint_wrappers=1:nokey=1', video_file],
+                capture_output=True, text=True, timeout=10
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                return float(result.stdout.strip())
+        except:
+            pass
+        return None
+
+    def get_audio_format(self, video_file):
+        """Détecte l'audio de la source: (codec, fréquence, disposition des canaux), ou None."""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+                 '-show_entries', 'stream=codec_name,sample_rate,channel_layout',
+                 '-of', 'default=noprint_wrappers=1', video_file],
+                capture_output=True, text=True, timeout=10
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                values = dict(line.split('=', 1) for line in result.stdout.split() if '=' in line)
+                layout = values.get('channel_layout')
+                return (values['codec_name'], int(values['sample_rate']),
+                        layout if layout and layout != 'unknown' else 'stereo')
+        except:
+            pass
+        return None
+
+    def validate(self):
+        """
+        Valide toutes les entrées avant l'encodage (sources, plages, scores).
+
+        Returns:
+            ValidationReport (voir utils/validation.py)
+        """
+        self.resolve_sources()
+
+        # Une sonde ffprobe par source unique, en parallèle
+        sources = sorted({clip['source_path'] for clip in self.clips if clip.get('source_path')})
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            durations = dict(zip(sources, executor.map(self.get_video_duration, sources)))
+
+        return validate_inputs(self.clips, self.scores, self.fps, durations,
+                               super_tiebreak=self.super_tiebreak)
+
     def get_video_bitrate(self, video_file):
         """Extrait le bitrate de la vidéo source."""
         try:
@@ -251,18 +376,80 @@ class VideoOverlayAutomator:
         else:
             return f"{secs}s"
 
-    def process_single_segment(self, i, clip, score, temp_path, original_bitrate, total_clips):
-        """Traite un seul segment vidéo (pour parallélisation)."""
+    def build_video_params(self, original_bitrate=None):
+        """Construit les paramètres d'encodage vidéo (codec, preset, bitrate...)."""
+        return get_encoder(self.encoder['video_codec']).build_params(original_bitrate)
+
+    def overlay_kwargs(self, score):
+        """Arguments de create_overlay pour un score (sets terminés uniquement)."""
+        return {
+            'team1_names': self.team1_names,
+            'team2_names': self.team2_names,
+            'jeux': score['jeux'],
+            'points': score['points'],
+            'set1': score['set1'] if score['set1'] and score['set1'] != score['jeux'] else None,
+            'set2': score['set2'] if score['set2'] and score['set2'] != score['jeux'] else None
+        }
+
+    def get_keyframes(self, video_file, start_time, duration):
+        """Images clés de la source dans une plage (relatives au début de la plage, en images)."""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-skip_frame', 'nokey',
+                 '-read_intervals', f'{start_time}%{start_time + duration}',
+                 '-show_entries', 'frame=pts_time', '-of', 'csv=p=0', str(video_file)],
+                capture_output=True, text=True, timeout=60
+            )
+            if result.returncode == 0:
+                return parse_keyframes(result.stdout, start_time, self.fps)
+        except (OSError, subprocess.SubprocessError):
+            pass
+        return []
+
+    def plan_clip_chunks(self, clip):
+        """
+        Découpe un clip long en morceaux (aux images clés de la source).
+
+        Returns:
+            Liste de (décalage, durée) en images; un seul élément si le clip n'est pas découpé
+        """
+        max_frames = round(self.max_chunk_seconds * self.fps) if self.max_chunk_seconds else None
+        if not max_frames or clip['duration_frames'] <= max_frames:
+            return [(0, clip['duration_frames'])]
+        keyframes = self.get_keyframes(
+            clip['source_path'],
+            self.frames_to_seconds(clip['in_frame']),
+            self.frames_to_seconds(clip['duration_frames'])
+        )
+        return plan_chunks(clip['duration_frames'], max_frames, keyframes)
+
+    def prepare_segment(self, i, clip, score, temp_path, original_bitrate, total_clips,
+                        ts_offset=None, previous_score=None, chunk=None, reuse_only=False):
+        """
+        Prépare un segment: overlay, transition et commande FFmpeg.
+
+        chunk: (numéro, nombre, décalage, durée en images) pour un morceau de clip long
+        reuse_only: ne retourner que les segments déjà rendus (dossier de travail ou
+            cache), None pour un segment à encoder
+
+        Returns:
+            Dict du segment (avec 'cmd' à exécuter, sauf s'il est réutilisé), ou None
+        """
+        self.control.check()
         segment_start_time = time.time()
         timings = {}
 
-        print(f"\n[{i}/{total_clips}] Processing clip: {clip['name']}")
-        logging.debug(f"Segment {i}: Début du traitement")
+        chunk_index, chunk_count, chunk_offset, chunk_frames = chunk or (0, 1, 0, clip['duration_frames'])
+        part = f" (partie {chunk_index + 1}/{chunk_count})" if chunk_count > 1 else ""
+        name = f"{i:03d}_{chunk_index:02d}" if chunk_count > 1 else f"{i:03d}"
+
+        print(f"\n[{i}/{total_clips}] Processing clip: {clip['name']}{part}")
+        logging.debug(f"Segment {i}{part}: Début du traitement")
 
         # Trouver le fichier vidéo source
         t0 = time.time()
         try:
-            video_file = self.find_video_file(clip['name'])
+            video_file = self.find_video_file(clip)
         except FileNotFoundError as e:
             print(f"⚠️  {e}, skipping...")
             return None
@@ -271,94 +458,184 @@ class VideoOverlayAutomator:
 
         # Calculer les timestamps
         t0 = time.time()
-        start_time = self.frames_to_seconds(clip['in_frame'])
-        duration = self.frames_to_seconds(clip['duration_frames'])
+        start_time = self.frames_to_seconds(clip['in_frame'] + chunk_offset)
+        duration = self.frames_to_seconds(chunk_frames)
         timings['calc_timestamps'] = time.time() - t0
 
         print(f"   Start: {start_time:.2f}s, Duration: {duration:.2f}s")
 
+        segment = {
+            'path': None,
+            'time': 0.0,
+            'index': i,
+            'chunk': chunk_index,
+            'source': video_file,
+            'start': start_time,
+            'duration': duration,
+            'reused': False,
+            'timings': timings,
+            'started': segment_start_time
+        }
+
+        # Segment déjà terminé lors d'un traitement précédent (dossier de travail persistant)
+        segment_path = temp_path / f"segment_{name}{segment_extension(self.segment_format)}"
+        segment['path'] = str(segment_path)
+        renditions = self.rendition_outputs(segment_path, original_bitrate)
+        if renditions:
+            segment['renditions'] = [str(path) for path, _, _ in renditions]
+
         # Déterminer quels sets afficher
         t0 = time.time()
-        display_set1 = score['set1'] if score['set1'] and score['set1'] != score['jeux'] else None
-        display_set2 = score['set2'] if score['set2'] and score['set2'] != score['jeux'] else None
+        overlay_kwargs = self.overlay_kwargs(score)
         timings['calc_scores'] = time.time() - t0
 
-        print(f"   Set1: {display_set1} | Set2: {display_set2} | Jeux: {score['jeux']} | Points: {score['points']}")
-
-        # Créer l'overlay
+        # Clé du rendu: un segment d'un traitement précédent n'est réutilisé que si
+        # elle est identique (score corrigé, plage, encodeur, aperçu...: réencodé)
+        with_transition = bool(self.animator and previous_score and chunk_index == 0)
         t0 = time.time()
-        overlay_img = self.overlay_generator.create_overlay(
-            team1_names=self.team1_names,
-            team2_names=self.team2_names,
-            jeux=score['jeux'],
-            points=score['points'],
-            set1=display_set1,
-            set2=display_set2
+        render_key = self.segment_cache_key(
+            video_file, clip['in_frame'] + chunk_offset, chunk_frames, overlay_kwargs,
+            self.overlay_kwargs(previous_score) if with_transition else None,
+            original_bitrate, ts_offset
         )
-        overlay_path = temp_path / f"overlay_{i:03d}.png"
-        self.overlay_generator.save_overlay(overlay_img, str(overlay_path))
+        timings['render_key'] = time.time() - t0
+        if (self.segment_done(segment_path, render_key) and segment_path.exists()
+                and all(path.exists() for path, _, _ in renditions)):
+            print(f"   ♻️  Segment déjà encodé, réutilisé")
+            segment.update(reused=True, timings=None)
+            del segment['started']
+            return segment
+
+        print(f"   Set1: {overlay_kwargs['set1']} | Set2: {overlay_kwargs['set2']} | Jeux: {score['jeux']} | Points: {score['points']}")
+
+        # Jamais de réécriture sur place: le fichier peut être lié au cache des segments
+        segment_path.unlink(missing_ok=True)
+        for path, _, _ in renditions:
+            path.unlink(missing_ok=True)
+
+        # Même rendu déjà encodé (autre montage, autre projet): lié depuis le cache
+        segment['render_key'] = render_key
+        if self.segment_cache:
+            t0 = time.time()
+            cached = self.segment_cache.fetch(render_key, segment_path)
+            # Réutilisé seulement si toutes les versions sont en cache
+            for key, (path, _, _) in zip(self.rendition_cache_keys(render_key), renditions):
+                cached = cached and self.segment_cache.fetch(key, path)
+            timings['cache_lookup'] = time.time() - t0
+            if cached:
+                print(f"   ♻️  Segment trouvé dans le cache, réutilisé")
+                self.done_marker(segment_path).write_text(render_key, encoding='utf-8')
+                segment.update(reused=True, timings=None)
+                del segment['started'], segment['render_key']
+                return segment
+        if reuse_only:
+            return None
+
+        # Créer l'overlay (ou choisir son image dans la piste d'overlays)
+        t0 = time.time()
+        overlay_frame = None
+        overlay_position = (0, 0)
+        if self.overlay_track:
+            overlay_path = self.overlay_track_path
+            overlay_frame = self.overlay_track.frames[i - 1]
+            overlay_position = self.overlay_track.position
+        else:
+            overlay_img = self.overlay_generator.create_overlay(**overlay_kwargs)
+            overlay_path = temp_path / f"overlay_{name}.png"
+            self.overlay_generator.save_overlay(overlay_img, str(overlay_path))
         timings['create_overlay'] = time.time() - t0
         logging.debug(f"Segment {i}: Overlay créé en {timings['create_overlay']:.3f}s")
 
-        # Créer le segment avec overlay
-        segment_path = temp_path / f"segment_{i:03d}.mp4"
+        # Animation du changement de score (clip mis en cache par transition)
+        transition = None
+        if with_transition:
+            t0 = time.time()
+            transition = self.animator.transition(self.overlay_kwargs(previous_score), overlay_kwargs)
+            timings['transition'] = time.time() - t0
 
         # Construire la commande FFmpeg
         t0 = time.time()
-        ffmpeg_cmd = [
-            'ffmpeg',
-            '-hwaccel', 'cuda',
-            '-hwaccel_output_format', 'cuda',
-            '-ss', str(start_time),
-            '-i', video_file,
-            '-i', str(overlay_path),
-            '-filter_complex', '[0:v]hwdownload,format=nv12[base];[base][1:v]overlay=0:0,format=nv12,hwupload_cuda[out]',
-            '-map', '[out]',
-            '-t', str(duration),
-            '-c:v', self.encoder['video_codec']
-        ]
+        segment['cmd'] = build_segment_command(
+            video_file, overlay_path, segment_path,
+            start_time, duration,
+            self.build_video_params(original_bitrate),
+            segment_format=self.segment_format,
+            ts_offset=ts_offset,
+            audio=self.audio_mode == 'copy',
+            transition=transition,
+            overlay_frame=overlay_frame,
+            overlay_rate=OverlayTrack.FRAME_RATE,
+            overlay_position=overlay_position,
+            hwaccel=self.hwaccel,
+            scale=self.composite_scale(),
+            keyframes_only=self.preview,
+            renditions=renditions,
+            keyframe_frames=self.hls_keyframe_frames()
+        )
 
-        if self.encoder['preset']:
-            ffmpeg_cmd.extend(['-preset', self.encoder['preset']])
+        timings['build_cmd'] = time.time() - t0
 
-        if self.encoder['crf']:
-            ffmpeg_cmd.extend(['-crf', self.encoder['crf']])
+        print(f"   Running FFmpeg ({self.encoder['video_codec']}, {self.hwaccel})...")
+        logging.debug(f"Segment {i}: Commande FFmpeg: {' '.join(segment['cmd'])}")
+        return segment
 
-        # Utiliser le bitrate original si détecté
-        if original_bitrate and self.encoder['video_codec'] == 'hevc_nvenc':
-            custom_params = []
-            for j, param in enumerate(self.encoder['extra_params']):
-                if param == '-b:v':
-                    custom_params.extend(['-b:v', f'{int(original_bitrate)}M'])
-                    continue
-                elif param == '-maxrate:v':
-                    custom_params.extend(['-maxrate:v', f'{int(original_bitrate * 1.2)}M'])
-                    continue
-                elif param == '-bufsize:v':
-                    custom_params.extend(['-bufsize:v', f'{int(original_bitrate * 2)}M'])
-                    continue
-                if j > 0 and self.encoder['extra_params'][j-1] in ['-b:v', '-maxrate:v', '-bufsize:v']:
-                    continue
-                custom_params.append(param)
-            ffmpeg_cmd.extend(custom_params)
-        else:
-            ffmpeg_cmd.extend(self.encoder['extra_params'])
+    @staticmethod
+    def done_marker(segment_path):
+        """Marqueur d'un segment terminé (contient sa clé de rendu, voir segment_cache_key)."""
+        return Path(segment_path).with_name(Path(segment_path).name + ".done")
 
-        # Audio: copier si déjà en AAC, sinon réencoder
-        ffmpeg_cmd.extend([
-            '-c:a', 'copy',  # Copie l'audio (pas de réencodage)
-            '-y',
-            str(segment_path)
-        ])
+    def segment_done(self, segment_path, render_key):
+        """True si le segment a été terminé avec le même rendu (marqueur absent ou ancien: False)."""
+        try:
+            return self.done_marker(segment_path).read_text(encoding='utf-8').strip() == render_key
+        except OSError:
+            return False
 
-        timings['build_cmd'] = time.time() - t0
+    def segment_cache_key(self, video_file, start_frame, frames, overlay_kwargs, previous_kwargs,
+                          original_bitrate, ts_offset):
+        """
+        Clé du rendu d'un segment (cache et marqueurs .done): tout ce qui détermine son rendu.
 
-        print(f"   Running FFmpeg ({self.encoder['video_codec']})...")
-        logging.debug(f"Segment {i}: Commande FFmpeg: {' '.join(ffmpeg_cmd)}")
+        Source (empreinte du contenu), plage exacte en images, état de l'overlay
+        (et état précédent si le segment commence par une transition), taille
+        de sortie et réglages d'encodage.
+        """
+        return SegmentCache.key({
+            'source': memoized_fingerprint(video_file, self.source_fingerprints),
+            'start_frame': start_frame,
+            'frames': frames,
+            'fps': self.fps,
+            'overlay': overlay_kwargs,
+            'overlay_mode': self.overlay_mode,
+            'transition': [self.animation, previous_kwargs] if previous_kwargs else None,
+            'size': self.output_size(),
+            'preview': self.preview,
+            'video_params': self.build_video_params(original_bitrate),
+            'hwaccel': self.hwaccel,
+            'segment_format': self.segment_format,
+            'audio': self.audio_mode == 'copy',
+            'keyframe_frames': self.hls_keyframe_frames(),
+            # Timestamps inscrits dans les segments 'ts' (position dans la vidéo finale)
+            'ts_offset': round(ts_offset, 6) if ts_offset is not None else None
+        })
+
+    def rendition_cache_keys(self, key):
+        """Clés du cache des versions réduites d'un segment (même rendu, autre taille)."""
+        if not self.renditions:
+            return []
+        return [self.segment_cache.key({'segment': key, 'rendition': size})
+                for size in self.rendition_sizes()[1:]]
+
+    def complete_segment(self, segment, result, ffmpeg_elapsed):
+        """
+        Termine un segment après l'exécution de sa commande FFmpeg.
 
-        t0 = time.time()
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-        timings['ffmpeg_execution'] = time.time() - t0
+        Returns:
+            Dict du segment (path, time, index, chunk, source, start, duration, timings), ou None
+        """
+        i = segment['index']
+        timings = segment['timings']
+        timings['ffmpeg_execution'] = ffmpeg_elapsed
         logging.debug(f"Segment {i}: FFmpeg exécuté en {timings['ffmpeg_execution']:.3f}s")
 
         if result.returncode != 0:
@@ -366,7 +643,14 @@ class VideoOverlayAutomator:
             logging.error(f"Segment {i}: Erreur FFmpeg: {result.stderr}")
             return None
 
-        segment_elapsed = time.time() - segment_start_time
+        key = segment.pop('render_key')
+        self.done_marker(segment['path']).write_text(key, encoding='utf-8')
+        if self.segment_cache:
+            self.segment_cache.store(key, segment['path'])
+            for rendition_key, path in zip(self.rendition_cache_keys(key), segment.get('renditions', [])):
+                self.segment_cache.store(rendition_key, path)
+        segment_elapsed = time.time() - segment.pop('started')
+        del segment['cmd']
         print(f"   ✅ Segment créé en {self.format_time(segment_elapsed)}")
 
         # Log détaillé des timings
@@ -376,25 +660,180 @@ class VideoOverlayAutomator:
                 pct = (value / segment_elapsed) * 100
                 logging.debug(f"  - {key}: {value:.3f}s ({pct:.1f}%)")
 
-        return {
-            'path': str(segment_path),
-            'time': segment_elapsed,
-            'index': i,
-            'timings': timings if self.debug else None
-        }
+        segment['time'] = segment_elapsed
+        segment['timings'] = timings if self.debug else None
+        return segment
 
-    def process_video(self, output_path="output_final.mp4"):
+    def process_single_segment(self, i, clip, score, temp_path, original_bitrate, total_clips,
+                               ts_offset=None, previous_score=None, chunk=None):
         """
-        Traite la vidéo complète avec les overlays.
+        Traite un seul segment vidéo (pour parallélisation).
+
+        chunk: (numéro, nombre, décalage, durée en images) pour un morceau de clip long
         """
-        print(f"\n🎬 Starting video processing...")
-        total_start_time = time.time()
+        segment = self.prepare_segment(i, clip, score, temp_path, original_bitrate, total_clips,
+                                       ts_offset=ts_offset, previous_score=previous_score, chunk=chunk)
+        if segment is None or segment['reused']:
+            return segment
+
+        t0 = time.time()
+        result = self.control.run(segment['cmd'])
+        return self.complete_segment(segment, result, time.time() - t0)
+
+    async def process_segment_async(self, engine, job, *args, **kwargs):
+        """
+        Traite un segment avec le moteur asyncio (même résultat que process_single_segment).
+
+        La préparation (overlay, transition) tourne dans un thread; FFmpeg est
+        piloté par la boucle, avec un délai déduit du coût estimé du job. Un job
+        qui dépasse son délai est relancé avec un délai doublé (JOB_TIMEOUT_RETRIES
+        fois), puis fait échouer le traitement: le segment n'est jamais omis.
+
+        Raises:
+            JobTimeout: si le job dépasse encore son délai après les relances
+        """
+        segment = await asyncio.to_thread(self.prepare_segment, *args, **kwargs)
+        if segment is None or segment['reused']:
+            return segment
+
+        frames = job[3][3]
+        segment_name = f"Segment {segment['index']}.{segment['chunk']}"
+
+        def on_progress(progress):
+            logging.debug(f"{segment_name}: {progress['frame']}/{frames} images")
+            if self.segment_progress_callback:
+                self.segment_progress_callback(segment['index'], segment['chunk'], progress['frame'], frames)
+
+        # Taille estimée du segment: débit de la source (50 Mb/s par défaut) sur sa durée
+        expected_bytes = int((self.original_bitrate or 50) * 1_000_000 / 8 * segment['duration'])
+
+        timeout = engine.timeout or self.scheduler.timeout(job)
+        for attempt in range(self.JOB_TIMEOUT_RETRIES + 1):
+            t0 = time.time()
+            try:
+                result = await engine.run(
+                    segment['cmd'],
+                    timeout=timeout,
+                    on_progress=on_progress,
+                    expected_bytes=expected_bytes,
+                    control=self.control
+                )
+                break
+            except JobTimeout as e:
+                logging.error(f"{segment_name}: {e}")
+                if attempt == self.JOB_TIMEOUT_RETRIES:
+                    print(f"   ❌ {segment_name}: {e}, abandon du traitement")
+                    raise JobTimeout(f"{segment_name}: {e}") from None
+                timeout *= 2
+                print(f"   ⚠️  {segment_name}: {e}, nouvel essai (délai {timeout:.0f}s)")
+        return self.complete_segment(segment, result, time.time() - t0)
+
+    def extract_audio(self, segments_data, temp_path):
+        """
+        Extrait l'audio de tous les segments créés en une seule commande FFmpeg.
+
+        Chaque source est lue une fois, les plages sont coupées à l'échantillon près
+        puis encodées en un seul fichier AAC, muxé lors de l'assemblage final.
+
+        Returns:
+            Chemin du fichier audio, ou None en cas d'échec
+        """
+        ranges = [(seg['source'], seg['start'], seg['duration']) for seg in segments_data]
+
+        sources, graph = build_audio_filter(ranges)
+        graph_path = temp_path / "audio_graph.txt"
+        graph_path.write_text(graph, encoding='utf-8')
+        audio_path = temp_path / "audio.m4a"
+
+        audio_cmd = build_audio_command(sources, graph_path, audio_path)
+        logging.debug(f"Audio: Commande FFmpeg: {' '.join(audio_cmd)}")
+        result = self.control.run(audio_cmd)
+
+        if result.returncode != 0:
+            print(f"   ❌ Audio extraction failed: {result.stderr}")
+            logging.error(f"Audio: Erreur FFmpeg: {result.stderr}")
+            return None
+        return audio_path
+
+    def join_ts_segments(self, segments, temp_path, output_path, audio_path=None):
+        """
+        Assemble des segments MPEG-TS par simple jointure d'octets.
+
+        Si la sortie n'est pas un .ts (ou si une piste audio séparée doit être
+        ajoutée), le flux joint est remuxé une seule fois (copie de flux).
+        """
+        if Path(output_path).suffix.lower() == '.ts' and not audio_path:
+            join_segments_bytes(segments, output_path)
+            return subprocess.CompletedProcess([], 0, '', '')
+
+        joined_path = temp_path / f"{Path(output_path).stem}_joined.ts"
+        join_segments_bytes(segments, joined_path)
+        remux_cmd = build_remux_command(joined_path, output_path, audio_path)
+        return self.control.run(remux_cmd)
+
+    def output_size(self):
+        """
+        Résolution de composition des segments: celle de la source, réduite à
+        PREVIEW_HEIGHT en aperçu, ou celle de la plus grande version demandée.
+        """
+        if self.renditions:
+            return self.rendition_sizes()[0]
+        width, height = self.video_width or 3840, self.video_height or 2160
+        if not self.preview or height <= PREVIEW_HEIGHT:
+            return width, height
+        # Largeur paire (contrainte yuv420p)
+        return round(width * PREVIEW_HEIGHT / height / 2) * 2, PREVIEW_HEIGHT
+
+    def rendition_sizes(self):
+        """Tailles des versions, de la plus grande à la plus petite (jamais au-delà de la source)."""
+        width, height = self.video_width or 3840, self.video_height or 2160
+        heights = sorted({min(h, height) for h in self.renditions}, reverse=True)
+        return [(width, h) if h == height else (round(width * h / height / 2) * 2, h) for h in heights]
+
+    def composite_scale(self):
+        """Taille de composition si la source est réduite avant l'overlay, sinon None."""
+        if not (self.preview or self.renditions):
+            return None
+        size = self.output_size()
+        return size if size != (self.video_width, self.video_height) else None
+
+    @staticmethod
+    def rendition_path(path, size):
+        """Fichier d'une version réduite (segment ou vidéo finale): nom_720p.mp4."""
+        path = Path(path)
+        return path.with_name(f"{path.stem}_{size[1]}p{path.suffix}")
+
+    def rendition_outputs(self, segment_path, original_bitrate):
+        """Sorties supplémentaires d'un segment: (fichier, taille, paramètres d'encodage)."""
+        if not self.renditions:
+            return []
+        sizes = self.rendition_sizes()
+        return [
+            (self.rendition_path(segment_path, size), size,
+             self.build_video_params(scale_bitrate(original_bitrate, sizes[0], size)))
+            for size in sizes[1:]
+        ]
+
+    def prepare_sources(self):
+        """
+        Résout les sources et détecte la résolution et le bitrate de la première vidéo.
+
+        Returns:
+            Bitrate original (Mbps), ou None si non détecté
+        """
+        # Résoudre toutes les sources avant d'encoder (un seul parcours des dossiers)
+        unresolved = self.resolve_sources()
+        if unresolved:
+            print(f"\n⚠️  {len(unresolved)} fichier(s) source introuvable(s), clips ignorés:")
+            for name in unresolved:
+                print(f"   • {name}")
 
         # Détecter la résolution et le bitrate de la première vidéo source
         original_bitrate = None
-        if self.clips:
+        resolved_clips = [clip for clip in self.clips if clip.get('source_path')]
+        if resolved_clips:
             try:
-                first_video = self.find_video_file(self.clips[0]['name'])
+                first_video = resolved_clips[0]['source_path']
 
                 # Détecter la résolution
                 if not self.video_width or not self.video_height:
@@ -419,105 +858,1014 @@ class VideoOverlayAutomator:
                 self.video_width, self.video_height = 3840, 2160
                 self.overlay_generator = PadelOverlayGenerator(self.video_width, self.video_height)
 
-        # Créer un dossier temporaire pour les segments
-        with tempfile.TemporaryDirectory() as temp_dir:
+        if self.preview or self.renditions:
+            # Overlays rendus directement à la taille de composition (facteur d'échelle du générateur)
+            width, height = self.output_size()
+            self.overlay_generator = PadelOverlayGenerator(width, height)
+            if self.preview:
+                print(f"👁️  Aperçu en {width}x{height}")
+            else:
+                print(f"📐 Versions: {', '.join(f'{w}x{h}' for w, h in self.rendition_sizes())} "
+                      f"(un décodage par segment)")
+
+        self.original_bitrate = original_bitrate
+        return original_bitrate
+
+    def work_directory(self):
+        """Dossier des segments: temporaire, ou persistant pour pouvoir reprendre après annulation."""
+        if self.work_dir:
+            self.work_dir.mkdir(parents=True, exist_ok=True)
+            return nullcontext(str(self.work_dir))
+        return tempfile.TemporaryDirectory()
+
+    def prepare_overlays(self, temp_path, offsets):
+        """Prépare les overlays partagés par les segments (piste d'overlays, transitions)."""
+        # Piste d'overlays: chaque état de score distinct rendu une seule fois
+        if self.overlay_mode == 'track':
+            track_start_time = time.time()
+            if self.overlay_images[0] is not self.overlay_generator:
+                self.overlay_images = (self.overlay_generator, {})
+            track = OverlayTrack(
+                self.overlay_generator,
+                [self.overlay_kwargs(score) for score in self.scores[:len(self.clips)]],
+                cache=self.overlay_images[1]
+            )
+            track_path = temp_path / "overlays.mov"
+            previous = self.overlay_track
+            if (previous and previous.cache is track.cache and previous.states == track.states
+                    and self.overlay_track_path == track_path and track_path.exists()):
+                # Mode direct: mêmes états qu'au lot précédent, la piste encodée reste valable
+                previous.frames = track.frames
+                track = previous
+            else:
+                self.overlay_track_path = track.encode(track_path)
+            self.overlay_track = track
+            print(f"🖼️  Piste d'overlays: {len(self.overlay_track.states)} états distincts "
+                  f"pour {len(self.overlay_track.frames)} clips "
+                  f"({self.format_time(time.time() - track_start_time)})")
+            if self.debug:
+                durations = [self.frames_to_seconds(clip['duration_frames']) for clip in self.clips]
+                self.overlay_track.save_timecode_map(Path("logs") / "overlay_track.json",
+                                                     offsets, durations)
+
+        # Transitions de score partagées entre les workers
+        if self.animation:
+            self.animator = ScoreAnimator(self.overlay_generator, temp_path / "transitions",
+                                          style=self.animation, fps=self.fps)
+
+    def plan_jobs(self, workers, indices=None):
+        """
+        Liste ordonnée des jobs d'encodage (plus longs d'abord).
+
+        indices: Clips à encoder (à partir de 1), None = tous (mode direct: nouveaux points)
+
+        Returns:
+            Jobs (i, clip, score, chunk) dans l'ordre de soumission
+        """
+        # Jobs: un par clip, ou un par morceau pour les clips longs
+        jobs = []
+        for i, (clip, score) in enumerate(zip(self.clips, self.scores), 1):
+            if not clip.get('source_path') or (indices is not None and i not in indices):
+                continue
+            chunks = self.plan_clip_chunks(clip)
+            for chunk_index, (chunk_offset, chunk_frames) in enumerate(chunks):
+                jobs.append((i, clip, score, (chunk_index, len(chunks), chunk_offset, chunk_frames)))
+        split = sum(1 for job in jobs if job[3][1] > 1 and job[3][0] == 0)
+        if split:
+            print(f"✂️  {split} clip(s) long(s) découpé(s) en morceaux parallèles")
+
+        # Les plus longs d'abord (coût estimé): la fin du traitement n'attend pas un gros clip isolé
+        cost_model = CostModel(
+            get_encoder(self.encoder['video_codec']), self.hwaccel,
+            *self.output_size(),
+            self.throughput_history
+        )
+        self.scheduler = JobScheduler(cost_model, workers)
+        jobs = self.scheduler.plan(jobs, frames_of=lambda job: job[3][3])
+        print(f"📐 Temps d'encodage prévu: {self.format_time(self.scheduler.predicted)} "
+              f"({len(jobs)} jobs, {cost_model.fps:.0f} images/s par job)")
+        return jobs
+
+    def segment_offsets(self):
+        """Position de chaque clip dans la vidéo finale, sans les clips dont la source est introuvable."""
+        rendered = {i for i, clip in enumerate(self.clips, 1) if clip.get('source_path')}
+        return compute_segment_offsets(self.clips, self.fps, rendered)
+
+    def segment_arguments(self, job, temp_path, original_bitrate, offsets):
+        """Arguments de process_single_segment pour un job (args, kwargs)."""
+        i, clip, score, chunk = job
+        ts_offset = None
+        if self.segment_format == 'ts':
+            ts_offset = offsets[i - 1] + self.frames_to_seconds(chunk[2])
+        args = (i, clip, score, temp_path, original_bitrate, len(self.clips))
+        kwargs = {
+            'ts_offset': ts_offset,
+            'previous_score': self.scores[i - 2] if i > 1 else None,
+            'chunk': chunk
+        }
+        return args, kwargs
+
+    @staticmethod
+    def is_hls_output(output_path):
+        """True si la sortie est une playlist HLS (segments publiés sans assemblage)."""
+        return Path(output_path).suffix.lower() == '.m3u8'
+
+    def check_output(self, output_path):
+        """Vérifie le mode de sortie avant l'encodage (HLS: segments MPEG-TS H.264 avec leur audio)."""
+        self.hls_output = self.is_hls_output(output_path)
+        if not self.hls_output:
+            return
+        if self.audio_mode != 'copy' or self.stream_output:
+            raise ValueError("La sortie HLS demande audio_mode='copy' (sans assemblage en continu)")
+        if self.segment_format != 'ts':
+            print("🔀 Segments MPEG-TS imposés (publiés en HLS)")
+            self.segment_format = 'ts'
+        if get_encoder(self.encoder['video_codec']).codec != 'h264':
+            # Le HEVC en MPEG-TS n'est pas lu par les lecteurs Apple
+            print("🔀 H.264 imposé pour la sortie HLS")
+            previous = self.encoder
+            self.codec = 'h264'
+            self.encoder = self.detect_gpu_encoder()
+            self.hwaccel = hwaccel_profile(get_encoder(self.encoder['video_codec']))
+            if previous['hardware'] and not self.encoder['hardware']:
+                print(f"⚠️  Aucun encodeur H.264 matériel disponible: {previous['label']} "
+                      f"remplacé par {self.encoder['label']} (encodage CPU, plus lent)")
+
+    def hls_keyframe_frames(self):
+        """Intervalle des images clés imposées (sortie HLS: découpe en segments courts), sinon None."""
+        return segment_frames(self.fps) if self.hls_output else None
+
+    def start_assembler(self, jobs, temp_path, output_path):
+        """Démarre l'assemblage en continu ou la publication HLS (si activés) pour les jobs planifiés."""
+        self.assembler = None
+        self.packager = None
+        if self.is_hls_output(output_path):
+            segments = sorted(((job[0], job[3][0]), self.frames_to_seconds(job[3][3])) for job in jobs)
+            sizes = self.rendition_sizes() if self.renditions else [self.output_size()]
+            self.packager = HlsPackager(output_path, segments, sizes, fps=self.fps)
+            print(f"📡 Publication HLS vers {output_path} (segments de {self.packager.target_duration}s max)")
+        elif self.stream_output:
+            keys = sorted((job[0], job[3][0]) for job in jobs)
+            self.assembler = StreamingAssembler(output_path, keys, temp_path, self.control)
+            print(f"🔗 Assemblage en continu vers {output_path}")
+
+    def job_finished(self, job, result, completed, total, segments_data):
+        """Enregistre le résultat d'un job et affiche la progression."""
+        if self.assembler:
+            # Segment ajouté à la sortie dès que les précédents le sont, puis supprimé
+            key = (job[0], job[3][0])
+            if result:
+                self.done_marker(result['path']).unlink(missing_ok=True)
+                self.assembler.add(key, result['path'])
+            else:
+                self.assembler.skip(key)
+        if self.packager:
+            # Segment publié dès que les précédents le sont (déplacé hors du dossier de travail)
+            key = (job[0], job[3][0])
+            if result:
+                self.done_marker(result['path']).unlink(missing_ok=True)
+                self.packager.add(key, [result['path'], *result.get('renditions', [])])
+            else:
+                self.packager.skip(key)
+
+        if result and result['reused']:
+            segments_data.append(result)
+            self.scheduler.job_skipped(job)
+        elif result:
+            segments_data.append(result)
+            self.scheduler.job_done(job, job[3][3], result['time'])
+
+        # Afficher progression (temps restant d'après le modèle de coût)
+        eta = self.scheduler.eta()
+        print(f"\n📊 Progression: {completed}/{total} segments terminés "
+              f"- Temps restant: ~{self.format_time(eta)}")
+        if self.progress_callback:
+            self.progress_callback(completed, total, eta)
+
+    def cancelled_message(self, completed, total):
+        """Affiche le bilan d'un traitement annulé."""
+        print(f"\n🛑 Traitement annulé ({completed}/{total} segments terminés)")
+        if self.work_dir:
+            print(f"   Segments terminés conservés dans: {self.work_dir}")
+
+    def finish_video(self, segments_data, temp_path, output_path, expected=None):
+        """
+        Statistiques, audio séparé et assemblage final des segments.
+
+        Args:
+            expected: Nombre de segments planifiés (jobs); en MPEG-TS, un segment
+                manquant laisserait un trou dans les timestamps de la vidéo jointe
+
+        Raises:
+            RuntimeError: si des segments MPEG-TS manquent (aucune vidéo créée)
+        """
+        actual_makespan = self.scheduler.elapsed()
+        print(f"\n⏱️  Temps d'encodage: prévu {self.format_time(self.scheduler.predicted)}, "
+              f"réel {self.format_time(actual_makespan)}")
+        self.throughput_history.save()
+        if self.segment_cache:
+            cache = self.segment_cache
+            print(f"♻️  Cache des segments: {cache.hits} réutilisé(s), {cache.misses} encodé(s) "
+                  f"({cache.size() / 1024 ** 3:.1f} Go dans {cache.root})")
+
+        # Trier les segments par index (puis par morceau) et extraire les paths
+        segments_data.sort(key=lambda x: (x['index'], x['chunk']))
+        segments = [s['path'] for s in segments_data]
+        segment_times = [s['time'] for s in segments_data]
+
+        # Statistiques
+        if segment_times:
+            avg_time = sum(segment_times) / len(segment_times)
+            print(f"\n⏱️  Temps moyen par segment: {self.format_time(avg_time)}")
+
+            # Rapport détaillé des timings en mode debug
+            if self.debug:
+                logging.debug("\n========== RAPPORT DÉTAILLÉ DES TIMINGS ==========")
+                all_timings = {}
+                for seg in segments_data:
+                    if seg.get('timings'):
+                        for key, value in seg['timings'].items():
+                            if key not in all_timings:
+                                all_timings[key] = []
+                            all_timings[key].append(value)
+
+                logging.debug("\nTemps moyens par étape:")
+                for key, values in all_timings.items():
+                    avg = sum(values) / len(values)
+                    min_val = min(values)
+                    max_val = max(values)
+                    logging.debug(f"  {key}:")
+                    logging.debug(f"    Moyenne: {avg:.3f}s | Min: {min_val:.3f}s | Max: {max_val:.3f}s")
+                logging.debug("=" * 50)
+
+        # Concaténer tous les segments
+        self.control.check()
+        missing = expected - len(segments_data) if expected is not None else 0
+        if missing and self.segment_format == 'ts' and not self.packager:
+            if self.assembler:
+                self.assembler.abort()
+            raise RuntimeError(f"{missing} segment(s) en échec: timestamps MPEG-TS discontinus, "
+                               f"vidéo finale non créée (relancer pour encoder les segments manquants)")
+        if self.packager:
+            # Segments déjà publiés: il ne reste qu'à terminer les playlists
+            self.packager.close()
+            print(f"\n✅ HLS publié: {output_path} ({self.packager.appended} segments, "
+                  f"au plus {self.packager.max_pending} en attente de publication)")
+        elif segments:
+            # Audio extrait à part (une passe par source, muxé une seule fois)
+            audio_path = None
+            if self.audio_mode == 'separate':
+                audio_start_time = time.time()
+                print(f"\n🔊 Extracting audio for {len(segments)} segments...")
+                audio_path = self.extract_audio(segments_data, temp_path)
+                audio_elapsed = time.time() - audio_start_time
+                print(f"⏱️  Audio time: {self.format_time(audio_elapsed)}")
+                logging.debug(f"Audio: extrait en {audio_elapsed:.3f}s")
+
+            # Une vidéo finale par version (même piste audio), la plus grande sous output_path
+            outputs = [(output_path, segments)]
+            for k, size in enumerate(self.rendition_sizes()[1:] if self.renditions else []):
+                outputs.append((self.rendition_path(output_path, size),
+                                [s['renditions'][k] for s in segments_data]))
+
+            for final_path, paths in outputs:
+                concat_start_time = time.time()
+                print(f"\n🔗 Concatenating {len(paths)} segments...")
+
+                if self.assembler:
+                    # Segments déjà ajoutés à la sortie au fil de l'encodage
+                    result = self.assembler.close()
+                    print(f"   Assemblage en continu: au plus {self.assembler.max_pending} "
+                          f"segment(s) en attente sur le disque")
+                elif self.segment_format == 'ts':
+                    result = self.join_ts_segments(paths, temp_path, final_path, audio_path)
+                else:
+                    # Créer le fichier de liste pour FFmpeg
+                    concat_file = temp_path / f"concat_list_{Path(final_path).stem}.txt"
+                    with open(concat_file, 'w') as f:
+                        for seg in paths:
+                            f.write(f"file '{seg}'\n")
+
+                    # Concaténer
+                    concat_cmd = build_concat_command(concat_file, final_path, audio_path)
+                    result = self.control.run(concat_cmd)
+
+                concat_elapsed = time.time() - concat_start_time
+
+                if result.returncode == 0:
+                    print(f"\n✅ Final video created: {final_path}")
+                    print(f"📹 Total segments: {len(paths)}")
+                    print(f"⏱️  Concatenation time: {self.format_time(concat_elapsed)}")
+                else:
+                    print(f"\n❌ Concatenation failed: {result.stderr}")
+        else:
+            print("\n❌ No segments were created")
+
+    def process_video(self, output_path="output_final.mp4"):
+        """
+        Traite la vidéo complète avec les overlays.
+        """
+        print(f"\n🎬 Starting video processing...")
+        total_start_time = time.time()
+        self.check_output(output_path)
+
+        original_bitrate = self.prepare_sources()
+
+        with self.work_directory() as temp_dir:
             temp_path = Path(temp_dir)
 
-            max_workers = 4
+            # Autant de workers que de sessions simultanées supportées par l'encodeur
+            max_workers = self.encoder['max_sessions']
             print(f"\n🚀 Traitement parallèle activé ({max_workers} workers)")
 
+            # Offsets des segments dans la vidéo finale (jointure octet par octet en 'ts')
+            offsets = self.segment_offsets()
+            self.prepare_overlays(temp_path, offsets)
+            jobs = self.plan_jobs(max_workers)
+            self.start_assembler(jobs, temp_path, output_path)
+
             segments_data = []
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 # Soumettre tous les jobs
                 futures = {}
-                for i, (clip, score) in enumerate(zip(self.clips, self.scores), 1):
-                    future = executor.submit(
-                        self.process_single_segment,
-                        i, clip, score, temp_path, original_bitrate, len(self.clips)
-                    )
-                    futures[future] = i
+                for job in jobs:
+                    args, kwargs = self.segment_arguments(job, temp_path, original_bitrate, offsets)
+                    futures[executor.submit(self.process_single_segment, *args, **kwargs)] = job
 
                 # Récupérer les résultats au fur et à mesure
                 completed = 0
-                for future in as_completed(futures):
+                try:
+                    for future in as_completed(futures):
+                        result = future.result()
+                        completed += 1
+                        self.job_finished(futures[future], result, completed, len(futures), segments_data)
+                except ProcessingCancelled:
+                    # Jobs en attente abandonnés; attendre la fin des workers (processus déjà tués)
+                    # avant que le dossier temporaire ne soit supprimé
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    if self.assembler:
+                        self.assembler.abort()
+                    if self.packager:
+                        self.packager.abort()
+                    self.cancelled_message(completed, len(futures))
+                    raise
+
+            self.finish_video(segments_data, temp_path, output_path, len(jobs))
+
+            total_elapsed = time.time() - total_start_time
+            print(f"\n⏱️  TEMPS TOTAL: {self.format_time(total_elapsed)}")
+
+    async def process_video_async(self, output_path, engine):
+        """
+        Traite la vidéo complète avec le moteur asyncio (même résultat que process_video).
+
+        Les jobs de plusieurs matchs peuvent partager le même moteur et la même boucle.
+        Les étapes courtes et bloquantes (détection, overlays, assemblage) tournent dans un thread.
+        """
+        print(f"\n🎬 Starting video processing (asyncio)...")
+        total_start_time = time.time()
+        self.check_output(output_path)
+
+        original_bitrate = await asyncio.to_thread(self.prepare_sources)
+
+        with self.work_directory() as temp_dir:
+            temp_path = Path(temp_dir)
+            print(f"\n🚀 Moteur asyncio ({engine.max_jobs} jobs simultanés)")
+
+            offsets = self.segment_offsets()
+            await asyncio.to_thread(self.prepare_overlays, temp_path, offsets)
+            jobs = await asyncio.to_thread(self.plan_jobs, engine.max_jobs)
+            self.start_assembler(jobs, temp_path, output_path)
+
+            segments_data = []
+            tasks = {}
+            for job in jobs:
+                args, kwargs = self.segment_arguments(job, temp_path, original_bitrate, offsets)
+                tasks[asyncio.ensure_future(self.process_segment_async(engine, job, *args, **kwargs))] = job
+
+            completed = 0
+            try:
+                async for task in asyncio.as_completed(tasks):
+                    result = await task
                     completed += 1
+                    self.job_finished(tasks[task], result, completed, len(tasks), segments_data)
+            except BaseException as e:
+                # Annulation ou erreur: arrêter les autres jobs (processus tués) avant le nettoyage
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if self.assembler:
+                    self.assembler.abort()
+                if self.packager:
+                    self.packager.abort()
+                if isinstance(e, ProcessingCancelled):
+                    self.cancelled_message(completed, len(tasks))
+                raise
+
+            await asyncio.to_thread(self.finish_video, segments_data, temp_path, output_path, len(jobs))
+
+            total_elapsed = time.time() - total_start_time
+            print(f"\n⏱️  TEMPS TOTAL: {self.format_time(total_elapsed)}")
+
+    def watch_signature(self):
+        """État des entrées surveillées en mode direct (date et taille du XML, de la feuille, du dossier vidéo)."""
+        signature = []
+        for path in (self.xml_path, self.excel_path, self.video_folder):
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def reload_inputs(self, published):
+        """
+        Relit le XML et la feuille de scores (mode direct).
+
+        Args:
+            published: État (clip, overlay) des points déjà publiés, dans l'ordre
+
+        Returns:
+            Index (à partir de 1) des nouveaux points à rendre: à la suite des points
+            publiés, avec un score et une source trouvée
+        """
+        self.clips, self.scores = [], []
+        # Nouvelles vidéos possibles dans le dossier: index reconstruit
+        self.source_index = None
+        try:
+            self.parse_xml()
+            self.parse_excel()
+        except Exception as e:
+            # Fichier en cours d'enregistrement: relu à sa prochaine modification
+            print(f"⚠️  Lecture impossible ({e}), nouvelle tentative à la prochaine modification")
+            return []
+        self.resolve_sources()
+
+        changed = sum(1 for k, point in enumerate(published)
+                      if k >= len(self.clips) or point != self.point_state(k + 1))
+        if changed:
+            print(f"⚠️  {changed} point(s) déjà publié(s) modifié(s): corrections ignorées "
+                  f"(relancer un rendu complet)")
+
+        new = []
+        for i in range(len(published) + 1, min(len(self.clips), len(self.scores)) + 1):
+            # Dans l'ordre du match: un point sans source bloque les suivants
+            if not self.clips[i - 1].get('source_path'):
+                break
+            new.append(i)
+        if not new:
+            return new
+
+        # Même validation qu'un rendu complet; le nombre de clips et de scores
+        # diffère normalement pendant la saisie (erreur globale ignorée)
+        report = self.validate()
+        invalid = sorted({error['index'] for error in report.errors
+                          if error['index'] in new})
+        if invalid:
+            print(report.format())
+            print(f"⚠️  Point {invalid[0]} invalide: rendu des points suivants suspendu "
+                  f"jusqu'à sa correction")
+            new = [i for i in new if i < invalid[0]]
+        return new
+
+    def point_state(self, i):
+        """Ce qui détermine le rendu du point i: plage de la source et overlay."""
+        clip = self.clips[i - 1]
+        return (clip['name'], clip['in_frame'], clip['duration_frames'],
+                self.overlay_kwargs(self.scores[i - 1]))
+
+    def render_points(self, indices, temp_path, output_path, original_bitrate, segments_data):
+        """
+        Rend un lot de nouveaux points (mode direct) et les publie.
+
+        En HLS, les segments sont ajoutés à la playlist dès qu'ils sont encodés;
+        sinon les segments du lot sont ajoutés à la suite du flux MPEG-TS de
+        chaque version (live_streams), sans relire les lots précédents.
+        """
+        batch_start_time = time.time()
+        batch_start = len(segments_data)
+        print(f"\n🎾 {len(indices)} nouveau(x) point(s): {indices[0]} à {indices[-1]}")
+        max_workers = self.encoder['max_sessions']
+        offsets = self.segment_offsets()
+        self.prepare_overlays(temp_path, offsets)
+        jobs = self.plan_jobs(max_workers, set(indices))
+
+        hls = self.is_hls_output(output_path)
+        if hls:
+            if self.packager is None:
+                sizes = self.rendition_sizes() if self.renditions else [self.output_size()]
+                # Durée cible fixée d'avance par la découpe en segments courts
+                self.packager = HlsPackager(output_path, [], sizes, fps=self.fps)
+            self.packager.extend(sorted(((job[0], job[3][0]), self.frames_to_seconds(job[3][3]))
+                                        for job in jobs))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for job in jobs:
+                args, kwargs = self.segment_arguments(job, temp_path, original_bitrate, offsets)
+                futures[executor.submit(self.process_single_segment, *args, **kwargs)] = job
+
+            completed = 0
+            try:
+                for future in as_completed(futures):
                     result = future.result()
-                    if result:
-                        segments_data.append(result)
-
-                    # Afficher progression
-                    print(f"\n📊 Progression: {completed}/{len(self.clips)} segments terminés")
-
-            # Trier les segments par index et extraire les paths
-            segments_data.sort(key=lambda x: x['index'])
-            segments = [s['path'] for s in segments_data]
-            segment_times = [s['time'] for s in segments_data]
-
-            # Statistiques
-            if segment_times:
-                avg_time = sum(segment_times) / len(segment_times)
-                print(f"\n⏱️  Temps moyen par segment: {self.format_time(avg_time)}")
-
-                # Rapport détaillé des timings en mode debug
-                if self.debug:
-                    logging.debug("\n========== RAPPORT DÉTAILLÉ DES TIMINGS ==========")
-                    all_timings = {}
-                    for seg in segments_data:
-                        if seg.get('timings'):
-                            for key, value in seg['timings'].items():
-                                if key not in all_timings:
-                                    all_timings[key] = []
-                                all_timings[key].append(value)
-
-                    logging.debug("\nTemps moyens par étape:")
-                    for key, values in all_timings.items():
-                        avg = sum(values) / len(values)
-                        min_val = min(values)
-                        max_val = max(values)
-                        logging.debug(f"  {key}:")
-                        logging.debug(f"    Moyenne: {avg:.3f}s | Min: {min_val:.3f}s | Max: {max_val:.3f}s")
-                    logging.debug("=" * 50)
-
-            # Concaténer tous les segments
-            if segments:
-                concat_start_time = time.time()
-                print(f"\n🔗 Concatenating {len(segments)} segments...")
-
-                # Créer le fichier de liste pour FFmpeg
-                concat_file = temp_path / "concat_list.txt"
-                with open(concat_file, 'w') as f:
-                    for seg in segments:
-                        f.write(f"file '{seg}'\n")
-
-                # Concaténer
-                concat_cmd = [
-                    'ffmpeg',
-                    '-f', 'concat',
-                    '-safe', '0',
-                    '-i', str(concat_file),
-                    '-c', 'copy',
-                    '-y',
-                    output_path
-                ]
+                    completed += 1
+                    self.job_finished(futures[future], result, completed, len(futures), segments_data)
+            except ProcessingCancelled:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+        if not hls:
+            if len(segments_data) - batch_start < len(jobs):
+                # Trou dans les timestamps du flux joint: arrêt, points déjà publiés conservés
+                raise RuntimeError(f"{len(jobs) - len(segments_data) + batch_start} segment(s) du lot "
+                                   f"en échec: lot non ajouté à la sortie")
+            batch = sorted(segments_data[batch_start:], key=lambda s: (s['index'], s['chunk']))
+            for k, (stream_path, _) in enumerate(self.live_streams(output_path, temp_path)):
+                paths = [s['path'] if k == 0 else s['renditions'][k - 1] for s in batch]
+                join_segments_bytes(paths, stream_path, append=True)
+        self.throughput_history.save()
+        print(f"⏱️  Lot publié en {self.format_time(time.time() - batch_start_time)}")
+
+    def live_streams(self, output_path, temp_path):
+        """
+        Flux MPEG-TS du mode direct (sortie fichier), un par version: [(flux, vidéo finale)].
 
-                result = subprocess.run(concat_cmd, capture_output=True, text=True)
+        Une sortie .ts sans audio séparé est complétée directement (lisible pendant
+        la session); sinon le flux est dans le dossier de travail et remuxé à la fin.
+        """
+        finals = [Path(output_path)]
+        if self.renditions:
+            finals += [self.rendition_path(output_path, size) for size in self.rendition_sizes()[1:]]
+        direct = Path(output_path).suffix.lower() == '.ts' and self.audio_mode == 'copy'
+        return [(final if direct else temp_path / f"{final.stem}_live.ts", final) for final in finals]
 
-                concat_elapsed = time.time() - concat_start_time
+    def finish_live(self, segments_data, temp_path, output_path):
+        """
+        Termine la sortie fichier du mode direct: un seul remux par version (copie de flux),
+        avec la piste audio séparée extraite une fois pour tous les points publiés.
+        """
+        segments_data.sort(key=lambda x: (x['index'], x['chunk']))
+        audio_path = None
+        if self.audio_mode == 'separate':
+            print(f"\n🔊 Extracting audio for {len(segments_data)} segments...")
+            audio_path = self.extract_audio(segments_data, temp_path)
+
+        for stream_path, final_path in self.live_streams(output_path, temp_path):
+            if stream_path == final_path:
+                continue
+            # Pas de self.control.run: le remux doit aussi aboutir après une annulation
+            result = subprocess.run(build_remux_command(stream_path, final_path, audio_path),
+                                    capture_output=True, text=True)
+            if result.returncode == 0:
+                print(f"✅ Final video created: {final_path}")
+            else:
+                print(f"❌ Remux failed: {result.stderr}")
 
-                if result.returncode == 0:
-                    print(f"\n✅ Final video created: {output_path}")
-                    print(f"📹 Total segments: {len(segments)}")
-                    print(f"⏱️  Concatenation time: {self.format_time(concat_elapsed)}")
+    def watch(self, output_path, poll_interval=1.0, idle_timeout=None):
+        """
+        Mode direct (tournoi): rend les points au fur et à mesure de leur saisie.
+
+        Le XML, la feuille de scores et le dossier vidéo sont surveillés. Après
+        chaque modification (une fois les fichiers stables), seuls les nouveaux
+        points sont rendus, après validation. En HLS (.m3u8), chaque segment est
+        ajouté à la playlist dès qu'il est encodé. Pour un fichier, les segments
+        (MPEG-TS) de chaque lot sont ajoutés à la suite d'un flux MPEG-TS, remuxé
+        une seule fois dans le conteneur de sortie à l'arrêt.
+
+        Le mode s'arrête après idle_timeout secondes sans nouveau point, ou à
+        l'annulation: les points publiés sont conservés et la playlist terminée.
+
+        Returns:
+            Nombre de points publiés
+        """
+        print(f"\n📡 Mode direct: surveillance de {self.xml_path.name} et {self.excel_path.name}")
+        self.check_output(output_path)
+        if not self.hls_output and self.segment_format != 'ts':
+            # Lots ajoutés octet par octet à la suite de la sortie
+            print("🔀 Segments MPEG-TS imposés (ajoutés à la suite de la sortie)")
+            self.segment_format = 'ts'
+        self.assembler = None
+        self.packager = None
+        published = []
+        segments_data = []
+        prepared = False
+        original_bitrate = None
+        last_seen = last_read = None
+        last_activity = time.time()
+
+        with self.work_directory() as temp_dir:
+            temp_path = Path(temp_dir)
+            if not self.hls_output:
+                # Flux d'une session précédente (dossier de travail persistant) repris de zéro
+                for stream_path, _ in self.live_streams(output_path, temp_path):
+                    stream_path.unlink(missing_ok=True)
+            try:
+                while True:
+                    signature = self.watch_signature()
+                    # Relu seulement une fois stable sur une période (enregistrement terminé)
+                    if signature == last_seen and signature != last_read:
+                        last_read = signature
+                        new = self.reload_inputs(published)
+                        if new:
+                            if not prepared:
+                                # Résolution et bitrate détectés sur les premiers points
+                                original_bitrate = self.prepare_sources()
+                                prepared = True
+                            self.render_points(new, temp_path, output_path, original_bitrate, segments_data)
+                            published.extend(self.point_state(i) for i in new)
+                            print(f"📡 {len(published)} point(s) publié(s)")
+                            last_activity = time.time()
+                    last_seen = signature
+
+                    if idle_timeout and time.time() - last_activity > idle_timeout:
+                        print(f"\n⏹️  Aucun nouveau point depuis {self.format_time(idle_timeout)}")
+                        break
+                    self.control.wait(poll_interval)
+            except (ProcessingCancelled, KeyboardInterrupt):
+                print(f"\n⏹️  Mode direct arrêté")
+            finally:
+                # Points publiés conservés: la playlist devient un VOD complet
+                if self.packager:
+                    self.packager.close()
+                elif segments_data:
+                    self.finish_live(segments_data, temp_path, output_path)
+
+        print(f"✅ {len(published)} point(s) publié(s): {output_path}")
+        return len(published)
+
+    def contact_sheet(self, output_dir, tile_width=TILE_WIDTH, columns=4, rows=5):
+        """
+        Planche de vérification: une vignette par clip avec son overlay, sans encoder la vidéo.
+
+        La vignette d'un clip est la première image clé à partir de son milieu;
+        chaque source n'est lue qu'une fois pour toutes ses vignettes.
+
+        Returns:
+            Chemin de la page HTML (les planches PNG sont à côté)
+        """
+        print(f"\n🖼️  Planche de vérification...")
+        start_time = time.time()
+        self.prepare_sources()
+        size = tile_size(self.video_width or 3840, self.video_height or 2160, tile_width)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+
+            # Vignettes regroupées par source (une lecture par fichier)
+            entries = []
+            by_source = {}
+            for i, (clip, score) in enumerate(zip(self.clips, self.scores), 1):
+                entry = {'index': i, 'name': clip['name'], 'state': self.overlay_kwargs(score),
+                         'thumbnail': None}
+                entries.append(entry)
+                if clip.get('source_path'):
+                    middle = self.frames_to_seconds(clip['in_frame'] + clip['duration_frames'] // 2)
+                    by_source.setdefault(clip['source_path'], []).append((middle, entry))
+
+            def extract(number, source, picks):
+                thumbnail_dir = temp_path / f"source_{number:03d}"
+                thumbnail_dir.mkdir()
+                times = [t for t, _ in picks]
+                result = self.control.run(build_thumbnail_command(source, times, thumbnail_dir, size))
+                for (_, entry), path in zip(picks, match_thumbnails(times, thumbnail_dir)):
+                    entry['thumbnail'] = path
+                return result
+
+            if by_source:
+                workers = min(len(by_source), os.cpu_count() or 1)
+                print(f"   {len(entries)} clips, {len(by_source)} source(s) lue(s) une fois ({workers} workers)")
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = executor.map(lambda item: extract(item[0], *item[1]),
+                                           enumerate(by_source.items()))
+                    for source, result in zip(by_source, results):
+                        if result.returncode != 0:
+                            print(f"⚠️  Vignettes incomplètes pour {Path(source).name}: {result.stderr.strip()}")
+
+            # Scoreboards rendus à la taille des vignettes (facteur d'échelle du générateur)
+            sheet = ContactSheet(PadelOverlayGenerator(*size), entries, columns, rows)
+            html_path = sheet.save(output_dir)
+            missing = sheet.missing_count()
+
+        if missing:
+            print(f"⚠️  {missing} clip(s) sans vignette")
+        print(f"✅ Planche de vérification: {html_path} ({sheet.page_count} planche(s), "
+              f"{self.format_time(time.time() - start_time)})")
+        return html_path
+
+    def build_highlights(self, output_path, indices, title=None, subtitle=None, title_seconds=TITLE_SECONDS):
+        """
+        Montage des meilleurs moments à partir des segments déjà rendus.
+
+        Les segments viennent du dossier de travail (rendu du match complet) ou du
+        cache des segments et sont assemblés sans réencodage (concat): seuls les
+        segments absents et le carton titre sont encodés.
+
+        Args:
+            indices: Clips retenus (à partir de 1, voir utils/highlights.py:select_highlights)
+            title: Texte du carton titre (None = pas de carton)
+            subtitle: Deuxième ligne du carton titre
+
+        Returns:
+            Nombre de segments encodés pour ce montage (hors carton titre)
+
+        Raises:
+            ValueError: sans cache ni dossier de travail (rien à réutiliser)
+            RuntimeError: si aucun des segments retenus n'a encore été rendu
+        """
+        # Segments MP4: leurs timestamps ne dépendent pas de leur place dans la vidéo
+        if self.segment_format != 'mp4':
+            raise ValueError("Les montages demandent segment_format='mp4'")
+        if not self.segment_cache and not self.work_dir:
+            raise ValueError("Les montages réutilisent les segments rendus: activer le cache "
+                             "des segments (cache_dir) ou un dossier de travail (work_dir)")
+        print(f"\n🎞️  Montage: {len(indices)} clip(s) retenu(s)")
+        if not indices:
+            return 0
+        start_time = time.time()
+        original_bitrate = self.prepare_sources()
+
+        with self.work_directory() as temp_dir:
+            temp_path = Path(temp_dir)
+            offsets = self.segment_offsets()
+            self.prepare_overlays(temp_path, offsets)
+
+            # Mêmes jobs (et mêmes morceaux) que le rendu du match complet
+            jobs = []
+            for i in indices:
+                clip, score = self.clips[i - 1], self.scores[i - 1]
+                if not clip.get('source_path'):
+                    print(f"⚠️  Clip {i} ignoré (source introuvable)")
+                    continue
+                chunks = self.plan_clip_chunks(clip)
+                for chunk_index, (chunk_offset, chunk_frames) in enumerate(chunks):
+                    jobs.append((i, clip, score, (chunk_index, len(chunks), chunk_offset, chunk_frames)))
+
+            # Segments déjà rendus (match complet), les autres seulement sont encodés
+            segments_data = []
+            missing = []
+            for job in jobs:
+                args, kwargs = self.segment_arguments(job, temp_path, original_bitrate, offsets)
+                segment = self.prepare_segment(*args, **kwargs, reuse_only=True)
+                if segment:
+                    segments_data.append(segment)
                 else:
-                    print(f"\n❌ Concatenation failed: {result.stderr}")
-            else:
+                    missing.append((args, kwargs))
+            if jobs and not segments_data:
+                raise RuntimeError("Aucun segment de ce montage n'a encore été rendu: lancer "
+                                   "d'abord le rendu du match (même cache ou dossier de travail)")
+
+            with ThreadPoolExecutor(max_workers=self.encoder['max_sessions']) as executor:
+                futures = [executor.submit(self.process_single_segment, *args, **kwargs)
+                           for args, kwargs in missing]
+                try:
+                    for future in as_completed(futures):
+                        result = future.result()
+                        if result:
+                            segments_data.append(result)
+                except ProcessingCancelled:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise
+            segments_data.sort(key=lambda x: (x['index'], x['chunk']))
+            encoded = sum(1 for segment in segments_data if not segment['reused'])
+            if not segments_data:
                 print("\n❌ No segments were created")
+                return encoded
+
+            if title:
+                # Carton titre généré (fond uni et silence), encodé comme les segments
+                # (même encodeur, même format audio): assemblage sans réencodage
+                text_path = temp_path / "title_card.png"
+                render_title_card(*self.output_size(), title, subtitle, background=None).save(text_path)
+                # Sans source: silence à la place de l'audio (mode 'separate', voir build_audio_filter)
+                card = {'path': str(temp_path / "title_card.mp4"), 'source': None,
+                        'start': 0.0, 'duration': title_seconds}
+                audio_format = None
+                if self.audio_mode == 'copy':
+                    audio_format = self.get_audio_format(segments_data[0]['source'])
+                result = self.control.run(build_title_card_command(
+                    text_path, card['path'], self.output_size(), self.fps, title_seconds,
+                    self.build_video_params(original_bitrate), title_card_color(),
+                    audio_format=audio_format, hwaccel=self.hwaccel
+                ))
+                if result.returncode == 0:
+                    segments_data.insert(0, card)
+                else:
+                    print(f"⚠️  Carton titre ignoré: {result.stderr}")
+
+            audio_path = None
+            if self.audio_mode == 'separate':
+                audio_path = self.extract_audio(segments_data, temp_path)
+
+            concat_file = temp_path / "highlights_list.txt"
+            with open(concat_file, 'w') as f:
+                for segment in segments_data:
+                    f.write(f"file '{segment['path']}'\n")
+            result = self.control.run(build_concat_command(concat_file, output_path, audio_path))
+
+        if result.returncode == 0:
+            print(f"\n✅ Montage créé: {output_path}")
+            print(f"♻️  {len(jobs) - encoded} segment(s) réutilisé(s), {encoded} encodé(s) "
+                  f"({self.format_time(time.time() - start_time)})")
+        else:
+            print(f"\n❌ Concatenation failed: {result.stderr}")
+        return encoded
 
-            total_elapsed = time.time() - total_start_time
-            print(f"\n⏱️  TEMPS TOTAL: {self.format_time(total_elapsed)}")
+    def distributed_settings(self, lease):
+        """Réglages transmis aux workers du rendu distribué."""
+        return {
+            'xml_path': str(self.xml_path),
+            'excel_path': str(self.excel_path),
+            'team1_names': self.team1_names,
+            'team2_names': self.team2_names,
+            'segment_format': self.segment_format,
+            'audio_mode': self.audio_mode,
+            'animation': self.animation,
+            'quality_target': self.quality_target,
+            # Même format pour tous les segments (jointure sans réencodage)
+            'codec': get_encoder(self.encoder['video_codec']).codec,
+            'video_width': self.video_width,
+            'video_height': self.video_height,
+            'original_bitrate': self.original_bitrate,
+            'total_clips': len(self.clips),
+            'fps': self.fps,
+            'preview': self.preview,
+            'lease': lease
+        }
 
-    def run(self, output_path="output_final.mp4"):
-        """Exécute le workflow complet."""
+    def job_payload(self, position, job, offsets):
+        """Description d'un job pour un worker (sérialisable en JSON, sans chemin local)."""
+        i, clip, score, chunk = job
+        _, kwargs = self.segment_arguments(job, None, None, offsets)
+        return {
+            'job': position,
+            'index': i,
+            'clip': {key: value for key, value in clip.items() if key != 'source_path'},
+            'score': score,
+            'previous_score': kwargs['previous_score'],
+            'chunk': list(chunk),
+            'ts_offset': kwargs['ts_offset']
+        }
+
+    def process_video_distributed(self, output_path, broker, poll_interval=2.0):
+        """
+        Coordinateur du rendu distribué: publie les jobs, attend les segments et assemble la vidéo.
+
+        Les workers rendent avec leur propre encodeur (même format que le
+        coordinateur). Les segments sont en MPEG-TS pour être joints octet par
+        octet quel que soit l'encodeur qui les a produits. Les jobs abandonnés
+        par les workers sont rendus localement avant l'assemblage.
+
+        Args:
+            output_path: Vidéo finale
+            broker: JobBroker (dossier des segments rendus)
+            poll_interval: Intervalle de suivi de l'avancement (secondes)
+
+        Raises:
+            RuntimeError: si un job abandonné échoue aussi localement (aucune vidéo créée)
+        """
+        if self.renditions:
+            raise ValueError("Les versions multiples ne sont pas disponibles en rendu distribué")
+        print(f"\n🎬 Starting video processing (rendu distribué)...")
+        total_start_time = time.time()
+        if self.segment_format != 'ts':
+            print("🔀 Segments MPEG-TS imposés (encodeurs différents selon les machines)")
+            self.segment_format = 'ts'
+
+        original_bitrate = self.prepare_sources()
+        offsets = self.segment_offsets()
+        jobs = self.plan_jobs(self.encoder['max_sessions'])
+        lease = max((self.scheduler.timeout(job) for job in jobs), default=60.0)
+        broker.publish(
+            self.distributed_settings(lease),
+            [(self.scheduler.costs[id(job)], self.job_payload(position, job, offsets))
+             for position, job in enumerate(jobs)]
+        )
+        print(f"📡 {len(jobs)} jobs publiés, en attente des workers...")
+
+        segments_data = []
+        received = set()
+        while True:
+            self.control.check()
+            finished = broker.finished()
+            for done in broker.results():
+                if done['id'] in received:
+                    continue
+                received.add(done['id'])
+                payload = done['payload']
+                job = jobs[payload['job']]
+                i, clip, _, (chunk_index, _, chunk_offset, chunk_frames) = job
+                segments_data.append({
+                    'path': str(done['segment']),
+                    'time': done['result'].get('time', 0.0),
+                    'index': i,
+                    'chunk': chunk_index,
+                    'source': clip['source_path'],
+                    'start': self.frames_to_seconds(clip['in_frame'] + chunk_offset),
+                    'duration': self.frames_to_seconds(chunk_frames),
+                    'reused': False,
+                    'timings': None
+                })
+                # Rendu sur une autre machine: pas de mesure pour l'historique local
+                self.scheduler.job_skipped(job)
+                eta = self.scheduler.eta()
+                print(f"\n📊 Progression: {len(received)}/{len(jobs)} segments reçus "
+                      f"({done['result'].get('worker', '?')}, {done['result'].get('encoder', '?')})")
+                if self.progress_callback:
+                    self.progress_callback(len(received), len(jobs), eta)
+            if finished:
+                break
+            time.sleep(poll_interval)
+
+        failures = broker.failures()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            if failures:
+                # Jamais de vidéo avec des points manquants: segments abandonnés rendus ici
+                self.prepare_overlays(temp_path, offsets)
+            for payload, error in failures:
+                print(f"❌ Segment {payload['index']} abandonné par les workers ({error}), rendu local...")
+                args, kwargs = self.segment_arguments(jobs[payload['job']], temp_path,
+                                                      original_bitrate, offsets)
+                result = self.process_single_segment(*args, **kwargs)
+                if result is None:
+                    raise RuntimeError(f"Segment {payload['index']} impossible à rendre: "
+                                       f"vidéo finale non créée")
+                segments_data.append(result)
+
+            self.finish_video(segments_data, temp_path, output_path, len(jobs))
+
+        total_elapsed = time.time() - total_start_time
+        print(f"\n⏱️  TEMPS TOTAL: {self.format_time(total_elapsed)}")
+
+    def serve_jobs(self, broker, worker_name=None, poll_interval=2.0):
+        """
+        Worker du rendu distribué: rend les jobs du broker avec l'encodeur local.
+
+        Args:
+            broker: JobBroker (même machine) ou BrokerClient (HTTP)
+            worker_name: Nom du worker (défaut: machine-pid)
+            poll_interval: Attente quand aucun job n'est disponible (secondes)
+
+        Returns:
+            Nombre de segments rendus
+        """
+        worker_name = worker_name or f"{socket.gethostname()}-{os.getpid()}"
+        settings = broker.settings()
+        if not settings:
+            raise RuntimeError("Aucun traitement publié par le coordinateur")
+        self.video_width, self.video_height = settings['video_width'], settings['video_height']
+        self.original_bitrate = settings['original_bitrate']
+        self.overlay_generator = PadelOverlayGenerator(*self.output_size())
+        print(f"🛠️  Worker {worker_name}: {self.encoder['video_codec']} ({self.hwaccel})")
+
+        rendered = 0
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            if self.animation:
+                self.animator = ScoreAnimator(self.overlay_generator, temp_path / "transitions",
+                                              style=self.animation, fps=self.fps)
+            while True:
+                self.control.check()
+                claimed = broker.claim(worker_name, settings['lease'])
+                if claimed is False:
+                    break
+                if claimed is None:
+                    time.sleep(poll_interval)
+                    continue
+
+                job_id, payload = claimed
+                try:
+                    segment = self.process_single_segment(
+                        payload['index'], payload['clip'], payload['score'], temp_path,
+                        self.original_bitrate, settings['total_clips'],
+                        ts_offset=payload['ts_offset'],
+                        previous_score=payload['previous_score'],
+                        chunk=tuple(payload['chunk'])
+                    )
+                except ProcessingCancelled:
+                    broker.fail(job_id, f"{worker_name} annulé")
+                    raise
+                if segment is None:
+                    broker.fail(job_id, f"Échec du rendu sur {worker_name}")
+                    continue
+
+                broker.complete(job_id, segment['path'], {
+                    'worker': worker_name,
+                    'encoder': self.encoder['video_codec'],
+                    'time': segment['time']
+                })
+                rendered += 1
+
+        print(f"\n✅ Worker {worker_name}: {rendered} segment(s) rendu(s)")
+        return rendered
+
+    def run(self, output_path="output_final.mp4", broker=None):
+        """
+        Exécute le workflow complet.
+
+        broker: JobBroker pour un rendu distribué (les workers rendent les segments)
+        """
         print("=" * 60)
         print("🎾 PADEL VIDEO OVERLAY AUTOMATOR")
         print("=" * 60)
@@ -525,31 +1873,148 @@ class VideoOverlayAutomator:
         self.parse_xml()
         self.parse_excel()
 
-        # Vérifier la correspondance
-        if len(self.clips) != len(self.scores):
-            print(f"\n⚠️  WARNING: {len(self.clips)} clips but {len(self.scores)} scores")
-            print(f"   Using minimum: {min(len(self.clips), len(self.scores))}")
-            min_len = min(len(self.clips), len(self.scores))
-            self.clips = self.clips[:min_len]
-            self.scores = self.scores[:min_len]
+        # Valider toutes les entrées avant d'encoder (échec immédiat si invalide)
+        print("\n🔎 Validation des entrées...")
+        report = self.validate()
+        print(report.format())
+        if not report.ok:
+            raise ValidationError(report)
 
-        self.process_video(output_path)
+        if broker is not None:
+            self.process_video_distributed(output_path, broker)
+        else:
+            self.process_video(output_path)
 
         print("\n" + "=" * 60)
         print("✨ DONE!")
         print("=" * 60)
 
 
+def process_matches(matches, engine=None):
+    """
+    Traite plusieurs matchs en parallèle dans une seule boucle asyncio.
+
+    Args:
+        matches: Liste de (VideoOverlayAutomator déjà parsé, chemin de sortie)
+        engine: AsyncFFmpegEngine partagé (défaut: sessions de l'encodeur du premier match)
+
+    Returns:
+        Liste des résultats (None, ou l'exception du match en échec)
+    """
+    async def run_all():
+        shared = engine or AsyncFFmpegEngine(max_jobs=matches[0][0].encoder['max_sessions'])
+        return await asyncio.gather(
+            *(automator.process_video_async(output_path, shared) for automator, output_path in matches),
+            return_exceptions=True
+        )
+
+    return asyncio.run(run_all())
+
+
+def run_worker(broker_url, video_folder=".", worker_name=None, debug=False, cache_dir=None,
+               history_path=None, token=None):
+    """
+    Lance un worker de rendu distribué connecté au coordinateur.
+
+    Les réglages (équipes, format, animation...) viennent du coordinateur;
+    l'encodeur est détecté sur la machine du worker, qui peut avoir son propre
+    cache de segments (cache_dir) et son historique de débits (history_path).
+    token est le jeton partagé affiché par le coordinateur (défaut: variable
+    d'environnement PADEL_BROKER_TOKEN).
+    """
+    client = BrokerClient(broker_url, token=token)
+    settings = client.settings()
+    if not settings:
+        raise RuntimeError(f"Aucun traitement publié sur {broker_url}")
+    automator = VideoOverlayAutomator(
+        settings['xml_path'], settings['excel_path'], video_folder,
+        team1_names=settings['team1_names'],
+        team2_names=settings['team2_names'],
+        debug=debug,
+        segment_format=settings['segment_format'],
+        audio_mode=settings['audio_mode'],
+        animation=settings['animation'],
+        quality_target=settings['quality_target'],
+        codec=settings['codec'],
+        preview=settings['preview'],
+        cache_dir=cache_dir,
+        history_path=history_path
+    )
+    # Frames des jobs exprimées dans le timebase de la séquence du coordinateur
+    automator.fps = settings.get('fps', automator.fps)
+    return automator.serve_jobs(client, worker_name)
+
+
 if __name__ == "__main__":
     # Configuration
     XML_FILE = "data/Sequence_timeframe.xml"
     EXCEL_FILE = "data/match_points.xlsx"
-    OUTPUT_FILE = "output/output_final.mp4"
+    OUTPUT_FILE = "output/output_final.mp4"  # .m3u8 pour publier en HLS au fil de l'encodage
     VIDEO_FOLDER = "data"  # Dossier contenant les vidéos sources
 
     # Activer le mode debug (mettre False pour désactiver)
     DEBUG_MODE = True
 
+    # Cache des segments encodés, à côté du projet (None pour désactiver)
+    CACHE_DIR = project_cache_dir(XML_FILE)
+
+    # Historique des débits mesurés (prévision du temps d'encodage), None pour le garder en mémoire
+    HISTORY_PATH = DEFAULT_HISTORY_PATH
+
+    # Versions supplémentaires à publier (hauteurs, un seul décodage), None pour une seule vidéo
+    RENDITIONS = None  # ex: (2160, 1080, 720) -> output_final.mp4, output_final_1080p.mp4...
+
+    # Format du match: 3e set remplacé par un super tie-break (points numériques)
+    SUPER_TIEBREAK = False
+
+    # Équipe au service du premier jeu (1 ou 2), pour repérer les balles de break
+    FIRST_SERVER = None
+
+    # Adresse d'écoute du coordinateur: "0.0.0.0" pour accepter les workers d'autres machines
+    BROKER_HOST = "127.0.0.1"
+
+    # Rendu distribué (plusieurs machines, jeton partagé dans PADEL_BROKER_TOKEN):
+    #   python main.py coordinator [port]                        publie les jobs et assemble la vidéo
+    #   python main.py worker http://hote:8765 [dossier_videos]  rend les jobs d'un coordinateur
+    # Planche de vérification des scores (sans encoder la vidéo):
+    #   python main.py contact-sheet [dossier_sortie]
+    # Meilleurs moments (tags des commentaires et/ou situations: set_point, tiebreak...):
+    #   python main.py highlights smash set_point
+    # Mode direct (tournoi): rend les points au fil de la saisie, publiés en HLS:
+    #   python main.py watch [sortie.m3u8]
+    if len(sys.argv) > 2 and sys.argv[1] == "worker":
+        run_worker(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else VIDEO_FOLDER, debug=DEBUG_MODE,
+                   cache_dir=CACHE_DIR, history_path=HISTORY_PATH)
+        sys.exit(0)
+
     # Lancer l'automatisation
-    automator = VideoOverlayAutomator(XML_FILE, EXCEL_FILE, VIDEO_FOLDER, debug=DEBUG_MODE)
-    automator.run(OUTPUT_FILE)
+    automator = VideoOverlayAutomator(XML_FILE, EXCEL_FILE, VIDEO_FOLDER, debug=DEBUG_MODE, cache_dir=CACHE_DIR,
+                                      renditions=RENDITIONS, super_tiebreak=SUPER_TIEBREAK,
+                                      history_path=HISTORY_PATH)
+    if len(sys.argv) > 1 and sys.argv[1] == "coordinator":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+        with BrokerServer(JobBroker(Path(OUTPUT_FILE).parent / "broker"), host=BROKER_HOST,
+                          port=port) as server:
+            print(f"📡 Broker en écoute sur {BROKER_HOST}:{server.port}")
+            print(f"🔑 Jeton des workers: {TOKEN_ENV}={server.token}")
+            automator.run(OUTPUT_FILE, broker=server.broker)
+    elif len(sys.argv) > 1 and sys.argv[1] == "contact-sheet":
+        automator.parse_xml()
+        automator.parse_excel()
+        automator.contact_sheet(sys.argv[2] if len(sys.argv) > 2 else Path(OUTPUT_FILE).parent / "planche")
+    elif len(sys.argv) > 1 and sys.argv[1] == "highlights":
+        automator.parse_xml()
+        automator.parse_excel()
+        words = sys.argv[2:]
+        indices = select_highlights(
+            automator.scores,
+            tags=[word for word in words if word not in SITUATIONS],
+            situations=[word for word in words if word in SITUATIONS],
+            first_server=FIRST_SERVER
+        )
+        automator.build_highlights(Path(OUTPUT_FILE).with_name("meilleurs_moments.mp4"), indices,
+                                   title="Meilleurs moments", subtitle=" ".join(words) or None)
+    elif len(sys.argv) > 1 and sys.argv[1] == "watch":
+        automator.watch(sys.argv[2] if len(sys.argv) > 2 else Path(OUTPUT_FILE).parent / "direct" / "match.m3u8")
+    else:
+        automator.run(OUTPUT_FILE)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour async_engine.py
+Tests de la progression, des délais, de l'espace disque et de l'annulation.
+"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from utils.async_engine import AsyncFFmpegEngine, JobTimeout, ProgressReader, with_progress
+from utils.process_control import ProcessControl, ProcessingCancelled
+
+SLEEP_CMD = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+class TestProgress:
+    """Tests pour with_progress et ProgressReader."""
+
+    def test_with_progress_ffmpeg(self):
+        """Test de l'ajout de -progress pipe:1 aux commandes ffmpeg."""
+        cmd = with_progress(['ffmpeg', '-i', 'a.mp4', '-y', 'b.mp4'])
+
+        assert cmd[:4] == ['ffmpeg', '-progress', 'pipe:1', '-nostats']
+        assert cmd[-2:] == ['-y', 'b.mp4']
+
+    def test_with_progress_other_command(self):
+        """Test que les autres commandes (ffprobe) ne sont pas modifiées."""
+        assert with_progress(['ffprobe', 'a.mp4']) == ['ffprobe', 'a.mp4']
+
+    def test_reader_block(self):
+        """Test de l'assemblage d'un bloc de progression."""
+        reader = ProgressReader()
+        lines = ["frame=120", "fps=240.0", "out_time_us=2002000", "speed=4.01x"]
+
+        assert all(reader.feed(line) is None for line in lines)
+        progress = reader.feed("progress=continue")
+        assert progress == {'frame': 120, 'out_time': pytest.approx(2.002), 'speed': pytest.approx(4.01),
+                            'done': False}
+
+    def test_reader_end_with_missing_values(self):
+        """Test d'un bloc final avec des valeurs N/A."""
+        reader = ProgressReader()
+        reader.feed("out_time_us=N/A")
+        reader.feed("speed=N/A")
+        progress = reader.feed("progress=end")
+
+        assert progress['done']
+        assert progress['out_time'] is None
+        assert progress['speed'] is None
+
+
+class TestAsyncFFmpegEngine:
+    """Tests pour AsyncFFmpegEngine."""
+
+    def test_run_returns_completed_process(self):
+        """Test que run() renvoie le même résultat que subprocess.run."""
+        engine = AsyncFFmpegEngine(max_jobs=2)
+        cmd = [sys.executable, "-c", "import sys; print('ok'); print('err', file=sys.stderr); sys.exit(2)"]
+        result = asyncio.run(engine.run(cmd))
+
+        assert result.returncode == 2
+        assert result.stdout.strip() == "ok"
+        assert result.stderr.strip() == "err"
+
+    def test_concurrency_is_bounded(self):
+        """Test que max_jobs limite le nombre de processus simultanés."""
+        engine = AsyncFFmpegEngine(max_jobs=2)
+        peak = []
+
+        async def job():
+            await engine.run([sys.executable, "-c", "import time; time.sleep(0.2)"])
+
+        async def watch():
+            while True:
+                peak.append(engine.running)
+                await asyncio.sleep(0.02)
+
+        async def main():
+            watcher = asyncio.ensure_future(watch())
+            await asyncio.gather(*(job() for _ in range(5)))
+            watcher.cancel()
+
+        asyncio.run(main())
+        assert max(peak) == 2
+
+    def test_timeout_kills_process(self):
+        """Test qu'un job trop long est tué et lève JobTimeout."""
+        engine = AsyncFFmpegEngine()
+        start = time.time()
+
+        with pytest.raises(JobTimeout):
+            asyncio.run(engine.run(SLEEP_CMD, timeout=0.3))
+        assert time.time() - start < 5
+        assert engine.running == 0
+
+    @pytest.mark.skipif(not ProcessControl.can_suspend(), reason="suspension indisponible")
+    def test_pause_does_not_count_towards_timeout(self):
+        """Test que le temps passé en pause n'est pas décompté du délai du job."""
+        engine = AsyncFFmpegEngine()
+        control = ProcessControl()
+        cmd = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+
+        async def main():
+            task = asyncio.ensure_future(engine.run(cmd, timeout=1.0, control=control))
+            while control.active_count() == 0:
+                await asyncio.sleep(0.01)
+            control.pause()
+            await asyncio.sleep(1.5)
+            control.resume()
+            return await task
+
+        assert asyncio.run(main()).returncode == 0
+
+    def test_disk_space_insufficient(self, tmp_path):
+        """Test qu'un job n'est pas lancé si l'espace disque manque et qu'aucun job ne tourne."""
+        engine = AsyncFFmpegEngine(scratch_dir=tmp_path, min_free_bytes=1 << 60)
+
+        with pytest.raises(OSError):
+            asyncio.run(engine.run([sys.executable, "-c", "pass"]))
+
+    def test_cancel_through_control(self):
+        """Test que l'annulation du traitement tue les processus du moteur."""
+        engine = AsyncFFmpegEngine()
+        control = ProcessControl()
+
+        async def main():
+            task = asyncio.ensure_future(engine.run(SLEEP_CMD, control=control))
+            while control.active_count() == 0:
+                await asyncio.sleep(0.01)
+            control.cancel()
+            await task
+
+        with pytest.raises(ProcessingCancelled):
+            asyncio.run(main())
+        assert control.active_count() == 0
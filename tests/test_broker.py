@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour broker.py
+Tests de la file de jobs SQLite et de son accès HTTP par les workers.
+"""
+
+import time
+import urllib.error
+
+import pytest
+
+from utils.broker import MAX_ATTEMPTS, BrokerClient, BrokerServer, JobBroker
+
+
+@pytest.fixture
+def broker(tmp_path):
+    """Broker avec trois jobs publiés (priorités 1, 3, 2)."""
+    broker = JobBroker(tmp_path / "broker")
+    broker.publish({'codec': 'hevc'}, [(1.0, {'index': 1}), (3.0, {'index': 2}), (2.0, {'index': 3})])
+    return broker
+
+
+class TestJobBroker:
+    """Tests pour JobBroker."""
+
+    def test_claim_highest_priority_first(self, broker):
+        """Test que les jobs les plus coûteux sont servis d'abord."""
+        order = [broker.claim('w1')[1]['index'] for _ in range(3)]
+
+        assert order == [2, 3, 1]
+        assert broker.counts()['running'] == 3
+
+    def test_claim_none_then_false(self, broker, tmp_path):
+        """Test de claim: None si des jobs sont en cours, False quand tout est terminé."""
+        claimed = [broker.claim('w1') for _ in range(3)]
+        assert broker.claim('w2') is None
+
+        for job_id, _ in claimed:
+            segment = tmp_path / f"segment_{job_id}.ts"
+            segment.write_bytes(b"ts")
+            broker.complete(job_id, segment)
+        assert broker.claim('w2') is False
+        assert broker.finished()
+
+    def test_expired_lease_is_reclaimed(self, broker):
+        """Test qu'un job dont le bail a expiré (worker disparu) est repris."""
+        for _ in range(3):
+            broker.claim('w1', lease=-1)
+
+        assert broker.claim('w2') is not None
+
+    def test_expired_lease_gives_up_after_max_attempts(self, broker):
+        """Test qu'un job dont le bail expire à chaque tentative est abandonné après MAX_ATTEMPTS."""
+        broker.publish({}, [(1.0, {'index': 1})])
+        for _ in range(MAX_ATTEMPTS):
+            assert broker.claim('w1', lease=-1) is not None
+
+        assert broker.claim('w2') is False
+        assert broker.counts()['failed'] == 1
+        assert broker.failures()[0][0] == {'index': 1}
+
+    def test_fail_requeues_then_gives_up(self, broker):
+        """Test qu'un job en échec est remis en file puis abandonné après MAX_ATTEMPTS."""
+        for _ in range(MAX_ATTEMPTS):
+            job_id, payload = broker.claim('w1')
+            assert payload['index'] == 2
+            broker.fail(job_id, "erreur ffmpeg")
+
+        assert broker.counts()['failed'] == 1
+        assert broker.failures() == [({'index': 2}, "erreur ffmpeg")]
+
+    def test_complete_moves_segment_first_result_wins(self, broker, tmp_path):
+        """Test que le segment est rangé dans le broker et qu'un second résultat est ignoré."""
+        job_id, _ = broker.claim('w1')
+        first = tmp_path / "segment_002.ts"
+        first.write_bytes(b"first")
+        second = tmp_path / "copy" / "segment_002.ts"
+        second.parent.mkdir()
+        second.write_bytes(b"second")
+
+        assert broker.complete(job_id, first, {'worker': 'w1'})
+        assert not broker.complete(job_id, second, {'worker': 'w2'})
+
+        results = broker.results()
+        assert len(results) == 1
+        assert results[0]['segment'].read_bytes() == b"first"
+        assert results[0]['result'] == {'worker': 'w1'}
+        assert not first.exists() and not second.exists()
+
+    def test_publish_replaces_previous_jobs(self, broker):
+        """Test qu'une nouvelle publication remplace le traitement précédent."""
+        broker.publish({'codec': 'h264'}, [(1.0, {'index': 9})])
+
+        assert broker.settings() == {'codec': 'h264'}
+        assert broker.counts()['pending'] == 1
+
+
+class TestBrokerHTTP:
+    """Tests du serveur HTTP et du client des workers."""
+
+    def test_worker_roundtrip(self, broker, tmp_path):
+        """Test d'un worker complet: réglages, prise de jobs et envoi des segments."""
+        with BrokerServer(broker, port=0) as server:
+            client = BrokerClient(f"http://127.0.0.1:{server.port}", token=server.token)
+            assert client.settings() == {'codec': 'hevc'}
+
+            rendered = []
+            while (claimed := client.claim('w1')) is not False:
+                assert claimed is not None
+                job_id, payload = claimed
+                segment = tmp_path / f"segment_{payload['index']:03d}.ts"
+                segment.write_bytes(bytes([payload['index']]) * 1000)
+                assert client.complete(job_id, segment, {'worker': 'w1', 'time': 1.5})
+                rendered.append(payload['index'])
+
+            assert rendered == [2, 3, 1]
+            assert client.counts()['done'] == 3
+
+        results = {r['payload']['index']: r for r in broker.results()}
+        assert results[3]['segment'].read_bytes() == bytes([3]) * 1000
+        assert results[3]['result'] == {'worker': 'w1', 'time': 1.5}
+        assert not list(broker.segments_dir.glob("*.part"))
+
+    def test_fail_over_http(self, broker):
+        """Test du signalement d'un échec par HTTP."""
+        with BrokerServer(broker, port=0) as server:
+            client = BrokerClient(f"http://127.0.0.1:{server.port}", token=server.token)
+            job_id, _ = client.claim('w1')
+            client.fail(job_id, "GPU indisponible")
+
+        assert broker.counts()['pending'] == 3
+
+    def test_token_required(self, broker, tmp_path):
+        """Test que les requêtes sans le jeton partagé sont refusées."""
+        with BrokerServer(broker, port=0, token="secret") as server:
+            url = f"http://127.0.0.1:{server.port}"
+            with pytest.raises(urllib.error.HTTPError) as error:
+                BrokerClient(url, token="faux").claim('intrus')
+            assert error.value.code == 401
+
+            segment = tmp_path / "segment_002.ts"
+            segment.write_bytes(b"ts")
+            with pytest.raises(urllib.error.HTTPError):
+                BrokerClient(url, token="faux").complete(1, segment)
+
+        assert broker.counts()['pending'] == 3
+        assert server.httpd.server_address[0] == '127.0.0.1'
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour chunking.py
+Tests du découpage des clips longs aux images clés.
+"""
+
+from utils.chunking import parse_keyframes, plan_chunks
+
+
+class TestPlanChunks:
+    """Tests pour plan_chunks."""
+
+    def test_short_clip_not_split(self):
+        """Test qu'un clip court reste en un seul morceau."""
+        assert plan_chunks(500, 600) == [(0, 500)]
+
+    def test_no_limit(self):
+        """Test que la découpe peut être désactivée."""
+        assert plan_chunks(10000, None) == [(0, 10000)]
+
+    def test_even_split_without_keyframes(self):
+        """Test d'une découpe en parts égales sans images clés."""
+        chunks = plan_chunks(1000, 400)
+
+        assert chunks == [(0, 333), (333, 334), (667, 333)]
+
+    def test_cuts_snap_to_keyframes(self):
+        """Test que les coupes sont placées sur les images clés proches."""
+        chunks = plan_chunks(1000, 400, keyframes=[0, 120, 300, 360, 660, 900])
+
+        assert [offset for offset, _ in chunks] == [0, 360, 660]
+
+    def test_far_keyframes_ignored(self):
+        """Test qu'une image clé trop éloignée ne déséquilibre pas les morceaux."""
+        chunks = plan_chunks(1200, 600, keyframes=[100])
+
+        assert chunks == [(0, 600), (600, 600)]
+
+    def test_chunks_cover_clip(self):
+        """Test que les morceaux couvrent tout le clip sans trou ni chevauchement."""
+        chunks = plan_chunks(54321, 5400, keyframes=range(0, 54321, 240))
+
+        assert chunks[0][0] == 0
+        assert sum(frames for _, frames in chunks) == 54321
+        for (offset, frames), (next_offset, _) in zip(chunks, chunks[1:]):
+            assert offset + frames == next_offset
+        assert all(offset % 240 == 0 for offset, _ in chunks)
+
+
+class TestParseKeyframes:
+    """Tests pour parse_keyframes."""
+
+    def test_relative_frames(self):
+        """Test de la conversion des pts en images relatives au clip."""
+        output = "10.000000\n12.002000,\n\n14.004000\nN/A\n"
+
+        assert parse_keyframes(output, 10.0, 59.94) == [0, 120, 240]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour contact_sheet.py
+Tests des vignettes, de la correspondance instant -> image clé et de la mise en page.
+"""
+
+import pytest
+from PIL import Image
+
+from utils.contact_sheet import (
+    CAPTION_HEIGHT, ContactSheet, match_thumbnails, score_label, tile_size
+)
+from utils.overlay_generator import PadelOverlayGenerator
+
+
+def _state(**changes):
+    """État de score (arguments de create_overlay)."""
+    state = dict(team1_names="A / B", team2_names="C / D",
+                 jeux="1/0", points="0/0", set1=None, set2=None)
+    state.update(changes)
+    return state
+
+
+@pytest.fixture
+def entries(tmp_path):
+    """Cinq clips dont un sans vignette (source introuvable)."""
+    entries = []
+    for i in range(1, 6):
+        thumbnail = None
+        if i != 3:
+            thumbnail = tmp_path / f"{i}.png"
+            Image.new('RGB', (320, 180), (i * 40, 0, 0)).save(thumbnail)
+        entries.append({'index': i, 'name': f"clip_{i}.mp4", 'thumbnail': thumbnail,
+                        'state': _state(points="15/0" if i % 2 else "0/0")})
+    return entries
+
+
+@pytest.fixture
+def sheet(entries):
+    """Planche de 2 x 2 vignettes 320x180."""
+    generator = PadelOverlayGenerator(320, 180, backend="pillow")
+    return ContactSheet(generator, entries, columns=2, rows=2)
+
+
+class TestHelpers:
+    """Tests des fonctions utilitaires."""
+
+    def test_tile_size_keeps_aspect_ratio(self):
+        """Test que la hauteur suit le format de la vidéo (paire)."""
+        assert tile_size(3840, 2160, 480) == (480, 270)
+        assert tile_size(1440, 1080, 480) == (480, 360)
+
+    def test_score_label_with_sets(self):
+        """Test du texte de score avec les sets terminés."""
+        assert score_label(_state(jeux="2/1", points="40/30", set1="6/4")) == \
+            "Jeux 2/1 · Points 40/30 · Sets 6/4"
+
+    def test_match_thumbnails(self, tmp_path):
+        """Test que chaque instant reçoit la première image clé à partir de lui."""
+        for ms in (6006, 7007, 9009):
+            (tmp_path / f"{ms}.png").write_bytes(b"png")
+
+        matched = match_thumbnails([5.5, 6.2, 6.3, 9.009, 12.0], tmp_path)
+
+        names = [path.name if path else None for path in matched]
+        assert names == ["6006.png", "7007.png", "7007.png", "9009.png", None]
+
+
+class TestContactSheet:
+    """Tests pour ContactSheet."""
+
+    def test_overlays_rendered_once_per_state(self, sheet):
+        """Test que les scoreboards sont partagés entre clips au même score."""
+        assert len(sheet.track.states) == 2
+        assert sheet.track.frames == [0, 1, 0, 1, 0]
+
+    def test_pages(self, sheet):
+        """Test de la pagination: 5 clips en planches de 4."""
+        assert sheet.page_count == 2
+        assert sheet.page(0).size == (640, 2 * (180 + CAPTION_HEIGHT))
+        assert sheet.page(1).size == (640, 180 + CAPTION_HEIGHT)
+
+    def test_tile_burns_overlay(self, sheet):
+        """Test que l'overlay est incrusté sur la vignette."""
+        tile = sheet.tile(0)
+        x, y = sheet.track.position
+        box = sheet.track.images[0].getchannel('A').getbbox()
+        center = (x + (box[0] + box[2]) // 2, y + (box[1] + box[3]) // 2)
+
+        assert tile.size == (320, 180 + CAPTION_HEIGHT)
+        assert tile.getpixel(center) != (40, 0, 0)
+        assert tile.getpixel((2, 2)) == (40, 0, 0)
+
+    def test_missing_thumbnail(self, sheet):
+        """Test qu'un clip sans vignette garde sa case (fond neutre)."""
+        assert sheet.missing_count() == 1
+        assert sheet.tile(2).size == (320, 180 + CAPTION_HEIGHT)
+
+    def test_save_pages_and_html(self, sheet, tmp_path):
+        """Test de l'écriture des planches PNG et de la page HTML."""
+        html_path = sheet.save(tmp_path / "planche")
+
+        assert sorted(p.name for p in html_path.parent.glob("*.png")) == \
+            ["contact_sheet_01.png", "contact_sheet_02.png"]
+        html = html_path.read_text(encoding='utf-8')
+        assert html.count('<img') == 2
+        assert 'clip_5.mp4' in html
+        assert html.count('class="missing"') == 1
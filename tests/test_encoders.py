@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour encoders.py
+Tests du registre, des paramètres et de la sélection (sans GPU).
+"""
+
+import shutil
+
+import pytest
+
+from utils.encoders import (
+    ENCODERS, get_encoder, hwaccel_profile, rank_encoders, scale_bitrate, select_encoder
+)
+
+
+class TestRegistry:
+    """Tests du registre des encodeurs."""
+
+    def test_registry_entries(self):
+        """Test que les encodeurs attendus sont enregistrés."""
+        for name in ('libx264', 'libx265', 'libsvtav1', 'hevc_vaapi',
+                     'hevc_qsv', 'hevc_nvenc', 'hevc_videotoolbox',
+                     'h264_vaapi', 'h264_qsv', 'h264_nvenc', 'h264_videotoolbox'):
+            assert name in ENCODERS
+
+    def test_unknown_encoder(self):
+        """Test qu'un encodeur inconnu lève une erreur."""
+        with pytest.raises(KeyError):
+            get_encoder('mpeg1video')
+
+    def test_libx264_params(self):
+        """Test des paramètres x264 (CRF, bitrate ignoré)."""
+        params = get_encoder('libx264').build_params(50)
+
+        assert params == ['-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23']
+
+    def test_nvenc_default_bitrate(self):
+        """Test des bitrates NVENC par défaut."""
+        params = get_encoder('hevc_nvenc').build_params()
+
+        assert params[params.index('-b:v') + 1] == '10M'
+        assert params[params.index('-maxrate:v') + 1] == '15M'
+        assert params[params.index('-bufsize:v') + 1] == '20M'
+
+    def test_nvenc_source_bitrate(self):
+        """Test que le bitrate NVENC suit celui de la source."""
+        params = get_encoder('hevc_nvenc').build_params(40.5)
+
+        assert params[:4] == ['-c:v', 'hevc_nvenc', '-preset', 'p1']
+        assert params[params.index('-b:v') + 1] == '40M'
+        assert params[params.index('-maxrate:v') + 1] == '48M'
+        assert params[params.index('-bufsize:v') + 1] == '81M'
+
+    def test_fps_scales_with_resolution(self):
+        """Test que le débit estimé baisse avec la résolution."""
+        encoder = get_encoder('libx264')
+
+        assert encoder.fps_for(1920, 1080) == pytest.approx(250)
+        assert encoder.fps_for(3840, 2160) == pytest.approx(60)
+        assert encoder.fps_for(1280, 720) > encoder.fps_for(1920, 1080)
+
+
+class TestSelection:
+    """Tests de la sélection de l'encodeur."""
+
+    def test_fastest_software(self):
+        """Test que x264 est retenu sans GPU et sans exigence de qualité."""
+        encoder = select_encoder(compiled={'libx264', 'libx265', 'libsvtav1'}, system='Linux')
+
+        assert encoder.name == 'libx264'
+
+    def test_quality_target(self):
+        """Test qu'une exigence de qualité écarte les encodeurs insuffisants."""
+        encoder = select_encoder(quality_target=78, compiled={'libx264', 'libx265', 'libsvtav1'},
+                                 system='Linux')
+
+        assert encoder.name == 'libsvtav1'
+
+    def test_hardware_preferred_when_probe_succeeds(self):
+        """Test que NVENC est préféré quand il s'initialise."""
+        encoder = select_encoder(compiled={'libx264', 'hevc_nvenc'}, system='Windows',
+                                 probe=lambda e: True)
+
+        assert encoder.name == 'hevc_nvenc'
+
+    def test_hardware_skipped_when_probe_fails(self):
+        """Test qu'un encodeur compilé mais sans matériel est ignoré."""
+        encoder = select_encoder(compiled={'libx264', 'hevc_nvenc', 'hevc_vaapi'}, system='Linux',
+                                 probe=lambda e: False)
+
+        assert encoder.name == 'libx264'
+
+    def test_platform_filter(self):
+        """Test que VideoToolbox n'est proposé que sur macOS."""
+        encoder = select_encoder(compiled={'libx264', 'hevc_videotoolbox'}, system='Linux',
+                                 probe=lambda e: True)
+
+        assert encoder.name == 'libx264'
+
+    def test_unreachable_quality_prefers_best(self):
+        """Test qu'une qualité inatteignable retient le plus qualitatif."""
+        ranked = rank_encoders([get_encoder('libx264'), get_encoder('libx265')], quality_target=99)
+
+        assert ranked[0].name == 'libx265'
+
+    @pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="FFmpeg absent")
+    def test_codec_constraint(self):
+        """Test qu'un format imposé écarte les encodeurs des autres formats."""
+        encoder = select_encoder(compiled={'libx264', 'libx265', 'hevc_nvenc'}, system='Linux',
+                                 probe=lambda e: True, codec='hevc')
+
+        assert encoder.name == 'hevc_nvenc'
+        assert encoder.codec == 'hevc'
+
+    def test_hardware_h264_when_imposed(self):
+        """Test que le H.264 imposé (sortie HLS) garde l'encodeur matériel de la même famille."""
+        compiled = {'libx264', 'libx265', 'hevc_nvenc', 'h264_nvenc'}
+        encoder = select_encoder(compiled=compiled, system='Linux', probe=lambda e: True, codec='h264')
+
+        assert encoder.name == 'h264_nvenc'
+        assert encoder.hardware == 'cuda'
+        # Sans format imposé, le HEVC reste préféré à débit égal
+        assert select_encoder(compiled=compiled, system='Linux', probe=lambda e: True).name == 'hevc_nvenc'
+
+    def test_codec_constraint_software_fallback(self):
+        """Test du repli sur l'encodeur logiciel du format imposé."""
+        encoder = select_encoder(compiled={'libx264'}, system='Linux', codec='hevc')
+
+        assert encoder.name == 'libx265'
+
+    def test_detected_software_encoder(self):
+        """Test de la détection réelle: un encodeur logiciel est toujours utilisable."""
+        encoder = select_encoder(probe=lambda e: False)
+
+        assert encoder.hardware is None
+
+
+class TestHwaccelProfile:
+    """Tests du choix du profil de décodage."""
+
+    def test_software_encoder_never_uses_hwaccel(self):
+        """Test que x264 reste en logiciel même si CUDA est disponible."""
+        assert hwaccel_profile(get_encoder('libx264'), {'cuda', 'vaapi'}) == 'software'
+
+    def test_nvenc_with_cuda(self):
+        """Test que NVENC sans overlay_cuda garde le décodage CUDA et l'overlay CPU."""
+        assert hwaccel_profile(get_encoder('hevc_nvenc'), {'cuda'}, {'overlay'}) == 'cuda'
+
+    def test_nvenc_with_overlay_cuda(self):
+        """Test que NVENC reste sur le GPU quand overlay_cuda est disponible."""
+        assert hwaccel_profile(get_encoder('hevc_nvenc'), {'cuda'}, {'overlay_cuda'}) == 'cuda_overlay'
+
+    def test_vaapi_profiles(self):
+        """Test des profils VA-API (overlay GPU ou envoi en fin de chaîne)."""
+        encoder = get_encoder('hevc_vaapi')
+
+        assert hwaccel_profile(encoder, {'vaapi'}, {'overlay_vaapi'}) == 'vaapi'
+        assert hwaccel_profile(encoder, {'vaapi'}, {'overlay'}) == 'vaapi_upload'
+        assert hwaccel_profile(encoder, set(), set()) == 'vaapi_upload'
+
+    def test_qsv_profiles(self):
+        """Test des profils Quick Sync."""
+        encoder = get_encoder('hevc_qsv')
+
+        assert hwaccel_profile(encoder, {'qsv'}, {'overlay_qsv'}) == 'qsv'
+        assert hwaccel_profile(encoder, {'qsv'}, set()) == 'software'
+
+    def test_nvenc_without_cuda(self):
+        """Test que NVENC sans décodage CUDA repasse en composition logicielle."""
+        assert hwaccel_profile(get_encoder('hevc_nvenc'), {'vaapi'}, {'overlay_cuda'}) == 'software'
+
+    def test_videotoolbox(self):
+        """Test du profil VideoToolbox."""
+        assert hwaccel_profile(get_encoder('hevc_videotoolbox'), {'videotoolbox'}) == 'videotoolbox'
+
+
+class TestScaleBitrate:
+    """Tests du bitrate des versions réduites."""
+
+    def test_scaled_below_pixel_ratio(self):
+        """Test qu'une version 1080p d'une source 4K garde plus d'un quart du bitrate."""
+        bitrate = scale_bitrate(40, (3840, 2160), (1920, 1080))
+        assert 10 < bitrate < 40
+        assert bitrate == pytest.approx(40 * 0.25 ** 0.75)
+
+    def test_unknown_bitrate(self):
+        """Test qu'un bitrate inconnu reste inconnu (défauts de l'encodeur)."""
+        assert scale_bitrate(None, (3840, 2160), (1280, 720)) is None
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour ffmpeg_commands.py
+Tests de construction des commandes FFmpeg (sans exécuter FFmpeg).
+"""
+
+import pytest
+
+from utils.ffmpeg_commands import (
+    HWACCEL_PROFILES, build_audio_command, build_audio_filter, build_concat_command,
+    build_rgba_clip_command, build_segment_command, build_stream_remux_command, build_thumbnail_command,
+    build_hls_split_command, build_title_card_command,
+    compute_segment_offsets, join_segments_bytes, segment_extension
+)
+
+
+class TestSegmentFormat:
+    """Tests pour les formats de segments intermédiaires."""
+
+    def test_segment_extension_mp4(self):
+        """Test de l'extension des segments MP4."""
+        assert segment_extension('mp4') == '.mp4'
+
+    def test_segment_extension_ts(self):
+        """Test de l'extension des segments MPEG-TS."""
+        assert segment_extension('ts') == '.ts'
+
+    def test_segment_extension_invalid(self):
+        """Test qu'un format inconnu lève une erreur."""
+        with pytest.raises(ValueError):
+            segment_extension('avi')
+
+    def test_compute_segment_offsets(self):
+        """Test du calcul des offsets cumulés."""
+        clips = [{'duration_frames': 60}, {'duration_frames': 120}, {'duration_frames': 30}]
+        offsets = compute_segment_offsets(clips, 60)
+
+        assert offsets == [0.0, 1.0, 3.0]
+
+    def test_compute_segment_offsets_skips_unrendered(self):
+        """Test qu'un clip non rendu (source introuvable) ne décale pas les suivants."""
+        clips = [{'duration_frames': 60}, {'duration_frames': 120}, {'duration_frames': 30}]
+        offsets = compute_segment_offsets(clips, 60, rendered={1, 3})
+
+        assert offsets == [0.0, 1.0, 1.0]
+
+    def test_compute_segment_offsets_empty(self):
+        """Test du calcul des offsets sans clips."""
+        assert compute_segment_offsets([], 59.94) == []
+
+
+class TestBuildSegmentCommand:
+    """Tests pour la commande FFmpeg d'un segment."""
+
+    def test_mp4_segment(self):
+        """Test d'un segment MP4 classique."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 1.5, 3.0,
+                                    ['-c:v', 'libx264'])
+
+        assert cmd[0] == 'ffmpeg'
+        assert cmd[-1] == 'seg.mp4'
+        assert '-f' not in cmd
+        assert cmd[cmd.index('-ss') + 1] == '1.5'
+        assert cmd[cmd.index('-t') + 1] == '3.0'
+        assert cmd[cmd.index('-c:v') + 1] == 'libx264'
+
+    def test_ts_segment_with_offset(self):
+        """Test d'un segment MPEG-TS avec offset de timestamps."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.ts', 0, 3.0,
+                                    ['-c:v', 'libx264'], segment_format='ts', ts_offset=12.5)
+
+        assert cmd[cmd.index('-f') + 1] == 'mpegts'
+        assert cmd[cmd.index('-output_ts_offset') + 1] == '12.500000'
+        assert cmd[-1] == 'seg.ts'
+
+    def test_ts_first_segment_without_offset(self):
+        """Test que le premier segment n'a pas d'offset."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.ts', 0, 3.0,
+                                    ['-c:v', 'libx264'], segment_format='ts', ts_offset=0.0)
+
+        assert '-output_ts_offset' not in cmd
+
+    def test_segment_without_audio(self):
+        """Test d'un segment sans audio (audio traité à part)."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0,
+                                    ['-c:v', 'libx264'], audio=False)
+
+        assert '-an' in cmd
+
+    def test_segment_with_transition(self):
+        """Test d'un segment avec clip d'animation du score."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0,
+                                    ['-c:v', 'hevc_nvenc'], transition=('tr.mov', 805, 755),
+                                    hwaccel='cuda')
+
+        assert cmd[cmd.index('tr.mov') - 1] == '-i'
+        graph = cmd[cmd.index('-filter_complex') + 1]
+        assert '[2:v]overlay=805:755:eof_action=pass' in graph
+        assert graph.endswith('hwupload_cuda[out]')
+
+    def test_segment_with_overlay_track(self):
+        """Test d'un segment dont l'overlay est une image de la piste d'overlays."""
+        cmd = build_segment_command('in.mp4', 'overlays.mov', 'seg.mp4', 0, 3.0,
+                                    ['-c:v', 'hevc_nvenc'], overlay_frame=7, overlay_position=(12, 480),
+                                    hwaccel='cuda')
+
+        graph = cmd[cmd.index('-filter_complex') + 1]
+        assert cmd.count('-i') == 2
+        # Accès direct à l'image 7 de la piste (1 image/s), une seule image lue
+        track = cmd.index('overlays.mov')
+        assert cmd[track - 5:track] == ['-ss', '7', '-t', '0.5', '-i']
+        assert 'select' not in graph
+        assert '[base][1:v]overlay=12:480' in graph
+
+    def test_overlay_track_seek_uses_track_rate(self):
+        """Test que la position dans la piste suit sa cadence."""
+        cmd = build_segment_command('in.mp4', 'overlays.mov', 'seg.mp4', 0, 3.0,
+                                    ['-c:v', 'libx264'], overlay_frame=3, overlay_rate=4)
+
+        track = cmd.index('overlays.mov')
+        assert cmd[track - 5:track] == ['-ss', '0.75', '-t', '0.125', '-i']
+
+    def test_transition_command(self):
+        """Test de la commande d'encodage d'une transition (rawvideo RGBA -> qtrle)."""
+        cmd = build_rgba_clip_command('tr.mov', (150, 105), 59.94)
+
+        assert cmd[cmd.index('-pix_fmt') + 1] == 'rgba'
+        assert cmd[cmd.index('-s') + 1] == '150x105'
+        assert cmd[cmd.index('-i') + 1] == '-'
+        assert cmd[cmd.index('-c:v') + 1] == 'qtrle'
+        assert cmd[-1] == 'tr.mov'
+        assert '-g' not in cmd
+
+    def test_thumbnail_command_single_decode(self):
+        """Test de l'extraction des vignettes: une lecture, images clés seules, une sélection."""
+        cmd = build_thumbnail_command('in.mp4', [12.5, 4.0, 30.25], 'thumbs', (480, 270), lookahead=10.0)
+
+        assert cmd.count('-i') == 1
+        assert cmd[cmd.index('-skip_frame') + 1] == 'nokey'
+        assert cmd[cmd.index('-ss') + 1] == '4.000'
+        assert cmd[cmd.index('-t') + 1] == '36.250'
+        assert '-copyts' in cmd
+        vf = cmd[cmd.index('-vf') + 1]
+        assert vf.count('gte(t,') == 3
+        assert 'not(gte(prev_t,12.500))' in vf
+        assert vf.endswith('scale=480:270')
+        assert cmd[-1].endswith('%d.png')
+
+    def test_rgba_clip_all_keyframes(self):
+        """Test que la piste d'overlays n'a que des images clés."""
+        cmd = build_rgba_clip_command('overlays.mov', (640, 200), 1, all_keyframes=True)
+
+        assert cmd[cmd.index('-g') + 1] == '1'
+        assert '-c:a' not in cmd
+
+
+class TestHwaccelProfiles:
+    """Tests de la commande d'un segment pour chaque profil de capacités."""
+
+    def _graph(self, cmd):
+        return cmd[cmd.index('-filter_complex') + 1]
+
+    def test_software_profile(self):
+        """Test du profil CPU: aucune option ni filtre matériel."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 1.0, 3.0,
+                                    ['-c:v', 'libx264'], hwaccel='software')
+
+        assert '-hwaccel' not in cmd
+        assert self._graph(cmd) == '[0:v][1:v]overlay=0:0,format=yuv420p[out]'
+        assert cmd.index('-ss') < cmd.index('-i')
+
+    def test_software_is_default(self):
+        """Test que le profil logiciel est le profil par défaut."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0, ['-c:v', 'libx264'])
+
+        assert 'hwupload_cuda' not in self._graph(cmd)
+
+    def test_cuda_profile(self):
+        """Test du profil NVIDIA: décodage CUDA, hwdownload puis hwupload_cuda."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 1.0, 3.0,
+                                    ['-c:v', 'hevc_nvenc'], hwaccel='cuda')
+
+        assert cmd[cmd.index('-hwaccel') + 1] == 'cuda'
+        assert cmd[cmd.index('-hwaccel_output_format') + 1] == 'cuda'
+        assert self._graph(cmd) == (
+            '[0:v]hwdownload,format=nv12[base];[base][1:v]overlay=0:0,format=nv12,hwupload_cuda[out]'
+        )
+
+    def test_videotoolbox_profile(self):
+        """Test du profil macOS: décodage VideoToolbox sans hwdownload explicite."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 1.0, 3.0,
+                                    ['-c:v', 'hevc_videotoolbox'], hwaccel='videotoolbox')
+
+        assert cmd[cmd.index('-hwaccel') + 1] == 'videotoolbox'
+        assert '-hwaccel_output_format' not in cmd
+        assert self._graph(cmd) == '[0:v][1:v]overlay=0:0,format=nv12[out]'
+
+    def test_software_profile_with_track_and_transition(self):
+        """Test du profil CPU avec piste d'overlays et transition."""
+        cmd = build_segment_command('in.mp4', 'overlays.mov', 'seg.mp4', 0, 3.0,
+                                    ['-c:v', 'libx264'], transition=('tr.mov', 5, 6),
+                                    overlay_frame=2, overlay_position=(7, 8))
+
+        assert self._graph(cmd) == (
+            '[0:v][1:v]overlay=7:8'
+            '[score];[score][2:v]overlay=5:6:eof_action=pass,format=yuv420p[out]'
+        )
+
+    def test_cuda_overlay_profile(self):
+        """Test du profil NVIDIA sans aller-retour CPU: overlay envoyé une fois, overlay_cuda."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 1.0, 3.0,
+                                    ['-c:v', 'hevc_nvenc'], hwaccel='cuda_overlay',
+                                    overlay_position=(10, 20))
+        graph = self._graph(cmd)
+
+        assert cmd[cmd.index('-hwaccel_output_format') + 1] == 'cuda'
+        assert 'hwdownload' not in graph
+        assert graph == (
+            '[1:v]format=yuva420p,hwupload_cuda[ov];[0:v][ov]overlay_cuda=x=10:y=20[out]'
+        )
+
+    def test_cuda_overlay_with_track_and_transition(self):
+        """Test que piste et transition sont envoyées sur le GPU avant overlay_cuda."""
+        cmd = build_segment_command('in.mp4', 'overlays.mov', 'seg.mp4', 0, 3.0,
+                                    ['-c:v', 'hevc_nvenc'], hwaccel='cuda_overlay',
+                                    transition=('tr.mov', 5, 6), overlay_frame=3)
+
+        assert self._graph(cmd) == (
+            '[1:v]format=yuva420p,hwupload_cuda[ov];'
+            '[0:v][ov]overlay_cuda=x=0:y=0[score];'
+            '[2:v]format=yuva420p,hwupload_cuda[clip];'
+            '[score][clip]overlay_cuda=x=5:y=6:eof_action=pass[out]'
+        )
+
+    def test_vaapi_profile(self):
+        """Test du profil VA-API: périphérique partagé et overlay_vaapi."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0,
+                                    ['-c:v', 'hevc_vaapi'], hwaccel='vaapi')
+
+        assert cmd[cmd.index('-filter_hw_device') + 1] == 'va'
+        assert cmd[cmd.index('-hwaccel_output_format') + 1] == 'vaapi'
+        assert cmd.index('-init_hw_device') < cmd.index('-i')
+        assert self._graph(cmd) == '[1:v]format=bgra,hwupload[ov];[0:v][ov]overlay_vaapi=x=0:y=0[out]'
+
+    def test_vaapi_upload_profile(self):
+        """Test du repli VA-API: overlay CPU puis envoi au GPU pour l'encodeur."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0,
+                                    ['-c:v', 'hevc_vaapi'], hwaccel='vaapi_upload')
+
+        assert '-hwaccel' not in cmd
+        assert self._graph(cmd) == '[0:v][1:v]overlay=0:0,format=nv12,hwupload[out]'
+
+    def test_qsv_profile(self):
+        """Test du profil Quick Sync: overlay_qsv."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0,
+                                    ['-c:v', 'hevc_qsv'], hwaccel='qsv')
+
+        assert cmd[cmd.index('-hwaccel') + 1] == 'qsv'
+        assert self._graph(cmd).endswith('[0:v][ov]overlay_qsv=x=0:y=0[out]')
+
+    @pytest.mark.parametrize('profile', list(HWACCEL_PROFILES))
+    def test_every_profile_maps_output(self, profile):
+        """Test que chaque profil produit un graphe complet vers [out]."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0,
+                                    ['-c:v', 'libx264'], hwaccel=profile, transition=('tr.mov', 1, 2))
+        graph = self._graph(cmd)
+
+        assert graph.endswith('[out]')
+        assert graph.count('[score]') == 2
+        assert cmd[cmd.index('-map') + 1] == '[out]'
+
+    def test_preview_scale_and_keyframes_only(self):
+        """Test de l'aperçu: décodage des images clés seules et réduction avant l'overlay."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 1.0, 3.0,
+                                    ['-c:v', 'libx264'], scale=(960, 540), keyframes_only=True)
+
+        assert cmd[cmd.index('-skip_frame') + 1] == 'nokey'
+        assert cmd.index('-skip_frame') < cmd.index('-ss') < cmd.index('-i')
+        assert self._graph(cmd) == '[0:v]scale=960:540[base];[base][1:v]overlay=0:0,format=yuv420p[out]'
+
+    def test_preview_keyframes_only_requires_software(self):
+        """Test que le décodage des images clés seules est réservé au profil logiciel."""
+        with pytest.raises(ValueError):
+            build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0,
+                                  ['-c:v', 'hevc_nvenc'], hwaccel='cuda', keyframes_only=True)
+
+    def test_renditions_split_after_overlay(self):
+        """Test des versions: un décodage, overlay composé une fois puis split + scale par version."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0, ['-c:v', 'libx264'],
+                                    audio=True,
+                                    renditions=[('seg_720p.mp4', (1280, 720), ['-c:v', 'libx264', '-b:v', '5M'])])
+        graph = self._graph(cmd)
+
+        assert cmd.count('-i') == 2
+        assert graph == ('[0:v][1:v]overlay=0:0,split=2[r0][r1];'
+                         '[r0]format=yuv420p[out];[r1]scale=1280:720,format=yuv420p[out1]')
+        assert [cmd[k + 1] for k, arg in enumerate(cmd) if arg == '-map'] == ['[out]', '0:a?', '[out1]', '0:a?']
+        assert cmd[-1] == 'seg_720p.mp4'
+        assert cmd[cmd.index('[out1]'):].count('-b:v') == 1
+
+    def test_renditions_use_profile_scale(self):
+        """Test que les versions sont réduites avec le filtre de mise à l'échelle du profil."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0, ['-c:v', 'hevc_qsv'],
+                                    hwaccel='qsv', renditions=[('seg_720p.mp4', (1280, 720), [])])
+
+        assert '[r1]scale_qsv=w=1280:h=720[out1]' in self._graph(cmd)
+
+    def test_unknown_profile(self):
+        """Test qu'un profil inconnu lève une erreur."""
+        with pytest.raises(ValueError):
+            build_segment_command('in.mp4', 'ov.png', 'seg.mp4', 0, 3.0,
+                                  ['-c:v', 'libx264'], hwaccel='opencl')
+
+
+class TestAudioStage:
+    """Tests pour l'extraction audio en une passe."""
+
+    def test_audio_filter_single_use_sources(self):
+        """Test du filtergraph avec une plage par source."""
+        sources, graph = build_audio_filter([('a.mp4', 1.0, 2.0), ('b.mp4', 0.5, 1.5)])
+
+        assert sources == ['a.mp4', 'b.mp4']
+        assert 'asplit' not in graph
+        assert '[0:a]atrim=start=1.000000:duration=2.000000' in graph
+        assert '[1:a]atrim=start=0.500000:duration=1.500000' in graph
+        assert graph.endswith('[a0][a1]concat=n=2:v=0:a=1[aout]')
+
+    def test_audio_filter_reuses_source(self):
+        """Test qu'une source utilisée plusieurs fois n'est ouverte qu'une fois."""
+        sources, graph = build_audio_filter([
+            ('a.mp4', 0.0, 1.0), ('b.mp4', 0.0, 1.0), ('a.mp4', 5.0, 1.0)
+        ])
+
+        assert sources == ['a.mp4', 'b.mp4']
+        assert '[0:a]asplit=2[src0_0][src0_1]' in graph
+        assert '[src0_1]atrim=start=5.000000' in graph
+        assert 'concat=n=3' in graph
+
+    def test_audio_filter_pads_to_exact_duration(self):
+        """Test que chaque plage est complétée à sa durée exacte."""
+        _, graph = build_audio_filter([('a.mp4', 0.0, 2.5)])
+
+        assert 'apad=whole_dur=2.500000' in graph
+
+    def test_audio_filter_silence_range(self):
+        """Test qu'une plage sans source (carton titre) devient un silence."""
+        sources, graph = build_audio_filter([(None, 0.0, 2.0), ('a.mp4', 1.0, 3.0)])
+
+        assert sources == ['a.mp4']
+        assert 'anullsrc=r=48000:cl=stereo,atrim=duration=2.000000[a0]' in graph
+        assert '[0:a]atrim=start=1.000000' in graph
+
+    def test_audio_command(self):
+        """Test de la commande d'extraction audio."""
+        cmd = build_audio_command(['a.mp4', 'b.mp4'], 'graph.txt', 'audio.m4a')
+
+        assert cmd.count('-i') == 2
+        assert cmd[cmd.index('-filter_complex_script') + 1] == 'graph.txt'
+        assert cmd[cmd.index('-map') + 1] == '[aout]'
+        assert cmd[-1] == 'audio.m4a'
+
+
+class TestAssembly:
+    """Tests pour l'assemblage final."""
+
+    def test_concat_command(self):
+        """Test de la commande concat (copie de flux)."""
+        cmd = build_concat_command('list.txt', 'out.mp4')
+
+        assert cmd[cmd.index('-f') + 1] == 'concat'
+        assert cmd[cmd.index('-c') + 1] == 'copy'
+        assert cmd[-1] == 'out.mp4'
+
+    def test_concat_command_with_audio(self):
+        """Test de la concaténation avec piste audio séparée."""
+        cmd = build_concat_command('list.txt', 'out.mp4', audio_path='audio.m4a')
+
+        assert 'audio.m4a' in cmd
+        assert ['-map', '0:v', '-map', '1:a'] == cmd[cmd.index('-map'):cmd.index('-map') + 4]
+
+    def test_stream_remux_command(self):
+        """Test du remux d'un flux MPEG-TS lu sur l'entrée standard."""
+        cmd = build_stream_remux_command('out.mp4')
+
+        assert cmd[cmd.index('-f') + 1] == 'mpegts'
+        assert cmd[cmd.index('-i') + 1] == 'pipe:0'
+        assert cmd[-1] == 'out.mp4'
+
+    def test_join_segments_bytes(self, tmp_path):
+        """Test de la jointure octet par octet des segments."""
+        seg1 = tmp_path / "a.ts"
+        seg2 = tmp_path / "b.ts"
+        seg1.write_bytes(b"\x47" * 188)
+        seg2.write_bytes(b"\x47\x00" * 94)
+        output = tmp_path / "out.ts"
+
+        written = join_segments_bytes([seg1, seg2], output)
+
+        assert written == 376
+        assert output.read_bytes() == seg1.read_bytes() + seg2.read_bytes()
+
+    def test_join_segments_bytes_append(self, tmp_path):
+        """Test de l'ajout de segments à la suite d'un flux existant (mode direct)."""
+        seg1 = tmp_path / "a.ts"
+        seg2 = tmp_path / "b.ts"
+        seg1.write_bytes(b"\x47" * 188)
+        seg2.write_bytes(b"\x47\x00" * 94)
+        output = tmp_path / "out.ts"
+
+        join_segments_bytes([seg1], output, append=True)
+        written = join_segments_bytes([seg2], output, append=True)
+
+        assert written == 188
+        assert output.read_bytes() == seg1.read_bytes() + seg2.read_bytes()
+
+
+class TestTitleCard:
+    """Tests pour le carton titre généré (sans source)."""
+
+    def test_generated_background_and_silence(self):
+        """Test que le carton ne lit aucune source: fond lavfi color, silence anullsrc."""
+        cmd = build_title_card_command('title.png', 'card.mp4', (1920, 1080), 50, 2.0,
+                                       ['-c:v', 'libx264'], '0x25425e',
+                                       audio_format=('aac', 48000, 'stereo'))
+
+        inputs = [cmd[k + 1] for k, arg in enumerate(cmd) if arg == '-i']
+        assert inputs == ['color=c=0x25425e:s=1920x1080:r=50:d=2.0', 'title.png',
+                          'anullsrc=r=48000:cl=stereo']
+        assert cmd[cmd.index('-filter_complex') + 1] == '[0:v][1:v]overlay=0:0,format=yuv420p[out]'
+        assert cmd[cmd.index('-c:a') + 1] == 'aac'
+        assert cmd[-1] == 'card.mp4'
+
+    def test_without_audio(self):
+        """Test d'un carton sans piste audio (audio traité à part)."""
+        cmd = build_title_card_command('title.png', 'card.mp4', (1280, 720), 25, 2.0,
+                                       ['-c:v', 'libx264'], '0x25425e')
+
+        assert '-an' in cmd
+        assert 'anullsrc' not in ' '.join(cmd)
+
+    def test_vaapi_encoder_gets_upload(self):
+        """Test que l'encodeur VA-API reçoit des images envoyées sur le GPU."""
+        cmd = build_title_card_command('title.png', 'card.mp4', (1280, 720), 25, 2.0,
+                                       ['-c:v', 'hevc_vaapi'], '0x25425e', hwaccel='vaapi')
+
+        assert '-filter_hw_device' in cmd
+        assert cmd[cmd.index('-filter_complex') + 1].endswith('format=nv12,hwupload[out]')
+        assert '-hwaccel' not in cmd
+
+
+class TestHlsSplit:
+    """Tests pour la découpe HLS (images clés imposées, découpe sans réencodage)."""
+
+    def test_forced_keyframes_on_every_output(self):
+        """Test que chaque version reçoit les mêmes images clés imposées."""
+        cmd = build_segment_command('in.mp4', 'ov.png', 'seg.ts', 0, 20.0, ['-c:v', 'libx264'],
+                                    segment_format='ts', keyframe_frames=300,
+                                    renditions=[('seg_720p.ts', (1280, 720), ['-c:v', 'libx264'])])
+
+        assert cmd.count('-force_key_frames') == 2
+        assert cmd[cmd.index('-force_key_frames') + 1] == 'expr:eq(mod(n,300),0)'
+
+    def test_split_command(self):
+        """Test de la découpe d'un segment sur les images clés, timestamps conservés."""
+        cmd = build_hls_split_command('seg.ts', 'out/match_%05d.ts', 'seg.csv', 300, 1000,
+                                      start_number=7)
+
+        assert '-copyts' in cmd
+        assert cmd[cmd.index('-c') + 1] == 'copy'
+        assert cmd[cmd.index('-segment_frames') + 1] == '300,600,900'
+        assert cmd[cmd.index('-segment_start_number') + 1] == '7'
+        assert cmd[-1] == 'out/match_%05d.ts'
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour highlights.py
+Tests des tags, des situations de score et de la sélection des meilleurs moments.
+"""
+
+import pytest
+
+from utils.highlights import (
+    comment_tags, render_title_card, score_situations, select_highlights, server, sets_won
+)
+
+
+def _score(jeux="0/0", points="0/0", set_num=1, set1=None, set2=None, commentaires=""):
+    """Score tel que lu par parse_excel."""
+    return {'set': set_num, 'point': 1, 'set1': set1, 'set2': set2,
+            'jeux': jeux, 'points': points, 'commentaires': commentaires}
+
+
+class TestTags:
+    """Tests pour comment_tags."""
+
+    def test_tags_case_and_hash(self):
+        """Test que les tags ignorent la casse et le '#'."""
+        assert comment_tags("#Smash, lob  par 3") == {'smash', 'lob', 'par', '3'}
+
+    def test_empty_comment(self):
+        """Test d'un commentaire vide (cellule vide)."""
+        assert comment_tags(None) == set()
+
+
+class TestSituations:
+    """Tests pour score_situations."""
+
+    def test_game_point(self):
+        """Test d'une balle de jeu simple."""
+        assert score_situations(_score("1/1", "40/15")) == {'game_point'}
+
+    def test_no_situation(self):
+        """Test d'un point sans enjeu."""
+        assert score_situations(_score("1/1", "30/15")) == set()
+
+    def test_golden_point_for_both_teams(self):
+        """Test que 40/40 (point décisif) est une balle de jeu pour les deux équipes."""
+        assert 'set_point' in score_situations(_score("5/1", "40/40"))
+
+    def test_advantage(self):
+        """Test d'un avantage (AD)."""
+        assert 'game_point' in score_situations(_score("1/1", "40/AD"))
+        assert score_situations(_score("5/3", "40/AD")) == {'game_point'}
+
+    def test_set_point(self):
+        """Test d'une balle de set (5/4, 40/30)."""
+        assert score_situations(_score("5/4", "40/30")) == {'game_point', 'set_point'}
+
+    def test_not_set_point_at_5_5(self):
+        """Test qu'à 5/5 gagner le jeu ne donne pas le set."""
+        assert 'set_point' not in score_situations(_score("5/5", "40/0"))
+
+    def test_match_point_after_first_set(self):
+        """Test d'une balle de match pour l'équipe qui a gagné le premier set."""
+        score = _score("5/2", "40/15", set_num=2, set1="6/4")
+
+        assert sets_won(score) == [1, 0]
+        assert 'match_point' in score_situations(score)
+
+    def test_set_in_progress_is_not_won(self):
+        """Test qu'un set égal aux jeux en cours n'est pas compté comme gagné."""
+        assert sets_won(_score("5/2", "0/0", set1="5/2")) == [0, 0]
+
+    def test_tiebreak(self):
+        """Test d'un point de tie-break et d'une balle de set à 6/5."""
+        assert score_situations(_score("6/6", "3/2")) == {'tiebreak'}
+        assert score_situations(_score("6/6", "6/5")) == {'tiebreak', 'game_point', 'set_point'}
+
+    def test_super_tiebreak_match_point(self):
+        """Test d'une balle de match en super tie-break (3e set)."""
+        score = _score("0/0", "9/7", set_num=3, set1="6/4", set2="3/6")
+
+        assert score_situations(score) == {'tiebreak', 'game_point', 'set_point', 'match_point'}
+
+    def test_break_point_needs_server(self):
+        """Test des balles de break selon l'équipe au service."""
+        # 2 jeux joués: l'équipe 1 sert de nouveau si elle a servi le premier jeu
+        score = _score("1/1", "15/40")
+
+        assert server(score, first_server=1) == 1
+        assert 'break_point' in score_situations(score, first_server=1)
+        assert 'break_point' not in score_situations(score, first_server=2)
+        assert 'break_point' not in score_situations(score)
+
+
+class TestSelectHighlights:
+    """Tests pour select_highlights."""
+
+    @pytest.fixture
+    def scores(self):
+        return [
+            _score("0/0", "0/0"),
+            _score("1/0", "15/0", commentaires="#smash"),
+            _score("5/4", "40/30"),
+            _score("6/6", "2/2"),
+            _score("6/6", "2/3", commentaires="Lob"),
+        ]
+
+    def test_union_of_criteria(self, scores):
+        """Test qu'un clip est retenu s'il remplit un des critères."""
+        assert select_highlights(scores, tags=['SMASH', '#lob'], situations=['set_point']) == [2, 3, 5]
+
+    def test_score_filter(self, scores):
+        """Test du filtre libre sur le score."""
+        assert select_highlights(scores, score_filter=lambda s: s['jeux'] == "6/6") == [4, 5]
+
+    def test_unknown_situation(self, scores):
+        """Test qu'une situation inconnue est refusée."""
+        with pytest.raises(ValueError):
+            select_highlights(scores, situations=['ace'])
+
+    def test_break_points_require_first_server(self, scores):
+        """Test que les balles de break demandent l'équipe au service."""
+        with pytest.raises(ValueError):
+            select_highlights(scores, situations=['break_point'])
+
+
+def test_title_card_is_opaque():
+    """Test que le carton titre couvre toute l'image (rien de la vidéo ne transparaît)."""
+    card = render_title_card(640, 360, "Meilleurs moments", "smash")
+
+    assert card.size == (640, 360)
+    assert card.getchannel('A').getextrema() == (255, 255)
+
+
+def test_title_card_text_only():
+    """Test du texte seul sur fond transparent (fond généré par FFmpeg)."""
+    card = render_title_card(640, 360, "Meilleurs moments", background=None)
+
+    assert card.getchannel('A').getextrema()[0] == 0
+    assert card.getchannel('A').getbbox() is not None
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour hls_packager.py
+Tests de la publication dans l'ordre, des playlists et des versions multiples.
+"""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from utils import hls_packager
+from utils.hls_packager import HlsPackager, codec_string, media_playlist, read_segment_list
+
+
+@pytest.fixture
+def work(tmp_path):
+    """Dossier de travail avec trois segments factices (clé (clip, morceau) -> chemin)."""
+    work = tmp_path / "work"
+    work.mkdir()
+    paths = {}
+    for key in [(1, 0), (2, 0), (3, 0)]:
+        path = work / f"segment_{key[0]:03d}_{key[1]:02d}.ts"
+        path.write_bytes(b"x" * 1000)
+        paths[key] = path
+    return paths
+
+
+SEGMENTS = [((1, 0), 4.0), ((2, 0), 6.5), ((3, 0), 2.0)]
+
+
+class TestMediaPlaylist:
+    """Tests du format des playlists média."""
+
+    def test_event_playlist(self):
+        """Test d'une playlist en cours puis terminée."""
+        text = media_playlist([("a.ts", 4.0)], 7, ended=False)
+
+        assert text.startswith("#EXTM3U\n")
+        assert "#EXT-X-TARGETDURATION:7" in text
+        assert "#EXT-X-PLAYLIST-TYPE:EVENT" in text
+        assert "#EXTINF:4.000000,\na.ts" in text
+        assert "#EXT-X-ENDLIST" not in text
+        assert media_playlist([("a.ts", 4.0)], 7, ended=True).endswith("#EXT-X-ENDLIST\n")
+
+    def test_missing_segment_marks_discontinuity(self):
+        """Test qu'un segment manquant ajoute une discontinuité avant le suivant."""
+        text = media_playlist([("a.ts", 4.0), None, ("c.ts", 2.0)], 4, ended=True)
+
+        assert text.index("a.ts") < text.index("#EXT-X-DISCONTINUITY") < text.index("c.ts")
+
+
+class TestHlsPackager:
+    """Tests pour HlsPackager (une seule version)."""
+
+    def test_published_in_timeline_order(self, tmp_path, work):
+        """Test qu'un segment n'est publié qu'une fois les précédents publiés."""
+        output = tmp_path / "out" / "match.m3u8"
+        packager = HlsPackager(output, SEGMENTS, [(1920, 1080)])
+
+        packager.add((2, 0), [work[(2, 0)]])
+        assert "#EXTINF" not in output.read_text()
+        assert work[(2, 0)].exists()
+
+        packager.add((1, 0), [work[(1, 0)]])
+        text = output.read_text()
+        assert text.index("match_00000.ts") < text.index("match_00001.ts")
+        assert (output.parent / "match_00001.ts").exists()
+        assert not work[(2, 0)].exists()
+        assert packager.max_pending == 1
+
+    def test_target_duration_covers_longest_segment(self, tmp_path):
+        """Test que la durée cible est fixée d'avance d'après le segment le plus long."""
+        packager = HlsPackager(tmp_path / "match.m3u8", SEGMENTS, [(1920, 1080)])
+        assert packager.target_duration == 7
+
+    def test_close_ends_playlist(self, tmp_path, work):
+        """Test que la fin du traitement termine la playlist (VOD complet)."""
+        output = tmp_path / "match.m3u8"
+        packager = HlsPackager(output, SEGMENTS, [(1920, 1080)])
+        packager.add((1, 0), [work[(1, 0)]])
+        packager.skip((2, 0))
+        packager.add((3, 0), [work[(3, 0)]])
+        packager.close()
+
+        text = output.read_text()
+        assert packager.complete
+        assert packager.appended == 2
+        assert "#EXT-X-DISCONTINUITY" in text
+        assert text.endswith("#EXT-X-ENDLIST\n")
+
+    def test_extend_live_segments(self, tmp_path, work):
+        """Test du mode direct: segments ajoutés à la suite, durée cible fixée d'avance."""
+        output = tmp_path / "match.m3u8"
+        packager = HlsPackager(output, [], [(1920, 1080)], target_duration=10)
+        packager.extend(SEGMENTS[:1])
+        packager.add((1, 0), [work[(1, 0)]])
+        packager.extend(SEGMENTS[1:])
+        packager.add((2, 0), [work[(2, 0)]])
+
+        text = output.read_text()
+        assert "#EXT-X-TARGETDURATION:10" in text
+        assert "match_00001.ts" in text
+        assert not packager.complete
+
+    def test_abort_removes_published_files(self, tmp_path, work):
+        """Test que l'annulation supprime la playlist et les segments publiés."""
+        output = tmp_path / "match.m3u8"
+        packager = HlsPackager(output, SEGMENTS, [(1920, 1080)])
+        packager.add((1, 0), [work[(1, 0)]])
+
+        packager.abort()
+
+        assert list(tmp_path.glob("match*")) == []
+
+
+class TestHlsRenditions:
+    """Tests des versions multiples (playlist maître)."""
+
+    def test_master_playlist_lists_variants(self, tmp_path, work):
+        """Test d'une playlist par version et d'une playlist maître avec débit et résolution."""
+        output = tmp_path / "match.m3u8"
+        small = work[(1, 0)].with_name("segment_001_00_720p.ts")
+        small.write_bytes(b"x" * 500)
+        packager = HlsPackager(output, SEGMENTS, [(1920, 1080), (1280, 720)])
+
+        packager.add((1, 0), [work[(1, 0)], small])
+
+        master = output.read_text()
+        # Segments factices (sonde impossible): codecs déduits de la résolution
+        assert ("#EXT-X-STREAM-INF:BANDWIDTH=2000,RESOLUTION=1920x1080,"
+                "CODECS=\"avc1.640028,mp4a.40.2\"\nmatch_1080p.m3u8") in master
+        assert ("#EXT-X-STREAM-INF:BANDWIDTH=1000,RESOLUTION=1280x720,"
+                "CODECS=\"avc1.64001f,mp4a.40.2\"\nmatch_720p.m3u8") in master
+        assert "match_720p_00000.ts" in (tmp_path / "match_720p.m3u8").read_text()
+        assert (tmp_path / "match_720p_00000.ts").read_bytes() == b"x" * 500
+
+
+class TestHlsSplit:
+    """Tests de la découpe en segments HLS courts et des codecs."""
+
+    def test_codec_string(self):
+        """Test des identifiants RFC 6381 (attribut CODECS)."""
+        assert codec_string({'codec_name': 'h264', 'profile': 'High', 'level': 40}) == 'avc1.640028'
+        assert codec_string({'codec_name': 'h264', 'profile': 'Main', 'level': 31}) == 'avc1.4d001f'
+        assert codec_string({'codec_name': 'aac', 'profile': 'LC'}) == 'mp4a.40.2'
+        assert codec_string({'codec_name': 'hevc', 'profile': 'Main', 'level': 120}) is None
+
+    def test_read_segment_list(self, tmp_path):
+        """Test de la lecture de la liste CSV du muxer segment."""
+        path = tmp_path / "list.csv"
+        path.write_text("match_00000.ts,10.000000,16.000000\nmatch_00001.ts,16.000000,18.500000\n")
+
+        assert read_segment_list(path) == [("match_00000.ts", 6.0), ("match_00001.ts", 2.5)]
+
+    def test_segments_split_into_short_pieces(self, tmp_path, work, monkeypatch):
+        """Test qu'un segment de job est publié en plusieurs segments HLS courts numérotés à la suite."""
+        commands = []
+
+        def run(cmd, **kwargs):
+            if cmd[0] != 'ffmpeg':
+                return subprocess.CompletedProcess(cmd, 1, "", "")  # sonde ffprobe
+            commands.append(cmd)
+            start = int(cmd[cmd.index('-segment_start_number') + 1])
+            names = [cmd[-1] % (start + k) for k in range(2)]
+            for name in names:
+                (tmp_path / name).write_bytes(b"x" * 100)
+            Path(cmd[cmd.index('-segment_list') + 1]).write_text(
+                "".join(f"{Path(name).name},0.0,{3.0 - k}\n" for k, name in enumerate(names)))
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        monkeypatch.setattr(hls_packager.subprocess, 'run', run)
+        output = tmp_path / "match.m3u8"
+        packager = HlsPackager(output, SEGMENTS, [(1920, 1080)], fps=25)
+        packager.add((1, 0), [work[(1, 0)]])
+        packager.add((2, 0), [work[(2, 0)]])
+
+        text = output.read_text()
+        assert packager.target_duration == 6
+        assert "#EXTINF:3.000000,\nmatch_00000.ts" in text
+        assert "#EXTINF:2.000000,\nmatch_00003.ts" in text
+        assert not work[(1, 0)].exists()
+        assert commands[1][commands[1].index('-segment_frames') + 1] == '150'
@@ -4,9 +4,14 @@ Tests unitaires pour main.py
 Tests des fonctions utilitaires et de parsing.
 """
 
+import subprocess
+from pathlib import Path
+
 import pytest
 
 from main import VideoOverlayAutomator
+from utils.encoders import ENCODERS
+from utils.ffmpeg_commands import build_remux_command, join_segments_bytes
 
 
 class TestVideoOverlayAutomator:
@@ -106,8 +111,8 @@ class TestVideoOverlayAutomator:
         """Test que detect_gpu_encoder retourne un codec valide."""
         encoder = automator.detect_gpu_encoder()
 
-        valid_codecs = ['hevc_videotoolbox', 'hevc_nvenc', 'libx264']
-        assert encoder['video_codec'] in valid_codecs
+        assert encoder['video_codec'] in ENCODERS
+        assert encoder['max_sessions'] >= 1
 
     def test_initialization_with_custom_teams(self, tmp_path):
         """Test de l'initialisation avec noms d'équipes personnalisés."""
@@ -181,3 +186,506 @@ class TestVideoOverlayAutomator:
         """Test que les scores sont initialisés comme liste vide."""
         assert isinstance(automator.scores, list)
         assert len(automator.scores) == 0
+
+    def test_segment_format_default_mp4(self, automator):
+        """Test que les segments sont en MP4 par défaut."""
+        assert automator.segment_format == "mp4"
+
+    def test_segment_format_invalid(self, tmp_path):
+        """Test qu'un format de segment inconnu est refusé."""
+        with pytest.raises(ValueError):
+            VideoOverlayAutomator(
+                xml_path=str(tmp_path / "test.xml"),
+                excel_path=str(tmp_path / "test.xlsx"),
+                video_folder=str(tmp_path),
+                segment_format="avi"
+            )
+
+    def test_stream_output_requires_ts(self, tmp_path):
+        """Test que l'assemblage en continu exige des segments MPEG-TS."""
+        with pytest.raises(ValueError):
+            VideoOverlayAutomator(
+                xml_path=str(tmp_path / "test.xml"),
+                excel_path=str(tmp_path / "test.xlsx"),
+                video_folder=str(tmp_path),
+                stream_output=True
+            )
+
+    def test_output_size_source(self, automator):
+        """Test que les segments gardent la résolution de la source hors aperçu."""
+        automator.video_width, automator.video_height = 3840, 2160
+        assert automator.output_size() == (3840, 2160)
+
+    def test_preview_mode(self, tmp_path):
+        """Test que l'aperçu force libx264 logiciel et réduit la sortie à 540p."""
+        automator = VideoOverlayAutomator(
+            xml_path=str(tmp_path / "test.xml"),
+            excel_path=str(tmp_path / "test.xlsx"),
+            video_folder=str(tmp_path),
+            preview=True
+        )
+        automator.video_width, automator.video_height = 3840, 2160
+
+        assert automator.encoder['video_codec'] == 'libx264'
+        assert automator.hwaccel == 'software'
+        assert automator.output_size() == (960, 540)
+
+    def test_rendition_sizes(self, tmp_path):
+        """Test des versions: jamais au-delà de la source, sans doublon, de la plus grande à la plus petite."""
+        automator = VideoOverlayAutomator(
+            xml_path=str(tmp_path / "test.xml"),
+            excel_path=str(tmp_path / "test.xlsx"),
+            video_folder=str(tmp_path),
+            renditions=(720, 2160, 1080)
+        )
+        automator.video_width, automator.video_height = 1920, 1080
+
+        assert automator.rendition_sizes() == [(1920, 1080), (1280, 720)]
+        assert automator.output_size() == (1920, 1080)
+        assert automator.composite_scale() is None
+        assert automator.rendition_path("out/final.mp4", (1280, 720)) == Path("out/final_720p.mp4")
+
+    def test_renditions_incompatible_modes(self, tmp_path):
+        """Test que les versions multiples sont refusées avec l'aperçu."""
+        with pytest.raises(ValueError):
+            VideoOverlayAutomator(
+                xml_path=str(tmp_path / "test.xml"),
+                excel_path=str(tmp_path / "test.xlsx"),
+                video_folder=str(tmp_path),
+                preview=True,
+                renditions=(1080, 720)
+            )
+
+    def test_hls_output_forces_ts_segments(self, automator):
+        """Test qu'une sortie .m3u8 impose des segments MPEG-TS publiés tels quels."""
+        automator.check_output("out/match.M3U8")
+        assert automator.segment_format == 'ts'
+        assert automator.hls_keyframe_frames() == round(automator.fps * 6)
+
+    def test_hls_output_forces_h264(self, automator, monkeypatch):
+        """Test qu'une sortie HLS remplace un encodeur HEVC par un encodeur H.264."""
+        automator.encoder = ENCODERS['libx265'].describe()
+        monkeypatch.setattr(automator, 'detect_gpu_encoder',
+                            lambda: ENCODERS['libx264' if automator.codec == 'h264' else 'libx265'].describe())
+
+        automator.check_output("out/match.m3u8")
+
+        assert automator.encoder['video_codec'] == 'libx264'
+        assert automator.hwaccel == 'software'
+
+    def test_hls_output_warns_when_gpu_dropped(self, automator, monkeypatch, capsys):
+        """Test qu'un encodeur GPU remplacé par x264 (aucun H.264 matériel) est signalé."""
+        automator.encoder = ENCODERS['hevc_nvenc'].describe()
+        monkeypatch.setattr(automator, 'detect_gpu_encoder', lambda: ENCODERS['libx264'].describe())
+
+        automator.check_output("out/match.m3u8")
+
+        assert "NVIDIA NVENC remplacé par CPU H.264" in capsys.readouterr().out
+
+    def test_hls_output_requires_audio_copy(self, tmp_path):
+        """Test que la sortie HLS refuse l'audio extrait à part (piste muxée en fin de traitement)."""
+        automator = VideoOverlayAutomator(
+            xml_path=str(tmp_path / "test.xml"),
+            excel_path=str(tmp_path / "test.xlsx"),
+            video_folder=str(tmp_path),
+            audio_mode="separate"
+        )
+        with pytest.raises(ValueError):
+            automator.check_output(tmp_path / "match.m3u8")
+
+    def test_reload_inputs_returns_new_points(self, automator, monkeypatch):
+        """Test du mode direct: seuls les points saisis après les points publiés sont à rendre."""
+        clips = [{'name': name, 'in_frame': k * 100, 'duration_frames': 100}
+                 for k, name in enumerate(["a.mp4", "b.mp4", "c.mp4"])]
+        monkeypatch.setattr(automator, 'parse_xml', lambda: automator.clips.extend(dict(c) for c in clips))
+        monkeypatch.setattr(automator, 'resolve_sources', lambda: [
+            clip.update(source_path=clip['name']) for clip in automator.clips if clip['name'] != "c.mp4"])
+
+        # 3 clips, 1 score saisi: un seul point prêt
+        assert automator.reload_inputs([]) == [1]
+        published = [automator.point_state(1)]
+
+        # Deux scores de plus: le point 3 attend sa source
+        monkeypatch.setattr(automator, 'parse_excel', lambda: automator.scores.extend(
+            {'set': 1, 'point': k, 'set1': None, 'set2': None, 'jeux': '0/0', 'points': '0/0',
+             'commentaires': ''} for k in range(3)))
+        assert automator.reload_inputs(published) == [2]
+
+    def test_reload_inputs_stops_at_invalid_point(self, automator, monkeypatch):
+        """Test que chaque lot relu est validé: un point invalide bloque les suivants."""
+        clips = [{'name': f"{k}.mp4", 'in_frame': k * 100, 'duration_frames': 100, 'source_path': f"{k}.mp4"}
+                 for k in range(3)]
+        score = {'set': 1, 'point': 1, 'set1': None, 'set2': None, 'jeux': '0/0', 'points': '0/0',
+                 'commentaires': ''}
+        monkeypatch.setattr(automator, 'parse_xml', lambda: automator.clips.extend(dict(c) for c in clips))
+        monkeypatch.setattr(automator, 'parse_excel', lambda: automator.scores.extend(
+            [score, dict(score, points='15/99'), score]))
+        monkeypatch.setattr(automator, 'resolve_sources', lambda: None)
+        monkeypatch.setattr(automator, 'get_video_duration', lambda source: 100.0)
+
+        assert automator.reload_inputs([]) == [1]
+
+    def test_live_file_output_remuxed_once(self, automator, tmp_path, monkeypatch):
+        """Test du mode direct vers un .mp4: lots ajoutés à un flux MPEG-TS, un seul remux à l'arrêt."""
+        output = tmp_path / "match.mp4"
+        work = tmp_path / "work"
+        work.mkdir()
+        streams = automator.live_streams(output, work)
+        assert streams == [(work / "match_live.ts", output)]
+
+        segments = []
+        for k in range(3):
+            path = work / f"segment_{k + 1:03d}_00.ts"
+            path.write_bytes(bytes([k]) * 188)
+            segments.append({'index': k + 1, 'chunk': 0, 'path': path})
+        for batch in (segments[:2], segments[2:]):
+            join_segments_bytes([s['path'] for s in batch], streams[0][0], append=True)
+
+        commands = []
+        monkeypatch.setattr(subprocess, 'run', lambda cmd, **kwargs: commands.append(cmd)
+                            or subprocess.CompletedProcess(cmd, 0, '', ''))
+        automator.finish_live(segments, work, output)
+
+        assert streams[0][0].read_bytes() == b"".join(s['path'].read_bytes() for s in segments)
+        assert commands == [build_remux_command(streams[0][0], output)]
+
+    def test_live_ts_output_written_directly(self, automator, tmp_path):
+        """Test qu'une sortie .ts du mode direct est complétée directement (sans remux)."""
+        output = tmp_path / "match.ts"
+        assert automator.live_streams(output, tmp_path / "work") == [(output, output)]
+
+    def test_watch_signature_tracks_score_sheet(self, automator):
+        """Test que la signature surveillée change quand la feuille de scores est enregistrée."""
+        before = automator.watch_signature()
+        automator.excel_path.write_bytes(automator.excel_path.read_bytes() + b"\0")
+        assert automator.watch_signature() != before
+
+    def test_overlay_track_reused_between_batches(self, automator, tmp_path, monkeypatch):
+        """Test que la piste d'overlays n'est réencodée que si les états de score changent."""
+        from utils.overlay_generator import PadelOverlayGenerator
+        from utils.overlay_track import OverlayTrack
+
+        encoded = []
+        def encode(track, path):
+            encoded.append(len(track.states))
+            path.write_bytes(b"")
+            return path
+        monkeypatch.setattr(OverlayTrack, 'encode', encode)
+        automator.overlay_mode = 'track'
+        automator.overlay_generator = PadelOverlayGenerator(640, 360, backend="pillow")
+        automator.clips = [{'duration_frames': 60}] * 2
+        score = {'jeux': '0/0', 'points': '0/0', 'set1': None, 'set2': None}
+        automator.scores = [score, dict(score, points='15/0')]
+
+        automator.prepare_overlays(tmp_path, [0.0, 1.0])
+        automator.clips.append({'duration_frames': 60})
+        automator.scores.append(score)
+        automator.prepare_overlays(tmp_path, [0.0, 1.0, 2.0])
+        assert encoded == [2]
+        assert automator.overlay_track.frames == [0, 1, 0]
+
+        automator.clips.append({'duration_frames': 60})
+        automator.scores.append(dict(score, points='30/0'))
+        automator.prepare_overlays(tmp_path, [0.0, 1.0, 2.0, 3.0])
+        assert encoded == [2, 3]
+
+    def test_throughput_history_injected(self, automator, tmp_path):
+        """Test que l'historique des débits reste en mémoire sauf fichier fourni."""
+        assert automator.throughput_history.path is None
+
+        path = tmp_path / "throughput.json"
+        other = VideoOverlayAutomator(automator.xml_path, automator.excel_path, tmp_path,
+                                      history_path=path)
+        other.throughput_history.record('k', 50)
+        other.throughput_history.save()
+        assert path.exists()
+
+    def test_async_timeout_retried_then_fails(self, automator, monkeypatch):
+        """Test qu'un job hors délai est relancé avec un délai doublé puis fait échouer le rendu."""
+        import asyncio
+        from utils.async_engine import AsyncFFmpegEngine, JobTimeout
+
+        engine = AsyncFFmpegEngine(timeout=10)
+        timeouts = []
+        async def run(cmd, timeout=None, **kwargs):
+            timeouts.append(timeout)
+            raise JobTimeout("ffmpeg: délai dépassé")
+        monkeypatch.setattr(engine, 'run', run)
+        monkeypatch.setattr(automator, 'prepare_segment', lambda *args, **kwargs: {
+            'index': 1, 'chunk': 0, 'reused': False, 'duration': 1.0, 'cmd': ['ffmpeg']})
+
+        job = (1, {}, {}, (0, 1, 0, 60))
+        with pytest.raises(JobTimeout):
+            asyncio.run(automator.process_segment_async(engine, job))
+        assert timeouts == [10, 20]
+
+    def test_missing_ts_segment_creates_no_video(self, automator, tmp_path):
+        """Test qu'un segment MPEG-TS en échec arrête l'assemblage (timestamps discontinus)."""
+        from types import SimpleNamespace
+
+        automator.segment_format = 'ts'
+        automator.scheduler = SimpleNamespace(elapsed=lambda: 1.0, predicted=1.0)
+        segment = tmp_path / "segment_001.ts"
+        segment.write_bytes(b"\x47" * 188)
+        segments_data = [{'index': 1, 'chunk': 0, 'path': str(segment), 'time': 1.0}]
+        output = tmp_path / "match.ts"
+
+        with pytest.raises(RuntimeError):
+            automator.finish_video(segments_data, tmp_path, output, expected=2)
+        assert not output.exists()
+
+    def test_segment_offsets_ignore_missing_sources(self, automator):
+        """Test que les offsets des segments ne comptent que les clips dont la source est trouvée."""
+        automator.fps = 60
+        automator.clips = [{'duration_frames': 60, 'source_path': 'a.mp4'}, {'duration_frames': 120},
+                           {'duration_frames': 30, 'source_path': 'c.mp4'}]
+
+        assert automator.segment_offsets() == [0.0, 1.0, 1.0]
+
+    @pytest.fixture
+    def abandoned_broker(self, automator, monkeypatch):
+        """Coordinateur prêt pour un rendu distribué dont l'unique job a été abandonné par les workers."""
+        from collections import defaultdict
+        from types import SimpleNamespace
+
+        class Broker:
+            def publish(self, settings, jobs):
+                self.payloads = [payload for _, payload in jobs]
+            def finished(self):
+                return True
+            def results(self):
+                return []
+            def failures(self):
+                return [(payload, "FFmpeg error") for payload in self.payloads]
+
+        job = (1, {'name': 'a.mp4', 'in_frame': 0, 'duration_frames': 60}, {}, (0, 1, 0, 60))
+        automator.clips = [job[1]]
+        automator.scores = [job[2]]
+        monkeypatch.setattr(automator, 'prepare_sources', lambda: None)
+        monkeypatch.setattr(automator, 'prepare_overlays', lambda *args: None)
+        monkeypatch.setattr(automator, 'distributed_settings', lambda lease: {})
+        monkeypatch.setattr(automator, 'job_payload', lambda position, job, offsets: {'job': position, 'index': 1})
+
+        def plan_jobs(max_workers):
+            automator.scheduler = SimpleNamespace(timeout=lambda job: 60.0, costs=defaultdict(float))
+            return [job]
+        monkeypatch.setattr(automator, 'plan_jobs', plan_jobs)
+        return Broker()
+
+    def test_distributed_failed_job_creates_no_video(self, automator, abandoned_broker, tmp_path, monkeypatch):
+        """Test qu'un job abandonné qui échoue aussi localement ne produit pas de vidéo incomplète."""
+        monkeypatch.setattr(automator, 'process_single_segment', lambda *args, **kwargs: None)
+        monkeypatch.setattr(automator, 'finish_video', lambda *args: pytest.fail("aucun assemblage attendu"))
+        output = tmp_path / "match.mp4"
+
+        with pytest.raises(RuntimeError):
+            automator.process_video_distributed(output, abandoned_broker, poll_interval=0)
+        assert not output.exists()
+
+    def test_distributed_failed_job_rendered_locally(self, automator, abandoned_broker, tmp_path, monkeypatch):
+        """Test qu'un job abandonné par les workers est rendu localement avant l'assemblage."""
+        segment = {'index': 1, 'chunk': 0, 'path': 'segment_001.ts'}
+        monkeypatch.setattr(automator, 'process_single_segment', lambda *args, **kwargs: segment)
+        assembled = []
+        monkeypatch.setattr(automator, 'finish_video', lambda data, *args: assembled.extend(data))
+
+        automator.process_video_distributed(tmp_path / "match.mp4", abandoned_broker, poll_interval=0)
+
+        assert assembled == [segment]
+
+    def test_highlights_require_mp4_segments(self, tmp_path):
+        """Test que les montages refusent les segments MPEG-TS (timestamps de la vidéo complète)."""
+        automator = VideoOverlayAutomator(
+            xml_path=str(tmp_path / "test.xml"),
+            excel_path=str(tmp_path / "test.xlsx"),
+            video_folder=str(tmp_path),
+            segment_format="ts"
+        )
+        with pytest.raises(ValueError):
+            automator.build_highlights(tmp_path / "reel.mp4", [1])
+
+    def test_highlights_require_rendered_segments(self, automator, tmp_path, monkeypatch):
+        """Test qu'un montage échoue clairement sans cache ni segments déjà rendus."""
+        with pytest.raises(ValueError):
+            automator.build_highlights(tmp_path / "reel.mp4", [1])
+
+        automator.work_dir = tmp_path / "work"
+        (tmp_path / 'C1.mp4').write_bytes(b"source")
+        automator.clips = [{'name': 'C1', 'source_path': str(tmp_path / 'C1.mp4'),
+                            'in_frame': 0, 'duration_frames': 60}]
+        automator.scores = [{'jeux': '0/0', 'points': '0/0', 'set1': None, 'set2': None}]
+        monkeypatch.setattr(automator, 'prepare_sources', lambda: None)
+        monkeypatch.setattr(automator, 'prepare_overlays', lambda *args: None)
+        monkeypatch.setattr(automator, 'plan_clip_chunks', lambda clip: [(0, 60)])
+        monkeypatch.setattr(automator, 'process_single_segment',
+                            lambda *args, **kwargs: pytest.fail("aucun encodage attendu"))
+        with pytest.raises(RuntimeError):
+            automator.build_highlights(tmp_path / "reel.mp4", [1])
+
+    def test_animation_invalid(self, tmp_path):
+        """Test qu'un style d'animation inconnu est refusé."""
+        with pytest.raises(ValueError):
+            VideoOverlayAutomator(
+                xml_path=str(tmp_path / "test.xml"),
+                excel_path=str(tmp_path / "test.xlsx"),
+                video_folder=str(tmp_path),
+                animation="zoom"
+            )
+
+    def test_overlay_mode_invalid(self, tmp_path):
+        """Test qu'un mode d'overlay inconnu est refusé."""
+        with pytest.raises(ValueError):
+            VideoOverlayAutomator(
+                xml_path=str(tmp_path / "test.xml"),
+                excel_path=str(tmp_path / "test.xlsx"),
+                video_folder=str(tmp_path),
+                overlay_mode="gif"
+            )
+
+    def test_overlay_kwargs_hides_current_set(self, automator):
+        """Test que le set en cours (égal aux jeux) n'est pas affiché comme set terminé."""
+        kwargs = automator.overlay_kwargs({'jeux': '3/2', 'points': '15/0', 'set1': '3/2', 'set2': None})
+
+        assert kwargs['set1'] is None
+        assert kwargs['jeux'] == '3/2'
+
+    def test_plan_clip_chunks_short_clip(self, automator):
+        """Test qu'un clip court n'est pas découpé (pas de sondage ffprobe)."""
+        clip = {'in_frame': 0, 'duration_frames': 600, 'source_path': 'a.mp4'}
+
+        assert automator.plan_clip_chunks(clip) == [(0, 600)]
+
+    def test_plan_clip_chunks_long_clip(self, automator, monkeypatch):
+        """Test qu'un clip long est découpé aux images clés de la source."""
+        monkeypatch.setattr(automator, "get_keyframes", lambda *args: [0, 2900, 6000])
+        automator.max_chunk_seconds = 60
+        clip = {'in_frame': 100, 'duration_frames': 9000, 'source_path': 'a.mp4'}
+        chunks = automator.plan_clip_chunks(clip)
+
+        assert [offset for offset, _ in chunks] == [0, 2900, 6000]
+        assert sum(frames for _, frames in chunks) == 9000
+
+    def test_parse_xml_empty_track(self, automator):
+        """Test du parsing XML d'une séquence vide."""
+        clips = automator.parse_xml()
+
+        assert clips == []
+        assert automator.timeline is not None
+
+    def test_parse_xml_multitrack(self, automator):
+        """Test du parsing d'un XML multi-pistes: logo ignoré, un clip par point, fps de la séquence."""
+        automator.xml_path.write_text(
+            '<?xml version="1.0"?><xmeml version="5"><sequence id="s1">'
+            '<rate><timebase>50</timebase><ntsc>FALSE</ntsc></rate><media><video>'
+            '<track><clipitem id="c1"><name>A.MP4</name><start>0</start><end>100</end><in>0</in><out>100</out>'
+            '<file id="f1"><name>A.MP4</name><pathurl>A.MP4</pathurl></file></clipitem>'
+            '<clipitem id="c2"><name>A.MP4</name><start>100</start><end>200</end><in>500</in><out>600</out>'
+            '<file id="f1"/></clipitem></track>'
+            '<track><clipitem id="c3"><name>B.MP4</name><start>20</start><end>60</end><in>0</in><out>40</out>'
+            '<file id="f2"><name>B.MP4</name><pathurl>B.MP4</pathurl></file></clipitem>'
+            '<clipitem id="c4"><name>logo.png</name><start>0</start><end>200</end><in>0</in><out>200</out>'
+            '<file id="f3"><name>logo.png</name><pathurl>logo.png</pathurl></file></clipitem></track>'
+            '</video></media></sequence></xmeml>')
+
+        clips = automator.parse_xml()
+
+        assert [(c['name'], c['start_frame'], c['duration_frames']) for c in clips] == [
+            ('A.MP4', 0, 100), ('A.MP4', 100, 100)
+        ]
+        assert automator.fps == 50.0
+
+    def test_find_video_file_missing(self, automator):
+        """Test qu'un fichier source absent lève FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            automator.find_video_file("ABSENT.MP4")
+
+    def test_resolve_sources(self, automator, tmp_path):
+        """Test de la résolution des sources avant encodage."""
+        (tmp_path / "C0001.MP4").write_bytes(b"")
+        automator.clips = [{'name': 'c0001.mp4'}, {'name': 'ABSENT.MP4'}]
+
+        unresolved = automator.resolve_sources()
+
+        assert unresolved == ['ABSENT.MP4']
+        assert automator.find_video_file(automator.clips[0]) == str(tmp_path / "C0001.MP4")
+
+    def test_process_single_segment_after_cancel(self, automator, tmp_path):
+        """Test qu'aucun segment ne démarre après l'annulation."""
+        from utils.process_control import ProcessingCancelled
+
+        automator.cancel()
+        clip = {'name': 'a.mp4', 'in_frame': 0, 'duration_frames': 600, 'source_path': 'a.mp4'}
+        score = {'set_num': 1, 'set1': None, 'set2': None, 'jeux': '0/0', 'points': '0/0'}
+        with pytest.raises(ProcessingCancelled):
+            automator.process_single_segment(1, clip, score, tmp_path, None, 1)
+
+    def test_process_single_segment_reuses_finished_segment(self, automator, tmp_path):
+        """Test qu'un segment terminé (marqueur .done avec sa clé de rendu) est réutilisé sans relancer FFmpeg."""
+        source = tmp_path / "a.mp4"
+        source.write_bytes(b"source")
+        clip = {'name': 'a.mp4', 'in_frame': 0, 'duration_frames': 600, 'source_path': str(source)}
+        score = {'set_num': 1, 'set1': None, 'set2': None, 'jeux': '0/0', 'points': '0/0'}
+        key = automator.segment_cache_key(str(source), 0, 600, automator.overlay_kwargs(score),
+                                          None, None, None)
+        (tmp_path / "segment_001.mp4").write_bytes(b"data")
+        (tmp_path / "segment_001.mp4.done").write_text(key)
+
+        result = automator.process_single_segment(1, clip, score, tmp_path, None, 1)
+
+        assert result['reused']
+        assert result['path'] == str(tmp_path / "segment_001.mp4")
+
+    def test_stale_finished_segment_rerendered(self, automator, tmp_path):
+        """Test qu'un segment terminé avec un autre rendu (score corrigé, ancien marqueur) est réencodé."""
+        source = tmp_path / "a.mp4"
+        source.write_bytes(b"source")
+        clip = {'name': 'a.mp4', 'in_frame': 0, 'duration_frames': 600, 'source_path': str(source)}
+        score = {'set_num': 1, 'set1': None, 'set2': None, 'jeux': '0/0', 'points': '0/0'}
+        key = automator.segment_cache_key(str(source), 0, 600, automator.overlay_kwargs(score),
+                                          None, None, None)
+        (tmp_path / "segment_001.mp4").write_bytes(b"data")
+        marker = tmp_path / "segment_001.mp4.done"
+        from utils.overlay_generator import PadelOverlayGenerator
+        automator.overlay_generator = PadelOverlayGenerator(640, 360, backend="pillow")
+
+        for content in (key, ""):
+            marker.write_text(content)
+            corrected = score if content == "" else dict(score, points='15/0')
+            segment = automator.prepare_segment(1, clip, corrected, tmp_path, None, 1)
+            assert not segment['reused']
+            assert 'cmd' in segment
+
+    def test_process_single_segment_from_cache(self, automator, tmp_path):
+        """Test qu'un segment déjà encodé dans un autre projet est lié depuis le cache."""
+        from utils.segment_cache import SegmentCache
+
+        source = tmp_path / "a.mp4"
+        source.write_bytes(b"source")
+        clip = {'name': 'a.mp4', 'in_frame': 0, 'duration_frames': 600, 'source_path': str(source)}
+        score = {'set_num': 1, 'set1': None, 'set2': None, 'jeux': '0/0', 'points': '0/0'}
+        automator.segment_cache = SegmentCache(tmp_path / "cache")
+        key = automator.segment_cache_key(str(source), 0, 600, automator.overlay_kwargs(score),
+                                          None, None, None)
+        encoded = tmp_path / "other_project.mp4"
+        encoded.write_bytes(b"segment")
+        automator.segment_cache.store(key, encoded)
+
+        work = tmp_path / "work"
+        work.mkdir()
+        result = automator.process_single_segment(1, clip, score, work, None, 1)
+
+        assert result['reused']
+        assert (work / "segment_001.mp4").read_bytes() == b"segment"
+        assert automator.segment_cache.hits == 1
+
+    def test_job_payload_has_no_local_path(self, automator):
+        """Test que le job publié pour un worker ne contient pas de chemin local."""
+        automator.clips = [{'name': 'a.mp4', 'in_frame': 0, 'duration_frames': 600, 'source_path': '/local/a.mp4'}]
+        automator.scores = [{'set_num': 1, 'set1': None, 'set2': None, 'jeux': '0/0', 'points': '0/0'}]
+        job = (1, automator.clips[0], automator.scores[0], (0, 1, 0, 600))
+
+        payload = automator.job_payload(0, job, [0.0])
+
+        assert 'source_path' not in payload['clip']
+        assert payload['chunk'] == [0, 1, 0, 600]
+        assert payload['previous_score'] is None
@@ -5,8 +5,9 @@ Tests des fonctions pures et de la génération d'overlays.
 """
 
 import pytest
+from PIL import Image, ImageChops, ImageDraw
 
-from utils.overlay_generator import PadelOverlayGenerator
+from utils.overlay_generator import GlyphAtlas, PadelOverlayGenerator
 
 
 class TestPadelOverlayGenerator:
@@ -194,3 +195,111 @@ class TestPadelOverlayGenerator:
         gen_720p = PadelOverlayGenerator(width=1280, height=720)
         overlay_720p = gen_720p.create_overlay()
         assert overlay_720p.size == (1280, 720)
+
+
+class TestRenderBackends:
+    """Tests des backends de rendu des ombres."""
+
+    def test_invalid_backend(self):
+        """Test qu'un backend inconnu est refusé."""
+        with pytest.raises(ValueError):
+            PadelOverlayGenerator(1920, 1080, backend="opengl")
+
+    def test_pillow_backend(self):
+        """Test que le backend Pillow est utilisable explicitement."""
+        gen = PadelOverlayGenerator(1920, 1080, backend="pillow")
+
+        assert gen.backend == "pillow"
+        assert gen.create_overlay().size == (1920, 1080)
+
+    @pytest.mark.parametrize("width,height", [(1920, 1080), (1280, 720)])
+    def test_numpy_backend_matches_pillow(self, width, height):
+        """Test que le backend numpy est comparable au pixel près (tolérance) au backend Pillow."""
+        np = pytest.importorskip("numpy")
+        kwargs = dict(jeux="2/3", points="40/A", set1="6/4", set2="5/7")
+
+        reference = np.asarray(PadelOverlayGenerator(width, height, backend="pillow").create_overlay(**kwargs))
+        fast = np.asarray(PadelOverlayGenerator(width, height, backend="numpy").create_overlay(**kwargs))
+
+        diff = np.abs(reference.astype(int) - fast.astype(int))
+        assert diff.max() <= 6
+        assert diff.mean() < 0.05
+
+    def test_numpy_shadow_outside_boxes(self):
+        """Test que l'ombre numpy est bien décalée et floutée autour des cases."""
+        pytest.importorskip("numpy")
+        gen = PadelOverlayGenerator(1920, 1080, backend="numpy")
+        overlay = gen.create_overlay()
+
+        y_end = gen.height - gen.y_offset_from_bottom
+        # Sous la case des noms: ombre semi-transparente, pas de fond opaque
+        alpha = overlay.getpixel((gen.x_offset + gen.names_width // 2, y_end + gen.shadow_offset))[3]
+        assert 0 < alpha < 255
+
+
+class TestGlyphAtlas:
+    """Tests de l'atlas de glyphes."""
+
+    @pytest.fixture
+    def font(self):
+        """Police de l'overlay 1080p."""
+        return PadelOverlayGenerator(1920, 1080).get_fonts()[1]
+
+    def test_preloaded_score_alphabet(self, font):
+        """Test que les textes du score sont pré-rendus."""
+        atlas = GlyphAtlas(font)
+
+        for text in ("0", "15", "30", "40", "A", "AD", "99"):
+            assert text in atlas.entries
+
+    def test_width_matches_textbbox(self, font):
+        """Test que les largeurs pré-mesurées correspondent à textbbox."""
+        atlas = GlyphAtlas(font)
+        draw = ImageDraw.Draw(Image.new("RGBA", (10, 10)))
+
+        for text in ("7", "40", "AD", "MARTIN / DUPONT"):
+            bbox = draw.textbbox((0, 0), text, font=font)
+            assert atlas.width(text) == bbox[2] - bbox[0]
+
+    def test_draw_matches_draw_text(self, font):
+        """Test que le blit de l'atlas donne exactement le rendu de draw.text."""
+        atlas = GlyphAtlas(font)
+        reference = Image.new("RGBA", (300, 120), (20, 40, 60, 255))
+        blitted = reference.copy()
+
+        ImageDraw.Draw(reference).text((30, 20), "40", fill=(255, 255, 255, 255), font=font)
+        atlas.draw(blitted, (30, 20), "40", (255, 255, 255, 255))
+
+        assert ImageChops.difference(reference, blitted).getbbox() is None
+
+    def test_lazy_cache_and_empty_text(self, font):
+        """Test que les textes hors alphabet sont mis en cache et que le texte vide est ignoré."""
+        atlas = GlyphAtlas(font, preload=())
+        img = Image.new("RGBA", (50, 50))
+
+        atlas.draw(img, (0, 0), "", (255, 255, 255, 255))
+        atlas.get("EQUIPE")
+        assert atlas.get("EQUIPE") is atlas.entries["EQUIPE"]
+        assert img.getbbox() is None
+
+    def test_generator_reuses_fonts_and_atlases(self):
+        """Test que polices et atlas sont créés une seule fois par générateur."""
+        gen = PadelOverlayGenerator(1920, 1080)
+        gen.create_overlay()
+        fonts = gen.get_fonts()
+        atlases = dict(gen._atlases)
+
+        gen.create_overlay(jeux="3/2", points="AD/40")
+        assert gen.get_fonts() is fonts
+        assert gen._atlases == atlases
+
+    def test_team_font_not_preloaded(self):
+        """Test que seules les polices de score pré-rendent l'alphabet du score."""
+        gen = PadelOverlayGenerator(1920, 1080)
+        font_team, _, font_points = gen.get_fonts()
+        if font_team is font_points:
+            pytest.skip("Police par défaut partagée (aucune police TrueType trouvée)")
+        gen.create_overlay(team1_names="A / B", team2_names="C / D")
+
+        assert set(gen.glyph_atlas(font_team).entries) == {"A / B", "C / D"}
+        assert "99" in gen.glyph_atlas(font_points).entries
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour overlay_track.py
+Tests de la déduplication des états, du recadrage et de la correspondance temps -> image.
+"""
+
+import json
+
+import pytest
+from PIL import Image
+
+from utils.overlay_generator import PadelOverlayGenerator
+from utils.overlay_track import OverlayTrack
+
+
+def _state(**changes):
+    """État de score (arguments de create_overlay)."""
+    state = dict(team1_names="A / B", team2_names="C / D",
+                 jeux="1/0", points="0/0", set1=None, set2=None)
+    state.update(changes)
+    return state
+
+
+@pytest.fixture
+def track():
+    """Piste 720p avec des états répétés et un set terminé."""
+    generator = PadelOverlayGenerator(1280, 720, backend="pillow")
+    states = [_state(), _state(points="15/0"), _state(), _state(jeux="0/0", set1="6/4"), _state(points="15/0")]
+    return OverlayTrack(generator, states)
+
+
+class TestOverlayTrack:
+    """Tests pour OverlayTrack."""
+
+    def test_unique_states(self, track):
+        """Test qu'un état répété ne produit qu'une image."""
+        assert len(track.states) == 3
+        assert track.frames == [0, 1, 0, 2, 1]
+
+    def test_render_crops_all_states(self, track):
+        """Test que la zone recadrée contient entièrement chaque scoreboard."""
+        box = track.render()
+
+        assert len(track.images) == 3
+        assert all(img.size == (box[2] - box[0], box[3] - box[1]) for img in track.images)
+        for state, img in zip(track.states, track.images):
+            full = Image.new("RGBA", (1280, 720), (0, 0, 0, 0))
+            full.paste(img, track.position)
+            assert full.tobytes() == track.generator.create_overlay(**state).tobytes()
+
+    def test_cache_renders_only_new_states(self, track, monkeypatch):
+        """Test qu'une piste partageant le cache ne rend que les nouveaux états (mode direct)."""
+        track.render()
+        calls = []
+        create = track.generator.create_overlay
+        monkeypatch.setattr(track.generator, 'create_overlay',
+                            lambda **state: calls.append(state) or create(**state))
+
+        grown = OverlayTrack(track.generator, track.states + [_state(points="30/0")], cache=track.cache)
+        grown.render()
+
+        assert calls == [_state(points="30/0")]
+        assert len(grown.images) == 4
+
+    def test_timecode_map(self, track):
+        """Test de la correspondance temps de la vidéo finale -> image."""
+        entries = track.timecode_map([0.0, 2.0, 5.0, 6.0, 9.5], [2.0, 3.0, 1.0, 3.5, 1.0])
+
+        assert entries[1] == {'clip': 2, 'start': 2.0, 'end': 5.0, 'frame': 1}
+        assert [e['frame'] for e in entries] == track.frames
+
+    def test_save_timecode_map(self, track, tmp_path):
+        """Test de l'export JSON de la correspondance."""
+        track.render()
+        path = track.save_timecode_map(tmp_path / "track.json", [0.0] * 5, [1.0] * 5)
+        data = json.loads(path.read_text(encoding="utf-8"))
+
+        assert data['position'] == list(track.position)
+        assert len(data['entries']) == 5
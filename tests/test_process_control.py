@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour process_control.py
+Tests de l'exécution, de l'annulation et de la pause des processus FFmpeg.
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from utils import process_control
+from utils.process_control import ProcessControl, ProcessingCancelled
+
+# Processus enfant qui dure (remplace FFmpeg)
+SLEEP_CMD = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+def wait_for(condition, timeout=5.0):
+    """Attend qu'une condition soit vraie (ou échoue après timeout)."""
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition non atteinte"
+        time.sleep(0.01)
+
+
+class TestProcessControl:
+    """Tests pour ProcessControl."""
+
+    def test_run_returns_completed_process(self):
+        """Test que run() se comporte comme subprocess.run(capture_output=True, text=True)."""
+        control = ProcessControl()
+        result = control.run([sys.executable, "-c", "import sys; print('ok'); sys.exit(3)"])
+        assert result.returncode == 3
+        assert result.stdout.strip() == "ok"
+        assert control.active_count() == 0
+
+    def test_run_after_cancel_raises(self):
+        """Test qu'aucun processus ne démarre après l'annulation."""
+        control = ProcessControl()
+        control.cancel()
+        with pytest.raises(ProcessingCancelled):
+            control.run(SLEEP_CMD)
+
+    def test_cancel_kills_running_process(self):
+        """Test que l'annulation tue immédiatement le processus en cours."""
+        control = ProcessControl()
+        errors = []
+
+        def worker():
+            try:
+                control.run(SLEEP_CMD)
+            except ProcessingCancelled as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=worker)
+        start = time.time()
+        thread.start()
+        wait_for(lambda: control.active_count() == 1)
+        control.cancel()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert len(errors) == 1
+        assert time.time() - start < 5
+        assert control.active_count() == 0
+
+    def test_wait_interrupted_by_cancel(self):
+        """Test qu'une attente se termine dès l'annulation."""
+        control = ProcessControl()
+        threading.Timer(0.05, control.cancel).start()
+        start = time.time()
+        with pytest.raises(ProcessingCancelled):
+            control.wait(30)
+        assert time.time() - start < 5
+
+    def test_pause_blocks_new_jobs_until_resume(self):
+        """Test que check() attend la reprise pendant une pause."""
+        control = ProcessControl()
+        control.pause()
+        assert control.paused
+        passed = threading.Event()
+
+        thread = threading.Thread(target=lambda: (control.check(), passed.set()))
+        thread.start()
+        assert not passed.wait(0.1)
+
+        control.resume()
+        thread.join(timeout=5)
+        assert passed.is_set()
+        assert not control.paused
+
+    def test_cancel_while_paused_releases_workers(self):
+        """Test qu'une annulation pendant la pause libère les workers en attente."""
+        control = ProcessControl()
+        control.pause()
+        errors = []
+
+        def worker():
+            try:
+                control.check()
+            except ProcessingCancelled as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        control.cancel()
+        thread.join(timeout=5)
+        assert len(errors) == 1
+
+    @pytest.mark.skipif(not ProcessControl.can_suspend(), reason="suspension indisponible")
+    def test_pause_suspends_and_cancel_kills_stopped_process(self):
+        """Test qu'un processus suspendu par la pause est bien tué par l'annulation."""
+        control = ProcessControl()
+        errors = []
+
+        def worker():
+            try:
+                control.run(SLEEP_CMD)
+            except ProcessingCancelled as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        wait_for(lambda: control.active_count() == 1)
+        control.pause()
+        control.cancel()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert len(errors) == 1
+
+    def test_windows_suspend_uses_native_api(self, monkeypatch):
+        """Test que sans SIGSTOP (Windows) la pause passe par NtSuspendProcess / NtResumeProcess."""
+        calls = []
+        monkeypatch.delattr(process_control.signal, 'SIGSTOP', raising=False)
+        monkeypatch.delattr(process_control.signal, 'SIGCONT', raising=False)
+        monkeypatch.setattr(process_control, '_windows_suspend',
+                            lambda pid, resume=False: calls.append((pid, resume)))
+
+        process_control.suspend_process(42)
+        process_control.resume_process(42)
+
+        assert calls == [(42, False), (42, True)]
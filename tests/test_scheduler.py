@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour scheduler.py
+Tests du modèle de coût, de l'ordre plus long d'abord et du temps restant.
+"""
+
+import pytest
+
+from utils.encoders import get_encoder
+from utils.scheduler import (
+    CostModel, JobScheduler, ThroughputHistory, lpt_order, predict_makespan
+)
+
+
+@pytest.fixture
+def history(tmp_path):
+    """Historique vide dans un dossier temporaire."""
+    return ThroughputHistory(tmp_path / "throughput.json")
+
+
+@pytest.fixture
+def model(history):
+    """Modèle de coût x264 en 1080p."""
+    return CostModel(get_encoder('libx264'), 'software', 1920, 1080, history)
+
+
+class TestCostModel:
+    """Tests pour CostModel et ThroughputHistory."""
+
+    def test_cost_from_encoder_profile(self, model):
+        """Test du coût d'après le profil de l'encodeur (sans historique)."""
+        assert model.fps == pytest.approx(250)
+        assert model.cost(500) == pytest.approx(CostModel.JOB_OVERHEAD + 2.0)
+
+    def test_cost_grows_with_resolution(self, history):
+        """Test qu'un job 4K coûte plus cher qu'en 1080p."""
+        encoder = get_encoder('libx264')
+        hd = CostModel(encoder, 'software', 1920, 1080, history)
+        uhd = CostModel(encoder, 'software', 3840, 2160, history)
+
+        assert uhd.cost(600) > hd.cost(600)
+
+    def test_measured_fps_overrides_profile(self, model):
+        """Test que le débit mesuré remplace le profil."""
+        model.record(1000, CostModel.JOB_OVERHEAD + 10.0)
+
+        assert model.fps == pytest.approx(100)
+
+    def test_measured_fps_seeds_other_resolutions(self, history):
+        """Test qu'un débit mesuré en 1080p remplace le profil par défaut en 4K (mis à l'échelle)."""
+        encoder = get_encoder('libx264')
+        history.record(ThroughputHistory.key('libx264', 'software', 1080), 100)
+        history.record(ThroughputHistory.key('libx264', 'cuda', 2160), 5)
+
+        uhd = CostModel(encoder, 'software', 3840, 2160, history)
+
+        assert uhd.fps == pytest.approx(25)
+
+    def test_history_smoothing_and_persistence(self, history, tmp_path):
+        """Test de la moyenne glissante et de la sauvegarde."""
+        history.record('k', 100)
+        history.record('k', 200)
+        history.save()
+
+        reloaded = ThroughputHistory(tmp_path / "throughput.json")
+        assert reloaded.get('k') == pytest.approx(130)
+
+    def test_history_in_memory_without_path(self, tmp_path, monkeypatch):
+        """Test qu'un historique sans fichier n'écrit rien (ni dans le dossier personnel)."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        history = ThroughputHistory()
+        history.record('k', 100)
+        history.save()
+
+        assert history.get('k') == 100
+        assert list(tmp_path.iterdir()) == []
+
+    def test_corrupt_history_ignored(self, tmp_path):
+        """Test qu'un historique illisible est ignoré."""
+        path = tmp_path / "throughput.json"
+        path.write_text("not json", encoding="utf-8")
+
+        assert ThroughputHistory(path).rates == {}
+
+
+class TestScheduling:
+    """Tests pour l'ordre LPT et la prévision."""
+
+    def test_lpt_order(self):
+        """Test de l'ordre plus long d'abord."""
+        assert lpt_order(['a', 'b', 'c'], [2.0, 9.0, 5.0]) == [1, 2, 0]
+
+    def test_predict_makespan(self):
+        """Test de la simulation des workers."""
+        assert predict_makespan([9, 5, 4, 3], workers=2) == 12
+        assert predict_makespan([], workers=4) == 0.0
+        assert predict_makespan([3, 3], workers=8) == 3
+
+    def test_lpt_beats_timeline_order(self):
+        """Test qu'un long job soumis en premier raccourcit le temps total."""
+        costs = [2, 2, 2, 2, 2, 2, 10]
+
+        assert predict_makespan(sorted(costs, reverse=True), 2) < predict_makespan(costs, 2)
+
+    def test_plan_orders_jobs(self, model):
+        """Test que plan() trie les jobs par coût décroissant et prévoit le total."""
+        scheduler = JobScheduler(model, workers=2)
+        jobs = [('a', 100), ('b', 5000), ('c', 1000)]
+        ordered = scheduler.plan(jobs, frames_of=lambda job: job[1])
+
+        assert [job[0] for job in ordered] == ['b', 'c', 'a']
+        assert scheduler.predicted == pytest.approx(model.cost(5000))
+
+    def test_eta_uses_cost_model(self, model):
+        """Test que le temps restant suit le coût des jobs restants et l'écart constaté."""
+        scheduler = JobScheduler(model, workers=2)
+        jobs = [('a', 1000), ('b', 1000), ('c', 1000)]
+        scheduler.plan(jobs, frames_of=lambda job: job[1])
+        initial = scheduler.eta()
+
+        # Premier job deux fois plus lent que prévu
+        scheduler.job_done(jobs[0], 1000, 2 * model.cost(1000))
+        assert scheduler.speed_ratio == pytest.approx(2.0)
+        assert scheduler.eta() > initial
+
+        scheduler.job_done(jobs[1], 1000, 1.0)
+        scheduler.job_done(jobs[2], 1000, 1.0)
+        assert scheduler.eta() == 0.0
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour score_animation.py
+Tests des zones animées, des images de transition et du cache.
+"""
+
+import pytest
+
+from utils.overlay_generator import PadelOverlayGenerator
+from utils.score_animation import ScoreAnimator
+
+
+def _state(**changes):
+    """État de score (arguments de create_overlay)."""
+    state = dict(team1_names="A / B", team2_names="C / D",
+                 jeux="3/2", points="15/0", set1=None, set2=None)
+    state.update(changes)
+    return state
+
+
+@pytest.fixture
+def generator():
+    """Générateur 720p (rendu rapide)."""
+    return PadelOverlayGenerator(1280, 720, backend="pillow")
+
+
+class TestScoreAnimator:
+    """Tests pour ScoreAnimator."""
+
+    def test_invalid_style(self, generator, tmp_path):
+        """Test qu'un style inconnu est refusé."""
+        with pytest.raises(ValueError):
+            ScoreAnimator(generator, tmp_path, style="zoom")
+
+    def test_changed_slots_points_only(self, generator, tmp_path):
+        """Test que seule la ligne des points modifiée est animée."""
+        animator = ScoreAnimator(generator, tmp_path)
+        slots = animator.changed_slots(_state(), _state(points="30/0"))
+        (x1, _), (x2, _) = generator.layout()['points']
+
+        assert len(slots) == 1
+        assert x1 < slots[0][0] < slots[0][2] < x2
+
+    def test_layout_change_cuts(self, generator, tmp_path):
+        """Test qu'un set terminé (nouvelle case) donne une coupe franche."""
+        animator = ScoreAnimator(generator, tmp_path)
+
+        assert animator.changed_slots(_state(), _state(jeux="0/0", set1="6/4")) is None
+
+    @pytest.mark.parametrize("style", ["fade", "slide"])
+    def test_frames_start_and_end_on_states(self, generator, tmp_path, style):
+        """Test que la transition part de l'ancien état et arrive au nouveau."""
+        animator = ScoreAnimator(generator, tmp_path, style=style, duration=0.1, fps=50)
+        before, after = _state(), _state(points="30/0", jeux="4/2")
+        slots = animator.changed_slots(before, after)
+        frames = animator.render_frames(before, after, slots)
+        x0, y0, x1, y1 = animator.region(slots)
+
+        assert len(frames) == animator.frame_count == 5
+        assert frames[0].size == (x1 - x0, y1 - y0)
+        for state, frame in ((before, frames[0]), (after, frames[-1])):
+            full = generator.create_overlay(**state)
+            for slot in slots:
+                local = (slot[0] - x0, slot[1] - y0, slot[2] - x0, slot[3] - y0)
+                assert frame.crop(local).tobytes() == full.crop(slot).tobytes()
+
+    def test_transition_is_cached(self, generator, tmp_path, monkeypatch):
+        """Test qu'une transition identique n'est rendue qu'une fois."""
+        animator = ScoreAnimator(generator, tmp_path)
+        encoded = []
+
+        def fake_encode(frames, clip_path):
+            encoded.append(clip_path)
+            clip_path.write_bytes(b"mov")
+
+        monkeypatch.setattr(animator, "encode", fake_encode)
+        first = animator.transition(_state(), _state(points="30/0"))
+        second = animator.transition(_state(), _state(points="30/0"))
+
+        assert first == second
+        assert len(encoded) == 1
+
+    def test_no_transition_without_change(self, generator, tmp_path):
+        """Test qu'aucun clip n'est produit sans changement ou sans état précédent."""
+        animator = ScoreAnimator(generator, tmp_path)
+
+        assert animator.transition(None, _state()) is None
+        assert animator.transition(_state(), _state()) is None
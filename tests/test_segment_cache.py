@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour segment_cache.py
+Tests des empreintes, des clés, de la réutilisation des segments et de l'éviction LRU.
+"""
+
+import os
+
+import pytest
+
+from utils.segment_cache import SegmentCache, source_fingerprint
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Cache de 1000 octets."""
+    return SegmentCache(tmp_path / "cache", max_bytes=1000)
+
+
+def _segment(path, size=400):
+    path.write_bytes(b"s" * size)
+    return path
+
+
+class TestFingerprint:
+    """Tests pour source_fingerprint."""
+
+    def test_independent_of_name(self, tmp_path):
+        """Test qu'une source copiée sous un autre nom garde son empreinte."""
+        a = tmp_path / "C0001.MP4"
+        b = tmp_path / "projet2" / "copie.mp4"
+        b.parent.mkdir()
+        a.write_bytes(b"video" * 1000)
+        b.write_bytes(b"video" * 1000)
+
+        assert source_fingerprint(a) == source_fingerprint(b)
+
+    def test_detects_content_change(self, tmp_path):
+        """Test que le début, la fin ou la taille du fichier changent l'empreinte."""
+        path = tmp_path / "a.mp4"
+        path.write_bytes(b"a" * 5000)
+        reference = source_fingerprint(path, sample=1000)
+
+        path.write_bytes(b"a" * 4999 + b"b")
+        assert source_fingerprint(path, sample=1000) != reference
+        path.write_bytes(b"a" * 5001)
+        assert source_fingerprint(path, sample=1000) != reference
+
+    def test_small_file_hashed_entirely(self, tmp_path):
+        """Test qu'une modification au milieu d'une petite source change l'empreinte."""
+        path = tmp_path / "a.mp4"
+        path.write_bytes(b"a" * 5000)
+        reference = source_fingerprint(path, sample=1000)
+
+        path.write_bytes(b"a" * 2500 + b"b" + b"a" * 2499)
+        assert source_fingerprint(path, sample=1000) != reference
+
+    def test_large_file_includes_mtime(self, tmp_path):
+        """Test qu'une grande source modifiée au milieu change d'empreinte (date de modification)."""
+        path = tmp_path / "a.mp4"
+        path.write_bytes(b"a" * 5000)
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        reference = source_fingerprint(path, sample=1000, full_hash_max=2000)
+
+        path.write_bytes(b"a" * 2500 + b"b" + b"a" * 2499)
+        os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+        assert source_fingerprint(path, sample=1000, full_hash_max=2000) != reference
+
+
+class TestSegmentCache:
+    """Tests pour SegmentCache."""
+
+    def test_key_is_order_independent(self):
+        """Test que la clé ne dépend que du contenu des éléments."""
+        assert SegmentCache.key({'a': 1, 'b': [1, 2]}) == SegmentCache.key({'b': [1, 2], 'a': 1})
+        assert SegmentCache.key({'a': 1}) != SegmentCache.key({'a': 2})
+
+    def test_fetch_miss(self, cache, tmp_path):
+        """Test qu'un segment absent n'est pas créé."""
+        dest = tmp_path / "segment_001.mp4"
+
+        assert not cache.fetch("ab" * 32, dest)
+        assert not dest.exists()
+        assert cache.misses == 1
+
+    def test_store_then_fetch(self, cache, tmp_path):
+        """Test de la réutilisation d'un segment stocké (même contenu, autre dossier)."""
+        key = SegmentCache.key({'clip': 1})
+        cache.store(key, _segment(tmp_path / "segment_001.mp4"))
+
+        dest = tmp_path / "autre_projet" / "segment_007.mp4"
+        dest.parent.mkdir()
+        assert cache.fetch(key, dest)
+        assert dest.read_bytes() == b"s" * 400
+        assert cache.hits == 1
+        assert not list(cache.root.glob("*/*.part"))
+
+    def test_fetch_replaces_existing_file(self, cache, tmp_path):
+        """Test qu'un ancien segment à la même place est remplacé."""
+        key = SegmentCache.key({'clip': 1})
+        cache.store(key, _segment(tmp_path / "a.mp4"))
+        dest = tmp_path / "b.mp4"
+        dest.write_bytes(b"ancien")
+
+        assert cache.fetch(key, dest)
+        assert dest.read_bytes() == b"s" * 400
+
+    def test_evicts_least_recently_used(self, cache, tmp_path):
+        """Test que l'éviction supprime d'abord le segment utilisé le moins récemment."""
+        keys = [SegmentCache.key({'clip': i}) for i in range(3)]
+        for i, key in enumerate(keys[:2]):
+            entry = cache.store(key, _segment(tmp_path / f"{i}.mp4"))
+            os.utime(entry, (1000 + i, 1000 + i))
+        # Le premier segment est réutilisé: c'est le second qui sera évincé
+        assert cache.fetch(keys[0], tmp_path / "reuse.mp4")
+
+        cache.store(keys[2], _segment(tmp_path / "2.mp4"))
+
+        assert cache.size() <= 1000
+        assert cache.fetch(keys[0], tmp_path / "x.mp4")
+        assert not cache.fetch(keys[1], tmp_path / "y.mp4")
+        assert cache.fetch(keys[2], tmp_path / "z.mp4")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour source_index.py
+Tests de l'index des fichiers sources et du décodage des pathurl.
+"""
+
+from pathlib import Path
+
+from utils.source_index import SourceIndex, decode_pathurl
+
+
+class TestDecodePathurl:
+    """Tests du décodage des pathurl Premiere."""
+
+    def test_windows_drive(self):
+        """Test d'un chemin Windows avec lettre de lecteur."""
+        assert decode_pathurl('file://localhost/D:/Match/C0001.MP4') == 'D:/Match/C0001.MP4'
+
+    def test_url_encoded_posix(self):
+        """Test d'un chemin macOS encodé (espaces, accents)."""
+        url = 'file://localhost/Users/pa/Vid%C3%A9os/Match%201/C0001.MP4'
+        assert decode_pathurl(url) == '/Users/pa/Vidéos/Match 1/C0001.MP4'
+
+    def test_network_share(self):
+        """Test d'un partage réseau (hôte dans l'URL)."""
+        assert decode_pathurl('file://nas/share/C0001.MP4') == '//nas/share/C0001.MP4'
+
+    def test_encoded_unc(self):
+        """Test d'un chemin UNC encodé dans le chemin."""
+        url = 'file://localhost/%5c%5cnas%5cshare%5cC0001.MP4'
+        assert decode_pathurl(url) == '\\\\nas\\share\\C0001.MP4'
+
+    def test_empty(self):
+        """Test d'un pathurl vide."""
+        assert decode_pathurl('') == ''
+
+
+class TestSourceIndex:
+    """Tests de l'index des sources."""
+
+    def test_lookup_case_insensitive(self, tmp_path):
+        """Test que la recherche ignore la casse."""
+        (tmp_path / "C0001.MP4").write_bytes(b"")
+        index = SourceIndex([tmp_path])
+
+        assert index.lookup({'name': 'c0001.mp4'}) == str(tmp_path / "C0001.MP4")
+
+    def test_lookup_by_name_string(self, tmp_path):
+        """Test d'une recherche par simple nom de fichier."""
+        (tmp_path / "C0001.MP4").write_bytes(b"")
+        index = SourceIndex([tmp_path])
+
+        assert index.lookup("C0001.MP4") == str(tmp_path / "C0001.MP4")
+
+    def test_first_folder_has_priority(self, tmp_path):
+        """Test que le premier dossier indexé est prioritaire."""
+        first = tmp_path / "first"
+        second = tmp_path / "second"
+        first.mkdir()
+        second.mkdir()
+        (first / "C0001.MP4").write_bytes(b"")
+        (second / "C0001.MP4").write_bytes(b"")
+        index = SourceIndex([first, second])
+
+        assert index.lookup("C0001.MP4") == str(first / "C0001.MP4")
+
+    def test_lookup_uses_file_name_and_pathurl(self, tmp_path):
+        """Test qu'un clip renommé est retrouvé via son fichier ou son pathurl."""
+        source = tmp_path / "elsewhere" / "C0002.MP4"
+        source.parent.mkdir()
+        source.write_bytes(b"")
+        index = SourceIndex([tmp_path])
+
+        clip = {'name': 'Point 12', 'pathurl': Path(source).as_uri()}
+        assert Path(index.lookup(clip)) == source
+
+    def test_pathurl_name_found_in_folder(self, tmp_path):
+        """Test qu'un pathurl obsolète est retrouvé par son nom dans le dossier."""
+        (tmp_path / "C0003.MP4").write_bytes(b"")
+        index = SourceIndex([tmp_path])
+
+        clip = {'name': 'Point 3', 'pathurl': 'file://localhost/D:/Old/C0003.MP4'}
+        assert index.lookup(clip) == str(tmp_path / "C0003.MP4")
+
+    def test_resolve_all_reports_unresolved(self, tmp_path):
+        """Test que les sources manquantes sont listées une seule fois."""
+        (tmp_path / "A.MP4").write_bytes(b"")
+        index = SourceIndex([tmp_path])
+
+        paths, unresolved = index.resolve_all([
+            {'name': 'A.MP4'}, {'name': 'B.MP4'}, {'name': 'B.MP4'}
+        ])
+
+        assert paths == [str(tmp_path / "A.MP4"), None, None]
+        assert unresolved == ['B.MP4']
+
+    def test_missing_folder_ignored(self, tmp_path):
+        """Test qu'un dossier inexistant ne lève pas d'erreur."""
+        index = SourceIndex([tmp_path / "missing"])
+
+        assert index.lookup("A.MP4") is None
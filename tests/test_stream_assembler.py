@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour stream_assembler.py
+Tests de l'ajout dans l'ordre, de la suppression des segments et des segments manquants.
+"""
+
+import pytest
+
+from utils.stream_assembler import StreamingAssembler
+
+
+@pytest.fixture
+def segments(tmp_path):
+    """Quatre segments factices (clé (clip, morceau) -> chemin)."""
+    paths = {}
+    for key in [(1, 0), (2, 0), (2, 1), (3, 0)]:
+        path = tmp_path / f"segment_{key[0]:03d}_{key[1]:02d}.ts"
+        path.write_bytes(f"<{key[0]}.{key[1]}>".encode())
+        paths[key] = path
+    return paths
+
+
+class TestStreamingAssembler:
+    """Tests pour StreamingAssembler (sortie .ts écrite directement)."""
+
+    def test_out_of_order_segments_written_in_order(self, tmp_path, segments):
+        """Test que la sortie suit l'ordre de la timeline quel que soit l'ordre de fin."""
+        output = tmp_path / "out.ts"
+        assembler = StreamingAssembler(output, sorted(segments), tmp_path)
+
+        for key in [(2, 1), (3, 0), (1, 0), (2, 0)]:
+            assembler.add(key, segments[key])
+        result = assembler.close()
+
+        assert result.returncode == 0
+        assert output.read_bytes() == b"<1.0><2.0><2.1><3.0>"
+        assert assembler.complete
+        assert assembler.appended == 4
+
+    def test_segments_deleted_once_consumed(self, tmp_path, segments):
+        """Test que seuls les segments en avance restent sur le disque."""
+        assembler = StreamingAssembler(tmp_path / "out.ts", sorted(segments), tmp_path)
+
+        assembler.add((2, 0), segments[(2, 0)])
+        assert segments[(2, 0)].exists()
+
+        assembler.add((1, 0), segments[(1, 0)])
+        assert not segments[(1, 0)].exists()
+        assert not segments[(2, 0)].exists()
+        assert assembler.max_pending == 1
+        assembler.close()
+
+    def test_skipped_segment_does_not_block(self, tmp_path, segments):
+        """Test qu'un segment en échec n'empêche pas l'ajout des suivants."""
+        output = tmp_path / "out.ts"
+        assembler = StreamingAssembler(output, sorted(segments), tmp_path)
+
+        assembler.add((2, 0), segments[(2, 0)])
+        assembler.skip((1, 0))
+        assembler.close()
+
+        assert output.read_bytes() == b"<2.0>"
+        assert not assembler.complete
+
+    def test_abort_removes_partial_output(self, tmp_path, segments):
+        """Test que l'annulation supprime la sortie partielle."""
+        output = tmp_path / "out.ts"
+        assembler = StreamingAssembler(output, sorted(segments), tmp_path)
+        assembler.add((1, 0), segments[(1, 0)])
+
+        assembler.abort()
+
+        assert not output.exists()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour timeline.py
+Tests du modèle de timeline (pistes multiples, références de fichiers, séquences imbriquées).
+"""
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from utils.timeline import Timeline
+
+SIMPLE_XML = """<?xml version="1.0"?>
+<xmeml version="5">
+<sequence id="sequence-1">
+  <rate><timebase>60</timebase><ntsc>TRUE</ntsc></rate>
+  <media><video>
+    <track>
+      <clipitem id="clipitem-1">
+        <name>C0001.MP4</name><start>0</start><end>100</end><in>50</in><out>150</out>
+        <file id="file-1"><name>C0001.MP4</name><pathurl>file://localhost/D:/Match/C0001.MP4</pathurl></file>
+      </clipitem>
+      <clipitem id="clipitem-2">
+        <name>C0001.MP4</name><start>100</start><end>160</end><in>400</in><out>460</out>
+        <file id="file-1"/>
+      </clipitem>
+      <clipitem id="clipitem-3">
+        <name>C0002.MP4</name><enabled>FALSE</enabled><start>160</start><end>200</end><in>0</in><out>40</out>
+        <file id="file-2"><name>C0002.MP4</name><pathurl>file://localhost/D:/Match/C0002.MP4</pathurl></file>
+      </clipitem>
+    </track>
+  </video></media>
+</sequence>
+</xmeml>"""
+
+MULTITRACK_XML = """<?xml version="1.0"?>
+<xmeml version="5">
+<sequence id="sequence-1">
+  <media><video>
+    <track>
+      <clipitem id="clipitem-1">
+        <name>WIDE.MP4</name><start>0</start><end>300</end><in>0</in><out>300</out>
+        <file id="file-1"><name>WIDE.MP4</name><pathurl>WIDE.MP4</pathurl></file>
+      </clipitem>
+    </track>
+    <track>
+      <clipitem id="clipitem-2">
+        <name>CLOSE.MP4</name><start>100</start><end>200</end><in>1000</in><out>1100</out>
+        <file id="file-2"><name>CLOSE.MP4</name><pathurl>CLOSE.MP4</pathurl></file>
+      </clipitem>
+    </track>
+  </video></media>
+</sequence>
+</xmeml>"""
+
+# V2: un plan rapproché qui déborde du début du 2e point, et un logo sur tout le match
+OVERLAP_XML = """<?xml version="1.0"?>
+<xmeml version="5">
+<sequence id="sequence-1">
+  <rate><timebase>50</timebase><ntsc>FALSE</ntsc></rate>
+  <media><video>
+    <track>
+      <clipitem id="clipitem-1">
+        <name>WIDE.MP4</name><start>0</start><end>100</end><in>0</in><out>100</out>
+        <file id="file-1"><name>WIDE.MP4</name><pathurl>WIDE.MP4</pathurl>
+          <media><video/><audio/></media></file>
+      </clipitem>
+      <clipitem id="clipitem-2">
+        <name>WIDE.MP4</name><start>100</start><end>250</end><in>300</in><out>450</out>
+        <file id="file-1"/>
+      </clipitem>
+    </track>
+    <track>
+      <clipitem id="clipitem-3">
+        <name>CLOSE.MP4</name><start>80</start><end>140</end><in>1000</in><out>1060</out>
+        <file id="file-2"><name>CLOSE.MP4</name><pathurl>CLOSE.MP4</pathurl></file>
+      </clipitem>
+    </track>
+    <track>
+      <clipitem id="clipitem-4">
+        <name>logo.png</name><start>0</start><end>250</end><in>0</in><out>250</out>
+        <stillframe>TRUE</stillframe>
+        <file id="file-3"><name>logo.png</name><pathurl>logo.png</pathurl>
+          <media><video/></media></file>
+      </clipitem>
+    </track>
+    <track>
+      <clipitem id="clipitem-5">
+        <name>music.wav</name><start>0</start><end>250</end><in>0</in><out>250</out>
+        <file id="file-4"><name>music.wav</name><pathurl>music.wav</pathurl>
+          <media><audio/></media></file>
+      </clipitem>
+    </track>
+  </video></media>
+</sequence>
+</xmeml>"""
+
+NESTED_XML = """<?xml version="1.0"?>
+<xmeml version="5">
+<sequence id="sequence-1">
+  <media><video>
+    <track>
+      <clipitem id="clipitem-1">
+        <name>Multicam</name><start>0</start><end>100</end><in>50</in><out>150</out>
+        <sequence id="sequence-2">
+          <media><video>
+            <track>
+              <clipitem id="clipitem-10">
+                <name>A.MP4</name><start>0</start><end>80</end><in>0</in><out>80</out>
+                <file id="file-1"><name>A.MP4</name><pathurl>A.MP4</pathurl></file>
+              </clipitem>
+              <clipitem id="clipitem-11">
+                <name>B.MP4</name><start>80</start><end>200</end><in>500</in><out>620</out>
+                <file id="file-2"><name>B.MP4</name><pathurl>B.MP4</pathurl></file>
+              </clipitem>
+            </track>
+          </video></media>
+        </sequence>
+      </clipitem>
+      <clipitem id="clipitem-2">
+        <name>Multicam</name><start>100</start><end>120</end><in>0</in><out>20</out>
+        <sequence id="sequence-2"/>
+      </clipitem>
+    </track>
+  </video></media>
+</sequence>
+</xmeml>"""
+
+
+def make_timeline(xml):
+    """Construit une timeline depuis une chaîne XML."""
+    return Timeline(ET.fromstring(xml))
+
+
+class TestTimelineIndex:
+    """Tests de l'indexation en une passe."""
+
+    def test_index_by_id(self):
+        """Test que clips et fichiers sont indexés par id."""
+        timeline = make_timeline(SIMPLE_XML)
+
+        assert set(timeline.clipitems) == {'clipitem-1', 'clipitem-2', 'clipitem-3'}
+        assert set(timeline.files) == {'file-1', 'file-2'}
+
+    def test_file_reference_resolved(self):
+        """Test qu'une référence <file id=.../> vide est résolue."""
+        timeline = make_timeline(SIMPLE_XML)
+        file_info = timeline.resolve_file(timeline.clipitems['clipitem-2'])
+
+        assert file_info['pathurl'] == 'file://localhost/D:/Match/C0001.MP4'
+
+    def test_fps_ntsc(self):
+        """Test du framerate NTSC de la séquence."""
+        timeline = make_timeline(SIMPLE_XML)
+
+        assert timeline.fps() == pytest.approx(59.94)
+
+    def test_from_file(self, tmp_path):
+        """Test du chargement depuis un fichier."""
+        xml_file = tmp_path / "sequence.xml"
+        xml_file.write_text(SIMPLE_XML, encoding='utf-8')
+
+        assert len(Timeline.from_file(xml_file).edit_list()) == 2
+
+
+class TestEditList:
+    """Tests de la liste de montage aplatie."""
+
+    def test_simple_edit_list(self):
+        """Test d'une piste simple (clip désactivé ignoré)."""
+        edits = make_timeline(SIMPLE_XML).edit_list()
+
+        assert [e['id'] for e in edits] == ['clipitem-1', 'clipitem-2']
+        assert edits[1]['pathurl'] == 'file://localhost/D:/Match/C0001.MP4'
+        assert edits[1]['in_frame'] == 400
+        assert edits[1]['duration_frames'] == 60
+
+    def test_insert_inside_point_keeps_point_whole(self):
+        """Test qu'un plan inséré au milieu d'un point ne le coupe pas en deux clips."""
+        edits = make_timeline(MULTITRACK_XML).edit_list()
+
+        assert [(e['name'], e['start_frame'], e['end_frame'], e['in_frame']) for e in edits] == [
+            ('WIDE.MP4', 0, 300, 0)
+        ]
+
+    def test_upper_track_overlap_trims(self):
+        """Test qu'un clip supérieur qui déborde d'un point ne fait que raccourcir les points voisins."""
+        edits = make_timeline(OVERLAP_XML).edit_list()
+
+        assert [(e['name'], e['start_frame'], e['end_frame'], e['in_frame']) for e in edits] == [
+            ('WIDE.MP4', 0, 80, 0),
+            ('CLOSE.MP4', 80, 140, 1000),
+            ('WIDE.MP4', 140, 250, 340),
+        ]
+
+    def test_still_and_audio_items_ignored(self):
+        """Test qu'un logo (image fixe) ou un fichier audio sur une piste haute ne masque pas les points."""
+        timeline = make_timeline(OVERLAP_XML)
+
+        assert timeline.files['file-4']['has_video'] is False
+        assert 'logo.png' not in [e['name'] for e in timeline.edit_list()]
+
+    def test_still_detected_by_extension(self):
+        """Test qu'une image fixe est reconnue à son extension sans <stillframe>."""
+        timeline = make_timeline(OVERLAP_XML)
+
+        assert not timeline.is_video_clip(timeline.clipitems['clipitem-1'],
+                                          {'name': 'C:\\Logos\\Club.PNG', 'pathurl': ''})
+
+    def test_fps_not_ntsc(self):
+        """Test d'un timebase non NTSC (50 images/s)."""
+        assert make_timeline(OVERLAP_XML).fps() == 50.0
+
+    def test_nested_sequence_expanded(self):
+        """Test qu'une séquence imbriquée est dépliée avec les bons points d'entrée."""
+        edits = make_timeline(NESTED_XML).edit_list()
+
+        assert [(e['name'], e['start_frame'], e['end_frame'], e['in_frame']) for e in edits] == [
+            ('A.MP4', 0, 30, 50),
+            ('B.MP4', 30, 100, 500),
+            ('A.MP4', 100, 120, 0),
+        ]
+
+    def test_nested_sequence_on_upper_track(self):
+        """Test d'une séquence imbriquée (multicam) posée sur V2 au-dessus d'un clip couvert en entier."""
+        nested = NESTED_XML.replace(
+            '<media><video>\n    <track>\n      <clipitem id="clipitem-1">',
+            '<media><video>\n    <track>\n      <clipitem id="clipitem-0">'
+            '<name>WIDE.MP4</name><start>0</start><end>120</end><in>0</in><out>120</out>'
+            '<file id="file-9"><name>WIDE.MP4</name><pathurl>WIDE.MP4</pathurl></file>'
+            '</clipitem>\n    </track>\n    <track>\n      <clipitem id="clipitem-1">', 1)
+        edits = make_timeline(nested).edit_list()
+
+        assert [(e['name'], e['start_frame'], e['end_frame']) for e in edits] == [
+            ('A.MP4', 0, 30), ('B.MP4', 30, 100), ('A.MP4', 100, 120)
+        ]
+        assert {e['track'] for e in edits} == {1}
+
+    def test_empty_track(self):
+        """Test d'une séquence sans clip."""
+        xml = '<?xml version="1.0"?><xmeml version="5"><sequence><media><video><track></track></video></media></sequence></xmeml>'
+
+        assert make_timeline(xml).edit_list() == []
+
+    def test_durations_sum(self):
+        """Test que la somme des durées correspond à la timeline."""
+        edits = make_timeline(MULTITRACK_XML).edit_list()
+
+        assert sum(e['duration_frames'] for e in edits) == 300
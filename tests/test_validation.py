@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour validation.py
+Tests de la validation des entrées avant encodage.
+"""
+
+import datetime
+
+import pytest
+
+from utils import validation
+from utils.validation import ValidationError, ValidationReport, validate_inputs
+
+FPS = 60
+
+
+def make_clip(in_frame=0, duration=120, source='a.mp4'):
+    """Crée un clip minimal."""
+    return {'name': 'A.MP4', 'in_frame': in_frame, 'duration_frames': duration, 'source_path': source}
+
+
+def make_score(jeux="0/0", points="0/0", set_num=1, set1=None, set2=None):
+    """Crée un score minimal."""
+    return {'set': set_num, 'point': 1, 'set1': set1, 'set2': set2,
+            'jeux': jeux, 'points': points, 'commentaires': ""}
+
+
+class TestValidateInputs:
+    """Tests de validate_inputs."""
+
+    def test_valid_inputs(self):
+        """Test d'entrées valides."""
+        clips = [make_clip(), make_clip(200)]
+        scores = [make_score("0/0", "15/0"), make_score("0/0", "30/0")]
+
+        report = validate_inputs(clips, scores, FPS, {'a.mp4': 100.0})
+
+        assert report.ok
+        assert report.warnings == []
+
+    def test_count_mismatch_is_error(self):
+        """Test qu'un nombre de clips différent du nombre de scores est bloquant."""
+        report = validate_inputs([make_clip()], [make_score(), make_score()], FPS)
+
+        assert not report.ok
+        assert report.errors[0]['field'] == 'count'
+
+    def test_missing_source(self):
+        """Test qu'une source introuvable est bloquante."""
+        report = validate_inputs([make_clip(source=None)], [make_score()], FPS)
+
+        assert [e['field'] for e in report.errors] == ['source']
+
+    def test_range_beyond_source(self):
+        """Test qu'un clip dépassant la durée de la source est bloquant."""
+        report = validate_inputs([make_clip(in_frame=5900, duration=200)], [make_score()], FPS,
+                                 {'a.mp4': 100.0})
+
+        assert [e['field'] for e in report.errors] == ['range']
+
+    def test_unknown_duration_not_checked(self):
+        """Test qu'une durée non sondée ne bloque pas."""
+        report = validate_inputs([make_clip(in_frame=99999)], [make_score()], FPS)
+
+        assert report.ok
+
+    def test_invalid_points(self):
+        """Test d'une valeur de points invalide."""
+        report = validate_inputs([make_clip()], [make_score(points="45/0")], FPS)
+
+        assert [e['field'] for e in report.errors] == ['points']
+
+    def test_tiebreak_and_advantage_points(self):
+        """Test que les points de tie-break et l'avantage sont acceptés."""
+        clips = [make_clip(), make_clip()]
+        scores = [make_score("6/6", "7/5"), make_score("5/5", "A/40")]
+
+        assert validate_inputs(clips, scores, FPS).ok
+
+    def test_third_set_points_depend_on_match_format(self):
+        """Test que les points numériques au 3e set ne sont acceptés qu'en format super tie-break."""
+        clips = [make_clip()]
+        scores = [make_score("2/1", "7/5", set_num=3)]
+
+        assert [e['field'] for e in validate_inputs(clips, scores, FPS).errors] == ['points']
+        assert validate_inputs(clips, scores, FPS, super_tiebreak=True).ok
+
+    def test_excel_date_cell(self):
+        """Test qu'une cellule convertie en date par Excel est signalée."""
+        report = validate_inputs([make_clip()], [make_score(jeux=datetime.datetime(2025, 3, 3))], FPS)
+
+        assert not report.ok
+        assert 'texte' in report.errors[0]['message']
+
+    def test_games_going_backwards_warns(self):
+        """Test qu'un recul des jeux dans un même set produit un avertissement."""
+        clips = [make_clip(), make_clip()]
+        scores = [make_score("3/2"), make_score("2/2")]
+
+        report = validate_inputs(clips, scores, FPS)
+
+        assert report.ok
+        assert [w['field'] for w in report.warnings] == ['jeux']
+
+    def test_new_set_resets_games(self):
+        """Test qu'un nouveau set peut repartir à 0/0."""
+        clips = [make_clip(), make_clip()]
+        scores = [make_score("6/4", set_num=1), make_score("0/0", set_num=2, set1="6/4")]
+
+        report = validate_inputs(clips, scores, FPS)
+
+        assert report.ok
+        assert report.warnings == []
+
+    def test_running_set_column_not_flagged(self):
+        """Test que la colonne du set en cours (égale aux jeux) peut évoluer."""
+        clips = [make_clip(), make_clip()]
+        scores = [make_score("2/1", set1="2/1"), make_score("3/1", set1="3/1")]
+
+        report = validate_inputs(clips, scores, FPS)
+
+        assert report.warnings == []
+
+
+    def test_no_overlay_generator_needed(self, monkeypatch):
+        """Test que la validation des scores ne charge aucune police."""
+        from utils.overlay_generator import PadelOverlayGenerator
+        monkeypatch.setattr(PadelOverlayGenerator, 'load_fonts',
+                            lambda self: pytest.fail("aucune police attendue"))
+
+        report = validate_inputs([make_clip()], [make_score("1/0", "15/0")], FPS)
+
+        assert report.ok
+
+
+class TestProgression:
+    """Tests du contrôle de progression vectorisé (pandas) et de son repli ligne par ligne."""
+
+    SCORES = [
+        make_score("3/2", set1="3/2"),
+        make_score("2/2", set1="2/2"),          # jeux en recul
+        make_score("6/4", set1="6/4"),
+        make_score("0/0", set_num=2, set1="6/4"),
+        make_score("1/0", set_num=2, set1="6/3"),  # set terminé modifié
+        make_score("bad", set_num=2),            # ignoré (format invalide)
+        make_score("2/0", set_num=1, set1="6/3"),  # numéro de set en recul
+        make_score("1/0", set_num=None),
+        make_score("0/0", set_num=None),         # jeux en recul (set inconnu des deux côtés)
+    ]
+
+    def report(self, monkeypatch, pandas):
+        if not pandas:
+            monkeypatch.setattr(validation, 'pd', None)
+        clips = [make_clip() for _ in self.SCORES]
+        return validate_inputs(clips, self.SCORES, FPS)
+
+    def test_fallback_warnings(self, monkeypatch):
+        """Test des avertissements de progression sans pandas."""
+        report = self.report(monkeypatch, pandas=False)
+
+        assert [(w['index'], w['field']) for w in report.warnings] == [
+            (2, 'jeux'), (5, 'set1'), (7, 'set'), (9, 'jeux')]
+
+    def test_pandas_matches_fallback(self, monkeypatch):
+        """Test que la passe vectorisée donne exactement les avertissements ligne par ligne."""
+        pytest.importorskip("pandas")
+        vectorised = self.report(monkeypatch, pandas=True)
+        fallback = self.report(monkeypatch, pandas=False)
+
+        assert vectorised.warnings == fallback.warnings
+        assert vectorised.errors == fallback.errors
+
+
+class TestValidationReport:
+    """Tests du rapport de validation."""
+
+    def test_format_empty(self):
+        """Test du rapport sans problème."""
+        assert "valides" in ValidationReport().format()
+
+    def test_validation_error_contains_report(self):
+        """Test que l'exception porte le rapport."""
+        report = ValidationReport()
+        report.add_error(3, 'points', "valeur invalide")
+
+        error = ValidationError(report)
+
+        assert error.report is report
+        assert "Point 3" in str(error)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Moteur asyncio pour l'exécution des commandes FFmpeg.
+
+Les processus sont lancés avec asyncio.create_subprocess_exec: une seule boucle
+d'événements pilote tous les jobs, y compris ceux de plusieurs matchs, sans
+thread bloqué par processus. La progression (-progress pipe:1) et stderr sont
+lus au fil de l'eau; seules les dernières lignes de stderr restent en mémoire.
+Chaque job peut avoir un délai maximal (le temps passé en pause n'est pas
+décompté), et le démarrage des jobs est retenu tant que l'espace libre du
+dossier de travail est insuffisant.
+"""
+
+import asyncio
+import collections
+import shutil
+import subprocess
+from pathlib import Path
+
+from utils.process_control import ProcessingCancelled
+
+# Lignes de stderr conservées par job (message d'erreur en cas d'échec)
+STDERR_TAIL_LINES = 50
+
+
+class JobTimeout(RuntimeError):
+    """Levée quand un job FFmpeg dépasse son délai."""
+
+
+def is_ffmpeg(cmd):
+    """Indique si la commande lance ffmpeg (et accepte donc -progress)."""
+    return bool(cmd) and Path(cmd[0]).stem.lower() == 'ffmpeg'
+
+
+def with_progress(cmd):
+    """Ajoute la progression machine (-progress pipe:1, sans -stats) à une commande ffmpeg."""
+    if not is_ffmpeg(cmd) or '-progress' in cmd:
+        return list(cmd)
+    return [cmd[0], '-progress', 'pipe:1', '-nostats', *cmd[1:]]
+
+
+def _number(value, cast):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _kill(process):
+    try:
+        process.kill()
+    except ProcessLookupError:
+        pass
+
+
+class ProgressReader:
+    """Assemble les lignes clé=valeur de -progress en un état par bloc."""
+
+    def __init__(self):
+        self.values = {}
+
+    def feed(self, line):
+        """
+        Ajoute une ligne de la sortie -progress.
+
+        Returns:
+            Dict {'frame', 'out_time', 'speed', 'done'} à la fin d'un bloc, sinon None
+        """
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return None
+        self.values[key] = value.strip()
+        if key != 'progress':
+            return None
+
+        values, self.values = self.values, {}
+        out_time_us = _number(values.get('out_time_us'), int)
+        return {
+            'frame': _number(values.get('frame'), int) or 0,
+            'out_time': out_time_us / 1_000_000 if out_time_us is not None else None,
+            'speed': _number(values.get('speed', '').rstrip('x'), float),
+            'done': values['progress'] == 'end'
+        }
+
+
+class AsyncFFmpegEngine:
+    """Exécute les commandes FFmpeg dans une boucle asyncio (concurrence bornée)."""
+
+    # Attente entre deux vérifications de l'espace disque (secondes)
+    DISK_POLL_INTERVAL = 1.0
+    # Attente entre deux vérifications pendant une pause (secondes)
+    PAUSE_POLL_INTERVAL = 0.2
+
+    def __init__(self, max_jobs=4, scratch_dir=None, min_free_bytes=2 * 1024 ** 3, timeout=None):
+        """
+        Args:
+            max_jobs: Nombre maximal de processus simultanés (tous matchs confondus)
+            scratch_dir: Dossier dont l'espace libre est surveillé (None = pas de contrôle)
+            min_free_bytes: Espace libre à conserver dans scratch_dir
+            timeout: Délai maximal par défaut d'un job (secondes, None = aucun)
+        """
+        self.max_jobs = max_jobs
+        self.scratch_dir = scratch_dir
+        self.min_free_bytes = min_free_bytes
+        self.timeout = timeout
+        self.running = 0
+        self.reserved_bytes = 0
+        self._semaphore = asyncio.Semaphore(max_jobs)
+
+    def free_bytes(self):
+        """Espace libre de scratch_dir, moins les écritures prévues des jobs en cours."""
+        return shutil.disk_usage(self.scratch_dir).free - self.reserved_bytes
+
+    async def _wait_for_disk(self, expected_bytes):
+        """
+        Retient le job tant que l'espace disque est insuffisant.
+
+        Raises:
+            OSError: si l'espace manque alors qu'aucun job ne peut en libérer
+        """
+        if not self.scratch_dir:
+            return
+        while self.free_bytes() < self.min_free_bytes + expected_bytes:
+            if not self.running:
+                raise OSError(f"Espace disque insuffisant dans {self.scratch_dir}")
+            await asyncio.sleep(self.DISK_POLL_INTERVAL)
+
+    async def _wait_running(self, control):
+        """Attend la reprise si le traitement est en pause."""
+        while control.paused and not control.cancelled:
+            await asyncio.sleep(self.PAUSE_POLL_INTERVAL)
+        if control.cancelled:
+            raise ProcessingCancelled("Traitement annulé")
+
+    async def run(self, cmd, timeout=None, on_progress=None, expected_bytes=0, control=None):
+        """
+        Exécute une commande (résultat équivalent à subprocess.run(capture_output=True, text=True)).
+
+        Args:
+            cmd: Commande (liste d'arguments)
+            timeout: Délai maximal (secondes), défaut: celui du moteur; le temps passé
+                en pause (control.paused) n'est pas décompté
+            on_progress: Appelé à chaque bloc de progression ffmpeg (voir ProgressReader.feed)
+            expected_bytes: Taille estimée du fichier produit (contrôle de l'espace disque)
+            control: ProcessControl du traitement (annulation / pause), optionnel
+
+        Returns:
+            subprocess.CompletedProcess (stderr limité aux dernières lignes pour ffmpeg)
+
+        Raises:
+            JobTimeout: si le délai est dépassé (le processus est tué)
+            ProcessingCancelled: si le traitement est annulé
+        """
+        async with self._semaphore:
+            if control:
+                await self._wait_running(control)
+            await self._wait_for_disk(expected_bytes)
+            self.running += 1
+            self.reserved_bytes += expected_bytes
+            try:
+                return await self._execute(cmd, timeout or self.timeout, on_progress, control)
+            finally:
+                self.running -= 1
+                self.reserved_bytes -= expected_bytes
+
+    async def _wait_with_deadline(self, work, timeout, control):
+        """
+        Attend la fin de work; le délai ne court que hors pause (processus suspendus).
+
+        Raises:
+            TimeoutError: si le délai est dépassé
+        """
+        if timeout is None or control is None:
+            await asyncio.wait_for(asyncio.shield(work), timeout)
+            return
+        loop = asyncio.get_running_loop()
+        remaining = timeout
+        while not work.done():
+            if remaining <= 0:
+                raise TimeoutError
+            started = loop.time()
+            # Attente par tranches: le temps d'une tranche passée en pause n'est pas décompté
+            await asyncio.wait({work}, timeout=min(remaining, self.PAUSE_POLL_INTERVAL))
+            if not control.paused:
+                remaining -= loop.time() - started
+        await work
+
+    async def _execute(self, cmd, timeout, on_progress, control):
+        process = await asyncio.create_subprocess_exec(
+            *with_progress(cmd), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        if control:
+            control.track(process)
+
+        stdout_lines = []
+        stderr_tail = collections.deque(maxlen=STDERR_TAIL_LINES if is_ffmpeg(cmd) else None)
+        reader = ProgressReader() if is_ffmpeg(cmd) else None
+
+        async def read_stdout():
+            async for raw in process.stdout:
+                line = raw.decode(errors='replace')
+                if reader is None:
+                    stdout_lines.append(line)
+                    continue
+                progress = reader.feed(line)
+                if progress and on_progress:
+                    on_progress(progress)
+
+        async def read_stderr():
+            async for raw in process.stderr:
+                stderr_tail.append(raw.decode(errors='replace'))
+
+        work = asyncio.ensure_future(asyncio.gather(read_stdout(), read_stderr(), process.wait()))
+        try:
+            await self._wait_with_deadline(work, timeout, control)
+        except TimeoutError:
+            _kill(process)
+            await asyncio.gather(work, return_exceptions=True)
+            raise JobTimeout(f"{cmd[0]}: délai de {timeout:.0f}s dépassé") from None
+        except asyncio.CancelledError:
+            _kill(process)
+            work.cancel()
+            raise
+        finally:
+            if control:
+                control.untrack(process)
+
+        if control and control.cancelled:
+            raise ProcessingCancelled("Traitement annulé")
+        return subprocess.CompletedProcess(cmd, process.returncode, ''.join(stdout_lines), ''.join(stderr_tail))
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+File de jobs pour le rendu distribué (un coordinateur, plusieurs workers).
+
+Le coordinateur publie les jobs d'encodage planifiés dans une base SQLite
+locale (JobBroker). Les workers, sur la même machine ou sur d'autres, y
+accèdent par HTTP (BrokerServer / BrokerClient): ils prennent un job, le
+rendent avec leur propre encodeur et renvoient le segment produit, rangé
+dans le dossier du broker pour l'assemblage final.
+
+Un job pris par un worker lui est réservé pour une durée limitée (bail): si
+le worker disparaît, le job redevient disponible à l'expiration du bail.
+
+Le serveur n'écoute par défaut que la machine locale; chaque requête doit
+porter le jeton partagé du coordinateur (en-tête X-Broker-Token).
+"""
+
+import contextlib
+import hmac
+import json
+import os
+import secrets
+import shutil
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Nombre de tentatives d'un job avant de l'abandonner
+MAX_ATTEMPTS = 3
+
+# Port par défaut du serveur du broker
+DEFAULT_PORT = 8765
+
+# En-tête HTTP du jeton partagé, et variable d'environnement qui le fournit
+TOKEN_HEADER = 'X-Broker-Token'
+TOKEN_ENV = 'PADEL_BROKER_TOKEN'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    priority REAL NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    segment TEXT,
+    result TEXT
+);
+"""
+
+
+class JobBroker:
+    """File de jobs SQLite et dossier des segments rendus."""
+
+    def __init__(self, root):
+        """
+        Args:
+            root: Dossier du broker (base broker.sqlite et segments/)
+        """
+        self.root = Path(root)
+        self.segments_dir = self.root / "segments"
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root / "broker.sqlite"
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    def _connect(self):
+        """Connexion courte (une par opération: le broker est partagé entre threads)."""
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return contextlib.closing(db)
+
+    def publish(self, settings, jobs):
+        """
+        Remplace le contenu du broker par un nouveau traitement.
+
+        Args:
+            settings: Réglages communs aux workers (dict sérialisable en JSON)
+            jobs: Liste de (priorité, payload): les priorités les plus hautes sont servies d'abord
+        """
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM settings")
+            db.execute("DELETE FROM jobs")
+            db.execute("INSERT INTO settings (key, value) VALUES ('settings', ?)", (json.dumps(settings),))
+            db.executemany(
+                "INSERT INTO jobs (priority, payload) VALUES (?, ?)",
+                [(priority, json.dumps(payload)) for priority, payload in jobs]
+            )
+            db.execute("COMMIT")
+
+    def settings(self):
+        """Réglages du traitement publié (None si rien n'est publié)."""
+        with self._connect() as db:
+            row = db.execute("SELECT value FROM settings WHERE key = 'settings'").fetchone()
+        return json.loads(row['value']) if row else None
+
+    def claim(self, worker, lease=600.0):
+        """
+        Réserve le job disponible le plus prioritaire.
+
+        Args:
+            worker: Nom du worker
+            lease: Durée de la réservation (secondes)
+
+        Un job dont le bail a expiré est repris, sauf s'il a déjà eu MAX_ATTEMPTS
+        tentatives: il est alors abandonné (worker disparu à chaque fois).
+
+        Returns:
+            (id, payload), None si aucun job n'est disponible pour l'instant,
+            ou False si tous les jobs sont terminés
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                "UPDATE jobs SET status = 'failed', lease_until = NULL, "
+                "error = COALESCE(error, 'bail expiré à chaque tentative') "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, MAX_ATTEMPTS)
+            )
+            row = db.execute(
+                "SELECT id, payload FROM jobs "
+                "WHERE status = 'pending' OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY priority DESC, id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                active = db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'running')"
+                ).fetchone()[0]
+                db.execute("COMMIT")
+                return None if active else False
+            db.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (worker, now + lease, row['id'])
+            )
+            db.execute("COMMIT")
+        return row['id'], json.loads(row['payload'])
+
+    def complete(self, job_id, segment_path, result=None, name=None):
+        """
+        Enregistre un job terminé et range son segment dans le dossier du broker.
+
+        Le premier résultat l'emporte (un job repris après expiration du bail
+        peut être terminé deux fois).
+
+        Args:
+            job_id: Identifiant du job
+            segment_path: Segment rendu (déplacé dans le dossier du broker)
+            result: Informations du worker (dict sérialisable en JSON)
+            name: Nom du segment dans le dossier du broker (défaut: nom du fichier)
+
+        Returns:
+            True si le résultat a été retenu
+        """
+        segment_path = Path(segment_path)
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row['status'] == 'done':
+                db.execute("COMMIT")
+                segment_path.unlink(missing_ok=True)
+                return False
+            target = self.segments_dir / Path(name or segment_path.name).name
+            if segment_path.resolve() != target.resolve():
+                shutil.move(str(segment_path), str(target))
+            db.execute(
+                "UPDATE jobs SET status = 'done', segment = ?, result = ?, error = NULL WHERE id = ?",
+                (target.name, json.dumps(result or {}), job_id)
+            )
+            db.execute("COMMIT")
+        return True
+
+    def fail(self, job_id, error):
+        """Signale l'échec d'un job: remis en file, ou abandonné après MAX_ATTEMPTS tentatives."""
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, lease_until = NULL WHERE id = ? AND status = 'running'",
+                (MAX_ATTEMPTS, str(error), job_id)
+            )
+
+    def counts(self):
+        """Nombre de jobs par état (pending, running, done, failed)."""
+        counts = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+        with self._connect() as db:
+            for row in db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+                counts[row['status']] = row['n']
+        return counts
+
+    def finished(self):
+        """True si tous les jobs sont terminés ou abandonnés."""
+        counts = self.counts()
+        return counts['pending'] == 0 and counts['running'] == 0
+
+    def results(self):
+        """
+        Jobs terminés avec leur segment.
+
+        Returns:
+            Liste de dict {'id', 'payload', 'segment' (chemin), 'result'}
+        """
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT id, payload, segment, result FROM jobs WHERE status = 'done' ORDER BY id"
+            ).fetchall()
+        return [
+            {
+                'id': row['id'],
+                'payload': json.loads(row['payload']),
+                'segment': self.segments_dir / row['segment'],
+                'result': json.loads(row['result'])
+            }
+            for row in rows
+        ]
+
+    def failures(self):
+        """Jobs abandonnés: liste de (payload, erreur)."""
+        with self._connect() as db:
+            rows = db.execute("SELECT payload, error FROM jobs WHERE status = 'failed' ORDER BY id").fetchall()
+        return [(json.loads(row['payload']), row['error']) for row in rows]
+
+
+class _BrokerHandler(BaseHTTPRequestHandler):
+    """Requêtes HTTP des workers (voir BrokerClient)."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _authorized(self):
+        """Vérifie le jeton partagé (réponse 401 sinon)."""
+        token = self.headers.get(TOKEN_HEADER, '')
+        if hmac.compare_digest(token.encode('utf-8'), self.server.token.encode('utf-8')):
+            return True
+        self.close_connection = True
+        self._send_json({'error': 'jeton invalide'}, 401)
+        return False
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        broker = self.server.broker
+        if self.path == '/settings':
+            self._send_json(broker.settings())
+        elif self.path == '/status':
+            self._send_json(broker.counts())
+        else:
+            self._send_json({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        broker = self.server.broker
+        request = self._read_json()
+        if self.path == '/claim':
+            claimed = broker.claim(request['worker'], request.get('lease', 600.0))
+            if not claimed:
+                self._send_json({'job': None, 'finished': claimed is False})
+            else:
+                self._send_json({'job': {'id': claimed[0], 'payload': claimed[1]}})
+        elif self.path == '/fail':
+            broker.fail(request['id'], request.get('error', ''))
+            self._send_json({'ok': True})
+        else:
+            self._send_json({'error': 'not found'}, 404)
+
+    def do_PUT(self):
+        # PUT /segments/<id>?name=<fichier>&result=<json>: envoi du segment rendu
+        if not self._authorized():
+            return
+        broker = self.server.broker
+        url = urllib.parse.urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        query = urllib.parse.parse_qs(url.query)
+        if len(parts) != 2 or parts[0] != 'segments' or 'name' not in query:
+            self._send_json({'error': 'not found'}, 404)
+            return
+
+        job_id = int(parts[1])
+        name = Path(query['name'][0]).name
+        result = json.loads(query.get('result', ['{}'])[0])
+        part_path = broker.segments_dir / f"{name}.{job_id}.part"
+        remaining = int(self.headers.get('Content-Length', 0))
+        with open(part_path, 'wb') as f:
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        if remaining:
+            part_path.unlink(missing_ok=True)
+            self._send_json({'error': 'envoi incomplet'}, 400)
+            return
+
+        self._send_json({'accepted': broker.complete(job_id, part_path, result, name=name)})
+
+
+class BrokerServer:
+    """Serveur HTTP du broker, lancé par le coordinateur (thread en arrière-plan)."""
+
+    def __init__(self, broker, host='127.0.0.1', port=DEFAULT_PORT, token=None):
+        """
+        Args:
+            broker: JobBroker servi aux workers
+            host: Adresse d'écoute ('0.0.0.0' pour accepter les workers d'autres machines)
+            port: Port d'écoute (0 = port libre choisi par le système)
+            token: Jeton partagé exigé des workers; défaut: variable PADEL_BROKER_TOKEN,
+                sinon jeton aléatoire (à transmettre aux workers)
+        """
+        self.broker = broker
+        self.token = token or os.environ.get(TOKEN_ENV) or secrets.token_urlsafe(24)
+        self.httpd = ThreadingHTTPServer((host, port), _BrokerHandler)
+        self.httpd.broker = broker
+        self.httpd.token = self.token
+        self.thread = None
+
+    @property
+    def port(self):
+        """Port effectif (utile avec port=0)."""
+        return self.httpd.server_address[1]
+
+    def start(self):
+        """Démarre le serveur en arrière-plan."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Arrête le serveur."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class BrokerClient:
+    """Accès d'un worker au broker (HTTP)."""
+
+    def __init__(self, url, token=None, timeout=30):
+        """
+        Args:
+            url: Adresse du coordinateur (ex: http://192.168.1.10:8765)
+            token: Jeton partagé du coordinateur (défaut: variable PADEL_BROKER_TOKEN)
+            timeout: Délai des requêtes (secondes, hors envoi de segment)
+        """
+        self.url = url.rstrip('/')
+        self.token = token or os.environ.get(TOKEN_ENV, '')
+        self.timeout = timeout
+
+    def _request(self, method, path, data=None, timeout=None):
+        body = json.dumps(data).encode('utf-8') if data is not None else None
+        request = urllib.request.Request(self.url + path, data=body, method=method,
+                                         headers={'Content-Type': 'application/json',
+                                                  TOKEN_HEADER: self.token})
+        with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+            return json.loads(response.read() or b'null')
+
+    def settings(self):
+        """Réglages du traitement publié."""
+        return self._request('GET', '/settings')
+
+    def counts(self):
+        """Nombre de jobs par état."""
+        return self._request('GET', '/status')
+
+    def claim(self, worker, lease=600.0):
+        """
+        Réserve un job.
+
+        Returns:
+            (id, payload), None si aucun job n'est disponible pour l'instant,
+            ou False si tous les jobs sont terminés
+        """
+        response = self._request('POST', '/claim', {'worker': worker, 'lease': lease})
+        job = response['job']
+        if job is None:
+            return False if response.get('finished') else None
+        return job['id'], job['payload']
+
+    def complete(self, job_id, segment_path, result=None):
+        """Envoie le segment rendu au coordinateur. Returns: True si retenu."""
+        segment_path = Path(segment_path)
+        query = urllib.parse.urlencode({'name': segment_path.name, 'result': json.dumps(result or {})})
+        with open(segment_path, 'rb') as f:
+            request = urllib.request.Request(
+                f"{self.url}/segments/{job_id}?{query}", data=f, method='PUT',
+                headers={'Content-Length': str(segment_path.stat().st_size),
+                         'Content-Type': 'application/octet-stream',
+                         TOKEN_HEADER: self.token}
+            )
+            with urllib.request.urlopen(request, timeout=None) as response:
+                return json.loads(response.read())['accepted']
+
+    def fail(self, job_id, error):
+        """Signale l'échec d'un job."""
+        self._request('POST', '/fail', {'id': job_id, 'error': str(error)})
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Découpage des clips longs en morceaux encodés en parallèle.
+
+Les points de coupe sont placés sur les images clés de la source (recherche -ss
+rapide et exacte), puis les morceaux encodés sont joints sans réencodage
+comme des segments ordinaires.
+"""
+
+import math
+
+
+def parse_keyframes(ffprobe_output, start_time, fps):
+    """
+    Convertit la sortie ffprobe (un pts_time par ligne) en positions d'images relatives au clip.
+
+    Args:
+        ffprobe_output: Sortie de ffprobe -show_entries frame=pts_time -of csv=p=0
+        start_time: Début du clip dans la source (secondes)
+        fps: Framerate de la timeline
+
+    Returns:
+        Liste triée des images clés (numéro d'image depuis le début du clip)
+    """
+    frames = set()
+    for line in ffprobe_output.splitlines():
+        value = line.strip().strip(',')
+        try:
+            frames.add(round((float(value) - start_time) * fps))
+        except ValueError:
+            continue
+    return sorted(frames)
+
+
+def plan_chunks(duration_frames, max_chunk_frames, keyframes=()):
+    """
+    Découpe un clip en morceaux d'au plus ~max_chunk_frames images.
+
+    Chaque coupe idéale (durées égales) est déplacée sur l'image clé la plus
+    proche si elle est à moins d'un quart de morceau; sinon la coupe reste à
+    la position idéale (le segment est réencodé, la coupe reste exacte).
+
+    Args:
+        duration_frames: Durée du clip (images)
+        max_chunk_frames: Durée maximale visée d'un morceau (images), None = pas de découpe
+        keyframes: Images clés de la source, relatives au début du clip
+
+    Returns:
+        Liste de (décalage, durée) en images, couvrant tout le clip
+    """
+    if not max_chunk_frames or duration_frames <= max_chunk_frames:
+        return [(0, duration_frames)]
+
+    count = math.ceil(duration_frames / max_chunk_frames)
+    chunk = duration_frames / count
+    tolerance = chunk / 4
+    candidates = [k for k in keyframes if 0 < k < duration_frames]
+
+    cuts = []
+    for n in range(1, count):
+        ideal = round(n * chunk)
+        cut = ideal
+        if candidates:
+            nearest = min(candidates, key=lambda k: abs(k - ideal))
+            if abs(nearest - ideal) <= tolerance:
+                cut = nearest
+        if cut > (cuts[-1] if cuts else 0) and cut < duration_frames:
+            cuts.append(cut)
+
+    bounds = [0, *cuts, duration_frames]
+    return [(lo, hi - lo) for lo, hi in zip(bounds, bounds[1:])]
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Planche de vérification: une vignette par clip avec son overlay de score.
+
+Au lieu de parcourir la vidéo finale, on vérifie d'un coup d'œil que chaque
+point affiche le bon score. Les vignettes sont extraites en une seule lecture
+par source (images clés uniquement, voir build_thumbnail_command), puis le
+scoreboard est incrusté depuis la piste d'overlays: chaque état de score
+distinct n'est rendu qu'une fois, à la taille des vignettes.
+"""
+
+import html
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from utils.overlay_track import OverlayTrack
+
+# Largeur des vignettes (la hauteur suit le format de la vidéo)
+TILE_WIDTH = 480
+
+# Bandeau de légende sous chaque vignette (nom du clip et score)
+CAPTION_HEIGHT = 44
+CAPTION_FONT_SIZE = 15
+
+COLOR_BACKGROUND = (24, 24, 24)
+COLOR_CAPTION = (235, 235, 235)
+COLOR_MISSING = (70, 70, 70)
+
+
+def tile_size(video_width, video_height, width=TILE_WIDTH):
+    """Taille (largeur, hauteur) des vignettes pour une vidéo (hauteur paire)."""
+    return width, max(2, round(width * video_height / video_width / 2) * 2)
+
+
+def score_label(state):
+    """Texte du score d'un clip (arguments de create_overlay)."""
+    parts = [f"Jeux {state['jeux']}", f"Points {state['points']}"]
+    sets = [s for s in (state.get('set1'), state.get('set2')) if s]
+    if sets:
+        parts.append(f"Sets {' '.join(sets)}")
+    return " · ".join(parts)
+
+
+def match_thumbnails(times, thumbnail_dir):
+    """
+    Associe chaque instant demandé à sa vignette extraite (build_thumbnail_command).
+
+    Les PNG sont nommés d'après l'instant de leur image clé (ms): la vignette d'un
+    instant est la première image clé à partir de lui. Deux instants proches peuvent
+    partager la même image clé.
+
+    Returns:
+        Chemin de la vignette de chaque instant (None si aucune image clé trouvée)
+    """
+    frames = sorted((int(path.stem), path) for path in Path(thumbnail_dir).glob('*.png')
+                    if path.stem.isdigit())
+    matched = []
+    for t in times:
+        # Tolérance: instants arrondis à la ms dans la commande
+        matched.append(next((path for ms, path in frames if ms >= t * 1000 - 1), None))
+    return matched
+
+
+def load_caption_font(size=CAPTION_FONT_SIZE):
+    """Police des légendes (DejaVu si disponible, sinon police par défaut de Pillow)."""
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+class ContactSheet:
+    """Vignettes des clips d'un match, mises en page sur plusieurs planches."""
+
+    def __init__(self, generator, entries, columns=4, rows=5):
+        """
+        Args:
+            generator: PadelOverlayGenerator à la taille des vignettes
+            entries: Un dict par clip, dans l'ordre: 'index', 'name', 'state'
+                (arguments de create_overlay) et 'thumbnail' (PNG, ou None si absent)
+            columns: Vignettes par ligne
+            rows: Lignes par planche
+        """
+        self.size = (generator.width, generator.height)
+        self.entries = entries
+        self.columns = columns
+        self.rows = rows
+        self.font = load_caption_font()
+        # Scoreboards uniques rendus une seule fois (même cache que la piste d'overlays)
+        self.track = OverlayTrack(generator, [entry['state'] for entry in entries])
+        if entries:
+            self.track.render()
+
+    @property
+    def per_page(self):
+        return self.columns * self.rows
+
+    @property
+    def page_count(self):
+        return -(-len(self.entries) // self.per_page)
+
+    def missing_count(self):
+        """Nombre de clips sans vignette (image clé introuvable)."""
+        return sum(1 for entry in self.entries if not self.thumbnail_exists(entry))
+
+    @staticmethod
+    def thumbnail_exists(entry):
+        return bool(entry.get('thumbnail')) and Path(entry['thumbnail']).exists()
+
+    def tile(self, k):
+        """Vignette du clip k avec son overlay et sa légende."""
+        entry = self.entries[k]
+        width, height = self.size
+        tile = Image.new('RGBA', (width, height + CAPTION_HEIGHT), COLOR_BACKGROUND + (255,))
+
+        if self.thumbnail_exists(entry):
+            with Image.open(entry['thumbnail']) as thumbnail:
+                frame = thumbnail.convert('RGBA')
+            if frame.size != self.size:
+                frame = frame.resize(self.size)
+        else:
+            frame = Image.new('RGBA', self.size, COLOR_MISSING + (255,))
+        frame.alpha_composite(self.track.images[self.track.frames[k]], dest=self.track.position)
+        tile.paste(frame, (0, 0))
+
+        draw = ImageDraw.Draw(tile)
+        name = f"#{entry['index']} {entry['name']}"
+        if not self.thumbnail_exists(entry):
+            name += " (image introuvable)"
+        draw.text((6, height + 4), name, font=self.font, fill=COLOR_CAPTION)
+        draw.text((6, height + 4 + CAPTION_HEIGHT // 2), score_label(entry['state']),
+                  font=self.font, fill=COLOR_CAPTION)
+        return tile.convert('RGB')
+
+    def page(self, number):
+        """Planche number (à partir de 0)."""
+        width, height = self.size
+        tile_height = height + CAPTION_HEIGHT
+        start = number * self.per_page
+        count = min(self.per_page, len(self.entries) - start)
+        rows = -(-count // self.columns)
+        page = Image.new('RGB', (self.columns * width, rows * tile_height), COLOR_BACKGROUND)
+        for position in range(count):
+            row, column = divmod(position, self.columns)
+            page.paste(self.tile(start + position), (column * width, row * tile_height))
+        return page
+
+    def save(self, output_dir, stem="contact_sheet"):
+        """
+        Écrit les planches en PNG et une page HTML qui les regroupe.
+
+        Returns:
+            Chemin de la page HTML
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        pages = []
+        for number in range(self.page_count):
+            path = output_dir / f"{stem}_{number + 1:02d}.png"
+            self.page(number).save(path, 'PNG')
+            pages.append(path)
+
+        html_path = output_dir / f"{stem}.html"
+        html_path.write_text(self.html(pages), encoding='utf-8')
+        return html_path
+
+    def html(self, pages):
+        """Page HTML: planches et liste des clips (score attendu de chacun)."""
+        lines = [
+            '<!DOCTYPE html>',
+            '<html lang="fr"><head><meta charset="utf-8"><title>Planche de vérification</title>',
+            '<style>body{background:#181818;color:#eee;font-family:sans-serif}'
+            'img{max-width:100%}td,th{padding:2px 10px;text-align:left}'
+            '.missing{color:#f77}</style></head><body>',
+            f'<h1>Planche de vérification ({len(self.entries)} clips)</h1>',
+        ]
+        for number, path in enumerate(pages):
+            first = number * self.per_page
+            last = min(first + self.per_page, len(self.entries))
+            lines.append(f'<h2>Planche {number + 1}/{len(pages)}</h2>')
+            lines.append(f'<img src="{html.escape(path.name)}" alt="Planche {number + 1}">')
+            lines.append('<table><tr><th>#</th><th>Clip</th><th>Score</th></tr>')
+            for entry in self.entries[first:last]:
+                css = '' if self.thumbnail_exists(entry) else ' class="missing"'
+                lines.append(f'<tr{css}><td>{entry["index"]}</td><td>{html.escape(entry["name"])}</td>'
+                             f'<td>{html.escape(score_label(entry["state"]))}</td></tr>')
+            lines.append('</table>')
+        lines.append('</body></html>')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Registre des encodeurs vidéo (logiciels et matériels).
+
+Chaque encodeur déclare ses paramètres FFmpeg, son nombre maximal de sessions
+simultanées et un profil de débit par défaut (images/s) par résolution. Ces
+débits sont des ordres de grandeur, pas des mesures: ils ne servent qu'à défaut
+de débits mesurés sur cette machine (utils/scheduler.py, ThroughputHistory).
+La sélection prend l'encodeur disponible le plus rapide qui atteint la qualité
+demandée.
+"""
+
+import platform
+import subprocess
+
+ENCODERS = {}
+
+
+def _bitrates(bitrate, default=(10, 15, 20)):
+    """Bitrate cible, max et buffer en Mbps (d'après le bitrate de la source si connu)."""
+    if not bitrate:
+        return default
+    return int(bitrate), int(bitrate * 1.2), int(bitrate * 2)
+
+
+def scale_bitrate(bitrate, from_size, to_size):
+    """
+    Bitrate (Mbps) d'une version réduite, d'après celui de la plus grande.
+
+    Le débit utile croît moins vite que le nombre de pixels (exposant 0.75):
+    une version 1080p d'une source 4K à 40 Mbps reçoit environ 14 Mbps.
+    """
+    if not bitrate:
+        return bitrate
+    ratio = (to_size[0] * to_size[1]) / (from_size[0] * from_size[1])
+    return bitrate * ratio ** 0.75
+
+
+class Encoder:
+    """Description d'un encodeur du registre."""
+
+    def __init__(self, name, label, build, quality, default_fps_profile,
+                 max_sessions=4, platforms=None, hardware=None, preset=None, crf=None,
+                 probe_args=(), codec='hevc'):
+        """
+        Args:
+            name: Nom de l'encodeur FFmpeg (-c:v)
+            label: Nom affiché
+            build: Fonction (bitrate Mbps ou None) -> paramètres FFmpeg après '-c:v name'
+            quality: Qualité relative aux réglages par défaut (0-100, échelle type VMAF)
+            default_fps_profile: Débit par défaut {hauteur: images/s} pour une passe
+                overlay (estimation, remplacée par les débits mesurés s'il y en a)
+            max_sessions: Nombre maximal d'encodages simultanés
+            platforms: Systèmes supportés (platform.system()), None = tous
+            hardware: Accélération matérielle ('cuda', 'vaapi', 'qsv', 'videotoolbox') ou None
+            preset: Preset par défaut (informatif)
+            crf: CRF par défaut (informatif)
+            probe_args: Arguments FFmpeg nécessaires au test d'initialisation
+            codec: Format produit ('h264', 'hevc', 'av1'); les segments d'une même
+                vidéo doivent partager le même format pour être joints sans réencodage
+        """
+        self.name = name
+        self.label = label
+        self.build = build
+        self.quality = quality
+        self.default_fps_profile = dict(default_fps_profile)
+        self.max_sessions = max_sessions
+        self.platforms = platforms
+        self.hardware = hardware
+        self.preset = preset
+        self.crf = crf
+        self.probe_args = list(probe_args)
+        self.codec = codec
+
+    def build_params(self, bitrate=None):
+        """Paramètres d'encodage complets ('-c:v', ...) pour un bitrate source (Mbps) éventuel."""
+        return ['-c:v', self.name, *self.build(bitrate)]
+
+    def fps_for(self, width, height, measured=None):
+        """
+        Débit estimé (images/s) pour une résolution.
+
+        Le débit de la hauteur la plus proche est mis à l'échelle du nombre de
+        pixels: d'après les débits mesurés ({hauteur: images/s}) s'il y en a,
+        sinon d'après le profil par défaut.
+        """
+        profile = measured or self.default_fps_profile
+        reference = min(profile, key=lambda h: abs(h - height))
+        ref_pixels = reference * reference * 16 / 9
+        return profile[reference] * ref_pixels / max(width * height, 1)
+
+    def supports_platform(self, system):
+        """Indique si l'encodeur est utilisable sur ce système."""
+        return self.platforms is None or system in self.platforms
+
+    def describe(self):
+        """Dict de configuration (format historique de detect_gpu_encoder)."""
+        return {
+            'video_codec': self.name,
+            'label': self.label,
+            'preset': self.preset,
+            'crf': self.crf,
+            'extra_params': self.build(None),
+            'quality': self.quality,
+            'max_sessions': self.max_sessions,
+            'hardware': self.hardware,
+            'codec': self.codec
+        }
+
+
+def register(encoder):
+    """Ajoute (ou remplace) un encodeur dans le registre."""
+    ENCODERS[encoder.name] = encoder
+    return encoder
+
+
+def get_encoder(name):
+    """Retourne un encodeur du registre (KeyError si inconnu)."""
+    try:
+        return ENCODERS[name]
+    except KeyError:
+        raise KeyError(f"Encodeur inconnu: {name}") from None
+
+
+# === ENCODEURS LOGICIELS ===
+
+register(Encoder(
+    'libx264', 'CPU H.264 (x264)',
+    build=lambda bitrate: ['-preset', 'ultrafast', '-crf', '23'],
+    quality=70, default_fps_profile={1080: 250, 2160: 60}, max_sessions=4,
+    preset='ultrafast', crf='23', codec='h264'
+))
+
+register(Encoder(
+    'libx265', 'CPU HEVC (x265)',
+    build=lambda bitrate: ['-preset', 'ultrafast', '-crf', '26', '-x265-params', 'log-level=error'],
+    quality=75, default_fps_profile={1080: 90, 2160: 22}, max_sessions=2,
+    preset='ultrafast', crf='26'
+))
+
+register(Encoder(
+    'libsvtav1', 'CPU AV1 (SVT-AV1)',
+    build=lambda bitrate: ['-preset', '10', '-crf', '35'],
+    quality=80, default_fps_profile={1080: 120, 2160: 30}, max_sessions=2,
+    preset='10', crf='35', codec='av1'
+))
+
+
+# === ENCODEURS MATÉRIELS ===
+
+def _nvenc_params(bitrate):
+    target, maxrate, bufsize = _bitrates(bitrate)
+    return [
+        '-preset', 'p1',                  # p1=fastest (max speed)
+        '-rc:v', 'vbr',                   # Variable bitrate (plus rapide que CBR)
+        '-b:v', f'{target}M',             # Bitrate cible
+        '-maxrate:v', f'{maxrate}M',      # Bitrate max
+        '-bufsize:v', f'{bufsize}M',      # Buffer
+        '-spatial_aq', '1',               # Spatial AQ pour meilleure qualité
+        '-temporal_aq', '1',              # Temporal AQ
+        '-rc-lookahead', '20',            # Lookahead frames (compromis vitesse/qualité)
+        '-surfaces', '64',                # Max surfaces pour RTX (défaut 32)
+        '-2pass', '0'                     # Désactive 2-pass (plus rapide)
+    ]
+
+
+register(Encoder(
+    'hevc_nvenc', 'NVIDIA NVENC',
+    build=_nvenc_params,
+    # Les cartes grand public limitent le nombre de sessions NVENC simultanées
+    quality=78, default_fps_profile={1080: 600, 2160: 180}, max_sessions=4,
+    platforms=('Windows', 'Linux'), hardware='cuda', preset='p1'
+))
+
+
+def _qsv_params(bitrate):
+    target, maxrate, bufsize = _bitrates(bitrate)
+    return ['-preset', 'veryfast', '-b:v', f'{target}M',
+            '-maxrate', f'{maxrate}M', '-bufsize', f'{bufsize}M']
+
+
+register(Encoder(
+    'hevc_qsv', 'Intel Quick Sync',
+    build=_qsv_params,
+    quality=76, default_fps_profile={1080: 400, 2160: 110}, max_sessions=4,
+    platforms=('Windows', 'Linux'), hardware='qsv', preset='veryfast'
+))
+
+
+def _vaapi_params(bitrate):
+    target, maxrate, _ = _bitrates(bitrate)
+    return ['-rc_mode', 'VBR', '-b:v', f'{target}M', '-maxrate', f'{maxrate}M']
+
+
+register(Encoder(
+    'hevc_vaapi', 'VA-API',
+    build=_vaapi_params,
+    quality=72, default_fps_profile={1080: 350, 2160: 95}, max_sessions=4,
+    platforms=('Linux',), hardware='vaapi',
+    probe_args=['-vaapi_device', '/dev/dri/renderD128', '-vf', 'format=nv12,hwupload']
+))
+
+
+def _videotoolbox_params(bitrate):
+    return [
+        '-q:v', '70',               # Plus bas = plus rapide (60 = bon compromis vitesse/qualité)
+        '-prio_speed', '1',         # Priorité à la vitesse d'encodage
+        '-realtime', '0',           # Pas de limitation temps réel
+        '-power_efficient', '-1'    # Max performance (0 = auto, 1 = économie d'énergie)
+    ]
+
+
+register(Encoder(
+    'hevc_videotoolbox', 'VideoToolbox (macOS)',
+    build=_videotoolbox_params,
+    quality=75, default_fps_profile={1080: 450, 2160: 120}, max_sessions=4,
+    platforms=('Darwin',), hardware='videotoolbox'
+))
+
+
+# H.264 matériel (ex: sortie HLS, lue partout en MPEG-TS): mêmes réglages et mêmes
+# débits estimés que les versions HEVC, enregistrées avant et donc préférées à débit égal
+
+register(Encoder(
+    'h264_nvenc', 'NVIDIA NVENC H.264',
+    build=_nvenc_params,
+    quality=72, default_fps_profile={1080: 600, 2160: 180}, max_sessions=4,
+    platforms=('Windows', 'Linux'), hardware='cuda', preset='p1', codec='h264'
+))
+
+register(Encoder(
+    'h264_qsv', 'Intel Quick Sync H.264',
+    build=_qsv_params,
+    quality=70, default_fps_profile={1080: 400, 2160: 110}, max_sessions=4,
+    platforms=('Windows', 'Linux'), hardware='qsv', preset='veryfast', codec='h264'
+))
+
+register(Encoder(
+    'h264_vaapi', 'VA-API H.264',
+    build=_vaapi_params,
+    quality=66, default_fps_profile={1080: 350, 2160: 95}, max_sessions=4,
+    platforms=('Linux',), hardware='vaapi', codec='h264',
+    probe_args=['-vaapi_device', '/dev/dri/renderD128', '-vf', 'format=nv12,hwupload']
+))
+
+register(Encoder(
+    'h264_videotoolbox', 'VideoToolbox H.264 (macOS)',
+    build=_videotoolbox_params,
+    quality=69, default_fps_profile={1080: 450, 2160: 120}, max_sessions=4,
+    platforms=('Darwin',), hardware='videotoolbox', codec='h264'
+))
+
+
+def list_ffmpeg_encoders():
+    """Noms des encodeurs compilés dans FFmpeg (ensemble vide si FFmpeg est absent)."""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-encoders'],
+            capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    names = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].startswith('V'):
+            names.add(parts[1])
+    return names
+
+
+def list_ffmpeg_hwaccels():
+    """Méthodes de décodage matériel de FFmpeg (ffmpeg -hwaccels)."""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-hwaccels'],
+            capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    return {line.strip() for line in result.stdout.splitlines()[1:] if line.strip()}
+
+
+def list_ffmpeg_filters():
+    """Noms des filtres de FFmpeg (ffmpeg -filters)."""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-filters'],
+            capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    names = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and '->' in parts[2]:
+            names.add(parts[1])
+    return names
+
+
+# Filtre d'overlay GPU et profil associé, par famille matérielle
+GPU_OVERLAYS = {
+    'cuda': ('overlay_cuda', 'cuda_overlay'),
+    'vaapi': ('overlay_vaapi', 'vaapi'),
+    'qsv': ('overlay_qsv', 'qsv')
+}
+
+# Profil de repli sans décodage matériel (overlay CPU, l'encodeur VA-API exige un envoi GPU)
+GPU_FALLBACKS = {
+    'cuda': 'software',
+    'vaapi': 'vaapi_upload',
+    'qsv': 'software'
+}
+
+
+def hwaccel_profile(encoder, hwaccels=None, filters=None):
+    """
+    Profil de décodage/composition du pipeline pour un encodeur (HWACCEL_PROFILES).
+
+    Le décodage matériel n'est utilisé qu'avec l'encodeur de la même famille
+    et seulement si FFmpeg le propose. Quand le filtre d'overlay GPU existe
+    (overlay_cuda, overlay_vaapi, overlay_qsv), les images restent en mémoire
+    GPU; sinon l'overlay est fait sur CPU. Logiciel dans tous les autres cas.
+
+    Args:
+        encoder: Encoder du registre
+        hwaccels: Méthodes disponibles (list_ffmpeg_hwaccels() si None)
+        filters: Filtres disponibles (list_ffmpeg_filters() si None)
+    """
+    hardware = encoder.hardware
+    if hardware is None:
+        return 'software'
+    hwaccels = list_ffmpeg_hwaccels() if hwaccels is None else set(hwaccels)
+    if hardware == 'videotoolbox':
+        return 'videotoolbox' if 'videotoolbox' in hwaccels else 'software'
+
+    if hardware in hwaccels:
+        filters = list_ffmpeg_filters() if filters is None else set(filters)
+        overlay_filter, profile = GPU_OVERLAYS[hardware]
+        if overlay_filter in filters:
+            return profile
+        if hardware == 'cuda':
+            # Décodage NVDEC conservé, overlay CPU (aller-retour hwdownload/hwupload)
+            return 'cuda'
+    return GPU_FALLBACKS[hardware]
+
+
+def probe_encoder(encoder):
+    """Vérifie qu'un encodeur matériel s'initialise (une image de test)."""
+    cmd = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', 'color=c=black:s=256x256:d=0.1',
+        '-frames:v', '1', *encoder.probe_args,
+        '-c:v', encoder.name, '-f', 'null', '-'
+    ]
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=10).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+def available_encoders(compiled=None, system=None):
+    """
+    Encodeurs du registre présents dans FFmpeg et supportés par le système.
+
+    Args:
+        compiled: Noms des encodeurs FFmpeg (list_ffmpeg_encoders() si None)
+        system: Système (platform.system() si None)
+    """
+    compiled = list_ffmpeg_encoders() if compiled is None else set(compiled)
+    system = system or platform.system()
+    return [encoder for encoder in ENCODERS.values()
+            if encoder.name in compiled and encoder.supports_platform(system)]
+
+
+def rank_encoders(encoders, quality_target=0, width=3840, height=2160):
+    """
+    Classe les encodeurs du plus rapide au plus lent parmi ceux qui atteignent la qualité.
+
+    Si aucun n'atteint la qualité demandée, les plus qualitatifs passent en premier.
+    """
+    meeting = [e for e in encoders if e.quality >= quality_target]
+    if not meeting:
+        return sorted(encoders, key=lambda e: -e.quality)
+    return sorted(meeting, key=lambda e: -e.fps_for(width, height))
+
+
+# Encodeur logiciel de dernier recours pour chaque format
+SOFTWARE_FALLBACKS = {
+    'h264': 'libx264',
+    'hevc': 'libx265',
+    'av1': 'libsvtav1'
+}
+
+
+def select_encoder(quality_target=0, width=3840, height=2160, compiled=None, system=None,
+                   probe=probe_encoder, codec=None):
+    """
+    Sélectionne l'encodeur disponible le plus rapide qui atteint la qualité demandée.
+
+    Les encodeurs matériels sont testés (probe) avant d'être retenus: un encodeur
+    compilé dans FFmpeg n'implique pas que le matériel soit présent.
+
+    Args:
+        codec: Format imposé ('h264', 'hevc', 'av1'), ex: segments rendus sur plusieurs machines
+
+    Returns:
+        Encoder (libx264, ou l'encodeur logiciel du format imposé, en dernier recours)
+    """
+    encoders = available_encoders(compiled, system)
+    if codec:
+        encoders = [encoder for encoder in encoders if encoder.codec == codec]
+    for encoder in rank_encoders(encoders, quality_target, width, height):
+        if encoder.hardware is None or probe(encoder):
+            return encoder
+    return ENCODERS[SOFTWARE_FALLBACKS.get(codec, 'libx264')]
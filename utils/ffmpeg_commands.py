@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Construction des commandes FFmpeg du pipeline de segments.
+Fonctions pures (aucun appel à FFmpeg) pour pouvoir être testées sans GPU.
+"""
+
+import shutil
+from pathlib import Path
+
+# Modes de traitement de l'audio
+# - copy:     audio copié dans chaque segment (coupé sur une frontière de paquet)
+# - separate: segments sans audio, audio extrait en une passe par source et muxé à la fin
+AUDIO_MODES = ('copy', 'separate')
+
+# Formats de segments intermédiaires supportés
+# - mp4: segments MP4 classiques, assemblés par le demuxer concat
+# - ts:  segments MPEG-TS avec timestamps pré-calculés, assemblés octet par octet
+SEGMENT_FORMATS = ('mp4', 'ts')
+
+# Hauteur des vidéos d'aperçu (vérification rapide des scores)
+PREVIEW_HEIGHT = 540
+
+# Profils de décodage/composition selon les capacités détectées
+# - input:    options de décodage matériel de la source (et périphérique des filtres)
+# - download: filtre de rapatriement des images en mémoire système (avant l'overlay)
+# - prepare:  filtre appliqué aux entrées overlay (envoi unique sur le GPU)
+# - overlay:  filtre d'incrustation ({x}, {y}: position)
+# - scale:    redimensionnement des images composées ({w}, {h}), sur le GPU si elles y sont
+# - upload:   filtre de sortie vers l'encodeur
+HWACCEL_PROFILES = {
+    # CPU seul: décodage, overlay et encodage logiciels
+    'software': {
+        'input': [],
+        'download': '',
+        'prepare': '',
+        'overlay': 'overlay={x}:{y}',
+        'scale': 'scale={w}:{h}',
+        'upload': 'format=yuv420p'
+    },
+    # NVIDIA: décodage NVDEC, overlay CPU, réupload pour NVENC
+    'cuda': {
+        'input': ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda'],
+        'download': 'hwdownload,format=nv12',
+        'prepare': '',
+        'overlay': 'overlay={x}:{y}',
+        'scale': 'scale={w}:{h}',
+        'upload': 'format=nv12,hwupload_cuda'
+    },
+    # NVIDIA: images en mémoire GPU de bout en bout, overlay envoyé une fois (overlay_cuda)
+    'cuda_overlay': {
+        'input': ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda'],
+        'download': '',
+        'prepare': 'format=yuva420p,hwupload_cuda',
+        'overlay': 'overlay_cuda=x={x}:y={y}',
+        'scale': 'scale_cuda={w}:{h}',
+        'upload': ''
+    },
+    # VA-API (Intel/AMD sous Linux): décodage et overlay sur le GPU (overlay_vaapi)
+    'vaapi': {
+        'input': ['-init_hw_device', 'vaapi=va:/dev/dri/renderD128', '-filter_hw_device', 'va',
+                  '-hwaccel', 'vaapi', '-hwaccel_device', 'va', '-hwaccel_output_format', 'vaapi'],
+        'download': '',
+        'prepare': 'format=bgra,hwupload',
+        'overlay': 'overlay_vaapi=x={x}:y={y}',
+        'scale': 'scale_vaapi=w={w}:h={h}',
+        'upload': ''
+    },
+    # VA-API sans overlay_vaapi: composition CPU, envoi au GPU pour l'encodeur
+    'vaapi_upload': {
+        'input': ['-init_hw_device', 'vaapi=va:/dev/dri/renderD128', '-filter_hw_device', 'va'],
+        'download': '',
+        'prepare': '',
+        'overlay': 'overlay={x}:{y}',
+        'scale': 'scale={w}:{h}',
+        'upload': 'format=nv12,hwupload'
+    },
+    # Intel Quick Sync: décodage et overlay sur le GPU (overlay_qsv)
+    'qsv': {
+        'input': ['-init_hw_device', 'qsv=qs', '-filter_hw_device', 'qs',
+                  '-hwaccel', 'qsv', '-hwaccel_device', 'qs', '-hwaccel_output_format', 'qsv'],
+        'download': '',
+        'prepare': 'format=bgra,hwupload=extra_hw_frames=16',
+        'overlay': 'overlay_qsv=x={x}:y={y}',
+        'scale': 'scale_qsv=w={w}:h={h}',
+        'upload': ''
+    },
+    # macOS: décodage VideoToolbox (images rapatriées automatiquement)
+    'videotoolbox': {
+        'input': ['-hwaccel', 'videotoolbox'],
+        'download': '',
+        'prepare': '',
+        'overlay': 'overlay={x}:{y}',
+        'scale': 'scale={w}:{h}',
+        'upload': 'format=nv12'
+    }
+}
+
+
+def segment_extension(segment_format):
+    """Retourne l'extension de fichier d'un segment selon son format."""
+    if segment_format not in SEGMENT_FORMATS:
+        raise ValueError(f"Format de segment inconnu: {segment_format}")
+    return '.ts' if segment_format == 'ts' else '.mp4'
+
+
+def compute_segment_offsets(clips, fps, rendered=None):
+    """
+    Calcule la position de chaque segment dans la vidéo finale.
+
+    Args:
+        clips: Liste des clips (avec 'duration_frames')
+        fps: Framerate de la timeline
+        rendered: Indices (à partir de 1) des clips rendus, None = tous; les autres
+            (source introuvable) n'occupent aucune place dans la vidéo finale
+
+    Returns:
+        Liste des offsets en secondes (un par clip)
+    """
+    offsets = []
+    total_frames = 0
+    for i, clip in enumerate(clips, 1):
+        offsets.append(total_frames / fps)
+        if rendered is None or i in rendered:
+            total_frames += clip['duration_frames']
+    return offsets
+
+
+def build_segment_command(video_file, overlay_path, segment_path, start_time, duration,
+                          video_params, segment_format='mp4', ts_offset=None, audio=True,
+                          transition=None, overlay_frame=None, overlay_rate=1, overlay_position=(0, 0),
+                          hwaccel='software', scale=None, keyframes_only=False, renditions=None,
+                          keyframe_frames=None):
+    """
+    Construit la commande FFmpeg d'un segment avec overlay.
+
+    Args:
+        video_file: Fichier vidéo source
+        overlay_path: PNG de l'overlay, ou piste d'overlays (avec overlay_frame)
+        segment_path: Fichier de sortie du segment
+        start_time: Début du segment dans la source (secondes)
+        duration: Durée du segment (secondes)
+        video_params: Paramètres d'encodage vidéo ('-c:v', ...)
+        segment_format: 'mp4' ou 'ts'
+        ts_offset: Position du segment dans la vidéo finale (secondes, format 'ts')
+        audio: Copier l'audio dans le segment (False si l'audio est traité à part)
+        transition: Clip d'animation du score (chemin, x, y) joué au début du segment
+        overlay_frame: Image de la piste d'overlays à afficher (None pour un PNG)
+        overlay_rate: Cadence de la piste d'overlays (images/s): l'image n est à t = n / rate
+        overlay_position: Position (x, y) de l'overlay dans la vidéo
+        hwaccel: Profil de décodage/composition (clé de HWACCEL_PROFILES)
+        scale: Taille de sortie (largeur, hauteur), None = résolution de la source
+        keyframes_only: Ne décoder que les images clés de la source (-skip_frame nokey, aperçu)
+        renditions: Sorties supplémentaires de la même composition, réduites:
+            liste de (fichier, (largeur, hauteur), paramètres d'encodage vidéo)
+        keyframe_frames: Image clé imposée toutes les N images (découpe HLS en segments
+            courts, identique pour toutes les versions), None = choix de l'encodeur
+
+    Returns:
+        Liste d'arguments pour subprocess
+    """
+    if hwaccel not in HWACCEL_PROFILES:
+        raise ValueError(f"Profil d'accélération inconnu: {hwaccel}")
+    if keyframes_only and hwaccel != 'software':
+        raise ValueError("keyframes_only n'est possible qu'avec le décodage logiciel")
+    profile = HWACCEL_PROFILES[hwaccel]
+
+    filter_graph = ''
+    overlay_input = '[1:v]'
+    overlay_chain = []
+    if profile['prepare']:
+        overlay_chain.append(profile['prepare'])
+    if overlay_chain:
+        filter_graph += f"[1:v]{','.join(overlay_chain)}[ov];"
+        overlay_input = '[ov]'
+
+    base = '[0:v]'
+    base_chain = [profile['download']] if profile['download'] else []
+    if scale:
+        base_chain.append(profile['scale'].format(w=scale[0], h=scale[1]))
+    if base_chain:
+        filter_graph += f"[0:v]{','.join(base_chain)}[base];"
+        base = '[base]'
+
+    x, y = overlay_position
+    filter_graph += base + overlay_input + profile['overlay'].format(x=x, y=y)
+    inputs = ['-i', str(video_file)]
+    if overlay_frame is not None:
+        # Accès direct à l'image de la piste (toutes des images clés): lecture d'une seule
+        # image, répétée pendant tout le segment (eof_action=repeat de overlay); select
+        # décoderait toutes les images qui la précèdent (voir utils/overlay_track.py)
+        inputs.extend(['-ss', f'{overlay_frame / overlay_rate:g}', '-t', f'{0.5 / overlay_rate:g}'])
+    inputs.extend(['-i', str(overlay_path)])
+    if transition:
+        # Animation par-dessus l'overlay fixe du nouvel état, puis disparaît (eof_action=pass)
+        clip_path, clip_x, clip_y = transition
+        inputs.extend(['-i', str(clip_path)])
+        clip_input = '[2:v]'
+        if profile['prepare']:
+            filter_graph += f"[score];[2:v]{profile['prepare']}[clip]"
+            clip_input = '[clip]'
+        else:
+            filter_graph += '[score]'
+        filter_graph += (f";[score]{clip_input}"
+                         f"{profile['overlay'].format(x=clip_x, y=clip_y)}:eof_action=pass")
+    renditions = renditions or []
+    upload = f",{profile['upload']}" if profile['upload'] else ''
+    if renditions:
+        # Composition unique, dupliquée puis réduite pour chaque sortie supplémentaire
+        branches = ''.join(f'[r{k}]' for k in range(1, len(renditions) + 1))
+        filter_graph += f",split={len(renditions) + 1}[r0]{branches}"
+        filter_graph += f";[r0]{upload.lstrip(',') or 'null'}[out]"
+        for k, (_, (width, height), _) in enumerate(renditions, 1):
+            filter_graph += f";[r{k}]{profile['scale'].format(w=width, h=height)}{upload}[out{k}]"
+    else:
+        filter_graph += f"{upload}[out]"
+
+    cmd = [
+        'ffmpeg',
+        *profile['input'],
+        *(['-skip_frame', 'nokey'] if keyframes_only else []),
+        '-ss', str(start_time),
+        *inputs,
+        '-filter_complex', filter_graph,
+    ]
+    outputs = [('[out]', segment_path, video_params)]
+    outputs += [(f'[out{k}]', path, params) for k, (path, _, params) in enumerate(renditions, 1)]
+    for label, path, params in outputs:
+        cmd.extend(['-map', label])
+        if audio:
+            # Audio de la source: copie directe (pas de réencodage)
+            cmd.extend(['-map', '0:a?'])
+        cmd.extend(['-t', str(duration)])
+        cmd.extend(params)
+        if keyframe_frames:
+            cmd.extend(['-force_key_frames', f'expr:eq(mod(n,{keyframe_frames}),0)'])
+        cmd.extend(['-c:a', 'copy'] if audio else ['-an'])
+
+        if segment_format == 'ts':
+            # Timestamps déjà décalés: l'assemblage final est une simple jointure d'octets
+            cmd.extend(['-f', 'mpegts', '-muxdelay', '0', '-muxpreload', '0'])
+            if ts_offset:
+                cmd.extend(['-output_ts_offset', f'{ts_offset:.6f}'])
+
+        cmd.extend(['-y', str(path)])
+    return cmd
+
+
+def build_rgba_clip_command(output_path, size, fps, all_keyframes=False):
+    """
+    Construit la commande d'encodage d'un clip RGBA (transition, piste d'overlays).
+
+    Les images RGBA arrivent sur l'entrée standard (rawvideo) et sont encodées
+    en QuickTime Animation (qtrle), qui conserve la transparence.
+    all_keyframes: chaque image est une image clé (accès direct à n'importe quelle image)
+    """
+    width, height = size
+    cmd = [
+        'ffmpeg',
+        '-loglevel', 'error',
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgba',
+        '-s', f'{width}x{height}',
+        '-r', str(fps),
+        '-i', '-',
+        '-c:v', 'qtrle',
+        '-pix_fmt', 'argb',
+    ]
+    if all_keyframes:
+        cmd.extend(['-g', '1'])
+    cmd.extend(['-y', str(output_path)])
+    return cmd
+
+
+def build_title_card_command(text_path, output_path, size, fps, duration, video_params,
+                             color, audio_format=None, hwaccel='software'):
+    """
+    Construit la commande d'un carton titre: fond uni (lavfi color), texte par-dessus
+    et silence (lavfi anullsrc), sans lire aucune source.
+
+    Args:
+        text_path: PNG du texte (fond transparent), à la taille de la vidéo
+        output_path: Fichier de sortie (MP4)
+        size: Taille (largeur, hauteur)
+        fps: Cadence des segments (images/s)
+        duration: Durée du carton (secondes)
+        video_params: Paramètres d'encodage vidéo des segments ('-c:v', ...)
+        color: Couleur du fond (syntaxe FFmpeg, ex: '0x25425e')
+        audio_format: (codec, fréquence, disposition des canaux) de l'audio des segments
+            (ex: ('aac', 48000, 'stereo')) pour un silence
+            joignable sans réencodage, None = pas d'audio
+        hwaccel: Profil des segments: seul l'envoi vers l'encodeur compte (images CPU)
+
+    Returns:
+        Liste d'arguments pour subprocess
+    """
+    if hwaccel not in HWACCEL_PROFILES:
+        raise ValueError(f"Profil d'accélération inconnu: {hwaccel}")
+    # Images produites sur CPU: l'encodeur VA-API est le seul à exiger un envoi GPU
+    profile = HWACCEL_PROFILES['vaapi_upload' if hwaccel.startswith('vaapi') else 'software']
+    width, height = size
+    cmd = [
+        'ffmpeg',
+        *profile['input'],
+        '-f', 'lavfi', '-i', f'color=c={color}:s={width}x{height}:r={fps}:d={duration}',
+        '-i', str(text_path),
+    ]
+    if audio_format:
+        codec, sample_rate, layout = audio_format
+        cmd.extend(['-f', 'lavfi', '-i', f'anullsrc=r={sample_rate}:cl={layout}'])
+    cmd.extend([
+        '-filter_complex', f"[0:v][1:v]overlay=0:0,{profile['upload']}[out]",
+        '-map', '[out]',
+    ])
+    if audio_format:
+        cmd.extend(['-map', '2:a'])
+    cmd.extend(['-t', str(duration), *video_params])
+    if audio_format:
+        cmd.extend(['-c:a', codec])
+    else:
+        cmd.append('-an')
+    cmd.extend(['-y', str(output_path)])
+    return cmd
+
+
+def build_hls_split_command(segment_path, pattern, list_path, frames, total_frames, start_number=0):
+    """
+    Construit la commande de découpe d'un segment MPEG-TS en segments HLS courts.
+
+    Copie de flux: la découpe tombe sur les images clés imposées toutes les
+    `frames` images (build_segment_command, keyframe_frames); les timestamps
+    sont conservés (continuité entre les segments de toute la vidéo).
+
+    Args:
+        segment_path: Segment MPEG-TS d'un job
+        pattern: Fichiers produits (motif printf, ex: 'match_%05d.ts')
+        list_path: Liste CSV des fichiers produits (nom, début, fin en secondes)
+        frames: Nombre d'images par segment HLS
+        total_frames: Nombre d'images du segment du job
+        start_number: Numéro du premier fichier produit
+    """
+    cuts = ','.join(str(n) for n in range(frames, total_frames, frames)) or str(total_frames)
+    return [
+        'ffmpeg',
+        '-loglevel', 'error',
+        '-copyts',
+        '-i', str(segment_path),
+        '-map', '0',
+        '-c', 'copy',
+        '-muxdelay', '0', '-muxpreload', '0',
+        '-f', 'segment',
+        '-segment_format', 'mpegts',
+        '-segment_frames', cuts,
+        '-segment_start_number', str(start_number),
+        '-segment_list', str(list_path),
+        '-segment_list_type', 'csv',
+        '-y', str(pattern)
+    ]
+
+
+def build_thumbnail_command(video_file, times, thumbnail_dir, size, lookahead=10.0):
+    """
+    Construit la commande d'extraction des vignettes d'une source (planche de vérification).
+
+    Une seule lecture de la source, en ne décodant que les images clés: pour chaque
+    instant demandé, la première image clé à partir de cet instant est gardée (select),
+    réduite puis écrite dans thumbnail_dir. Le nom de chaque PNG est son instant
+    dans la source, en millisecondes (voir utils/contact_sheet.py:match_thumbnails).
+
+    Args:
+        times: Instants des vignettes dans la source (secondes)
+        thumbnail_dir: Dossier des PNG (un dossier par source)
+        size: (largeur, hauteur) des vignettes
+        lookahead: Lecture au-delà du dernier instant pour trouver son image clé (secondes)
+    """
+    width, height = size
+    seek = min(times)
+    span = max(times) - seek + lookahead
+    # Image gardée si un instant tombe entre l'image clé précédente (exclue) et elle
+    picks = '+'.join(f'gte(t,{t:.3f})*not(gte(prev_t,{t:.3f}))' for t in sorted(set(times)))
+    return [
+        'ffmpeg',
+        '-loglevel', 'error',
+        '-skip_frame', 'nokey',
+        '-ss', f'{seek:.3f}',
+        '-t', f'{span:.3f}',
+        '-copyts',
+        '-i', str(video_file),
+        '-vf', f"select='gt({picks},0)',scale={width}:{height}",
+        '-fps_mode', 'passthrough',
+        '-enc_time_base', '1/1000',
+        '-frame_pts', '1',
+        '-y', str(Path(thumbnail_dir) / '%d.png')
+    ]
+
+
+def _audio_mux_params(audio_path):
+    """Ajoute la piste audio externe (si présente) à une commande de copie de flux."""
+    if not audio_path:
+        return []
+    return ['-i', str(audio_path), '-map', '0:v', '-map', '1:a']
+
+
+def build_concat_command(concat_file, output_path, audio_path=None):
+    """Construit la commande de concaténation (demuxer concat, sans réencodage)."""
+    return [
+        'ffmpeg',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', str(concat_file),
+        *_audio_mux_params(audio_path),
+        '-c', 'copy',
+        '-y',
+        str(output_path)
+    ]
+
+
+def build_remux_command(input_path, output_path, audio_path=None):
+    """Construit la commande de remux d'un flux MPEG-TS vers un autre conteneur."""
+    return [
+        'ffmpeg',
+        '-i', str(input_path),
+        *_audio_mux_params(audio_path),
+        '-c', 'copy',
+        '-y',
+        str(output_path)
+    ]
+
+
+def build_stream_remux_command(output_path):
+    """Construit la commande de remux d'un flux MPEG-TS reçu sur l'entrée standard (copie de flux)."""
+    return [
+        'ffmpeg',
+        '-loglevel', 'error',
+        '-f', 'mpegts',
+        '-i', 'pipe:0',
+        '-c', 'copy',
+        '-y',
+        str(output_path)
+    ]
+
+
+def build_audio_filter(ranges):
+    """
+    Construit le filtergraph d'extraction audio de tous les clips.
+
+    Chaque source n'est ouverte qu'une fois: ses plages sont séparées par asplit,
+    coupées à l'échantillon près (atrim) puis mises bout à bout (concat).
+
+    Args:
+        ranges: Liste ordonnée de (fichier source, début, durée) en secondes;
+            source None pour un silence (carton titre)
+
+    Returns:
+        Tuple (liste des sources dans l'ordre des entrées, filtergraph)
+    """
+    sources = []
+    uses = {}
+    for source, _, _ in ranges:
+        if source is None:
+            continue
+        if source not in uses:
+            sources.append(source)
+            uses[source] = 0
+        uses[source] += 1
+
+    # Une étiquette par utilisation de chaque source
+    labels = {}
+    chains = []
+    for k, source in enumerate(sources):
+        if uses[source] == 1:
+            labels[source] = [f'{k}:a']
+        else:
+            labels[source] = [f'src{k}_{j}' for j in range(uses[source])]
+            outputs = ''.join(f'[{label}]' for label in labels[source])
+            chains.append(f'[{k}:a]asplit={uses[source]}{outputs}')
+
+    concat_inputs = ''
+    for n, (source, start, duration) in enumerate(ranges):
+        if source is None:
+            chains.append(f'anullsrc=r=48000:cl=stereo,atrim=duration={duration:.6f}[a{n}]')
+            concat_inputs += f'[a{n}]'
+            continue
+        label = labels[source].pop(0)
+        chains.append(
+            f'[{label}]atrim=start={start:.6f}:duration={duration:.6f},'
+            f'asetpts=PTS-STARTPTS,apad=whole_dur={duration:.6f}[a{n}]'
+        )
+        concat_inputs += f'[a{n}]'
+
+    chains.append(f'{concat_inputs}concat=n={len(ranges)}:v=0:a=1[aout]')
+    return sources, ';\n'.join(chains)
+
+
+def build_audio_command(sources, graph_path, audio_path, bitrate='192k'):
+    """Construit la commande d'extraction audio (une seule passe, un seul encodage AAC)."""
+    cmd = ['ffmpeg']
+    for source in sources:
+        cmd.extend(['-i', str(source)])
+    cmd.extend([
+        '-filter_complex_script', str(graph_path),
+        '-map', '[aout]',
+        '-c:a', 'aac',
+        '-b:a', bitrate,
+        '-y',
+        str(audio_path)
+    ])
+    return cmd
+
+
+def join_segments_bytes(segments, output_path, chunk_size=16 * 1024 * 1024, append=False):
+    """
+    Joint des segments MPEG-TS octet par octet (aucun demux/remux).
+
+    Les timestamps étant calculés à l'encodage, le résultat est un flux continu.
+    Avec append=True, les segments sont ajoutés à la fin d'un flux existant.
+
+    Returns:
+        Nombre d'octets écrits
+    """
+    written = 0
+    with open(output_path, 'ab' if append else 'wb') as out:
+        for seg in segments:
+            with open(seg, 'rb') as src:
+                shutil.copyfileobj(src, out, chunk_size)
+            written += Path(seg).stat().st_size
+    return written
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Sélection des meilleurs moments d'un match (montages courts).
+
+Un clip est retenu d'après les tags de sa colonne Commentaires, la situation
+de score qu'il affiche (balle de break, balle de set, tie-break...) ou un filtre
+libre sur son score. Le montage réutilise ensuite les segments déjà rendus
+(voir VideoOverlayAutomator.build_highlights).
+"""
+
+import re
+
+from PIL import Image, ImageDraw
+
+from utils.contact_sheet import load_caption_font
+
+# Situations de score reconnues (score affiché pendant le clip, avant le point)
+# - game_point:  une équipe gagne le jeu si elle marque (point décisif à 40/40)
+# - break_point: balle de jeu pour l'équipe qui reçoit (équipe au service connue)
+# - set_point:   balle de jeu qui donne le set
+# - match_point: balle de set pour une équipe qui a déjà gagné un set
+# - tiebreak:    point joué en tie-break (6/6) ou en super tie-break (3e set)
+SITUATIONS = ('game_point', 'break_point', 'set_point', 'match_point', 'tiebreak')
+
+# Rang des points d'un jeu classique
+POINT_RANKS = {'0': 0, '15': 1, '30': 2, '40': 3, 'AD': 4}
+
+# Durée par défaut du carton titre (secondes)
+TITLE_SECONDS = 2.0
+
+COLOR_TITLE_BACKGROUND = (37, 66, 94, 255)
+COLOR_TITLE_TEXT = (255, 255, 255, 255)
+
+
+def title_card_color():
+    """Couleur du fond du carton titre dans la syntaxe FFmpeg (ex: '0x25425e')."""
+    return '0x{:02x}{:02x}{:02x}'.format(*COLOR_TITLE_BACKGROUND[:3])
+
+
+def _pair(value):
+    """Sépare un score "eq1/eq2" en deux chaînes (None si le format est invalide)."""
+    if not isinstance(value, str) or '/' not in value:
+        return None
+    first, second = value.split('/', 1)
+    return first.strip().upper(), second.strip().upper()
+
+
+def _games(value):
+    pair = _pair(value)
+    if pair is None or not all(p.isdigit() for p in pair):
+        return None
+    return int(pair[0]), int(pair[1])
+
+
+def comment_tags(comment):
+    """Tags d'un commentaire: mots en minuscules, '#' facultatif ("#Smash, lob" -> {smash, lob})."""
+    return set(re.findall(r'\w+', str(comment or '').lower()))
+
+
+def sets_won(score):
+    """Sets gagnés par chaque équipe (sets terminés: différents des jeux en cours)."""
+    won = [0, 0]
+    for field in ('set1', 'set2'):
+        games = _games(score.get(field))
+        if games and score.get(field) != score.get('jeux') and games[0] != games[1]:
+            won[0 if games[0] > games[1] else 1] += 1
+    return won
+
+
+def games_played(score):
+    """Jeux joués avant le jeu en cours (sets terminés et set en cours)."""
+    total = sum(_games(score.get('jeux')) or (0, 0))
+    for field in ('set1', 'set2'):
+        if score.get(field) and score.get(field) != score.get('jeux'):
+            total += sum(_games(score[field]) or (0, 0))
+    return total
+
+
+def tiebreak_target(score):
+    """Points à atteindre si le point est joué en tie-break (7 ou 10), sinon None."""
+    games = _games(score.get('jeux'))
+    points = _pair(score.get('points'))
+    if games == (6, 6):
+        return 7
+    set_num = score.get('set')
+    # Super tie-break: 3e set joué en points (hors valeurs d'un jeu classique)
+    if (isinstance(set_num, int) and set_num >= 3 and games == (0, 0) and points
+            and all(p.isdigit() for p in points) and any(p not in POINT_RANKS for p in points)):
+        return 10
+    return None
+
+
+def game_point_teams(score):
+    """Équipes (1, 2) qui gagnent le jeu (ou le tie-break) si elles marquent le point."""
+    points = _pair(score.get('points'))
+    if points is None:
+        return set()
+    target = tiebreak_target(score)
+    teams = set()
+    for team, (mine, theirs) in ((1, points), (2, points[::-1])):
+        if target:
+            if mine.isdigit() and theirs.isdigit():
+                if int(mine) + 1 >= target and int(mine) + 1 - int(theirs) >= 2:
+                    teams.add(team)
+        elif mine in POINT_RANKS and theirs in POINT_RANKS:
+            r_mine, r_theirs = POINT_RANKS[mine], POINT_RANKS[theirs]
+            # 40/40: point décisif (golden point), balle de jeu pour les deux équipes
+            if r_mine == 4 or (r_mine == 3 and r_theirs <= 3):
+                teams.add(team)
+    return teams
+
+
+def server(score, first_server):
+    """Équipe au service du jeu en cours (alternance à chaque jeu depuis le début du match)."""
+    return first_server if games_played(score) % 2 == 0 else 3 - first_server
+
+
+def score_situations(score, first_server=None):
+    """
+    Situations de score d'un point (sous-ensemble de SITUATIONS).
+
+    first_server: Équipe (1 ou 2) au service du premier jeu du match; sans elle,
+    les balles de break ne sont pas détectées.
+    """
+    situations = set()
+    target = tiebreak_target(score)
+    if target:
+        situations.add('tiebreak')
+
+    teams = game_point_teams(score)
+    if not teams:
+        return situations
+    situations.add('game_point')
+
+    if first_server in (1, 2) and not target:
+        receiver = 3 - server(score, first_server)
+        if receiver in teams:
+            situations.add('break_point')
+
+    games = _games(score.get('jeux')) or (0, 0)
+    won = sets_won(score)
+    for team in teams:
+        mine, theirs = (games[0], games[1]) if team == 1 else (games[1], games[0])
+        if target or (mine + 1 >= 6 and mine + 1 - theirs >= 2):
+            situations.add('set_point')
+            # Super tie-break: le set décide du match
+            if won[team - 1] >= 1 or target == 10:
+                situations.add('match_point')
+    return situations
+
+
+def select_highlights(scores, tags=(), situations=(), score_filter=None, first_server=None):
+    """
+    Sélectionne les clips des meilleurs moments.
+
+    Un clip est retenu s'il remplit au moins un des critères donnés.
+
+    Args:
+        scores: Scores issus de parse_excel (un par clip)
+        tags: Tags recherchés dans la colonne Commentaires (insensibles à la casse)
+        situations: Situations de score (voir SITUATIONS)
+        score_filter: Fonction score -> bool, optionnelle
+        first_server: Équipe au service du premier jeu (requise pour 'break_point')
+
+    Returns:
+        Index des clips retenus (à partir de 1), dans l'ordre du match
+
+    Raises:
+        ValueError: situation inconnue, ou balles de break sans équipe au service
+    """
+    unknown = set(situations) - set(SITUATIONS)
+    if unknown:
+        raise ValueError(f"Situation de score inconnue: {', '.join(sorted(unknown))}")
+    if 'break_point' in situations and first_server not in (1, 2):
+        raise ValueError("Les balles de break demandent l'équipe au service du premier jeu (1 ou 2)")
+
+    wanted_tags = {tag.lstrip('#').lower() for tag in tags}
+    selected = []
+    for i, score in enumerate(scores, 1):
+        if (wanted_tags & comment_tags(score.get('commentaires'))
+                or set(situations) & score_situations(score, first_server)
+                or (score_filter and score_filter(score))):
+            selected.append(i)
+    return selected
+
+
+def render_title_card(width, height, title, subtitle=None, background=COLOR_TITLE_BACKGROUND):
+    """
+    Carton titre plein écran au début d'un montage.
+
+    background: couleur du fond, ou None pour le texte seul sur fond transparent
+    (le fond vient alors de FFmpeg, voir title_card_color)
+    """
+    img = Image.new('RGBA', (width, height), background or (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    lines = [(title, load_caption_font(max(12, height // 10)))]
+    if subtitle:
+        lines.append((subtitle, load_caption_font(max(10, height // 22))))
+
+    boxes = [draw.textbbox((0, 0), text, font=font) for text, font in lines]
+    spacing = height // 30
+    total = sum(box[3] - box[1] for box in boxes) + spacing * (len(lines) - 1)
+    y = (height - total) // 2
+    for (text, font), box in zip(lines, boxes):
+        draw.text(((width - (box[2] - box[0])) // 2 - box[0], y - box[1]), text,
+                  font=font, fill=COLOR_TITLE_TEXT)
+        y += box[3] - box[1] + spacing
+    return img
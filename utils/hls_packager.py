@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Publication HLS directement depuis les segments MPEG-TS.
+
+Les segments 'ts' portent déjà leurs timestamps dans la vidéo finale et
+commencent tous par une image clé. Chaque segment d'un job (un clip ou un
+morceau de clip) est découpé sans réencodage, sur des images clés imposées à
+intervalle fixe (SEGMENT_SECONDS), en segments HLS courts publiés dans le
+dossier de sortie dès que tous les précédents le sont: le début du match est
+lisible pendant que la suite s'encode (playlist EVENT, terminée par
+EXT-X-ENDLIST).
+
+La vidéo est en H.264 (le HEVC en MPEG-TS n'est pas lu par les lecteurs Apple).
+Avec des versions multiples (VideoOverlayAutomator.renditions), chaque version
+a sa playlist et une playlist maître les regroupe, avec débit, résolution et
+codecs de chaque version; les segments des versions sont issus du même split
+et ont donc les mêmes frontières d'images clés.
+"""
+
+import csv
+import json
+import math
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+from utils.ffmpeg_commands import build_hls_split_command
+
+HLS_VERSION = 3
+
+# Durée visée des segments HLS (secondes, recommandation Apple)
+SEGMENT_SECONDS = 6
+
+# Identifiants RFC 6381 des profils H.264 (profile_idc, contraintes) et des profils AAC
+H264_PROFILES = {
+    'Baseline': (0x42, 0x00),
+    'Constrained Baseline': (0x42, 0x40),
+    'Main': (0x4D, 0x00),
+    'High': (0x64, 0x00),
+    'High 10': (0x6E, 0x00),
+}
+AAC_PROFILES = {'LC': 'mp4a.40.2', 'HE-AAC': 'mp4a.40.5', 'HE-AACv2': 'mp4a.40.29'}
+
+
+def segment_frames(fps, seconds=SEGMENT_SECONDS):
+    """Nombre d'images d'un segment HLS (intervalle des images clés imposées)."""
+    return max(1, round(fps * seconds))
+
+
+def codec_string(stream):
+    """
+    Identifiant RFC 6381 d'un flux (attribut CODECS), d'après ffprobe.
+
+    Args:
+        stream: Dict ffprobe {'codec_name', 'profile', 'level'}
+
+    Returns:
+        Chaîne (ex: 'avc1.640028', 'mp4a.40.2'), ou None si le codec n'est pas reconnu
+    """
+    name = stream.get('codec_name')
+    if name == 'h264' and stream.get('profile') in H264_PROFILES:
+        profile_idc, constraints = H264_PROFILES[stream['profile']]
+        return f"avc1.{profile_idc:02x}{constraints:02x}{int(stream.get('level', 40)):02x}"
+    if name == 'aac':
+        return AAC_PROFILES.get(stream.get('profile'), 'mp4a.40.2')
+    return {'mp3': 'mp4a.40.34', 'ac3': 'ac-3', 'eac3': 'ec-3'}.get(name)
+
+
+def default_codecs(size):
+    """CODECS probable d'une version H.264 + AAC (niveau d'après la résolution)."""
+    height = size[1]
+    level = 31 if height <= 720 else 40 if height <= 1080 else 50 if height <= 1440 else 51
+    return f"avc1.6400{level:02x},mp4a.40.2"
+
+
+def probe_codecs(path):
+    """CODECS d'un segment publié (ffprobe), ou None si la sonde échoue."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'stream=codec_name,profile,level',
+             '-of', 'json', str(path)],
+            capture_output=True, text=True, timeout=10
+        )
+        streams = json.loads(result.stdout).get('streams', [])
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+    codecs = [codec_string(stream) for stream in streams]
+    if not codecs or None in codecs:
+        return None
+    return ','.join(codecs)
+
+
+def read_segment_list(list_path):
+    """Fichiers produits par la découpe (liste CSV du muxer segment): [(nom, durée en s)]."""
+    with open(list_path, newline='', encoding='utf-8') as f:
+        return [(row[0], float(row[2]) - float(row[1])) for row in csv.reader(f) if len(row) >= 3]
+
+
+def write_atomic(path, text):
+    """Écrit un fichier texte sans jamais exposer de version partielle aux lecteurs."""
+    path = Path(path)
+    partial = path.with_name(f"{path.name}.part")
+    partial.write_text(text, encoding='utf-8')
+    os.replace(partial, path)
+
+
+def media_playlist(entries, target_duration, ended):
+    """
+    Playlist média HLS.
+
+    Args:
+        entries: Liste de (nom du segment, durée en s), ou None pour une
+            discontinuité (segment manquant)
+        target_duration: Durée maximale d'un segment (secondes entières)
+        ended: True si la playlist est terminée (EXT-X-ENDLIST)
+    """
+    lines = [
+        '#EXTM3U',
+        f'#EXT-X-VERSION:{HLS_VERSION}',
+        f'#EXT-X-TARGETDURATION:{target_duration}',
+        '#EXT-X-MEDIA-SEQUENCE:0',
+        '#EXT-X-PLAYLIST-TYPE:EVENT',
+    ]
+    discontinuity = False
+    for entry in entries:
+        if entry is None:
+            discontinuity = True
+            continue
+        if discontinuity:
+            lines.append('#EXT-X-DISCONTINUITY')
+            discontinuity = False
+        name, duration = entry
+        lines.append(f'#EXTINF:{duration:.6f},')
+        lines.append(name)
+    if ended:
+        lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines) + '\n'
+
+
+def master_playlist(variants):
+    """
+    Playlist maître HLS.
+
+    Args:
+        variants: Liste de (nom de la playlist, (largeur, hauteur), débit crête en bits/s,
+            codecs RFC 6381 séparés par des virgules)
+    """
+    lines = ['#EXTM3U', f'#EXT-X-VERSION:{HLS_VERSION}']
+    for name, (width, height), bandwidth, codecs in variants:
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={max(1, bandwidth)},RESOLUTION={width}x{height},'
+                     f'CODECS="{codecs}"')
+        lines.append(name)
+    return '\n'.join(lines) + '\n'
+
+
+class HlsPackager:
+    """Publie les segments dans l'ordre de la timeline, au fur et à mesure, en playlists HLS."""
+
+    def __init__(self, output_path, segments, sizes, target_duration=None, fps=None):
+        """
+        Args:
+            output_path: Playlist de sortie (.m3u8): playlist maître s'il y a plusieurs
+                versions, sinon playlist média
+            segments: Liste de (clé, durée en s) des segments attendus, dans l'ordre de la vidéo
+            sizes: Taille de chaque version (la première est celle des segments principaux)
+            target_duration: Durée maximale d'un segment (s), si des segments sont ajoutés
+                plus tard (extend) sans découpe; par défaut d'après les segments attendus
+            fps: Cadence de la vidéo: chaque segment est découpé en segments HLS de
+                segment_frames(fps) images (images clés imposées à l'encodage);
+                None = segments publiés tels quels
+        """
+        self.output_path = Path(output_path)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.order = [key for key, _ in segments]
+        self.durations = dict(segments)
+        self.fps = fps
+        self.split_frames = segment_frames(fps) if fps else None
+        # Arrondi supérieur exigé par la spécification (fixé d'avance: playlist EVENT)
+        if self.split_frames:
+            self.target_duration = math.ceil(self.split_frames / fps - 1e-3)
+        else:
+            self.target_duration = target_duration or max(
+                1, math.ceil(max(self.durations.values(), default=1) - 1e-3))
+        self.position = 0
+        self.ready = {}
+        self.appended = 0
+        self.max_pending = 0
+
+        stem = self.output_path.stem
+        if len(sizes) == 1:
+            self.variants = [{'playlist': self.output_path, 'prefix': stem, 'size': sizes[0]}]
+        else:
+            self.variants = [{'playlist': self.output_path.with_name(f"{stem}_{height}p.m3u8"),
+                              'prefix': f"{stem}_{height}p", 'size': (width, height)}
+                             for width, height in sizes]
+        for variant in self.variants:
+            variant.update(entries=[], files=[], bandwidth=0, codecs=None, count=0)
+        self._write(ended=False)
+
+    @property
+    def complete(self):
+        """True si tous les segments attendus ont été traités (publiés ou ignorés)."""
+        return self.position == len(self.order)
+
+    @property
+    def master(self):
+        return len(self.variants) > 1
+
+    def extend(self, segments):
+        """Ajoute des segments attendus à la suite de la timeline (mode direct)."""
+        for key, duration in segments:
+            if not self.split_frames and round(duration) > self.target_duration:
+                print(f"⚠️  Segment {key} de {duration:.1f}s, au-delà de la durée cible HLS "
+                      f"({self.target_duration}s)")
+            self.order.append(key)
+            self.durations[key] = duration
+
+    def add(self, key, segment_paths):
+        """
+        Signale un segment terminé (un fichier par version); publie tous les
+        segments désormais dans l'ordre.
+        """
+        self.ready[key] = list(segment_paths)
+        self._flush()
+
+    def skip(self, key):
+        """Signale un segment qui ne sera pas produit (échec): discontinuité dans la playlist."""
+        self.ready[key] = None
+        self._flush()
+
+    def _flush(self):
+        published = False
+        while self.position < len(self.order) and self.order[self.position] in self.ready:
+            key = self.order[self.position]
+            paths = self.ready.pop(key)
+            self.position += 1
+            for k, variant in enumerate(self.variants):
+                if paths is None:
+                    variant['entries'].append(None)
+                    continue
+                for name, duration in self._publish(variant, key, paths[k]):
+                    destination = self.output_path.with_name(name)
+                    variant['entries'].append((name, duration))
+                    variant['files'].append(destination)
+                    variant['bandwidth'] = max(variant['bandwidth'],
+                                               round(destination.stat().st_size * 8 / max(duration, 1e-3)))
+                    if variant['codecs'] is None:
+                        variant['codecs'] = probe_codecs(destination) or default_codecs(variant['size'])
+            if paths is not None:
+                self.appended += 1
+            published = True
+        self.max_pending = max(self.max_pending, len(self.ready))
+        if published:
+            self._write(ended=False)
+
+    def _publish(self, variant, key, segment_path):
+        """
+        Place le segment d'un job dans le dossier de sortie (découpé si fps est connu).
+
+        Returns:
+            Liste de (nom du fichier publié, durée en s)
+
+        Raises:
+            RuntimeError: si la découpe échoue
+        """
+        segment_path = Path(segment_path)
+        number = variant['count']
+        if not self.split_frames:
+            name = f"{variant['prefix']}_{number:05d}.ts"
+            shutil.move(segment_path, self.output_path.with_name(name))
+            variant['count'] += 1
+            return [(name, self.durations[key])]
+
+        list_path = segment_path.with_suffix('.csv')
+        total_frames = round(self.durations[key] * self.fps)
+        result = subprocess.run(build_hls_split_command(
+            segment_path, self.output_path.with_name(f"{variant['prefix']}_%05d.ts"), list_path,
+            self.split_frames, total_frames, start_number=number
+        ), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Découpe HLS de {segment_path.name} échouée: {result.stderr}")
+        pieces = read_segment_list(list_path)
+        list_path.unlink(missing_ok=True)
+        segment_path.unlink(missing_ok=True)
+        variant['count'] += len(pieces)
+        return pieces
+
+    def _write(self, ended):
+        for variant in self.variants:
+            write_atomic(variant['playlist'],
+                         media_playlist(variant['entries'], self.target_duration, ended))
+        if self.master:
+            write_atomic(self.output_path, master_playlist(
+                [(v['playlist'].name, v['size'], v['bandwidth'], v['codecs'] or default_codecs(v['size']))
+                 for v in self.variants]))
+
+    def close(self):
+        """Termine les playlists (EXT-X-ENDLIST): la vidéo devient un VOD complet."""
+        self._write(ended=True)
+
+    def abort(self):
+        """Interrompt la publication (annulation): playlists et segments publiés sont supprimés."""
+        for variant in self.variants:
+            for path in variant['files']:
+                path.unlink(missing_ok=True)
+            variant['playlist'].unlink(missing_ok=True)
+        self.output_path.unlink(missing_ok=True)
@@ -6,21 +6,126 @@ Style basé sur l'exemple Overlay_précis2.png
 
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
+try:
+    import numpy as np
+except ImportError:  # numpy est optionnel (backend de rendu 'numpy')
+    np = None
+
+# Backends de rendu des ombres
+# - pillow: une couche RGBA + GaussianBlur + paste par case (référence)
+# - numpy:  masques de toutes les cases combinés, un seul flou séparable, un seul compositing
+# - auto:   numpy si disponible, sinon pillow
+RENDER_BACKENDS = ('pillow', 'numpy', 'auto')
+
+
+def parse_score(jeux_str, points_str):
+    """
+    Parse les scores depuis le format Excel.
+
+    Args:
+        jeux_str: String format "3/3" (jeux équipe1/équipe2)
+        points_str: String format "40/30" (points équipe1/équipe2)
+
+    Returns:
+        Tuple (jeux_eq1, jeux_eq2, points_eq1, points_eq2)
+    """
+    # Parser les jeux
+    if isinstance(jeux_str, str) and '/' in jeux_str:
+        jeux_parts = jeux_str.split('/')
+        jeux_eq1 = jeux_parts[0].strip()
+        jeux_eq2 = jeux_parts[1].strip() if len(jeux_parts) > 1 else "0"
+    else:
+        jeux_eq1, jeux_eq2 = "0", "0"
+
+    # Parser les points
+    if isinstance(points_str, str) and '/' in points_str:
+        points_parts = points_str.split('/')
+        points_eq1 = points_parts[0].strip()
+        points_eq2 = points_parts[1].strip() if len(points_parts) > 1 else "0"
+    else:
+        points_eq1, points_eq2 = "0", "0"
+
+    return jeux_eq1, jeux_eq2, points_eq1, points_eq2
+
+
+class GlyphAtlas:
+    """
+    Atlas de glyphes d'une police: masques alpha anti-aliasés et largeurs pré-mesurées.
+
+    Les textes du score (chiffres, 15/30/40, AD, tie-break) sont pré-rendus à la
+    création des atlas des polices de score; tout autre texte (noms d'équipes)
+    est rendu une fois puis mis en cache.
+    Afficher un texte revient alors à copier son masque dans l'image.
+    """
+
+    # Alphabet du score: jeux, points (0/15/30/40), tie-breaks et avantage
+    SCORE_ALPHABET = tuple(str(n) for n in range(100)) + ('A', 'AD')
+
+    def __init__(self, font, preload=SCORE_ALPHABET):
+        """
+        Args:
+            font: Police PIL (FreeType ou bitmap)
+            preload: Textes à pré-rendre
+        """
+        self.font = font
+        self.entries = {}
+        for text in preload:
+            self.get(text)
+
+    def get(self, text):
+        """
+        Retourne l'entrée d'un texte (rendue à la première demande).
+
+        Returns:
+            Tuple (masque 'L', (décalage x, décalage y), largeur)
+        """
+        entry = self.entries.get(text)
+        if entry is None:
+            left, top, right, bottom = self.font.getbbox(text)
+            mask = Image.new('L', (max(right - left, 0), max(bottom - top, 0)), 0)
+            if mask.width and mask.height:
+                ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=self.font)
+            entry = (mask, (left, top), right - left)
+            self.entries[text] = entry
+        return entry
+
+    def width(self, text):
+        """Largeur du texte (identique à textbbox)."""
+        return self.get(text)[2]
+
+    def draw(self, img, xy, text, fill):
+        """Copie le texte dans l'image (même rendu que ImageDraw.text à la position xy)."""
+        mask, (left, top), _ = self.get(text)
+        if mask.width and mask.height:
+            img.paste(fill, (xy[0] + left, xy[1] + top), mask)
+
 
 class PadelOverlayGenerator:
     """Génère des overlays de score style padel avec design professionnel."""
 
-    def __init__(self, width=3840, height=2160):
+    def __init__(self, width=3840, height=2160, backend='auto'):
         """
         Initialise le générateur d'overlay.
 
         Args:
             width: Largeur de l'image overlay (résolution vidéo)
             height: Hauteur de l'image overlay (résolution vidéo)
+            backend: Backend de rendu des ombres ('pillow', 'numpy' ou 'auto')
         """
         self.width = width
         self.height = height
 
+        if backend not in RENDER_BACKENDS:
+            raise ValueError(f"Backend de rendu inconnu: {backend}")
+        if backend == 'auto':
+            backend = 'numpy' if np is not None else 'pillow'
+        elif backend == 'numpy' and np is None:
+            raise ImportError("Le backend 'numpy' nécessite numpy (pip install numpy)")
+        self.backend = backend
+        self._corner_cache = {}
+        self._fonts = None
+        self._atlases = {}
+
         # Calculer le facteur d'échelle basé sur la résolution (4K = référence)
         # Supporte: 720p, 1080p, 1440p, 4K, et résolutions personnalisées
         self.scale_factor = min(width / 3840, height / 2160)
@@ -94,34 +199,25 @@ class PadelOverlayGenerator:
 
         return font_team, font_games, font_points
 
-    def parse_score(self, jeux_str, points_str):
-        """
-        Parse les scores depuis le format Excel.
-
-        Args:
-            jeux_str: String format "3/3" (jeux équipe1/équipe2)
-            points_str: String format "40/30" (points équipe1/équipe2)
+    def get_fonts(self):
+        """Retourne les polices (chargées une seule fois par générateur)."""
+        if self._fonts is None:
+            self._fonts = self.load_fonts()
+        return self._fonts
 
-        Returns:
-            Tuple (jeux_eq1, jeux_eq2, points_eq1, points_eq2)
+    def glyph_atlas(self, font, preload=GlyphAtlas.SCORE_ALPHABET):
         """
-        # Parser les jeux
-        if isinstance(jeux_str, str) and '/' in jeux_str:
-            jeux_parts = jeux_str.split('/')
-            jeux_eq1 = jeux_parts[0].strip()
-            jeux_eq2 = jeux_parts[1].strip() if len(jeux_parts) > 1 else "0"
-        else:
-            jeux_eq1, jeux_eq2 = "0", "0"
+        Retourne l'atlas de glyphes d'une police (créé une seule fois).
 
-        # Parser les points
-        if isinstance(points_str, str) and '/' in points_str:
-            points_parts = points_str.split('/')
-            points_eq1 = points_parts[0].strip()
-            points_eq2 = points_parts[1].strip() if len(points_parts) > 1 else "0"
-        else:
-            points_eq1, points_eq2 = "0", "0"
+        preload: Textes pré-rendus à la création (aucun pour la police des noms)
+        """
+        atlas = self._atlases.get(font)
+        if atlas is None:
+            atlas = self._atlases[font] = GlyphAtlas(font, preload)
+        return atlas
 
-        return jeux_eq1, jeux_eq2, points_eq1, points_eq2
+    # Parsing sans police ni générateur (utilisé aussi par la validation des entrées)
+    parse_score = staticmethod(parse_score)
 
     def draw_rounded_rectangle_with_shadow(self, draw, bounds, radius, fill, shadow_img):
         """Dessine un rectangle arrondi avec ombre portée."""
@@ -149,6 +245,239 @@ class PadelOverlayGenerator:
         # Dessiner le rectangle principal par-dessus
         draw.rounded_rectangle(bounds, radius=radius, fill=fill)
 
+    @staticmethod
+    def _box_blur_radius(sigma, passes=3):
+        """Rayon (fractionnaire) de flou boîte équivalent à un flou gaussien (comme Pillow)."""
+        sigma2 = sigma * sigma / passes
+        size = (12 * sigma2 + 1) ** 0.5
+        radius = int((size - 1) / 2)
+        extra = (2 * radius + 1) * (radius * (radius + 1) - 3 * sigma2)
+        extra /= 6 * (sigma2 - (radius + 1) * (radius + 1))
+        return radius + extra
+
+    def _blur_axis(self, array, axis, passes=3):
+        """
+        Flou gaussien le long d'un axe (3 passes de flou boîte par sommes cumulées).
+
+        La taille du tableau est conservée: il doit déjà contenir la marge du flou.
+        """
+        radius = self._box_blur_radius(self.shadow_blur, passes)
+        whole = int(radius)
+        frac = radius - whole
+        n = array.shape[axis]
+
+        def window(lo):
+            index = [slice(None)] * array.ndim
+            index[axis] = slice(lo, lo + n)
+            return tuple(index)
+
+        padding = [(0, 0)] * array.ndim
+        padding[axis] = (whole + 1, whole + 2)
+        for _ in range(passes):
+            padded = np.pad(array, padding)
+            cumsum = np.cumsum(padded, axis=axis, dtype=np.float32)
+            # Somme de la fenêtre [-whole, +whole] + fraction des deux voisins suivants
+            array = cumsum[window(2 * whole + 1)] - cumsum[window(0)]
+            array += frac * (padded[window(0)] + padded[window(2 * whole + 2)])
+            array /= 2 * radius + 1
+        return array
+
+    def _blur_2d(self, array):
+        """Flou gaussien séparable (lignes puis colonnes)."""
+        if self.shadow_blur <= 0:
+            return array
+        return self._blur_axis(self._blur_axis(array, 1), 0)
+
+    def _blurred_corners(self, radius, margin):
+        """
+        Zones retirées par les coins arrondis, déjà floutées (une par orientation).
+
+        Ne dépendent que du rayon: calculées une fois et réutilisées pour chaque case.
+
+        Returns:
+            Dict {(coin_droit, coin_bas): tableau numpy (radius + 2*margin)²}
+        """
+        key = (radius, margin, self.shadow_blur)
+        if key not in self._corner_cache:
+            # Coin haut-gauche: pixels du carré radius x radius hors du cercle
+            offsets = np.arange(radius, dtype=np.float32) - radius
+            cut = (offsets[None, :] ** 2 + offsets[:, None] ** 2 > radius * radius).astype(np.float32)
+            corners = {}
+            for right in (False, True):
+                for bottom in (False, True):
+                    patch = np.zeros((radius + 2 * margin, radius + 2 * margin), dtype=np.float32)
+                    oriented = cut[:, ::-1] if right else cut
+                    oriented = oriented[::-1, :] if bottom else oriented
+                    patch[margin:margin + radius, margin:margin + radius] = oriented
+                    corners[(right, bottom)] = self._blur_2d(patch)
+            self._corner_cache[key] = corners
+        return self._corner_cache[key]
+
+    def draw_shadows_numpy(self, img, boxes):
+        """
+        Dessine les ombres de toutes les cases en une seule passe vectorisée.
+
+        Les cases d'une même ligne partagent leurs lignes de pixels: leur masque
+        combiné est le produit d'un profil de colonnes et d'un profil de lignes,
+        moins les zones des coins arrondis. Le flou étant linéaire et séparable,
+        seuls ces profils 1D et les coins sont floutés, puis l'ombre est
+        compositée en une opération sur la zone du scoreboard.
+
+        Args:
+            img: Image RGBA cible
+            boxes: Liste de bornes [(x1, y1), (x2, y2)] (cases sans chevauchement)
+        """
+        if not boxes:
+            return
+        offset = self.shadow_offset
+        margin = 3 * self.shadow_blur + 2
+        shifted = [((x1 + offset, y1 + offset), (x2 + offset, y2 + offset))
+                   for (x1, y1), (x2, y2) in boxes]
+
+        # Zone de travail: boîte englobante des ombres (avec la marge du flou)
+        left = min(b[0][0] for b in shifted) - margin
+        top = min(b[0][1] for b in shifted) - margin
+        right = max(b[1][0] for b in shifted) + margin + 1
+        bottom = max(b[1][1] for b in shifted) + margin + 1
+        width, height = right - left, bottom - top
+
+        # Masques des rectangles: un profil de colonnes x un profil de lignes par rangée
+        rows_groups = {}
+        for (x1, y1), (x2, y2) in shifted:
+            rows_groups.setdefault((y1, y2), []).append((x1, x2))
+        shadow = np.zeros((height, width), dtype=np.float32)
+        for (y1, y2), spans in rows_groups.items():
+            columns = np.zeros((1, width), dtype=np.float32)
+            for x1, x2 in spans:
+                columns[0, x1 - left:x2 - left + 1] = 1.0
+            rows = np.zeros((height, 1), dtype=np.float32)
+            rows[y1 - top:y2 - top + 1, 0] = 1.0
+            shadow += self._blur_axis(rows, 0) * self._blur_axis(columns, 1)
+
+        # Retirer les coins arrondis (déjà floutés)
+        for (x1, y1), (x2, y2) in shifted:
+            radius = min(self.border_radius, (x2 - x1) // 2, (y2 - y1) // 2)
+            if radius <= 0:
+                continue
+            corners = self._blurred_corners(radius, margin)
+            for (is_right, is_bottom), patch in corners.items():
+                x0 = (x2 - radius + 1 if is_right else x1) - margin - left
+                y0 = (y2 - radius + 1 if is_bottom else y1) - margin - top
+                shadow[y0:y0 + patch.shape[0], x0:x0 + patch.shape[1]] -= patch
+
+        shadow *= self.color_shadow[3]
+
+        # Découper la zone aux limites de l'image
+        crop_left, crop_top = max(left, 0), max(top, 0)
+        crop_right, crop_bottom = min(right, self.width), min(bottom, self.height)
+        if crop_right <= crop_left or crop_bottom <= crop_top:
+            return
+        shadow = shadow[crop_top - top:crop_bottom - top, crop_left - left:crop_right - left]
+
+        # Compositing en une opération: même sémantique que paste(ombre, masque=alpha)
+        alpha = Image.fromarray(np.rint(np.clip(shadow, 0, 255)).astype(np.uint8), 'L')
+        layer = Image.new('RGBA', alpha.size, self.color_shadow[:3] + (0,))
+        layer.putalpha(alpha)
+        img.paste(layer, (crop_left, crop_top), layer)
+
+    def draw_boxes(self, img, draw, boxes):
+        """
+        Dessine les cases du scoreboard (ombre + rectangle arrondi) avec le backend choisi.
+
+        Args:
+            img: Image RGBA cible
+            draw: ImageDraw de l'image
+            boxes: Liste de (bornes, couleur de fond)
+        """
+        if self.backend == 'numpy':
+            self.draw_shadows_numpy(img, [bounds for bounds, _ in boxes])
+            for bounds, fill in boxes:
+                draw.rounded_rectangle(bounds, radius=self.border_radius, fill=fill)
+        else:
+            for bounds, fill in boxes:
+                self.draw_rounded_rectangle_with_shadow(
+                    draw, bounds, radius=self.border_radius, fill=fill, shadow_img=img
+                )
+
+    def layout(self, set1=None, set2=None):
+        """
+        Calcule la position des cases (96px du bord gauche, 241px du bas en 4K).
+
+        Noms des équipes, sets terminés (si présents, insérés avant les jeux),
+        jeux du set en cours puis points.
+
+        Returns:
+            Dict ordonné {case: [(x1, y1), (x2, y2)]} ('names', 'set1', 'set2', 'games', 'points')
+        """
+        y_start = self.height - self.y_offset_from_bottom - self.total_height
+        y_end = y_start + self.total_height
+
+        cells = {}
+        x_current = self.x_offset
+        for cell, width, present in (('names', self.names_width, True),
+                                     ('set1', self.set_width, bool(set1)),
+                                     ('set2', self.set_width, bool(set2)),
+                                     ('games', self.games_width, True),
+                                     ('points', self.points_width, True)):
+            if present:
+                cells[cell] = [(x_current, y_start), (x_current + width, y_end)]
+                x_current += width + self.spacing
+        return cells
+
+    def text_items(self, cells,
+                   team1_names="LÉO / YANNOUCK",
+                   team2_names="BILAL / PIERRE",
+                   jeux="3/3",
+                   points="40/30",
+                   set1=None,
+                   set2=None):
+        """
+        Liste les textes de l'overlay avec leur position.
+
+        Args:
+            cells: Cases calculées par layout()
+
+        Returns:
+            Liste de tuples (case, ligne, atlas, (x, y), texte, couleur)
+        """
+        font_team, font_games, font_points = self.get_fonts()
+        atlas_team = self.glyph_atlas(font_team, preload=())
+        atlas_games = self.glyph_atlas(font_games)
+        atlas_points = self.glyph_atlas(font_points)
+
+        jeux_eq1, jeux_eq2, points_eq1, points_eq2 = self.parse_score(jeux, points)
+        rows = {
+            'names': (team1_names.upper(), team2_names.upper()),
+            'games': (jeux_eq1, jeux_eq2),
+            'points': (points_eq1, points_eq2)
+        }
+        for cell, set_score in (('set1', set1), ('set2', set2)):
+            if cell in cells:
+                rows[cell] = self.parse_score(set_score, "0/0")[0:2]
+
+        # Positions Y pour chaque ligne: (atlas, couleur, ajustement vertical)
+        y_rows = (10, self.row_height + 12)
+        styles = {
+            'names': (atlas_team, self.color_text_white, 0),
+            'set1': (atlas_points, self.color_text_white, -5),
+            'set2': (atlas_points, self.color_text_white, -5),
+            'games': (atlas_games, self.color_text_black, -5),
+            'points': (atlas_points, self.color_text_white, -3)
+        }
+
+        items = []
+        for cell, ((x1, y1), (x2, _)) in cells.items():
+            atlas, fill, dy = styles[cell]
+            for row, text in enumerate(rows[cell]):
+                y = y1 + y_rows[row] + dy
+                if cell == 'names':
+                    x = x1 + 15
+                else:
+                    # Centré dans la case
+                    x = x1 + (x2 - x1 - atlas.width(text)) // 2
+                items.append((cell, row, atlas, (x, y), text, fill))
+        return items
+
     def create_overlay(self,
                       team1_names="LÉO / YANNOUCK",
                       team2_names="BILAL / PIERRE",
@@ -174,222 +503,38 @@ class PadelOverlayGenerator:
         img = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
         draw = ImageDraw.Draw(img)
 
-        # Charger les polices
-        font_team, font_games, font_points = self.load_fonts()
+        # === POSITIONS DES CASES ===
+        cells = self.layout(set1, set2)
+        colors = {
+            'names': self.color_bg_teams,
+            'set1': self.color_bg_teams,
+            'set2': self.color_bg_teams,
+            'games': self.color_bg_games,
+            'points': self.color_bg_points
+        }
+        boxes = [(bounds, colors[cell]) for cell, bounds in cells.items()]
 
-        # Parser les scores
-        jeux_eq1, jeux_eq2, points_eq1, points_eq2 = self.parse_score(jeux, points)
-
-        # Calculer la hauteur totale avec les nouvelles dimensions
-        total_height = self.total_height
-
-        # Position selon les spécifications (96px du bord gauche, 241px du bas)
-        x_start = self.x_offset
-        y_start = self.height - self.y_offset_from_bottom - total_height
-
-        # === SECTION 1: NOMS DES ÉQUIPES (fond bleu marine) ===
-        x_names = x_start
-        self.draw_rounded_rectangle_with_shadow(
-            draw,
-            [(x_names, y_start),
-             (x_names + self.names_width, y_start + total_height)],
-            radius=self.border_radius,
-            fill=self.color_bg_teams,
-            shadow_img=img
-        )
-
-        # Position courante pour les sections suivantes
-        x_current = x_names + self.names_width + self.spacing
-
-        # === SETS TERMINÉS (si présents, insérés avant les jeux) ===
-        x_set1 = None
-        x_set2 = None
-
-        if set1:
-            x_set1 = x_current
-            self.draw_rounded_rectangle_with_shadow(
-                draw,
-                [(x_set1, y_start),
-                 (x_set1 + self.set_width, y_start + total_height)],
-                radius=self.border_radius,
-                fill=self.color_bg_teams,
-                shadow_img=img
-            )
-            x_current = x_set1 + self.set_width + self.spacing
-
-        if set2:
-            x_set2 = x_current
-            self.draw_rounded_rectangle_with_shadow(
-                draw,
-                [(x_set2, y_start),
-                 (x_set2 + self.set_width, y_start + total_height)],
-                radius=self.border_radius,
-                fill=self.color_bg_teams,
-                shadow_img=img
-            )
-            x_current = x_set2 + self.set_width + self.spacing
-
-        # === JEUX DU SET EN COURS (fond gris clair) ===
-        x_games = x_current
-        self.draw_rounded_rectangle_with_shadow(
-            draw,
-            [(x_games, y_start),
-             (x_games + self.games_width, y_start + total_height)],
-            radius=self.border_radius,
-            fill=self.color_bg_games,
-            shadow_img=img
-        )
-
-        # === POINTS (fond bleu marine) ===
-        x_points = x_games + self.games_width + self.spacing
-        self.draw_rounded_rectangle_with_shadow(
-            draw,
-            [(x_points, y_start),
-             (x_points + self.points_width, y_start + total_height)],
-            radius=self.border_radius,
-            fill=self.color_bg_points,
-            shadow_img=img
-        )
+        # === CASES (ombre portée + rectangle arrondi) ===
+        self.draw_boxes(img, draw, boxes)
 
         # === LIGNES DE SÉPARATION HORIZONTALES ===
-        sep_y = y_start + self.row_height + 7
-
-        # Séparation dans la section noms
-        draw.line(
-            [(x_names + 15, sep_y), (x_names + self.names_width - 15, sep_y)],
-            fill=self.color_separator,
-            width=2
-        )
-
-        # Séparation dans la section jeux
-        draw.line(
-            [(x_games + 20, sep_y), (x_games + self.games_width - 20, sep_y)],
-            fill=self.color_text_black,
-            width=2
-        )
-
-        # Séparation dans la section points
-        draw.line(
-            [(x_points + 20, sep_y), (x_points + self.points_width - 20, sep_y)],
-            fill=self.color_separator,
-            width=2
-        )
-
-        # Séparations dans les sets
-        if x_set1:
-            draw.line(
-                [(x_set1 + 15, sep_y), (x_set1 + self.set_width - 15, sep_y)],
-                fill=self.color_separator,
-                width=2
-            )
-        if x_set2:
-            draw.line(
-                [(x_set2 + 15, sep_y), (x_set2 + self.set_width - 15, sep_y)],
-                fill=self.color_separator,
-                width=2
-            )
-
-        # === TEXTES ===
-        # Positions Y pour chaque ligne (ajustées pour les nouvelles dimensions)
-        y1_offset = 10  # Équipe 1
-        y2_offset = self.row_height + 12  # Équipe 2
-
-        # ÉQUIPE 1 (ligne du haut)
-        # Noms
-        draw.text(
-            (x_names + 15, y_start + y1_offset),
-            team1_names.upper(),
-            fill=self.color_text_white,
-            font=font_team
-        )
-        # Jeux
-        jeux1_bbox = draw.textbbox((0, 0), jeux_eq1, font=font_games)
-        jeux1_width = jeux1_bbox[2] - jeux1_bbox[0]
-        draw.text(
-            (x_games + (self.games_width - jeux1_width) // 2, y_start + y1_offset - 5),
-            jeux_eq1,
-            fill=self.color_text_black,
-            font=font_games
-        )
-        # Points
-        points1_bbox = draw.textbbox((0, 0), points_eq1, font=font_points)
-        points1_width = points1_bbox[2] - points1_bbox[0]
-        draw.text(
-            (x_points + (self.points_width - points1_width) // 2, y_start + y1_offset - 3),
-            points_eq1,
-            fill=self.color_text_white,
-            font=font_points
-        )
-
-        # ÉQUIPE 2 (ligne du bas)
-        # Noms
-        draw.text(
-            (x_names + 15, y_start + y2_offset),
-            team2_names.upper(),
-            fill=self.color_text_white,
-            font=font_team
-        )
-        # Jeux
-        jeux2_bbox = draw.textbbox((0, 0), jeux_eq2, font=font_games)
-        jeux2_width = jeux2_bbox[2] - jeux2_bbox[0]
-        draw.text(
-            (x_games + (self.games_width - jeux2_width) // 2, y_start + y2_offset - 5),
-            jeux_eq2,
-            fill=self.color_text_black,
-            font=font_games
-        )
-        # Points
-        points2_bbox = draw.textbbox((0, 0), points_eq2, font=font_points)
-        points2_width = points2_bbox[2] - points2_bbox[0]
-        draw.text(
-            (x_points + (self.points_width - points2_width) // 2, y_start + y2_offset - 3),
-            points_eq2,
-            fill=self.color_text_white,
-            font=font_points
-        )
-
-        # === SETS (si présents) ===
-        if set1 and x_set1:
-            set1_eq1, set1_eq2 = self.parse_score(set1, "0/0")[0:2]
-            # Set 1 équipe 1
-            set1_eq1_bbox = draw.textbbox((0, 0), set1_eq1, font=font_points)
-            set1_eq1_width = set1_eq1_bbox[2] - set1_eq1_bbox[0]
-            draw.text(
-                (x_set1 + (self.set_width - set1_eq1_width) // 2, y_start + y1_offset - 5),
-                set1_eq1,
-                fill=self.color_text_white,
-                font=font_points
-            )
-            # Set 1 équipe 2
-            set1_eq2_bbox = draw.textbbox((0, 0), set1_eq2, font=font_points)
-            set1_eq2_width = set1_eq2_bbox[2] - set1_eq2_bbox[0]
-            draw.text(
-                (x_set1 + (self.set_width - set1_eq2_width) // 2, y_start + y2_offset - 5),
-                set1_eq2,
-                fill=self.color_text_white,
-                font=font_points
-            )
-
-        if set2 and x_set2:
-            set2_eq1, set2_eq2 = self.parse_score(set2, "0/0")[0:2]
-            # Set 2 équipe 1
-            set2_eq1_bbox = draw.textbbox((0, 0), set2_eq1, font=font_points)
-            set2_eq1_width = set2_eq1_bbox[2] - set2_eq1_bbox[0]
-            draw.text(
-                (x_set2 + (self.set_width - set2_eq1_width) // 2, y_start + y1_offset - 5),
-                set2_eq1,
-                fill=self.color_text_white,
-                font=font_points
-            )
-            # Set 2 équipe 2
-            set2_eq2_bbox = draw.textbbox((0, 0), set2_eq2, font=font_points)
-            set2_eq2_width = set2_eq2_bbox[2] - set2_eq2_bbox[0]
-            draw.text(
-                (x_set2 + (self.set_width - set2_eq2_width) // 2, y_start + y2_offset - 5),
-                set2_eq2,
-                fill=self.color_text_white,
-                font=font_points
-            )
+        # (retrait et couleur par case: noms et sets 15px, jeux et points 20px)
+        separators = {
+            'names': (15, self.color_separator),
+            'set1': (15, self.color_separator),
+            'set2': (15, self.color_separator),
+            'games': (20, self.color_text_black),
+            'points': (20, self.color_separator)
+        }
+        for cell, ((x1, y1), (x2, _)) in cells.items():
+            inset, fill = separators[cell]
+            sep_y = y1 + self.row_height + 7
+            draw.line([(x1 + inset, sep_y), (x2 - inset, sep_y)], fill=fill, width=2)
+
+        # === TEXTES (blit depuis les atlas de glyphes) ===
+        for _, _, atlas, xy, text, fill in self.text_items(
+                cells, team1_names, team2_names, jeux, points, set1, set2):
+            atlas.draw(img, xy, text, fill)
 
         return img
 
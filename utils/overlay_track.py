@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Piste d'overlays: tous les scoreboards distincts d'un match dans un seul flux vidéo.
+
+Chaque état de score unique est rendu une seule fois et devient une image d'un
+clip QuickTime Animation (qtrle, avec alpha), recadré sur la zone du scoreboard.
+Les segments lisent tous ce même fichier et se positionnent directement sur
+leur image (-ss sur l'entrée, toutes les images sont des images clés): une
+seule entrée overlay, une seule image décodée, quelle que soit la longueur du
+match.
+
+Chaque segment est un processus FFmpeg distinct, qui ouvre donc de toute façon
+sa propre entrée overlay: le nombre d'entrées par commande est constant (une),
+que l'image soit choisie par -ss ou par select. select=eq(n,K),setpts=PTS-STARTPTS
+décoderait en plus les K premières images de la piste dans chaque segment; -ss
+n'en décode qu'une. select/setpts ne prendrait l'avantage que dans un rendu en
+une seule passe de tout le match (une commande pour tous les clips), que ce
+pipeline n'utilise pas.
+"""
+
+import json
+import subprocess
+
+from utils.ffmpeg_commands import build_rgba_clip_command
+
+# Source des overlays des segments
+# - png:   un PNG par segment (une entrée image par commande FFmpeg)
+# - track: une piste unique avec une image par état de score distinct
+OVERLAY_MODES = ('png', 'track')
+
+
+def encode_rgba_clip(images, clip_path, fps, all_keyframes=False):
+    """
+    Envoie des images RGBA à FFmpeg (rawvideo sur l'entrée standard) et encode un clip qtrle.
+
+    Raises:
+        RuntimeError: si FFmpeg échoue
+    """
+    cmd = build_rgba_clip_command(clip_path, images[0].size, fps, all_keyframes=all_keyframes)
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        for img in images:
+            process.stdin.write(img.tobytes())
+    finally:
+        process.stdin.close()
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise RuntimeError(f"Encodage du clip {clip_path} échoué: {stderr.decode(errors='replace')}")
+    return clip_path
+
+
+def _state_key(state):
+    """Clé hashable d'un état (arguments de create_overlay)."""
+    return tuple(sorted(state.items()))
+
+
+class OverlayTrack:
+    """Scoreboards uniques d'un match et correspondance clip -> image."""
+
+    # Cadence de la piste: une image par seconde, l'image n est à t = n
+    FRAME_RATE = 1
+
+    def __init__(self, generator, states, cache=None):
+        """
+        Args:
+            generator: PadelOverlayGenerator (même résolution que la vidéo)
+            states: Arguments de create_overlay de chaque clip, dans l'ordre
+            cache: Dict optionnel clé d'état -> image non recadrée, partagé entre
+                pistes successives (mode direct: seuls les nouveaux états sont rendus)
+        """
+        self.generator = generator
+        self.cache = {} if cache is None else cache
+        self.states = []     # États uniques, par ordre d'apparition
+        self.frames = []     # Index de l'image de chaque clip
+        index = {}
+        for state in states:
+            key = _state_key(state)
+            if key not in index:
+                index[key] = len(self.states)
+                self.states.append(state)
+            self.frames.append(index[key])
+        self.images = None
+        self.box = None
+
+    def render(self):
+        """
+        Rend chaque état unique une fois et recadre sur la zone commune.
+
+        Returns:
+            Rectangle (x1, y1, x2, y2) de la zone du scoreboard dans la vidéo
+        """
+        images = []
+        for state in self.states:
+            key = _state_key(state)
+            if key not in self.cache:
+                self.cache[key] = self.generator.create_overlay(**state)
+            images.append(self.cache[key])
+        boxes = [img.getchannel('A').getbbox() for img in images]
+        boxes = [box for box in boxes if box] or [(0, 0, 2, 2)]
+        self.box = (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                    max(b[2] for b in boxes), max(b[3] for b in boxes))
+        self.images = [img.crop(self.box) for img in images]
+        return self.box
+
+    @property
+    def position(self):
+        """Position (x, y) de la piste dans la vidéo."""
+        return self.box[0], self.box[1]
+
+    def encode(self, track_path):
+        """Encode les scoreboards uniques dans un clip qtrle (une image par état)."""
+        if self.images is None:
+            self.render()
+        # Chaque image est une image clé: l'accès direct à une image ne décode qu'elle
+        return encode_rgba_clip(self.images, track_path, self.FRAME_RATE, all_keyframes=True)
+
+    def timecode_map(self, offsets, durations):
+        """
+        Correspondance temps de la vidéo finale -> image de la piste.
+
+        Args:
+            offsets: Début de chaque clip dans la vidéo finale (secondes)
+            durations: Durée de chaque clip (secondes)
+
+        Returns:
+            Liste de dict {'clip', 'start', 'end', 'frame'} (un par clip)
+        """
+        return [
+            {'clip': i, 'start': round(start, 6), 'end': round(start + duration, 6), 'frame': frame}
+            for i, (start, duration, frame) in enumerate(zip(offsets, durations, self.frames), 1)
+        ]
+
+    def save_timecode_map(self, path, offsets, durations):
+        """Écrit la correspondance temps -> image en JSON (avec la position de la piste)."""
+        data = {
+            'position': list(self.position) if self.box else None,
+            'frame_rate': self.FRAME_RATE,
+            'entries': self.timecode_map(offsets, durations)
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        return path
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Contrôle des processus FFmpeg d'un traitement: annulation et pause.
+
+Chaque commande passe par ProcessControl.run(), qui garde la trace du processus
+enfant. Annuler tue les enfants en cours et empêche les jobs suivants de
+démarrer; la pause suspend les enfants (SIGSTOP sous POSIX, NtSuspendProcess
+sous Windows) et retient les jobs suivants jusqu'à la reprise.
+"""
+
+import ctypes
+import os
+import signal
+import subprocess
+import threading
+
+
+# Droit d'accès Windows nécessaire à NtSuspendProcess / NtResumeProcess
+PROCESS_SUSPEND_RESUME = 0x0800
+
+
+class ProcessingCancelled(Exception):
+    """Levée quand le traitement a été annulé."""
+
+
+def _windows_suspend(pid, resume=False):
+    """Suspend (ou reprend) tous les threads d'un processus Windows (API native de ntdll)."""
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_SUSPEND_RESUME, False, pid)
+    if not handle:
+        return
+    try:
+        if resume:
+            ctypes.windll.ntdll.NtResumeProcess(handle)
+        else:
+            ctypes.windll.ntdll.NtSuspendProcess(handle)
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def suspend_process(pid):
+    """Suspend un processus (SIGSTOP sous POSIX, NtSuspendProcess sous Windows)."""
+    try:
+        if hasattr(signal, 'SIGSTOP'):
+            os.kill(pid, signal.SIGSTOP)
+        else:
+            _windows_suspend(pid)
+    except (OSError, ProcessLookupError):
+        pass
+
+
+def resume_process(pid):
+    """Reprend un processus suspendu par suspend_process()."""
+    try:
+        if hasattr(signal, 'SIGCONT'):
+            os.kill(pid, signal.SIGCONT)
+        else:
+            _windows_suspend(pid, resume=True)
+    except (OSError, ProcessLookupError):
+        pass
+
+
+class ProcessControl:
+    """Annulation et pause coopératives des workers et de leurs processus FFmpeg."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        """True si l'annulation a été demandée."""
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        """True si le traitement est en pause."""
+        return not self._running.is_set()
+
+    @staticmethod
+    def can_suspend():
+        """Indique si les processus en cours peuvent être suspendus (POSIX ou Windows)."""
+        return hasattr(signal, 'SIGSTOP') or hasattr(ctypes, 'windll')
+
+    def check(self):
+        """
+        Point d'arrêt coopératif des workers: attend la reprise si en pause.
+
+        Raises:
+            ProcessingCancelled: si l'annulation a été demandée
+        """
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise ProcessingCancelled("Traitement annulé")
+
+    def wait(self, timeout):
+        """
+        Attente entre deux vérifications (mode direct), interrompue par l'annulation.
+
+        Raises:
+            ProcessingCancelled: si l'annulation a été demandée
+        """
+        self._cancelled.wait(timeout)
+        self.check()
+
+    def pause(self):
+        """
+        Met en pause: aucun nouveau job, processus en cours suspendus.
+
+        Sans suspension possible (can_suspend() False), les processus en cours
+        vont jusqu'au bout de leur segment; seuls les jobs suivants attendent.
+        """
+        with self._lock:
+            if self.paused or self.cancelled:
+                return
+            self._running.clear()
+            if self.can_suspend():
+                for process in self._processes:
+                    suspend_process(process.pid)
+
+    def resume(self):
+        """Reprend après une pause."""
+        with self._lock:
+            if not self.paused:
+                return
+            if self.can_suspend():
+                for process in self._processes:
+                    resume_process(process.pid)
+            self._running.set()
+
+    def cancel(self):
+        """Annule: tue immédiatement les processus en cours et libère les workers en attente."""
+        with self._lock:
+            self._cancelled.set()
+            if self.paused and self.can_suspend():
+                for process in self._processes:
+                    resume_process(process.pid)
+            for process in self._processes:
+                try:
+                    process.kill()
+                except OSError:
+                    pass
+            self._running.set()
+
+    def track(self, process):
+        """
+        Enregistre un processus lancé hors de run() (ex: moteur asyncio).
+
+        Le processus est annulé et suspendu avec les autres; il est tué tout de
+        suite si l'annulation a déjà été demandée.
+        """
+        with self._lock:
+            self._processes.add(process)
+            if self._cancelled.is_set():
+                process.kill()
+            elif self.paused and self.can_suspend():
+                suspend_process(process.pid)
+
+    def untrack(self, process):
+        """Oublie un processus terminé."""
+        with self._lock:
+            self._processes.discard(process)
+
+    def run(self, cmd):
+        """
+        Exécute une commande (équivalent de subprocess.run(capture_output=True, text=True)).
+
+        Raises:
+            ProcessingCancelled: si l'annulation est demandée avant ou pendant l'exécution
+        """
+        self.check()
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        self.track(process)
+        try:
+            stdout, stderr = process.communicate()
+        finally:
+            self.untrack(process)
+
+        if self._cancelled.is_set():
+            raise ProcessingCancelled("Traitement annulé")
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    def active_count(self):
+        """Nombre de processus FFmpeg en cours."""
+        with self._lock:
+            return len(self._processes)
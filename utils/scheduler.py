@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Ordonnancement des jobs d'encodage (plus long d'abord) et estimation des durées.
+
+Le coût d'un job est estimé à partir de son nombre d'images, de la résolution
+et du débit (images/s) mesuré lors des traitements précédents, à défaut du
+profil de l'encodeur. Le même modèle sert à l'ordre de soumission, au temps
+total prévu et au temps restant affiché pendant le traitement.
+"""
+
+import heapq
+import json
+import time
+from pathlib import Path
+
+# Emplacement de l'historique des débits utilisé par l'interface et la ligne de commande
+# (les appelants de la bibliothèque choisissent le leur, par défaut en mémoire)
+DEFAULT_HISTORY_PATH = Path.home() / ".padel_overlay" / "throughput.json"
+
+
+class ThroughputHistory:
+    """Débits mesurés (images/s par job) par encodeur, profil et résolution."""
+
+    # Poids d'une nouvelle mesure dans la moyenne glissante
+    SMOOTHING = 0.3
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: Fichier JSON de l'historique (partagé entre les traitements),
+                None pour un historique en mémoire (ni lu ni enregistré)
+        """
+        self.path = Path(path) if path else None
+        self.rates = {}
+        if self.path is None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.rates = {key: float(value) for key, value in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            self.rates = {}
+
+    @staticmethod
+    def key(encoder_name, hwaccel, height):
+        """Clé d'historique (ex: 'hevc_nvenc|cuda|2160p')."""
+        return f"{encoder_name}|{hwaccel}|{height}p"
+
+    def get(self, key):
+        """Débit mesuré, ou None si jamais mesuré."""
+        return self.rates.get(key)
+
+    def measured_profile(self, encoder_name, hwaccel):
+        """Débits mesurés {hauteur: images/s} d'un encodeur et d'un profil, toutes résolutions."""
+        prefix = f"{encoder_name}|{hwaccel}|"
+        profile = {}
+        for key, fps in self.rates.items():
+            if key.startswith(prefix) and key.endswith('p') and key[len(prefix):-1].isdigit():
+                profile[int(key[len(prefix):-1])] = fps
+        return profile
+
+    def record(self, key, fps):
+        """Ajoute une mesure (moyenne glissante exponentielle)."""
+        if fps <= 0:
+            return
+        previous = self.rates.get(key)
+        self.rates[key] = fps if previous is None else previous + self.SMOOTHING * (fps - previous)
+
+    def save(self):
+        """Enregistre l'historique (silencieux si le dossier n'est pas accessible)."""
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.rates, f, indent=2)
+        except OSError:
+            pass
+
+
+class CostModel:
+    """Coût estimé (secondes) d'un job d'encodage."""
+
+    # Coût fixe d'un job (lancement de FFmpeg, ouverture de la source, seek)
+    JOB_OVERHEAD = 1.0
+
+    def __init__(self, encoder, hwaccel, width, height, history=None):
+        """
+        Args:
+            encoder: Encoder du registre (utils/encoders.py)
+            hwaccel: Profil de décodage/composition
+            width, height: Résolution de la source
+            history: ThroughputHistory (débits mesurés), optionnel
+        """
+        self.encoder = encoder
+        self.width = width
+        self.height = height
+        self.history = history
+        self.hwaccel = hwaccel
+        self.history_key = ThroughputHistory.key(encoder.name, hwaccel, height)
+
+    @property
+    def fps(self):
+        """
+        Débit par job: mesuré à cette résolution si disponible, sinon extrapolé des
+        débits mesurés à d'autres résolutions, sinon profil par défaut de l'encodeur.
+        """
+        if not self.history:
+            return self.encoder.fps_for(self.width, self.height)
+        measured = self.history.get(self.history_key)
+        return measured or self.encoder.fps_for(
+            self.width, self.height, self.history.measured_profile(self.encoder.name, self.hwaccel))
+
+    def cost(self, frames):
+        """Durée estimée d'un job de `frames` images (secondes)."""
+        return self.JOB_OVERHEAD + frames / self.fps
+
+    def record(self, frames, elapsed):
+        """Ajoute la mesure d'un job terminé à l'historique."""
+        if self.history and elapsed > self.JOB_OVERHEAD:
+            self.history.record(self.history_key, frames / (elapsed - self.JOB_OVERHEAD))
+
+
+def lpt_order(jobs, costs):
+    """Ordre plus long d'abord (Longest Processing Time): indices triés par coût décroissant."""
+    return sorted(range(len(jobs)), key=lambda k: -costs[k])
+
+
+def predict_makespan(costs, workers):
+    """
+    Temps total prévu: chaque job (dans l'ordre donné) va au premier worker libre.
+
+    Returns:
+        Durée prévue (secondes)
+    """
+    if not costs:
+        return 0.0
+    finish = [0.0] * max(1, min(workers, len(costs)))
+    heapq.heapify(finish)
+    for cost in costs:
+        heapq.heappush(finish, heapq.heappop(finish) + cost)
+    return max(finish)
+
+
+class JobScheduler:
+    """Ordonne les jobs et suit l'avancement réel par rapport au modèle."""
+
+    def __init__(self, cost_model, workers):
+        self.cost_model = cost_model
+        self.workers = workers
+        self.costs = {}
+        self.remaining = {}
+        self.predicted = 0.0
+        self.start_time = None
+        self.done_predicted = 0.0
+        self.done_actual = 0.0
+
+    def plan(self, jobs, frames_of):
+        """
+        Trie les jobs du plus long au plus court et prévoit le temps total.
+
+        Args:
+            jobs: Liste de jobs (objets hashables, ex: tuples)
+            frames_of: Fonction job -> nombre d'images
+
+        Returns:
+            Liste des jobs dans l'ordre de soumission
+        """
+        costs = [self.cost_model.cost(frames_of(job)) for job in jobs]
+        ordered = [jobs[k] for k in lpt_order(jobs, costs)]
+        self.costs = {id(job): cost for job, cost in zip(jobs, costs)}
+        self.remaining = dict(self.costs)
+        self.predicted = predict_makespan([self.costs[id(job)] for job in ordered], self.workers)
+        self.start_time = time.time()
+        return ordered
+
+    def job_done(self, job, frames, elapsed):
+        """Enregistre la fin d'un job (durée réelle d'exécution)."""
+        cost = self.remaining.pop(id(job), None)
+        if cost is None:
+            return
+        self.done_predicted += cost
+        self.done_actual += elapsed
+        self.cost_model.record(frames, elapsed)
+
+    def job_skipped(self, job):
+        """Retire un job sans mesure (segment réutilisé, rien n'a été encodé)."""
+        self.remaining.pop(id(job), None)
+
+    def timeout(self, job, factor=10.0, minimum=60.0):
+        """Délai maximal d'un job: largement au-delà de son coût estimé (secondes)."""
+        return max(minimum, self.costs.get(id(job), 0.0) * factor)
+
+    @property
+    def speed_ratio(self):
+        """Rapport durée réelle / durée prévue des jobs terminés (1.0 au départ)."""
+        if self.done_predicted <= 0 or self.done_actual <= 0:
+            return 1.0
+        return self.done_actual / self.done_predicted
+
+    def eta(self):
+        """
+        Temps restant estimé (secondes).
+
+        Au moins le plus long job restant, sinon le travail restant réparti sur
+        les workers, corrigé par l'écart constaté entre prévu et réel.
+        """
+        if not self.remaining:
+            return 0.0
+        costs = list(self.remaining.values())
+        return max(max(costs), sum(costs) / self.workers) * self.speed_ratio
+
+    def elapsed(self):
+        """Temps écoulé depuis le début du traitement (secondes)."""
+        return time.time() - self.start_time if self.start_time else 0.0
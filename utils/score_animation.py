@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Animations de changement de score (fondu ou glissement des cases modifiées).
+
+Seules les lignes des cases qui changent sont rendues, sur une petite zone RGBA.
+Les images sont envoyées à FFmpeg en rawvideo (pipe) et encodées en un clip
+QuickTime Animation (qtrle, avec alpha), mis en cache par transition: une
+transition déjà vue (ex: 15/0 -> 30/0) n'est jamais rendue deux fois.
+"""
+
+import hashlib
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+from utils.overlay_track import encode_rgba_clip
+
+# Styles d'animation supportés
+# - fade:  fondu enchaîné entre l'ancien et le nouveau texte
+# - slide: l'ancien texte sort par le haut, le nouveau entre par le bas
+ANIMATION_STYLES = ('fade', 'slide')
+
+
+def _ease(t):
+    """Courbe d'accélération/décélération (smoothstep)."""
+    return t * t * (3 - 2 * t)
+
+
+class ScoreAnimator:
+    """Rend et met en cache les transitions entre deux états de score."""
+
+    def __init__(self, generator, cache_dir, style='slide', duration=0.4, fps=59.94):
+        """
+        Args:
+            generator: PadelOverlayGenerator (même résolution que la vidéo)
+            cache_dir: Dossier des clips de transition
+            style: 'fade' ou 'slide'
+            duration: Durée de la transition (secondes)
+            fps: Framerate de la vidéo
+        """
+        if style not in ANIMATION_STYLES:
+            raise ValueError(f"Style d'animation inconnu: {style}")
+        self.generator = generator
+        self.cache_dir = Path(cache_dir)
+        self.style = style
+        self.duration = duration
+        self.fps = fps
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    @property
+    def frame_count(self):
+        """Nombre d'images d'une transition."""
+        return max(2, round(self.duration * self.fps))
+
+    def changed_slots(self, previous, current):
+        """
+        Liste les zones (case, ligne) dont le texte change entre deux overlays.
+
+        Args:
+            previous, current: Arguments de create_overlay des deux états
+
+        Returns:
+            Liste de rectangles (x1, y1, x2, y2) intérieurs aux cases, ou None si
+            la mise en page change (set terminé, noms) et qu'une coupe franche s'impose
+        """
+        gen = self.generator
+        cells = gen.layout(previous.get('set1'), previous.get('set2'))
+        if cells != gen.layout(current.get('set1'), current.get('set2')):
+            return None
+
+        before = {(cell, row): text for cell, row, _, _, text, _ in gen.text_items(cells, **previous)}
+        after = {(cell, row): text for cell, row, _, _, text, _ in gen.text_items(cells, **current)}
+        if any(before[key] != after[key] for key in before if key[0] == 'names'):
+            return None
+
+        slots = []
+        inset = gen.border_radius
+        for (cell, row), text in after.items():
+            if before[(cell, row)] == text:
+                continue
+            (x1, y1), (x2, y2) = cells[cell]
+            sep_y = y1 + gen.row_height + 7
+            # Intérieur opaque de la ligne (hors coins arrondis et séparateur)
+            if row == 0:
+                slots.append((x1 + inset, y1, x2 - inset, sep_y - 2))
+            else:
+                slots.append((x1 + inset, sep_y + 2, x2 - inset, y2))
+        return slots
+
+    @staticmethod
+    def region(slots):
+        """Rectangle englobant des zones animées (x1, y1, x2, y2)."""
+        return (min(s[0] for s in slots), min(s[1] for s in slots),
+                max(s[2] for s in slots), max(s[3] for s in slots))
+
+    def render_frames(self, previous, current, slots):
+        """
+        Rend les images de la transition (zone englobante uniquement).
+
+        Les pixels hors des zones animées sont transparents: l'overlay fixe
+        du nouvel état reste visible dessous.
+
+        Returns:
+            Liste d'images RGBA de la taille de region(slots)
+        """
+        x0, y0, x1, y1 = self.region(slots)
+        before = self.generator.create_overlay(**previous)
+        after = self.generator.create_overlay(**current)
+        crops = [(slot, before.crop(slot), after.crop(slot)) for slot in slots]
+
+        frames = []
+        count = self.frame_count
+        for k in range(count):
+            t = _ease(k / (count - 1))
+            frame = Image.new('RGBA', (x1 - x0, y1 - y0), (0, 0, 0, 0))
+            for slot, old, new in crops:
+                if self.style == 'fade':
+                    content = Image.blend(old, new, t)
+                else:
+                    shift = round(t * old.height)
+                    content = Image.new('RGBA', old.size)
+                    content.paste(old, (0, -shift))
+                    content.paste(new, (0, old.height - shift))
+                frame.paste(content, (slot[0] - x0, slot[1] - y0))
+            frames.append(frame)
+        return frames
+
+    def cache_key(self, previous, current):
+        """Clé de cache d'une transition (états, style, durée, résolution)."""
+        payload = repr((
+            self.style, self.duration, self.fps,
+            self.generator.width, self.generator.height,
+            sorted(previous.items()), sorted(current.items())
+        ))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+    def transition(self, previous, current):
+        """
+        Retourne le clip de transition entre deux états (rendu au premier appel).
+
+        Returns:
+            Tuple (chemin du clip .mov, x, y) ou None si rien n'est animé
+        """
+        if previous is None or previous == current:
+            return None
+        slots = self.changed_slots(previous, current)
+        if not slots:
+            return None
+
+        x0, y0, _, _ = self.region(slots)
+        key = self.cache_key(previous, current)
+        clip_path = self.cache_dir / f"transition_{key}.mov"
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if not clip_path.exists():
+                self.encode(self.render_frames(previous, current, slots), clip_path)
+        return clip_path, x0, y0
+
+    def encode(self, frames, clip_path):
+        """Envoie les images à FFmpeg (rawvideo RGBA) et encode le clip qtrle."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = clip_path.with_suffix('.tmp.mov')
+        encode_rgba_clip(frames, tmp_path, self.fps)
+        tmp_path.replace(clip_path)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Cache persistant des segments encodés, partagé entre projets.
+
+Les mêmes échanges reviennent dans plusieurs montages (match complet, meilleurs
+moments, montage par joueur) avec la même plage de la source et le même score.
+Un segment est identifié par le contenu de ce qui le produit: empreinte de la
+source, plage exacte en images, état de l'overlay et réglages d'encodage. Un
+segment déjà encodé est lié (lien physique, ou copie) au lieu d'être réencodé.
+
+La taille du cache est bornée: les segments utilisés le moins récemment
+(date de modification, rafraîchie à chaque utilisation) sont supprimés.
+
+Par défaut (interface et ligne de commande), le cache est rangé à côté du
+projet, dans PROJECT_CACHE_DIRNAME (voir project_cache_dir).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+# Version du format des clés (à incrémenter si le rendu des segments change)
+CACHE_FORMAT = 1
+
+# Taille maximale par défaut du cache sur le disque
+DEFAULT_MAX_BYTES = 50 * 1024 ** 3
+
+# Octets lus au début et à la fin d'une grande source pour son empreinte
+FINGERPRINT_SAMPLE = 1024 * 1024
+
+# Taille jusqu'à laquelle une source est entièrement lue pour son empreinte
+FULL_HASH_MAX_BYTES = 64 * 1024 * 1024
+
+# Dossier du cache dans le dossier du projet
+PROJECT_CACHE_DIRNAME = ".padel_cache"
+
+
+def project_cache_dir(project_file):
+    """Dossier du cache des segments d'un projet (à côté de son fichier XML)."""
+    return Path(project_file).resolve().parent / PROJECT_CACHE_DIRNAME / "segments"
+
+
+def source_fingerprint(path, sample=FINGERPRINT_SAMPLE, full_hash_max=FULL_HASH_MAX_BYTES):
+    """
+    Empreinte d'une source.
+
+    Jusqu'à full_hash_max octets, tout le fichier est lu. Au-delà: taille, date
+    de modification, début et fin du fichier (une modification au milieu change
+    la date). Indépendante du nom et du dossier: une source renommée, ou copiée
+    en conservant sa date, garde la même empreinte.
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha256(str(stat.st_size).encode())
+    with open(path, 'rb') as f:
+        if stat.st_size <= full_hash_max:
+            while chunk := f.read(sample):
+                digest.update(chunk)
+            return digest.hexdigest()
+        digest.update(str(stat.st_mtime_ns).encode())
+        digest.update(f.read(sample))
+        f.seek(max(sample, stat.st_size - sample))
+        digest.update(f.read(sample))
+    return digest.hexdigest()
+
+
+def memoized_fingerprint(path, memo):
+    """Empreinte d'une source, calculée une fois par version du fichier (memo: dict réutilisé)."""
+    stat = os.stat(path)
+    version = (str(path), stat.st_size, stat.st_mtime_ns)
+    if version not in memo:
+        memo[version] = source_fingerprint(path)
+    return memo[version]
+
+
+def link_or_copy(src, dest):
+    """Lien physique de src vers dest (copie si le lien est impossible: autre disque, FAT...)."""
+    dest = Path(dest)
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class SegmentCache:
+    """Segments encodés indexés par le contenu de leur rendu, avec éviction LRU."""
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            root: Dossier du cache (partagé entre projets)
+            max_bytes: Taille maximale des segments conservés
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, path):
+        """Empreinte d'une source (calculée une fois par version du fichier)."""
+        return memoized_fingerprint(path, self._fingerprints)
+
+    @staticmethod
+    def key(parts):
+        """Clé d'un segment: hash des éléments de son rendu (dict sérialisable en JSON)."""
+        data = json.dumps({'format': CACHE_FORMAT, **parts}, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def entry_path(self, key, suffix):
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def fetch(self, key, dest):
+        """
+        Place le segment en cache dans dest (même extension que dest).
+
+        Returns:
+            True si le segment était en cache
+        """
+        entry = self.entry_path(key, Path(dest).suffix)
+        try:
+            link_or_copy(entry, dest)
+            # Utilisation récente: dernier candidat à l'éviction
+            os.utime(entry)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def store(self, key, segment_path):
+        """Ajoute un segment terminé au cache, puis libère de la place si nécessaire."""
+        segment_path = Path(segment_path)
+        entry = self.entry_path(key, segment_path.suffix)
+        entry.parent.mkdir(exist_ok=True)
+        # Écriture sous un nom temporaire puis renommage: jamais d'entrée partielle
+        partial = entry.with_name(f"{entry.name}.{os.getpid()}.{threading.get_ident()}.part")
+        link_or_copy(segment_path, partial)
+        os.replace(partial, entry)
+        os.utime(entry)
+        self.evict()
+        return entry
+
+    def entries(self):
+        """Segments en cache: liste de (date d'utilisation, taille, chemin)."""
+        entries = []
+        for path in self.root.glob('*/*'):
+            if path.name.endswith('.part'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """
+        Supprime les segments utilisés le moins récemment au-delà de max_bytes.
+
+        Returns:
+            Nombre de segments supprimés
+        """
+        with self._lock:
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            return removed
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Index des fichiers vidéo sources.
+Un seul parcours des dossiers (os.scandir), puis une recherche par dictionnaire par clip.
+"""
+
+import os
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+
+def decode_pathurl(pathurl):
+    """
+    Convertit un pathurl Premiere (file://localhost/...) en chemin local.
+
+    Exemples:
+        file://localhost/D:/Match/C0001.MP4    -> D:/Match/C0001.MP4
+        file://localhost/Users/me/C%200001.MP4 -> /Users/me/C 0001.MP4
+        file://nas/share/C0001.MP4             -> //nas/share/C0001.MP4 (partage réseau)
+    """
+    if not pathurl:
+        return ''
+    if not pathurl.lower().startswith('file:'):
+        return unquote(pathurl)
+
+    parsed = urlparse(pathurl)
+    path = unquote(parsed.path)
+
+    # Chemin Windows avec lettre de lecteur ("/D:/...") ou UNC encodé ("/\\nas\share\...")
+    if (len(path) >= 3 and path[0] == '/' and path[2] == ':') or path.startswith('/\\\\'):
+        path = path[1:]
+
+    # Hôte réseau (autre que localhost): chemin UNC
+    if parsed.netloc and parsed.netloc.lower() != 'localhost':
+        path = f"//{parsed.netloc}{path}"
+    return path
+
+
+class SourceIndex:
+    """Index des fichiers sources, recherche insensible à la casse."""
+
+    def __init__(self, folders):
+        """
+        Construit l'index en parcourant chaque dossier une seule fois.
+
+        Args:
+            folders: Dossiers à indexer, par ordre de priorité
+        """
+        self.by_name = {}
+        self._pathurl_cache = {}
+        for folder in folders:
+            self.add_folder(folder)
+
+    def add_folder(self, folder):
+        """Ajoute les fichiers d'un dossier (les dossiers déjà indexés restent prioritaires)."""
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        self.by_name.setdefault(entry.name.casefold(), entry.path)
+        except OSError:
+            pass
+
+    def _from_pathurl(self, pathurl):
+        """Chemin d'origine du fichier (pathurl), vérifié une seule fois par URL."""
+        if pathurl not in self._pathurl_cache:
+            path = decode_pathurl(pathurl)
+            self._pathurl_cache[pathurl] = path if path and os.path.isfile(path) else None
+        return self._pathurl_cache[pathurl]
+
+    def lookup(self, clip):
+        """
+        Trouve le fichier source d'un clip.
+
+        Ordre: nom du fichier dans les dossiers indexés, nom du clip, puis pathurl.
+
+        Args:
+            clip: Dict de clip (file_name, name, pathurl) ou nom de fichier
+
+        Returns:
+            Chemin du fichier, ou None
+        """
+        if isinstance(clip, str):
+            clip = {'name': clip}
+
+        for key in ('file_name', 'name'):
+            name = clip.get(key)
+            if name:
+                path = self.by_name.get(name.casefold())
+                if path:
+                    return path
+
+        pathurl = clip.get('pathurl')
+        if pathurl:
+            path = self._from_pathurl(pathurl)
+            if path:
+                return path
+            # Même nom de fichier que le pathurl, mais dans un dossier indexé
+            path = self.by_name.get(Path(decode_pathurl(pathurl).replace('\\', '/')).name.casefold())
+            if path:
+                return path
+        return None
+
+    def resolve_all(self, clips):
+        """
+        Résout les sources de tous les clips.
+
+        Returns:
+            Tuple (liste des chemins ou None par clip, liste des noms non résolus)
+        """
+        paths = [self.lookup(clip) for clip in clips]
+        unresolved = []
+        for clip, path in zip(clips, paths):
+            if path is None:
+                name = clip.get('file_name') or clip.get('name')
+                if name not in unresolved:
+                    unresolved.append(name)
+        return paths, unresolved
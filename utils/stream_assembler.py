@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Assemblage en continu des segments MPEG-TS dans la vidéo finale.
+
+Chaque segment est ajouté à la sortie dès que tous les segments précédents
+l'ont été, puis supprimé: le dossier de travail ne contient plus qu'une
+petite fenêtre de segments terminés en avance. Une sortie .ts est écrite
+directement; les autres conteneurs passent par un remux FFmpeg alimenté
+par l'entrée standard, qui écrit le fichier final au fil de l'eau.
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+from utils.ffmpeg_commands import build_stream_remux_command
+
+
+class StreamingAssembler:
+    """Ajoute les segments à la sortie dans l'ordre de la timeline, au fur et à mesure."""
+
+    def __init__(self, output_path, keys, temp_path, control=None, chunk_size=16 * 1024 * 1024):
+        """
+        Args:
+            output_path: Vidéo finale
+            keys: Clés des segments attendus, dans l'ordre de la vidéo (ex: (clip, morceau))
+            temp_path: Dossier de travail (journal du remux)
+            control: ProcessControl du traitement (annulation du remux), optionnel
+            chunk_size: Taille des blocs copiés
+        """
+        self.output_path = Path(output_path)
+        self.order = list(keys)
+        self.position = 0
+        self.ready = {}
+        self.appended = 0
+        self.max_pending = 0
+        self.broken = False
+        self.control = control
+        self.chunk_size = chunk_size
+        self.process = None
+        self.log = None
+
+        if self.output_path.suffix.lower() == '.ts':
+            self.sink = open(self.output_path, 'wb')
+        else:
+            self.log = open(Path(temp_path) / "stream_remux.log", 'w+', encoding='utf-8')
+            self.process = subprocess.Popen(build_stream_remux_command(self.output_path),
+                                            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                            stderr=self.log)
+            self.sink = self.process.stdin
+            if control:
+                control.track(self.process)
+
+    @property
+    def complete(self):
+        """True si tous les segments attendus ont été traités (ajoutés ou ignorés)."""
+        return self.position == len(self.order)
+
+    def add(self, key, segment_path):
+        """Signale un segment terminé; ajoute à la sortie tous les segments désormais dans l'ordre."""
+        self.ready[key] = segment_path
+        self._flush()
+
+    def skip(self, key):
+        """Signale un segment qui ne sera pas produit (échec): les suivants ne l'attendent pas."""
+        self.ready[key] = None
+        self._flush()
+
+    def _flush(self):
+        while self.position < len(self.order) and self.order[self.position] in self.ready:
+            segment_path = self.ready.pop(self.order[self.position])
+            self.position += 1
+            if segment_path is None:
+                continue
+            if not self.broken:
+                try:
+                    with open(segment_path, 'rb') as src:
+                        shutil.copyfileobj(src, self.sink, self.chunk_size)
+                    self.appended += 1
+                except BrokenPipeError:
+                    # Le remux s'est arrêté: l'erreur est rapportée par close()
+                    self.broken = True
+            Path(segment_path).unlink(missing_ok=True)
+        self.max_pending = max(self.max_pending, len(self.ready))
+
+    def close(self):
+        """
+        Termine la sortie.
+
+        Returns:
+            subprocess.CompletedProcess (code de retour du remux, 0 pour une sortie .ts)
+        """
+        try:
+            self.sink.close()
+        except BrokenPipeError:
+            self.broken = True
+        if self.process is None:
+            return subprocess.CompletedProcess([], 0, '', '')
+
+        returncode = self.process.wait()
+        if self.control:
+            self.control.untrack(self.process)
+        self.log.seek(0)
+        stderr = self.log.read()
+        self.log.close()
+        return subprocess.CompletedProcess(self.process.args, returncode, '', stderr)
+
+    def abort(self):
+        """Interrompt l'assemblage (annulation): la sortie partielle est supprimée."""
+        try:
+            self.sink.close()
+        except OSError:
+            pass
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+            if self.control:
+                self.control.untrack(self.process)
+            self.log.close()
+        self.output_path.unlink(missing_ok=True)
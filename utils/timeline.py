@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Modèle de timeline pour les XML Premiere Pro (format Final Cut Pro 7 / xmeml).
+Indexe fichiers, clips et séquences imbriquées en une seule passe sur l'arbre XML.
+"""
+
+import xml.etree.ElementTree as ET
+from pathlib import PurePosixPath
+
+# Images fixes (logos, cartons): jamais un point de match, ignorées à l'aplatissement
+STILL_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.tif', '.tiff', '.psd', '.bmp', '.gif', '.ai', '.svg'}
+
+
+def _text(elem, tag, default=None):
+    """Retourne le texte d'un enfant direct (ou default s'il est absent)."""
+    child = elem.find(tag)
+    if child is None or child.text is None:
+        return default
+    return child.text.strip()
+
+
+def _int(elem, tag, default=0):
+    """Retourne la valeur entière d'un enfant direct."""
+    value = _text(elem, tag)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _enabled(elem):
+    """Indique si un élément (track, clipitem) est activé."""
+    return (_text(elem, 'enabled', 'TRUE') or 'TRUE').upper() != 'FALSE'
+
+
+class Timeline:
+    """Timeline Premiere Pro indexée (fichiers, clips et séquences par id)."""
+
+    # Profondeur maximale de séquences imbriquées (protection contre les cycles)
+    MAX_NESTING = 16
+
+    def __init__(self, root):
+        """
+        Indexe l'arbre XML en une seule passe.
+
+        Args:
+            root: Élément racine (<xmeml> ou <sequence>)
+        """
+        self.root = root
+        self.files = {}       # id -> {'name', 'pathurl'}
+        self.clipitems = {}   # id -> élément <clipitem>
+        self.sequences = {}   # id -> élément <sequence> (définition complète)
+
+        for elem in root.iter():
+            elem_id = elem.get('id')
+            if elem_id is None:
+                continue
+            if elem.tag == 'file':
+                # Premiere n'écrit le <file> complet qu'à la première utilisation,
+                # les suivantes ne sont que des références <file id="..."/>
+                if len(elem) and elem_id not in self.files:
+                    media = elem.find('media')
+                    self.files[elem_id] = {
+                        'name': _text(elem, 'name', ''),
+                        'pathurl': _text(elem, 'pathurl', ''),
+                        # Fichier audio seul (musique, commentaire): pas d'image à rendre
+                        'has_video': media is None or media.find('video') is not None
+                    }
+            elif elem.tag == 'clipitem':
+                self.clipitems[elem_id] = elem
+            elif elem.tag == 'sequence':
+                if elem.find('media') is not None:
+                    self.sequences[elem_id] = elem
+
+    @classmethod
+    def from_file(cls, xml_path):
+        """Charge et indexe un fichier XML."""
+        return cls(ET.parse(xml_path).getroot())
+
+    def main_sequence(self):
+        """Retourne la séquence principale (première séquence de premier niveau)."""
+        if self.root.tag == 'sequence':
+            return self.root
+        sequence = self.root.find('sequence')
+        if sequence is None:
+            sequence = self.root.find('.//sequence')
+        return sequence
+
+    def fps(self, sequence=None):
+        """Framerate d'une séquence (<rate>, avec correction NTSC)."""
+        sequence = sequence if sequence is not None else self.main_sequence()
+        rate = sequence.find('rate') if sequence is not None else None
+        if rate is None:
+            return None
+        timebase = _int(rate, 'timebase', 0)
+        if not timebase:
+            return None
+        if (_text(rate, 'ntsc', 'FALSE') or '').upper() == 'TRUE':
+            return round(timebase * 1000 / 1001, 2)
+        return float(timebase)
+
+    def video_tracks(self, sequence):
+        """Retourne les pistes vidéo activées d'une séquence (de bas en haut)."""
+        return [track for track in sequence.findall('media/video/track') if _enabled(track)]
+
+    def resolve_file(self, clipitem):
+        """Retourne le fichier source d'un clip (résolu par id), ou None."""
+        file_elem = clipitem.find('file')
+        if file_elem is None:
+            return None
+        return self.files.get(file_elem.get('id'))
+
+    def is_video_clip(self, clipitem, file_info):
+        """
+        Indique si un clip est une vidéo de match (ni image fixe, ni audio seul).
+
+        Les générateurs et titres n'ont pas de fichier et sont déjà écartés.
+        """
+        if not file_info.get('has_video', True):
+            return False
+        if (_text(clipitem, 'stillframe', 'FALSE') or '').upper() == 'TRUE':
+            return False
+        name = file_info['name'] or file_info['pathurl']
+        return PurePosixPath(name.replace('\\', '/')).suffix.lower() not in STILL_EXTENSIONS
+
+    def resolve_sequence(self, clipitem):
+        """Retourne la séquence imbriquée référencée par un clip, ou None."""
+        seq_elem = clipitem.find('sequence')
+        if seq_elem is None:
+            return None
+        return self.sequences.get(seq_elem.get('id'), seq_elem)
+
+    def _clip_bounds(self, track):
+        """
+        Calcule (clipitem, start, end) pour chaque clip d'une piste.
+
+        Les bords à -1 (clip dans une transition) prennent le milieu de la transition.
+        """
+        items = []
+        transition = None
+        for child in track:
+            if child.tag == 'transitionitem':
+                transition = (_int(child, 'start'), _int(child, 'end'))
+                if items and items[-1][2] == -1:
+                    items[-1][2] = (transition[0] + transition[1]) // 2
+            elif child.tag == 'clipitem':
+                start = _int(child, 'start')
+                end = _int(child, 'end')
+                if start == -1 and transition:
+                    start = (transition[0] + transition[1]) // 2
+                items.append([child, start, end])
+        return [item for item in items if item[1] >= 0 and item[2] > item[1]]
+
+    def _sequence_edits(self, sequence, depth):
+        """Liste les clips (éventuellement imbriqués) de toutes les pistes d'une séquence."""
+        edits = []
+        for track_index, track in enumerate(self.video_tracks(sequence)):
+            for clipitem, start, end in self._clip_bounds(track):
+                if not _enabled(clipitem):
+                    continue
+                in_point = _int(clipitem, 'in')
+
+                nested = self.resolve_sequence(clipitem)
+                if nested is not None:
+                    if depth >= self.MAX_NESTING:
+                        continue
+                    window_end = in_point + (end - start)
+                    for edit in self.flatten(self._sequence_edits(nested, depth + 1)):
+                        lo = max(edit['start_frame'], in_point)
+                        hi = min(edit['end_frame'], window_end)
+                        if hi <= lo:
+                            continue
+                        shift = lo - edit['start_frame']
+                        edits.append(dict(
+                            edit,
+                            start_frame=start + (lo - in_point),
+                            end_frame=start + (hi - in_point),
+                            in_frame=edit['in_frame'] + shift,
+                            out_frame=edit['in_frame'] + shift + (hi - lo),
+                            duration_frames=hi - lo,
+                            track=track_index
+                        ))
+                    continue
+
+                file_info = self.resolve_file(clipitem)
+                if file_info is None or not self.is_video_clip(clipitem, file_info):
+                    # Générateurs, titres, logos, audio seul: rien à rendre depuis une source
+                    continue
+
+                edits.append({
+                    'id': clipitem.get('id'),
+                    'name': _text(clipitem, 'name', 'Unknown'),
+                    'file_name': file_info['name'],
+                    'start_frame': start,
+                    'end_frame': end,
+                    'in_frame': in_point,
+                    'out_frame': _int(clipitem, 'out'),
+                    'duration_frames': end - start,
+                    'pathurl': file_info['pathurl'],
+                    'track': track_index
+                })
+        return edits
+
+    @staticmethod
+    def drop_inserts(edits):
+        """
+        Retire les clips de pistes supérieures placés à l'intérieur d'un clip inférieur.
+
+        Un clip = un point (une ligne de la feuille de scores): un plan inséré au
+        milieu d'un point le couperait en deux. Le point reste entier; un clip
+        supérieur qui déborde d'un bord ne fait que raccourcir le clip inférieur.
+        """
+        # Étendue de chaque clip: suite continue de clips sur sa piste (séquence imbriquée dépliée)
+        spans = [None] * len(edits)
+        for track in {edit['track'] for edit in edits}:
+            run = []
+            for k in sorted((k for k, e in enumerate(edits) if e['track'] == track),
+                            key=lambda k: edits[k]['start_frame']):
+                if run and edits[k]['start_frame'] != edits[run[-1]]['end_frame']:
+                    for j in run:
+                        spans[j] = (edits[run[0]]['start_frame'], edits[run[-1]]['end_frame'])
+                    run = []
+                run.append(k)
+            for j in run:
+                spans[j] = (edits[run[0]]['start_frame'], edits[run[-1]]['end_frame'])
+
+        inserts = set()
+        for k, upper in enumerate(edits):
+            start, end = spans[k]
+            if any(lower['track'] < upper['track']
+                   and lower['start_frame'] < start and end < lower['end_frame']
+                   for lower in edits):
+                inserts.add(k)
+        return [edit for k, edit in enumerate(edits) if k not in inserts]
+
+    @staticmethod
+    def flatten(edits):
+        """
+        Aplati des clips multi-pistes: à chaque instant, la piste la plus haute l'emporte.
+
+        Un clip n'est jamais découpé en plusieurs morceaux (voir drop_inserts):
+        les clips partiellement masqués sont seulement raccourcis (in_frame ajusté).
+
+        Returns:
+            Liste ordonnée de clips sans chevauchement
+        """
+        edits = Timeline.drop_inserts(edits)
+        boundaries = sorted({e['start_frame'] for e in edits} | {e['end_frame'] for e in edits})
+        by_start = sorted(range(len(edits)), key=lambda k: edits[k]['start_frame'])
+
+        flattened = []
+        active = []
+        next_edit = 0
+        for lo, hi in zip(boundaries, boundaries[1:]):
+            while next_edit < len(by_start) and edits[by_start[next_edit]]['start_frame'] <= lo:
+                active.append(by_start[next_edit])
+                next_edit += 1
+            active = [k for k in active if edits[k]['end_frame'] > lo]
+            if not active:
+                continue
+
+            top = max(active, key=lambda k: (edits[k]['track'], k))
+            edit = edits[top]
+            last = flattened[-1] if flattened else None
+            if last is not None and last['_source'] == top and last['end_frame'] == lo:
+                last['end_frame'] = hi
+                last['duration_frames'] = hi - last['start_frame']
+                last['out_frame'] = last['in_frame'] + last['duration_frames']
+                continue
+
+            shift = lo - edit['start_frame']
+            flattened.append(dict(
+                edit,
+                start_frame=lo,
+                end_frame=hi,
+                in_frame=edit['in_frame'] + shift,
+                out_frame=edit['in_frame'] + shift + (hi - lo),
+                duration_frames=hi - lo,
+                _source=top
+            ))
+
+        for edit in flattened:
+            del edit['_source']
+        return flattened
+
+    def edit_list(self, sequence=None):
+        """
+        Liste de montage aplatie et ordonnée de la séquence principale.
+
+        Returns:
+            Liste de clips (dict: name, start_frame, end_frame, in_frame,
+            out_frame, duration_frames, pathurl, ...)
+        """
+        sequence = sequence if sequence is not None else self.main_sequence()
+        if sequence is None:
+            return []
+        return self.flatten(self._sequence_edits(sequence, 0))
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Validation des entrées avant encodage (clips du XML, scores de l'Excel, sources).
+Toutes les vérifications sont faites en une passe, avant de lancer FFmpeg.
+"""
+
+import re
+
+from utils.overlay_generator import parse_score
+
+try:
+    import pandas as pd
+except ImportError:  # pandas est optionnel (contrôle de progression vectorisé)
+    pd = None
+
+# Valeurs de points autorisées (hors tie-break, où les points sont des entiers)
+TENNIS_POINTS = {'0', '15', '30', '40', 'A', 'AD'}
+
+_SCORE_RE = re.compile(r'^\s*[^/]+\s*/\s*[^/]+\s*$')
+
+
+class ValidationReport:
+    """Rapport de validation: erreurs bloquantes et avertissements."""
+
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+
+    def add_error(self, index, field, message):
+        """Ajoute une erreur bloquante (index = numéro de point, 1-based, ou None)."""
+        self.errors.append({'index': index, 'field': field, 'message': message})
+
+    def add_warning(self, index, field, message):
+        """Ajoute un avertissement non bloquant."""
+        self.warnings.append({'index': index, 'field': field, 'message': message})
+
+    @property
+    def ok(self):
+        """True si aucune erreur bloquante."""
+        return not self.errors
+
+    def format(self):
+        """Formate le rapport pour l'affichage."""
+        lines = []
+        for title, issues in (("❌ Erreurs", self.errors), ("⚠️  Avertissements", self.warnings)):
+            if not issues:
+                continue
+            lines.append(f"{title} ({len(issues)}):")
+            for issue in issues:
+                where = f"Point {issue['index']}" if issue['index'] else "Global"
+                lines.append(f"   • {where} [{issue['field']}]: {issue['message']}")
+        return "\n".join(lines) if lines else "✅ Entrées valides"
+
+
+class ValidationError(ValueError):
+    """Erreur levée quand la validation échoue (contient le rapport)."""
+
+    def __init__(self, report):
+        super().__init__(report.format())
+        self.report = report
+
+
+def _check_score_string(report, index, field, value, points=False, tiebreak=False):
+    """Vérifie le format d'un score "eq1/eq2" via parse_score."""
+    if not isinstance(value, str) or not _SCORE_RE.match(value):
+        hint = " (cellule Excel convertie en date ? la formater en texte)" if not isinstance(value, str) else ""
+        report.add_error(index, field, f"format invalide: {value!r}{hint}")
+        return None
+
+    if points:
+        _, _, eq1, eq2 = parse_score("0/0", value)
+        valid = all(p.upper() in TENNIS_POINTS or (tiebreak and p.isdigit()) for p in (eq1, eq2))
+    else:
+        eq1, eq2, _, _ = parse_score(value, "0/0")
+        valid = eq1.isdigit() and eq2.isdigit()
+
+    if not valid:
+        report.add_error(index, field, f"valeur invalide: {value!r}")
+        return None
+    return eq1, eq2
+
+
+def _progression_warnings(rows):
+    """
+    Contrôle de progression du score, ligne par ligne (sans pandas).
+
+    Args:
+        rows: Lignes de score validées (voir validate_inputs)
+
+    Returns:
+        Liste de (index, champ, message), dans l'ordre des points
+    """
+    warnings = []
+    previous = None
+    completed_sets = {}
+    for row in rows:
+        index = row['index']
+        for field in ('set1', 'set2'):
+            value = row.get(field)
+            # Un set terminé ne change plus (tant qu'il est égal aux jeux, il est en cours)
+            if value is None or value == row['jeux']:
+                continue
+            if field in completed_sets and completed_sets[field] != value:
+                warnings.append((index, field, f"set terminé modifié: {completed_sets[field]} -> {value}"))
+            completed_sets[field] = value
+
+        games = row['games']
+        if games is None:
+            continue
+        if previous:
+            if row['set_number'] is not None and previous['set_number'] is not None \
+                    and row['set_number'] < previous['set_number']:
+                warnings.append((index, 'set', f"numéro de set en recul: {previous['set']} -> {row['set']}"))
+            elif row['set'] == previous['set'] and row['total'] < previous['total']:
+                warnings.append((index, 'jeux', f"jeux en recul: {'/'.join(previous['games'])} "
+                                                f"-> {'/'.join(games)}"))
+        previous = row
+    return warnings
+
+
+def _progression_warnings_pandas(rows):
+    """
+    Contrôle de progression du score en une passe vectorisée (pandas).
+
+    Chaque ligne est comparée à la précédente par décalage (shift) des colonnes:
+    sets terminés modifiés, numéro de set et total des jeux en recul. Même
+    résultat que _progression_warnings.
+    """
+    if not rows:
+        return []
+    frame = pd.DataFrame(rows, columns=['index', 'set', 'set_number', 'games', 'total',
+                                        'jeux', 'set1', 'set2'], dtype=object)
+    warnings = []
+
+    for field in ('set1', 'set2'):
+        values = frame[field]
+        done = values[values.notna() & values.ne(frame['jeux'])]
+        previous = done.shift()
+        changed = previous.notna() & done.ne(previous)
+        for index, old, new in zip(frame.loc[changed[changed].index, 'index'],
+                                   previous[changed], done[changed]):
+            warnings.append((index, field, f"set terminé modifié: {old} -> {new}"))
+
+    played = frame[frame['games'].notna()]
+    numbers = pd.to_numeric(played['set_number'], errors='coerce')
+    totals = pd.to_numeric(played['total'])
+    # Égalité des valeurs brutes (None compris), comme la comparaison ligne à ligne
+    keys = played['set'].map(repr)
+    set_back = numbers < numbers.shift()
+    games_back = ~set_back & keys.eq(keys.shift()) & (totals < totals.shift())
+    previous_sets, previous_games = played['set'].shift(), played['games'].shift()
+    for index, old, new in zip(played['index'][set_back], previous_sets[set_back], played['set'][set_back]):
+        warnings.append((index, 'set', f"numéro de set en recul: {old} -> {new}"))
+    for index, old, new in zip(played['index'][games_back], previous_games[games_back],
+                               played['games'][games_back]):
+        warnings.append((index, 'jeux', f"jeux en recul: {'/'.join(old)} -> {'/'.join(new)}"))
+
+    # Ordre des points, puis ordre des contrôles pour un même point
+    return sorted(warnings, key=lambda warning: warning[0])
+
+
+def validate_inputs(clips, scores, fps, durations=None, super_tiebreak=False):
+    """
+    Valide clips, sources et scores avant l'encodage.
+
+    Args:
+        clips: Clips issus de parse_xml (avec 'source_path' si résolus)
+        scores: Scores issus de parse_excel
+        fps: Framerate de la timeline
+        durations: Dict {chemin source: durée en secondes} (sondé par ffprobe)
+        super_tiebreak: Format du match: 3e set remplacé par un super tie-break en points
+
+    Returns:
+        ValidationReport
+    """
+    report = ValidationReport()
+    durations = durations or {}
+
+    if len(clips) != len(scores):
+        report.add_error(None, 'count', f"{len(clips)} clips mais {len(scores)} scores")
+
+    # Sources et plages (in/out) des clips
+    for index, clip in enumerate(clips, 1):
+        if 'source_path' in clip and not clip['source_path']:
+            name = clip.get('file_name') or clip.get('name')
+            report.add_error(index, 'source', f"fichier introuvable: {name}")
+            continue
+
+        if clip['in_frame'] < 0 or clip['duration_frames'] <= 0:
+            report.add_error(index, 'range',
+                             f"plage invalide (in={clip['in_frame']}, durée={clip['duration_frames']})")
+            continue
+
+        duration = durations.get(clip.get('source_path'))
+        end_time = (clip['in_frame'] + clip['duration_frames']) / fps
+        if duration is not None and end_time > duration + 1 / fps:
+            report.add_error(index, 'range',
+                             f"fin du clip ({end_time:.2f}s) au-delà de la source ({duration:.2f}s)")
+
+    # Formats des scores (ligne par ligne: messages par cellule)
+    rows = []
+    for index, score in enumerate(scores, 1):
+        games = _check_score_string(report, index, 'jeux', score['jeux'])
+        # Points numériques libres en tie-break (6/6), ou au 3e set si le format du match
+        # est un super tie-break (un 3e set joué normalement garde les points 15/30/40)
+        set_num = score.get('set')
+        tiebreak = games == ('6', '6') or (super_tiebreak and isinstance(set_num, int) and set_num >= 3)
+        _check_score_string(report, index, 'points', score['points'], points=True, tiebreak=tiebreak)
+        row = {
+            'index': index,
+            'set': set_num,
+            'set_number': set_num if isinstance(set_num, int) else None,
+            'games': games,
+            'total': sum(map(int, games)) if games else None,
+            'jeux': score['jeux']
+        }
+        for field in ('set1', 'set2'):
+            if score.get(field) is not None and _check_score_string(report, index, field, score[field]):
+                row[field] = score[field]
+        rows.append(row)
+
+    # Progression du score (chaque point comparé au précédent)
+    progression = _progression_warnings_pandas if pd is not None else _progression_warnings
+    for index, field, message in progression(rows):
+        report.add_warning(index, field, message)
+
+    return report